@@ -1,4 +1,74 @@
-
 # Cesta ke konfiguracnimu souboru
 # مسار ملف التكوين
-DATA_FILE_PATH = "data/system_data.json"
\ No newline at end of file
+DATA_FILE_PATH = "data/system_data.json"
+
+# Rezim ukladani: "snapshot" (cely soubor pri kazde zmene) nebo "journal" (pripisovani zmen)
+# وضع الحفظ: لقطة كاملة أو سجل تغييرات
+PERSISTENCE_MODE = "snapshot"
+
+# Limity zurnalu, po jejichz prekroceni se provede kompakce do snapshotu
+# حدود السجل قبل الضغط
+JOURNAL_MAX_RECORDS = 1000
+JOURNAL_MAX_BYTES = 1024 * 1024
+
+# Backend uloziste: "json" (jeden soubor) nebo "sqlite" (indexovane tabulky v DATA_FILE_PATH)
+# محرك التخزين: ملف JSON أو قاعدة SQLite
+STORAGE_BACKEND = "json"
+
+# Format datoveho souboru: "json" (odsazeny), "json-compact" nebo "marshal" (binarni)
+# صيغة ملف البيانات: JSON منسق أو مضغوط أو ثنائي
+DATA_FORMAT = "json"
+
+# Povolene zpomaleni benchmarku proti ulozenemu zakladu (src/benchmark.py --baseline)
+# الحد المسموح للتباطؤ مقارنة بالقياس الأساسي
+BENCH_REGRESSION_THRESHOLD = 1.5
+
+# Mereni doby volani, zapisu a nacitani; pri vypnuti temer bez reziji
+# قياس زمن الاستدعاءات والحفظ والتحميل
+METRICS_ENABLED = False
+# Soubor, do ktereho se metriky zapisi pri ukonceni, a format: "json" nebo "prometheus"
+# ملف وصيغة تصدير المقاييس عند الخروج
+METRICS_EXPORT_PATH = "data/metrics.json"
+METRICS_FORMAT = "json"
+
+# Sdileny datovy soubor pro vice procesu (zamek fcntl, verze souboru, slouceni zmen).
+# Kazdy zapis je pak synchronni prepis pod zamkem (bez zapisovaciho vlakna) - proto jen na vyzadani.
+# ملف بيانات مشترك بين عدة عمليات (اختياري)
+SHARED_DATA_FILE = False
+
+# Nejvyssi pocet zapisu, ktere asynchronni sluzba ulozi jednim zapisem
+# الحد الأقصى للكتابات في دفعة واحدة
+ASYNC_MAX_BATCH = 1000
+
+# Adresa lokalniho API serveru (cli.py serve)
+# عنوان خادم واجهة البرمجة المحلي
+SERVER_HOST = "127.0.0.1"
+SERVER_PORT = 8080
+
+# Cache rozparsovanych dat vedle datoveho souboru (<soubor>.cache) pro rychly start
+# ذاكرة مؤقتة للبيانات المحللة لتسريع بدء التشغيل
+STARTUP_CACHE = True
+
+# Pocet polozek na jednu stranku vypisu v CLI
+# عدد العناصر في كل صفحة
+CLI_PAGE_SIZE = 20
+
+# Archiv dokoncenych planu: komprese segmentu ("gzip" nebo "lzma") a stari planu pro archivaci
+# أرشيف الخطط المكتملة: الضغط وعمر الخطة
+ARCHIVE_COMPRESSION = "gzip"
+ARCHIVE_AFTER_DAYS = 90
+
+# Adresar se soubory jednotlivych tymu (<tym>.json), kazdy tym ma vlastni SystemData
+# مجلد ملفات الفرق، لكل فريق ملف بيانات خاص
+TEAMS_DIR = "data/teams"
+# Pocet procesu pro paralelni nacitani tymu (0 = pocet CPU)
+# عدد العمليات لتحميل الفرق بالتوازي
+SHARD_LOAD_WORKERS = 0
+
+# Pocet poslednich zmen, ktere lze vratit (undo); 0 = bez historie
+# عدد التغييرات الأخيرة التي يمكن التراجع عنها
+UNDO_DEPTH = 20
+
+# Kanal zmen vedle datoveho souboru (<soubor>.changes) pro dashboardy a dalsi odberatele
+# سجل التغييرات للمستهلكين الآخرين
+CHANGE_FEED = True
@@ -0,0 +1,286 @@
+# src/analytics.py
+import math
+from array import array
+from dataclasses import dataclass
+from datetime import date
+from itertools import chain
+from typing import Dict, Iterable, List, Optional, Sequence, Tuple
+
+from src.models import SystemData, TrainingPlan, STATUS_COMPLETED
+from src.repository import SystemRepository
+
+# NumPy je volitelny; bez nej se pouzije modul array a cisty Python.
+# Importuje se az pri prvnim vypoctu - import trva desitky ms a CLI ho pri startu nepotrebuje.
+# NumPy اختياري
+np = None
+_numpy_checked = False
+
+
+def numpy_available() -> bool:
+    """Imports NumPy on first call; True when it is installed."""
+    global np, _numpy_checked
+    if not _numpy_checked:
+        try:
+            import numpy
+            np = numpy
+        except ImportError:  # pragma: no cover - depends on the environment
+            np = None
+        _numpy_checked = True
+    return np is not None
+
+_NAN = float("nan")
+
+# Klic skupiny: (player_id, pondeli tydne jako ordinal nebo None)
+GroupKey = Tuple[int, Optional[int]]
+
+
+@dataclass
+class LoadMetric:
+    """A named training-load number computed over one exercise type.
+
+    value = sum(product of `terms`) per group, divided by sum(product of
+    `per`) when `per` is given (e.g. goals_scored / shots_taken).
+    """
+    name: str
+    type_code: str
+    terms: Tuple[str, ...]
+    per: Tuple[str, ...] = ()
+    description: str = ""
+
+
+# Vestavene metriky
+# المقاييس المدمجة
+METRICS: Dict[str, LoadMetric] = {
+    "sprint": LoadMetric("sprint", "SPRINT", ("distance_m", "repetitions"),
+                         description="Sprint distance (distance_m x repetitions)"),
+    "shoot": LoadMetric("shoot", "SHOOT", ("goals_scored",), ("shots_taken",),
+                        description="Shot conversion (goals_scored / shots_taken)"),
+    "jump": LoadMetric("jump", "JUMP", ("jumps_count",),
+                       description="Jump volume (jumps_count)"),
+}
+
+
+class ExerciseColumns:
+    """Columnar view of all units of one exercise type."""
+    # Sloupcova data jednoho typu cviceni.
+    # بيانات عمودية لنوع تمرين واحد
+
+    def __init__(self, type_code: str, player_id, plan_id, day, completed, params: Dict[str, Sequence[float]]):
+        self.type_code = type_code
+        self.player_id = player_id   # int64 / array('q')
+        self.plan_id = plan_id       # int64 / array('q')
+        self.day = day               # datum prirazeni jako ordinal, int64 / array('q')
+        self.completed = completed   # bool / array('b')
+        self.params = params         # float64 / array('d'), NaN = chybejici hodnota
+
+    def __len__(self) -> int:
+        return len(self.plan_id)
+
+
+def _day_ordinal(value: Optional[str], cache: Dict[Optional[str], int]) -> int:
+    ordinal = cache.get(value)
+    if ordinal is None:
+        try:
+            ordinal = date.fromisoformat(value).toordinal()
+        except (TypeError, ValueError):
+            ordinal = 0
+        cache[value] = ordinal
+    return ordinal
+
+
+def build_columns(system_data: SystemData, type_code: str, use_numpy: Optional[bool] = None,
+                  plans: Optional[Iterable[TrainingPlan]] = None) -> ExerciseColumns:
+    """Extracts the units of one exercise type into typed columns (single pass).
+
+    `plans` defaults to system_data.training_plans (e.g. pass hot plus archived plans).
+    """
+    use_numpy = numpy_available() if use_numpy is None else (use_numpy and numpy_available())
+    repo = SystemRepository.of(system_data)
+    exercise_type = repo.get_exercise_type(type_code)
+    keys = list(exercise_type.parameters_metadata) if exercise_type else []
+
+    player_ids = array('q')
+    plan_ids = array('q')
+    days = array('q')
+    completed = array('b')
+    params = {k: array('d') for k in keys}
+    day_cache: Dict[Optional[str], int] = {}
+    for plan in (system_data.training_plans if plans is None else plans):
+        units = [u for u in plan.exercises if u.type_code == type_code]
+        if not units:
+            continue
+        day = _day_ordinal(plan.date_assigned, day_cache)
+        for unit in units:
+            player_ids.append(plan.player_id)
+            plan_ids.append(plan.id)
+            days.append(day)
+            completed.append(unit.status == STATUS_COMPLETED)
+            schema = unit._schema
+            for key in keys:
+                # Zabalene hodnoty se ctou primo z pole jednotky, bez slovniku.
+                i = schema.index.get(key) if schema is not None else None
+                if i is not None:
+                    params[key].append(unit._values[i])
+                else:
+                    value = unit._extra.get(key) if unit._extra else None
+                    params[key].append(float(value) if isinstance(value, (int, float)) else _NAN)
+
+    if use_numpy:
+        return ExerciseColumns(
+            type_code,
+            np.frombuffer(player_ids, dtype=np.int64) if player_ids else np.zeros(0, np.int64),
+            np.frombuffer(plan_ids, dtype=np.int64) if plan_ids else np.zeros(0, np.int64),
+            np.frombuffer(days, dtype=np.int64) if days else np.zeros(0, np.int64),
+            np.frombuffer(completed, dtype=np.int8).astype(bool) if completed else np.zeros(0, bool),
+            {k: np.frombuffer(v, dtype=np.float64) if v else np.zeros(0) for k, v in params.items()},
+        )
+    return ExerciseColumns(type_code, player_ids, plan_ids, days, completed, params)
+
+
+class TrainingLoadAnalytics:
+    """Batch, grouped training-load aggregations over columnar unit data."""
+    # Analytika zatizeni nad sloupcovymi daty.
+    # تحليلات حمل التدريب
+
+    def __init__(self, system_data: SystemData, use_numpy: Optional[bool] = None, archive=None):
+        self.system_data = system_data
+        self.use_numpy = numpy_available() if use_numpy is None else (use_numpy and numpy_available())
+        # Archiv (PlanArchive) se cte az pri vypoctu, jen mesice v rozsahu dotazu.
+        self.archive = archive
+        self._columns: Dict[Tuple[str, Tuple[str, ...]], ExerciseColumns] = {}
+        self._archived: Dict[str, List[TrainingPlan]] = {}
+        self._fingerprint = None
+
+    def _archived_plans(self, months: Tuple[str, ...]) -> List[TrainingPlan]:
+        hot = SystemRepository.of(self.system_data).plans_by_id
+        plans: List[TrainingPlan] = []
+        for month in months:
+            if month not in self._archived:
+                self._archived[month] = self.archive.read_month(month)
+            # Plan, ktery je jeste v horkych datech (pad behem archivace), se nepocita dvakrat.
+            plans.extend(p for p in self._archived[month] if p.id not in hot)
+        return plans
+
+    def columns(self, type_code: str, months: Tuple[str, ...] = ()) -> ExerciseColumns:
+        """Columns of one exercise type (plus the given archived months), rebuilt only when data changed."""
+        squad = SystemRepository.of(self.system_data).squad_progress()
+        fingerprint = (len(self.system_data.training_plans), squad.units_total, squad.units_completed,
+                       self.archive.signature() if self.archive is not None else ())
+        if fingerprint != self._fingerprint:
+            self._columns.clear()
+            self._archived.clear()
+            self._fingerprint = fingerprint
+        cols = self._columns.get((type_code, months))
+        if cols is None:
+            plans = chain(self.system_data.training_plans, self._archived_plans(months)) if months else None
+            cols = self._columns[(type_code, months)] = build_columns(self.system_data, type_code, self.use_numpy, plans)
+        return cols
+
+    def compute(self, metric: LoadMetric, by_week: bool = False, date_from: Optional[str] = None,
+                date_to: Optional[str] = None, completed_only: bool = False,
+                include_archive: bool = True) -> Dict[GroupKey, float]:
+        """Evaluates a metric per player (and per ISO week when by_week) in one batch.
+
+        With an archive, archived plans assigned in [date_from, date_to] are included.
+        """
+        months: Tuple[str, ...] = ()
+        if include_archive and self.archive is not None:
+            months = tuple(self.archive.months(date_from, date_to))
+        cols = self.columns(metric.type_code, months)
+        lo = date.fromisoformat(date_from).toordinal() if date_from else None
+        hi = date.fromisoformat(date_to).toordinal() if date_to else None
+        if self.use_numpy:
+            return self._compute_numpy(cols, metric, by_week, lo, hi, completed_only)
+        return self._compute_python(cols, metric, by_week, lo, hi, completed_only)
+
+    def _compute_numpy(self, cols, metric, by_week, lo, hi, completed_only) -> Dict[GroupKey, float]:
+        mask = np.ones(len(cols), dtype=bool)
+        if lo is not None:
+            mask &= cols.day >= lo
+        if hi is not None:
+            mask &= cols.day <= hi
+        if completed_only:
+            mask &= cols.completed
+        for key in metric.terms + metric.per:
+            column = cols.params.get(key)
+            if column is None:
+                return {}
+            mask &= ~np.isnan(column)
+        if not mask.any():
+            return {}
+
+        numerator = np.ones(int(mask.sum()))
+        for key in metric.terms:
+            numerator = numerator * cols.params[key][mask]
+        players = cols.player_id[mask]
+        if by_week:
+            days = cols.day[mask]
+            weeks = days - (days - 1) % 7  # ordinal 1 (0001-01-01) je pondeli
+            keys, inverse = np.unique(np.stack([players, weeks], axis=1), axis=0, return_inverse=True)
+        else:
+            keys, inverse = np.unique(players, return_inverse=True)
+        inverse = inverse.reshape(-1)
+        sums = np.bincount(inverse, weights=numerator, minlength=len(keys))
+        if metric.per:
+            denominator = np.ones(len(numerator))
+            for key in metric.per:
+                denominator = denominator * cols.params[key][mask]
+            totals = np.bincount(inverse, weights=denominator, minlength=len(keys))
+            with np.errstate(divide='ignore', invalid='ignore'):
+                sums = np.where(totals > 0, sums / np.where(totals > 0, totals, 1), np.nan)
+
+        result: Dict[GroupKey, float] = {}
+        for i, value in enumerate(sums.tolist()):
+            if by_week:
+                result[(int(keys[i][0]), int(keys[i][1]))] = value
+            else:
+                result[(int(keys[i]), None)] = value
+        return result
+
+    def _compute_python(self, cols, metric, by_week, lo, hi, completed_only) -> Dict[GroupKey, float]:
+        columns = [cols.params.get(key) for key in metric.terms + metric.per]
+        if any(c is None for c in columns):
+            return {}
+        n_terms = len(metric.terms)
+        sums: Dict[GroupKey, float] = {}
+        totals: Dict[GroupKey, float] = {}
+        for i, values in enumerate(zip(*columns)):
+            day = cols.day[i]
+            if (lo is not None and day < lo) or (hi is not None and day > hi):
+                continue
+            if completed_only and not cols.completed[i]:
+                continue
+            if any(math.isnan(v) for v in values):
+                continue
+            key = (cols.player_id[i], day - (day - 1) % 7 if by_week else None)
+            numerator = math.prod(values[:n_terms])
+            sums[key] = sums.get(key, 0.0) + numerator
+            if metric.per:
+                totals[key] = totals.get(key, 0.0) + math.prod(values[n_terms:])
+        if metric.per:
+            return {k: (v / totals[k] if totals[k] > 0 else _NAN) for k, v in sums.items()}
+        return sums
+
+
+def week_label(week_ordinal: Optional[int]) -> str:
+    """ISO week label (e.g. 2026-W03) for a Monday ordinal."""
+    if week_ordinal is None:
+        return "all"
+    year, week, _ = date.fromordinal(week_ordinal).isocalendar()
+    return f"{year}-W{week:02d}"
+
+
+def format_report(system_data: SystemData, metric: LoadMetric, values: Dict[GroupKey, float]) -> List[str]:
+    """Text lines of a report, sorted by player and week."""
+    repo = SystemRepository.of(system_data)
+    lines = [f"--- {metric.description or metric.name} ---"]
+    if not values:
+        lines.append("No matching units.")
+        return lines
+    ratio = bool(metric.per)
+    for (player_id, week), value in sorted(values.items(), key=lambda kv: (kv[0][0], kv[0][1] or 0)):
+        player = repo.get_player(player_id)
+        name = player.name if player else "Unknown Player"
+        shown = "N/A" if math.isnan(value) else (f"{value * 100:.1f}%" if ratio else f"{value:.1f}")
+        lines.append(f"[ID {player_id}] {name:<24} {week_label(week):<9} {shown:>12}")
+    return lines
@@ -0,0 +1,142 @@
+# src/archive.py
+import json
+import os
+from types import ModuleType
+from typing import Dict, Iterable, Iterator, List, Optional, Tuple
+
+from src.codec import encode, decode
+from src.models import TrainingPlan
+
+# Komprese segmentu archivu
+# ضغط مقاطع الأرشيف
+COMPRESSION_GZIP = "gzip"
+COMPRESSION_LZMA = "lzma"
+
+# Pripona segmentu podle komprese
+_SUFFIXES: Dict[str, str] = {
+    COMPRESSION_GZIP: ".jsonl.gz",
+    COMPRESSION_LZMA: ".jsonl.xz",
+}
+
+# Chyby pri cteni poskozeneho (utrzeneho) konce segmentu (bez chyb samotne komprese)
+_READ_ERRORS = (EOFError, OSError, UnicodeDecodeError, ValueError)
+
+
+def _compression(name: str) -> Tuple[ModuleType, Tuple[type, ...]]:
+    """(module with compress/open, its decompression errors); gzip and lzma load on first archive access."""
+    if name == COMPRESSION_GZIP:
+        import gzip
+        import zlib
+        return gzip, (zlib.error,)
+    import lzma
+    return lzma, (lzma.LZMAError,)
+
+
+def _compression_of(path: str) -> str:
+    return next(name for name, suffix in _SUFFIXES.items() if path.endswith(suffix))
+
+
+def archive_dir_for(data_file_path: str) -> str:
+    """Archive directory of a data file: data/system_data.json -> data/system_data.archive."""
+    return os.path.splitext(data_file_path)[0] + ".archive"
+
+
+def month_of(date_assigned: str) -> str:
+    """Segment name (YYYY-MM) of a plan's assignment date."""
+    return date_assigned[:7]
+
+
+class PlanArchive:
+    """Append-only monthly segments of archived plans (`<YYYY-MM>.jsonl.gz` or `.jsonl.xz`).
+
+    Each append writes one complete compressed member (gzip and xz readers
+    both continue across concatenated members), so a segment is never
+    rewritten. A plan is filed under the month of its date_assigned; if an
+    archiving run is repeated after a crash, readers keep the last copy of
+    each plan id.
+    """
+    # Archiv dokoncenych planu v mesicnich komprimovanych segmentech.
+    # أرشيف الخطط المكتملة في مقاطع شهرية مضغوطة
+
+    def __init__(self, directory: str, compression: str = COMPRESSION_GZIP):
+        if compression not in _SUFFIXES:
+            raise ValueError(f"Unknown archive compression '{compression}'.")
+        self.directory = directory
+        self.compression = compression
+
+    def segments(self) -> Dict[str, str]:
+        """Month -> segment path, for every segment on disk (either compression)."""
+        found: Dict[str, str] = {}
+        if not os.path.isdir(self.directory):
+            return found
+        for name in sorted(os.listdir(self.directory)):
+            for suffix in _SUFFIXES.values():
+                if name.endswith(suffix):
+                    found[name[:-len(suffix)]] = os.path.join(self.directory, name)
+        return found
+
+    def months(self, date_from: Optional[str] = None, date_to: Optional[str] = None) -> List[str]:
+        """Sorted months with a segment, limited to those overlapping [date_from, date_to]."""
+        low = month_of(date_from) if date_from else None
+        high = month_of(date_to) if date_to else None
+        return [m for m in sorted(self.segments())
+                if (low is None or m >= low) and (high is None or m <= high)]
+
+    def signature(self) -> Tuple[Tuple[str, int], ...]:
+        """(month, size) of every segment; changes whenever something is archived."""
+        return tuple((month, os.path.getsize(path)) for month, path in sorted(self.segments().items()))
+
+    def append(self, plans: Iterable[TrainingPlan]) -> Dict[str, int]:
+        """Appends plans to their monthly segments (durably); returns plans written per month."""
+        by_month: Dict[str, List[TrainingPlan]] = {}
+        for plan in plans:
+            by_month.setdefault(month_of(plan.date_assigned), []).append(plan)
+        if not by_month:
+            return {}
+        os.makedirs(self.directory, exist_ok=True)
+        existing = self.segments()
+        for month, month_plans in sorted(by_month.items()):
+            # Existujici segment se dopisuje ve sve puvodni kompresi.
+            path = existing.get(month) or os.path.join(self.directory, month + _SUFFIXES[self.compression])
+            module, _ = _compression(_compression_of(path))
+            lines = "".join(json.dumps(encode(p), ensure_ascii=False, separators=(',', ':')) + "\n"
+                            for p in month_plans)
+            with open(path, "ab") as f:
+                f.write(module.compress(lines.encode("utf-8")))
+                f.flush()
+                os.fsync(f.fileno())
+        return {month: len(month_plans) for month, month_plans in by_month.items()}
+
+    def read_month(self, month: str) -> List[TrainingPlan]:
+        """Plans of one segment sorted by (date_assigned, id); a torn tail is ignored."""
+        path = self.segments().get(month)
+        if path is None:
+            return []
+        module, errors = _compression(_compression_of(path))
+        plans: Dict[int, TrainingPlan] = {}
+        try:
+            with module.open(path, "rt", encoding="utf-8") as f:
+                for line in f:
+                    if line.strip():
+                        plan = decode(TrainingPlan, json.loads(line))
+                        plans[plan.id] = plan
+        except _READ_ERRORS + errors as e:
+            # Nedokonceny posledni zapis (pad behem archivace) - platne zaznamy zustavaji.
+            print(f"[WARN: ARCHIVE] Segment {os.path.basename(path)} ends with a damaged record: {e}")
+        return sorted(plans.values(), key=lambda p: (p.date_assigned, p.id))
+
+    def iter_plans(self, date_from: Optional[str] = None, date_to: Optional[str] = None) -> Iterator[TrainingPlan]:
+        """Lazily yields archived plans in (date_assigned, id) order, one segment in memory at a time."""
+        for month in self.months(date_from, date_to):
+            for plan in self.read_month(month):
+                if (date_from and plan.date_assigned < date_from) or (date_to and plan.date_assigned > date_to):
+                    continue
+                yield plan
+
+    def find_plan(self, plan_id: int) -> Optional[TrainingPlan]:
+        """Looks a plan up by id (reads segments until found)."""
+        for month in reversed(self.months()):
+            for plan in self.read_month(month):
+                if plan.id == plan_id:
+                    return plan
+        return None
@@ -0,0 +1,205 @@
+# src/async_service.py
+import asyncio
+from typing import Any, Callable, Dict, List, Optional, Tuple
+
+from config import ASYNC_MAX_BATCH
+from src.models import SystemData, Player, ExerciseType, TrainingPlan, TrainingUnit, PlanTemplate
+from src.repository import ProgressStats
+from src.services import TrainingService
+
+# Znacka pro ukonceni zapisovaci ulohy
+_STOP = object()
+
+
+class AsyncTrainingService:
+    """asyncio counterpart of TrainingService for servers with many concurrent clients.
+
+    Reads run directly on the event loop against the in-memory data (no I/O, no
+    locks: everything that touches SystemData runs on the loop thread). Writes
+    are queued; one writer task applies everything queued so far, persists it
+    with a single write off the loop and only then resolves the callers, so an
+    answered write is on disk. Writes arriving during a save form the next batch.
+    With a shared data file the lock wait, file read and write also run in a
+    worker thread; only merging another process's changes runs on the loop.
+    A batch whose save fails is rolled back (undo to the state before it), so a
+    write reported as failed never shows up later; when that undo point is not
+    kept, the service stops accepting writes (`failed` holds the error).
+    """
+    # Asynchronni sluzba: cteni z pameti, zapisy davkovane jednou ulohou.
+    # خدمة غير متزامنة: قراءة من الذاكرة وكتابة مجمعة
+
+    def __init__(self, ts: TrainingService, system_data: SystemData, max_batch: int = ASYNC_MAX_BATCH):
+        self.ts = ts
+        self.dm = ts.dm
+        self.system_data = system_data
+        self.max_batch = max(1, max_batch)
+        self.batches_written = 0
+        self.writes_applied = 0
+        self._queue: Optional[asyncio.Queue] = None
+        self._task: Optional[asyncio.Task] = None
+        self.failed: Optional[Exception] = None
+
+    async def start(self):
+        """Starts the writer task on the running loop (done automatically on the first write)."""
+        if self._task is None:
+            self._queue = asyncio.Queue()
+            self._task = asyncio.get_running_loop().create_task(self._writer())
+
+    async def close(self):
+        """Persists every queued write and stops the writer task."""
+        if self._task is not None:
+            await self._queue.put(_STOP)
+            await self._task
+            self._task = None
+
+    async def __aenter__(self) -> "AsyncTrainingService":
+        await self.start()
+        return self
+
+    async def __aexit__(self, *exc):
+        await self.close()
+
+    # --- Reads (served from memory on the loop) ---
+
+    async def find_player(self, player_id: int) -> Optional[Player]:
+        return self.ts.find_player(self.system_data, player_id)
+
+    async def find_exercise_type(self, code: str) -> Optional[ExerciseType]:
+        return self.ts.find_exercise_type(self.system_data, code)
+
+    async def find_plan(self, plan_id: int) -> Optional[TrainingPlan]:
+        return self.ts.find_plan(self.system_data, plan_id)
+
+    async def find_player_plans(self, player_id: int) -> List[TrainingPlan]:
+        return self.ts.find_player_plans(self.system_data, player_id)
+
+    async def search_players(self, query: str, limit: int) -> List[Player]:
+        return self.ts.search_players(self.system_data, query, limit)
+
+    async def get_plan_summary(self, plan: TrainingPlan) -> Dict[str, Any]:
+        return self.ts.get_plan_summary(plan)
+
+    async def get_player_progress(self, player_id: int) -> ProgressStats:
+        return self.ts.get_player_progress(self.system_data, player_id)
+
+    async def get_squad_progress(self) -> ProgressStats:
+        return self.ts.get_squad_progress(self.system_data)
+
+    # --- Writes (queued, applied and persisted in batches) ---
+
+    async def add_player(self, name: str, position: str) -> Player:
+        return await self._submit(self.dm.add_player, name, position)
+
+    async def add_exercise_type(self, exercise_type: ExerciseType) -> ExerciseType:
+        return await self._submit(self.ts.add_exercise_type, exercise_type)
+
+    async def create_training_plan(self, player_id: int, target_date: Optional[str]) -> Optional[TrainingPlan]:
+        return await self._submit(self.ts.create_training_plan, player_id, target_date)
+
+    async def add_exercise_to_plan(self, plan_id: int, type_code: str, params: Dict[str, Any]) -> Optional[TrainingUnit]:
+        return await self._submit(self.ts.add_exercise_to_plan, plan_id, type_code, params)
+
+    async def mark_exercise_completed(self, plan_id: int, unit_id: int) -> bool:
+        return await self._submit(self.ts.mark_exercise_completed, plan_id, unit_id)
+
+    async def save_plan_template(self, name: str, units: List[Tuple[str, Dict[str, Any]]],
+                                 description: str = "") -> PlanTemplate:
+        return await self._submit(self.ts.save_plan_template, name, units, description)
+
+    async def assign_plan_template(self, name: str, player_ids: Optional[List[int]] = None,
+                                   position: Optional[str] = None, target_date: Optional[str] = None) -> List[TrainingPlan]:
+        return await self._submit(self.ts.assign_plan_template, name, player_ids, position, target_date)
+
+    async def _submit(self, fn: Callable, *args):
+        self._check_writable()
+        await self.start()
+        future = asyncio.get_running_loop().create_future()
+        await self._queue.put((fn, args, future))
+        return await future
+
+    async def _persist_shared(self, records: List[Dict[str, Any]]):
+        """Shared-file write: locks and file I/O in a worker thread, the merge into the live data on the loop."""
+        # Slouceni meni SystemData - to smi jen smycka; cekani na zamek a zapis bezi ve vlakne.
+        if not records:
+            return
+        self.ts.repo(self.system_data).checkpoint()
+        disk = await asyncio.to_thread(self.dm.begin_shared_write, records)
+        try:
+            view = self.dm.merge_shared_write(self.system_data, disk)
+        except BaseException:
+            self.dm.release_shared_write()
+            raise
+        await asyncio.to_thread(self.dm.end_shared_write, view)
+        if self.dm.changes is not None:
+            await asyncio.to_thread(self.dm.changes.publish, records)
+
+    async def _writer(self):
+        stop = False
+        while not stop:
+            item = await self._queue.get()
+            if item is _STOP:
+                break
+            batch = [item]
+            while len(batch) < self.max_batch and not self._queue.empty():
+                item = self._queue.get_nowait()
+                if item is _STOP:
+                    stop = True
+                    break
+                batch.append(item)
+            await self._apply_batch(batch)
+
+    def _check_writable(self):
+        if self.failed is not None:
+            raise RuntimeError(f"Writes are disabled after a failed save that could not be rolled back: {self.failed}")
+
+    def _roll_back(self, before: Optional[SystemData], records: List[Dict[str, Any]], error: Exception):
+        """Undoes the changes of a batch whose save failed; without its undo point refuses further writes."""
+        # Vratit stav pred davkou; zaznamy se nesmi zverejnit ani sloucit pozdejsim zapisem.
+        # التراجع عن دفعة فشل حفظها
+        self.dm.discard(records)
+        repo = self.ts.repo(self.system_data)
+        repo.checkpoint()  # aktualni stav, at je z ceho se vracet
+        steps = next((i for i, view in enumerate(reversed(repo.history)) if view is before), None)
+        if before is None or steps is None:
+            # Bez bodu pro undo (UNDO_DEPTH = 0, nebo historii smazalo slouceni s jinym procesem).
+            self.failed = error
+            return
+        repo.undo(steps)
+
+    async def _apply_batch(self, batch: List[Tuple[Callable, tuple, asyncio.Future]]):
+        outcomes = []
+        try:
+            self._check_writable()
+        except RuntimeError as e:
+            for _, _, future in batch:
+                if not future.cancelled():
+                    future.set_exception(e)
+            return
+        repo = self.ts.repo(self.system_data)
+        # Stav pred davkou (O(1) snimek); bez historie undo ho neni kam vratit.
+        before = repo.snapshot() if repo.history.maxlen else None
+        with self.dm.collect() as records:
+            for fn, args, future in batch:
+                try:
+                    outcomes.append((future, fn(self.system_data, *args), None))
+                except Exception as e:
+                    outcomes.append((future, None, e))
+        try:
+            if self.dm.shared:
+                await self._persist_shared(records)
+            else:
+                await asyncio.to_thread(self.dm.persist, self.system_data, records)
+        except Exception as e:
+            if records:
+                self._roll_back(before, records, e)
+            outcomes = [(future, None, e) for future, _, _ in outcomes]
+        else:
+            self.batches_written += 1 if records else 0
+            self.writes_applied += len(records)
+        for future, value, error in outcomes:
+            if future.cancelled():
+                continue
+            if error is not None:
+                future.set_exception(error)
+            else:
+                future.set_result(value)
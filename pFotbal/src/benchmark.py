@@ -0,0 +1,299 @@
+# src/benchmark.py
+"""Benchmark suite for DataManager and TrainingService over synthetic data.
+
+Run from the project root:
+    python src/benchmark.py --scales small medium --output bench.json
+    python src/benchmark.py --baseline bench.json          # exit code 1 on regression
+    python src/benchmark.py --scales medium --startup      # + cold/warm CLI start
+"""
+import sys
+import os
+
+# Oprava chyby importu (ModuleNotFoundError)
+try:
+    project_root = os.path.abspath(os.path.join(os.path.dirname(__file__), '..'))
+    if project_root not in sys.path:
+        sys.path.append(project_root)
+except Exception:
+    pass
+
+import argparse
+import contextlib
+import io
+import json
+import platform
+import random
+import shutil
+import statistics
+import subprocess
+import tempfile
+import time
+from typing import Any, Callable, Dict, List, Tuple
+
+from config import BENCH_REGRESSION_THRESHOLD
+from src.models import SystemData, STATUS_COMPLETED
+from src.repository import SystemRepository
+from src.services import DataManager, TrainingService, MODE_SNAPSHOT
+from src.synthetic import generate_system_data
+
+# Velikosti dat: (hraci, plany na hrace, jednotky na plan)
+# أحجام البيانات
+SCALES: Dict[str, Tuple[int, int, int]] = {
+    "small": (100, 10, 5),       # 5 000 jednotek
+    "medium": (500, 20, 5),      # 50 000 jednotek
+    "large": (2000, 25, 6),      # 300 000 jednotek
+}
+
+# Verze formatu vysledku
+RESULTS_VERSION = 1
+
+# Interaktivni CLI; mereni startu ho spusti a hned ukonci volbou 0.
+CLI_SCRIPT = os.path.join(os.path.dirname(os.path.abspath(__file__)), "cli.py")
+
+
+def parse_scale(spec: str) -> Tuple[str, Tuple[int, int, int]]:
+    """Accepts a scale name from SCALES or PLAYERSxPLANSxUNITS (e.g. 50x4x3)."""
+    if spec in SCALES:
+        return spec, SCALES[spec]
+    try:
+        players, plans, units = (int(x) for x in spec.lower().split("x"))
+    except ValueError:
+        raise ValueError(f"Unknown scale '{spec}'. Use {', '.join(SCALES)} or PLAYERSxPLANSxUNITS.")
+    return spec, (players, plans, units)
+
+
+def _timed(fn: Callable[[], Any], repeat: int, ops: int, self_timed: bool = False) -> Dict[str, Any]:
+    """Runs fn `repeat` times; fn performs `ops` operations.
+
+    With self_timed, fn measures itself and returns the elapsed seconds.
+    """
+    runs = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        measured = fn()
+        runs.append(measured if self_timed else time.perf_counter() - start)
+    best = min(runs)
+    return {
+        "ops": ops,
+        "best_s": best,
+        "median_s": statistics.median(runs),
+        "per_op_us": best / ops * 1e6,
+    }
+
+
+def bench_startup(data_file: str, work_dir: str, repeat: int = 3) -> Dict[str, Dict[str, Any]]:
+    """Times complete CLI launches (start, load, menu, exit) without and with the startup cache."""
+    # Studeny start (bez cache) a teply start (cache z predchoziho ukonceni).
+    # بدء التشغيل البارد والدافئ
+    data_dir = os.path.join(work_dir, "data")
+    os.makedirs(data_dir, exist_ok=True)
+    target = os.path.join(data_dir, "system_data.json")
+    shutil.copyfile(data_file, target)
+    cache_path = target + ".cache"
+
+    def launch():
+        subprocess.run([sys.executable, CLI_SCRIPT], cwd=work_dir, input="0\n", text=True,
+                       stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL, check=True)
+
+    def cold():
+        if os.path.exists(cache_path):
+            os.remove(cache_path)
+        launch()
+
+    launch()  # ulozi cache pro teply start
+    return {"startup_cold": _timed(cold, repeat, 1), "startup_warm": _timed(launch, repeat, 1)}
+
+
+def bench_scale(players: int, plans_per_player: int, units_per_plan: int, repeat: int = 3,
+                ops: int = 1000, seed: int = 0, startup: bool = False) -> Dict[str, Any]:
+    """Times every measured operation on one synthetic dataset."""
+    # Mereni vsech operaci na jedne velikosti dat.
+    # قياس العمليات على حجم بيانات واحد
+    rnd = random.Random(seed)
+    start = time.perf_counter()
+    system_data = generate_system_data(players, plans_per_player, units_per_plan, seed=seed)
+    generate_s = time.perf_counter() - start
+    units = sum(len(p.exercises) for p in system_data.training_plans)
+    result: Dict[str, Any] = {
+        "players": players,
+        "plans": len(system_data.training_plans),
+        "units": units,
+        "generate_s": generate_s,
+        "operations": {},
+    }
+    operations = result["operations"]
+    player_ids = [rnd.randint(1, players) for _ in range(ops)] if players else []
+    plan_ids = [rnd.randint(1, len(system_data.training_plans)) for _ in range(ops)] if system_data.training_plans else []
+
+    with tempfile.TemporaryDirectory() as tmp_dir:
+        data_file = os.path.join(tmp_dir, "system_data.json")
+        dm = DataManager(data_file, persistence_mode=MODE_SNAPSHOT)
+        ts = TrainingService(dm)
+        try:
+            def save():
+                dm.save_data(system_data)
+                dm.flush()
+            operations["save_data"] = _timed(save, repeat, 1)
+            result["file_bytes"] = os.path.getsize(data_file)
+
+            def load(startup_cache=False):
+                fresh = DataManager(data_file, persistence_mode=MODE_SNAPSHOT, startup_cache=startup_cache)
+                try:
+                    fresh.load_data()
+                finally:
+                    fresh.close()
+            operations["load_data"] = _timed(load, repeat, 1)
+            load(startup_cache=True)  # vytvori cache
+            operations["load_data_cached"] = _timed(lambda: load(startup_cache=True), repeat, 1)
+            if startup:
+                operations.update(bench_startup(data_file, os.path.join(tmp_dir, "cli"), repeat))
+
+            operations["build_index"] = _timed(lambda: SystemRepository(system_data), repeat, 1)
+            if player_ids:
+                operations["find_player"] = _timed(
+                    lambda: [ts.find_player(system_data, i) for i in player_ids], repeat, len(player_ids))
+                operations["find_player_plans"] = _timed(
+                    lambda: [ts.find_player_plans(system_data, i) for i in player_ids], repeat, len(player_ids))
+            if plan_ids:
+                operations["find_plan"] = _timed(
+                    lambda: [ts.find_plan(system_data, i) for i in plan_ids], repeat, len(plan_ids))
+                plans = [ts.find_plan(system_data, i) for i in plan_ids]
+                operations["get_plan_summary"] = _timed(
+                    lambda: [ts.get_plan_summary(p) for p in plans], repeat, len(plans))
+                # Parametry jako z CSV (retezce) - davkova kontrola a prevod typu.
+                payloads = [("SPRINT", {"distance_m": "30.5", "repetitions": str(i % 9 + 1)}) for i in plan_ids]
+                operations["validate_units"] = _timed(
+                    lambda: ts.validate_units(system_data, payloads), repeat, len(payloads))
+                _bench_mutations(ts, system_data, operations, plan_ids, repeat, rnd)
+        finally:
+            dm.close()
+    return result
+
+
+def _bench_mutations(ts: TrainingService, system_data: SystemData, operations: Dict[str, Any],
+                     plan_ids: List[int], repeat: int, rnd: random.Random):
+    """Times add_exercise_to_plan / mark_exercise_completed without the final batch write.
+
+    Each run sits in one dm.batch(), so the timing is the in-memory service path;
+    persistence cost is covered by save_data.
+    """
+    pending = [(p.id, u.id) for p in system_data.training_plans for u in p.exercises if u.status != STATUS_COMPLETED]
+    rnd.shuffle(pending)
+    per_run = min(len(plan_ids), len(pending) // max(1, repeat))
+
+    def add_units():
+        with ts.dm.batch(system_data):
+            start = time.perf_counter()
+            for plan_id in plan_ids:
+                ts.add_exercise_to_plan(system_data, plan_id, "SPRINT", {"distance_m": 30.0, "repetitions": 5})
+            return time.perf_counter() - start
+    operations["add_exercise_to_plan"] = _timed(add_units, repeat, len(plan_ids), self_timed=True)
+
+    if per_run:
+        chunks = iter([pending[i * per_run:(i + 1) * per_run] for i in range(repeat)])
+
+        def complete_units():
+            chunk = next(chunks)
+            with ts.dm.batch(system_data):
+                start = time.perf_counter()
+                for plan_id, unit_id in chunk:
+                    ts.mark_exercise_completed(system_data, plan_id, unit_id)
+                return time.perf_counter() - start
+        operations["mark_exercise_completed"] = _timed(complete_units, repeat, per_run, self_timed=True)
+
+
+def run_benchmarks(scales: List[str], repeat: int = 3, ops: int = 1000, seed: int = 0,
+                   startup: bool = False) -> Dict[str, Any]:
+    """Runs the suite at each scale and returns a JSON-ready result document."""
+    results: Dict[str, Any] = {
+        "version": RESULTS_VERSION,
+        "python": platform.python_version(),
+        "platform": platform.platform(),
+        "repeat": repeat,
+        "seed": seed,
+        "scales": {},
+    }
+    # Vypisy zapisovaciho vlakna by prekryly vystup benchmarku.
+    with contextlib.redirect_stdout(io.StringIO()):
+        for spec in scales:
+            name, (players, plans, units) = parse_scale(spec)
+            results["scales"][name] = bench_scale(players, plans, units, repeat, ops, seed, startup)
+    return results
+
+
+def find_regressions(results: Dict[str, Any], baseline: Dict[str, Any],
+                     threshold: float = BENCH_REGRESSION_THRESHOLD) -> List[str]:
+    """Lists operations whose per-op time exceeds baseline * threshold.
+
+    Only scale/operation pairs present in both documents are compared.
+    """
+    regressions = []
+    for scale, current in results.get("scales", {}).items():
+        previous = baseline.get("scales", {}).get(scale)
+        if previous is None:
+            continue
+        for op, stats in current["operations"].items():
+            old = previous.get("operations", {}).get(op)
+            if old is None or old["per_op_us"] <= 0:
+                continue
+            ratio = stats["per_op_us"] / old["per_op_us"]
+            if ratio > threshold:
+                regressions.append(f"{scale}/{op}: {stats['per_op_us']:.2f} us vs {old['per_op_us']:.2f} us "
+                                   f"baseline ({ratio:.2f}x > {threshold:.2f}x)")
+    return regressions
+
+
+def format_results(results: Dict[str, Any]) -> List[str]:
+    """Human-readable table of the results."""
+    lines = []
+    for scale, data in results["scales"].items():
+        lines.append(f"--- {scale}: {data['players']} players, {data['plans']} plans, {data['units']} units ---")
+        for op, stats in data["operations"].items():
+            lines.append(f"{op:<26} {stats['per_op_us']:>14.2f} us/op   (best {stats['best_s']:.4f} s, {stats['ops']} ops)")
+    return lines
+
+
+def build_parser() -> argparse.ArgumentParser:
+    parser = argparse.ArgumentParser(description="Benchmarks DataManager and TrainingService on synthetic data.")
+    parser.add_argument("--scales", nargs="+", default=["small", "medium"],
+                        help=f"Scale names ({', '.join(SCALES)}) or PLAYERSxPLANSxUNITS.")
+    parser.add_argument("--repeat", type=int, default=3, help="Runs per operation (best run is reported).")
+    parser.add_argument("--ops", type=int, default=1000, help="Operations per run for the per-call benchmarks.")
+    parser.add_argument("--seed", type=int, default=0, help="Seed of the synthetic data generator.")
+    parser.add_argument("--output", help="Write JSON results to this file.")
+    parser.add_argument("--baseline", help="JSON results to compare against.")
+    parser.add_argument("--threshold", type=float, default=BENCH_REGRESSION_THRESHOLD,
+                        help="Allowed slowdown factor against the baseline.")
+    parser.add_argument("--startup", action="store_true",
+                        help="Also time cold and warm launches of the interactive CLI (separate processes).")
+    return parser
+
+
+def main(argv=None) -> int:
+    args = build_parser().parse_args(argv)
+    try:
+        for spec in args.scales:
+            parse_scale(spec)
+    except ValueError as e:
+        print(f"ERROR: {e}")
+        return 2
+    results = run_benchmarks(args.scales, max(1, args.repeat), max(1, args.ops), args.seed, args.startup)
+    print("\n".join(format_results(results)))
+    if args.output:
+        with open(args.output, 'w', encoding='utf-8') as f:
+            json.dump(results, f, indent=4)
+        print(f"Results written to {args.output}.")
+    if args.baseline:
+        with open(args.baseline, 'r', encoding='utf-8') as f:
+            baseline = json.load(f)
+        regressions = find_regressions(results, baseline, args.threshold)
+        for line in regressions:
+            print(f"REGRESSION: {line}")
+        if regressions:
+            return 1
+        print("No regressions against the baseline.")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
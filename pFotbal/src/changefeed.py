@@ -0,0 +1,289 @@
+# src/changefeed.py
+import json
+import os
+import re
+import threading
+from contextlib import nullcontext
+from dataclasses import dataclass, field
+from datetime import datetime, timezone
+from typing import Any, Callable, Dict, Iterator, List, Optional
+
+from src.metrics import registry
+from src.sharing import FileLock
+
+# Udalost vraceni zmen (DataManager.undo); odberatel si ma data nacist znovu.
+# حدث التراجع عن التغييرات
+OP_UNDO = "undo"
+
+# Vychozi pocet udalosti v jedne davce pro odberatele
+DEFAULT_FEED_BATCH = 500
+
+# Kazdy radek zacina {"seq":N, - poradi se cte bez parsovani celeho radku.
+_SEQ_PREFIX = b'{"seq":'
+_CONSUMER_NAME = re.compile(r"[\w\-]+")
+
+
+def feed_path_for(data_file_path: str) -> str:
+    """Change feed file of a data file: data/system_data.json -> data/system_data.json.changes."""
+    return data_file_path + ".changes"
+
+
+@dataclass
+class ChangeEvent:
+    """One committed mutation: feed sequence number, operation, UTC time and the journal-style payload."""
+    seq: int
+    op: str
+    timestamp: str
+    data: Dict[str, Any] = field(default_factory=dict)
+
+    def to_line(self) -> bytes:
+        record = {"seq": self.seq, "ts": self.timestamp, "op": self.op, "data": self.data}
+        return json.dumps(record, ensure_ascii=False, separators=(',', ':')).encode('utf-8') + b"\n"
+
+    @classmethod
+    def from_line(cls, line: bytes) -> "ChangeEvent":
+        record = json.loads(line)
+        return cls(record["seq"], record["op"], record["ts"], record.get("data") or {})
+
+
+@dataclass
+class ChangeBatch:
+    """Events after a cursor; `cursor` is the seq of the last event (pass it to the next read)."""
+    events: List[ChangeEvent] = field(default_factory=list)
+    cursor: int = 0
+    has_more: bool = False
+
+
+def _line_seq(line: bytes) -> int:
+    end = line.find(b",", len(_SEQ_PREFIX))
+    if not line.startswith(_SEQ_PREFIX) or end < 0:
+        raise ValueError("Corrupt change feed line.")
+    return int(line[len(_SEQ_PREFIX):end])
+
+
+class ChangeFeed:
+    """Append-only JSON-lines log of change events (`<data file>.changes`), numbered 1, 2, 3, ...
+
+    Unlike the mutation journal it is never truncated, so consumers can resume
+    from any cursor. Reading from a cursor binary-searches the file by byte
+    offset (seqs grow line by line), so it does not scan older events. With
+    `shared=True` appends take a file lock and continue the numbering of other
+    processes; `durable=True` fsyncs every append. Subscribers are called in
+    the publishing thread (the writer thread for background snapshot saves)
+    after the events are written; a failing subscriber is reported and does
+    not affect the mutation.
+    """
+    # Kanal zmen pro dalsi systemy (dashboardy, zdravotni tym): jen delty, od kurzoru.
+    # سجل التغييرات للأنظمة الأخرى
+
+    def __init__(self, path: str, shared: bool = False, durable: bool = False):
+        self.path = path
+        self.shared = shared
+        self.durable = durable
+        self._lock = threading.RLock()
+        self._subscribers: List[Callable[[ChangeEvent], None]] = []
+        self._fd: Optional[int] = None
+        self._size = 0
+        self.last_seq = 0
+        if os.path.exists(path):
+            self._drop_torn_tail()
+            self._size = os.path.getsize(path)
+            self.last_seq = self._read_last_seq(self._size)
+
+    def _drop_torn_tail(self):
+        """Cuts off a partially written last line (crash mid-append)."""
+        lock = FileLock(self.path + ".lock") if self.shared else nullcontext()
+        with lock, open(self.path, 'rb+') as f:
+            size = f.seek(0, os.SEEK_END)
+            if size == 0:
+                return
+            f.seek(size - 1)
+            if f.read(1) != b"\n":
+                f.truncate(self._last_line_start(f, size))
+
+    @staticmethod
+    def _last_line_start(f, end: int) -> int:
+        """Offset where the line ending just before `end` starts (reads backwards in chunks)."""
+        pos = end - 1  # posledni \n patri k radku
+        chunk = 4096
+        while pos > 0:
+            start = max(0, pos - chunk)
+            f.seek(start)
+            found = f.read(pos - start).rfind(b"\n")
+            if found >= 0:
+                return start + found + 1
+            pos = start
+            chunk *= 2
+        return 0
+
+    def _read_last_seq(self, size: int) -> int:
+        if size == 0:
+            return 0
+        with open(self.path, 'rb') as f:
+            f.seek(self._last_line_start(f, size))
+            return _line_seq(f.readline())
+
+    # --- Writing ---
+
+    def publish(self, records: List[Dict[str, Any]]) -> List[ChangeEvent]:
+        """Appends one event per mutation record (journal format) and notifies the subscribers."""
+        if not records:
+            return []
+        timestamp = datetime.now(timezone.utc).isoformat(timespec="milliseconds")
+        with self._lock:
+            lock = FileLock(self.path + ".lock") if self.shared else nullcontext()
+            with lock:
+                if self._fd is None:
+                    # Soubor zustava otevreny (O_APPEND) - otevreni je drazsi nez samotny zapis.
+                    self._fd = os.open(self.path, os.O_WRONLY | os.O_APPEND | os.O_CREAT, 0o644)
+                # Bez sdileni je tento proces jedinym zapisovatelem.
+                size = os.fstat(self._fd).st_size if self.shared else self._size
+                if size != self._size:
+                    # Jiny proces mezitim pridal udalosti - cislovani navazuje.
+                    self.last_seq = self._read_last_seq(size)
+                events = []
+                for record in records:
+                    self.last_seq += 1
+                    data = {k: v for k, v in record.items() if k not in ("op", "seq")}
+                    events.append(ChangeEvent(self.last_seq, record["op"], timestamp, data))
+                payload = b"".join(event.to_line() for event in events)
+                os.write(self._fd, payload)
+                if self.durable:
+                    os.fsync(self._fd)
+                self._size = size + len(payload)
+            if registry.enabled:
+                registry.inc("pfl_change_events_total", len(events))
+            for event in events:
+                self._notify(event)
+        return events
+
+    def close(self):
+        """Closes the append descriptor (the next publish reopens it)."""
+        with self._lock:
+            if self._fd is not None:
+                os.close(self._fd)
+                self._fd = None
+
+    def _notify(self, event: ChangeEvent):
+        for callback in list(self._subscribers):
+            try:
+                callback(event)
+            except Exception as e:
+                print(f"[WARN: CHANGE FEED] Subscriber {getattr(callback, '__name__', callback)!s} failed: {e}")
+
+    def subscribe(self, callback: Callable[[ChangeEvent], None]) -> Callable[[], None]:
+        """Calls callback(event) for every event published by this process from now on; returns an unsubscribe function."""
+        with self._lock:
+            self._subscribers.append(callback)
+
+        def unsubscribe():
+            with self._lock:
+                if callback in self._subscribers:
+                    self._subscribers.remove(callback)
+        return unsubscribe
+
+    # --- Reading ---
+
+    def _offset_after(self, f, cursor: int, size: int) -> int:
+        """Byte offset of the first event with seq > cursor (binary search over line starts)."""
+        # Nejmensi pozice p, kde prvni cely radek od p ma seq > cursor (nebo konec souboru).
+        def line_at(p: int) -> int:
+            if p == 0:
+                return 0
+            f.seek(p - 1)
+            f.readline()
+            return f.tell()
+
+        def after_cursor(p: int) -> bool:
+            start = line_at(p)
+            if start >= size:
+                return True
+            f.seek(start)
+            line = f.readline()
+            return not line.endswith(b"\n") or _line_seq(line) > cursor
+
+        low, high = 0, size
+        while low < high:
+            mid = (low + high) // 2
+            if after_cursor(mid):
+                high = mid
+            else:
+                low = mid + 1
+        return line_at(low)
+
+    def iter_from(self, cursor: int = 0) -> Iterator[ChangeEvent]:
+        """Lazily yields every event with seq > cursor in order."""
+        if not os.path.exists(self.path):
+            return
+        with open(self.path, 'rb') as f:
+            size = f.seek(0, os.SEEK_END)
+            f.seek(self._offset_after(f, cursor, size) if cursor > 0 else 0)
+            for line in f:
+                if not line.endswith(b"\n"):
+                    break  # jiny proces prave zapisuje
+                yield ChangeEvent.from_line(line)
+
+    def read(self, cursor: int = 0, limit: int = DEFAULT_FEED_BATCH) -> ChangeBatch:
+        """Up to `limit` events with seq > cursor; batch.cursor resumes after them."""
+        limit = max(1, limit)
+        batch = ChangeBatch(cursor=cursor)
+        for event in self.iter_from(cursor):
+            if len(batch.events) == limit:
+                batch.has_more = True
+                break
+            batch.events.append(event)
+        if batch.events:
+            batch.cursor = batch.events[-1].seq
+        return batch
+
+    def consumer(self, name: str, batch_size: int = DEFAULT_FEED_BATCH) -> "FeedConsumer":
+        """A named consumer whose cursor is stored next to the feed (`<feed>.cursors/<name>`)."""
+        return FeedConsumer(self, name, batch_size)
+
+
+class FeedConsumer:
+    """Reads a ChangeFeed in batches from a cursor that survives restarts.
+
+    poll() returns the next batch without moving the cursor; commit() stores
+    it once the consumer has handled the batch (at-least-once delivery).
+    """
+    # Odberatel s ulozenym kurzorem (pokracuje po restartu).
+    # مستهلك بمؤشر محفوظ
+
+    def __init__(self, feed: ChangeFeed, name: str, batch_size: int = DEFAULT_FEED_BATCH):
+        if not _CONSUMER_NAME.fullmatch(name):
+            raise ValueError(f"Invalid consumer name '{name}' (letters, digits, '_' and '-' only).")
+        self.feed = feed
+        self.name = name
+        self.batch_size = batch_size
+        self.cursor_path = os.path.join(feed.path + ".cursors", name)
+        self.cursor = self._load_cursor()
+
+    def _load_cursor(self) -> int:
+        try:
+            with open(self.cursor_path, 'r', encoding='ascii') as f:
+                return int(f.read().strip() or 0)
+        except (FileNotFoundError, ValueError):
+            return 0
+
+    def poll(self) -> ChangeBatch:
+        """The next batch after the stored cursor."""
+        return self.feed.read(self.cursor, self.batch_size)
+
+    def commit(self, cursor: int):
+        """Stores the cursor (atomically) so the next poll() - also after a restart - continues after it."""
+        os.makedirs(os.path.dirname(self.cursor_path), exist_ok=True)
+        tmp_path = self.cursor_path + ".tmp"
+        with open(tmp_path, 'w', encoding='ascii') as f:
+            f.write(str(cursor))
+        os.replace(tmp_path, self.cursor_path)
+        self.cursor = cursor
+
+    def __iter__(self) -> Iterator[ChangeBatch]:
+        """Yields non-empty batches until caught up, committing each one after the caller has handled it."""
+        while True:
+            batch = self.poll()
+            if not batch.events:
+                return
+            yield batch
+            self.commit(batch.cursor)
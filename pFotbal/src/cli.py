@@ -10,17 +10,29 @@ try:
 except Exception:
     pass
 
+import argparse
 from src.services import DataManager, TrainingService
-from src.models import STATUS_COMPLETED, STATUS_PENDING, SystemData, ExerciseType
-from typing import Optional
+from src import metrics
+from src.query import PlanQuery, Page, ORDERS
+from config import DATA_FILE_PATH, SERVER_HOST, SERVER_PORT, CLI_PAGE_SIZE, TEAMS_DIR
+from src.models import STATUS_COMPLETED, STATUS_PENDING, STATUS_CANCELLED, SystemData, ExerciseType, Player
+from typing import Callable, List, Optional
+
+# Volby argparse jako literaly: uloziste (sqlite3), import (csv) a analytika se nacitaji az v prikazu.
+# Odpovidaji src.storage.BACKEND_*, src.importer.FORMAT_* a klicum src.analytics.METRICS.
+# خيارات سطر الأوامر كقيم ثابتة
+BACKENDS = ("json", "sqlite")
+IMPORT_FORMATS = ("csv", "jsonl")
+REPORT_METRICS = ("jump", "shoot", "sprint")
 
 # Initial setup
 class TrainingPlannerCLI:
     """Command Line Interface for the Training Planner."""
     # Rozhrani prikazove radky.
     
-    def __init__(self):
-        self.dm = DataManager()
+    def __init__(self, data_file_path: str = DATA_FILE_PATH, shared: Optional[bool] = None):
+        # shared=None: podle SHARED_DATA_FILE v config.py
+        self.dm = DataManager(data_file_path) if shared is None else DataManager(data_file_path, shared=shared)
         self.ts = TrainingService(self.dm)
         self.system_data: Optional[SystemData] = None
         
@@ -41,21 +53,27 @@ class TrainingPlannerCLI:
         print("3. Define New Exercise Type")
         print("4. Create and Assign New Training Plan")
         print("5. Mark Exercise as Completed in a Plan")
+        print("6. Undo Last Change")
         print("0. Exit")
 
     def run(self):
         """Main program loop."""
         while True:
             self.display_menu()
-            choice = input("Enter choice (0-5): ").strip()
+            choice = input("Enter choice (0-6): ").strip()
             
             try:
+                # Jiny trener mohl mezitim soubor zmenit - nacist jeho zmeny.
+                if choice != '0' and self.dm.refresh(self.system_data):
+                    print("[INFO] Data was changed by another process and has been reloaded.")
                 if choice == '1': self.view_players_and_plans()
                 elif choice == '2': self.add_player()
                 elif choice == '3': self.define_exercise_type()
                 elif choice == '4': self.create_and_assign_plan()
                 elif choice == '5': self.mark_exercise_completed()
+                elif choice == '6': self.undo_last_change()
                 elif choice == '0':
+                    self.dm.close()
                     print("Exiting Planner. Goodbye!")
                     break
                 else:
@@ -66,20 +84,64 @@ class TrainingPlannerCLI:
                 print(f"\nCRITICAL ERROR: An unexpected error occurred: {e}")
 
     # --- Implementation of Menu Options (zkraceno, logika je v services) ---
-    def view_players_and_plans(self):
-        if not self.system_data.players: print("No players registered."); return
+    def view_players_and_plans(self, prompt: str = "-- Enter = next page, q = stop --") -> Optional[str]:
+        """Pages through players with their pending plans; returns what the user typed to stop paging."""
+        if not self.system_data.players: print("No players registered."); return None
         print("\n--- PLAYER LIST & PENDING PLANS ---")
-        for player in self.system_data.players:
-            print(f"\n[ID {player.id}] {player.name} ({player.position})")
-            player_plans = [p for p in self.system_data.training_plans if p.player_id == player.id and p.status == STATUS_PENDING]
-            if player_plans:
-                print("  PENDING PLANS:")
+        squad = self.ts.get_squad_progress(self.system_data)
+        print(f"Squad: {squad.plans_pending} pending / {squad.plans_completed} completed plans ({self._format_rate(squad.completion_rate)})")
+
+        def render(players):
+            for player in players:
+                progress = self.ts.get_player_progress(self.system_data, player.id)
+                print(f"\n[ID {player.id}] {player.name} ({player.position}) - plans completed {progress.plans_completed}/{progress.plans_total}")
+                player_plans = self.ts.query_plans(self.system_data, PlanQuery(player_id=player.id, status=STATUS_PENDING))
+                shown = False
                 for plan in player_plans:
+                    if not shown: print("  PENDING PLANS:"); shown = True
                     summary = self.ts.get_plan_summary(plan)
                     print(f"    - PLAN ID {plan.id}: Assigned {plan.date_assigned} (Target: {plan.target_completion_date or 'N/A'})")
                     print(f"      Status: {summary['completed']}/{summary['total']} completed ({summary['completion_percentage']})")
-            else:
-                print("  No pending plans.")
+                if not shown:
+                    print("  No pending plans.")
+
+        return self._page_through(lambda cursor: self.ts.page_players(self.system_data, CLI_PAGE_SIZE, cursor), render, prompt)
+
+    @staticmethod
+    def _page_through(fetch: Callable[[Optional[str]], Page], render: Callable[[List], None], prompt: str) -> Optional[str]:
+        """Shows page after page until the last one or until the user types anything but Enter (returned)."""
+        # Strankovani vypisu: Enter = dalsi stranka.
+        cursor = None
+        while True:
+            page = fetch(cursor)
+            render(page.items)
+            if page.next_cursor is None:
+                return None
+            answer = input(prompt).strip()
+            if answer:
+                return answer
+            cursor = page.next_cursor
+
+    def _choose_player(self, answer: str) -> Optional[Player]:
+        """Player meant by an ID or (part of) a name; lists the candidates to pick from when several match."""
+        # Hrac podle ID nebo jmena (bez diakritiky, toleruje preklepy).
+        if not answer: print("ERROR: Player not found."); return None
+        try:
+            return self.ts.resolve_player(self.system_data, answer)
+        except ValueError as e:
+            candidates = self.ts.search_players(self.system_data, answer)
+            if not candidates: print(f"ERROR: {e}"); return None
+        print("Several players match:")
+        for player in candidates:
+            print(f"  [ID {player.id}] {player.name} ({player.position})")
+        choice = input("Enter Player ID from the list: ").strip()
+        chosen = next((p for p in candidates if str(p.id) == choice), None)
+        if chosen is None: print("ERROR: Player not in the list.")
+        return chosen
+
+    @staticmethod
+    def _format_rate(rate: Optional[float]) -> str:
+        return f"{rate * 100:.1f}%" if rate is not None else "N/A"
 
     def add_player(self):
         print("\n--- ADD NEW PLAYER ---")
@@ -111,19 +173,17 @@ class TrainingPlannerCLI:
             print("ERROR: Invalid parameter format. Use 'key:type, key2:type2'."); return
             
         new_type = ExerciseType(code=code, description=description, parameters_metadata=metadata)
-        self.system_data.exercise_types.append(new_type); self.ts.dm.save_data(self.system_data)
+        self.ts.add_exercise_type(self.system_data, new_type)
         print(f"New exercise type '{code}' successfully defined.")
 
     def create_and_assign_plan(self):
-        self.view_players_and_plans()
+        answer = self.view_players_and_plans("-- Enter = next page, or type the Player ID or name --")
         if not self.system_data.players: return
-        try: player_id = int(input("\nEnter Player ID to assign plan to: ").strip())
-        except ValueError: print("ERROR: Player ID must be a number."); return
-        player = self.ts.find_player(self.system_data, player_id)
-        if not player: print("ERROR: Player not found."); return
+        player = self._choose_player(answer or input("\nEnter Player ID or name to assign plan to: ").strip())
+        if not player: return
             
         target_date = input("Enter Target Completion Date (YYYY-MM-DD, or leave blank): ").strip() or None
-        new_plan = self.ts.create_training_plan(self.system_data, player_id, target_date)
+        new_plan = self.ts.create_training_plan(self.system_data, player.id, target_date)
         if not new_plan: print("ERROR: Failed to create plan."); return
             
         print(f"Plan ID {new_plan.id} created for {player.name}. Now adding exercises...")
@@ -139,39 +199,48 @@ class TrainingPlannerCLI:
             ex_type = self.ts.find_exercise_type(self.system_data, type_code)
             if not ex_type: print("Invalid exercise code."); continue
 
-            params = {}; valid_input = True
-            for key, dtype in ex_type.parameters_metadata.items():
-                val = input(f"  Enter value for {key} ({dtype}): ").strip()
-                try:
-                    if dtype == 'int': params[key] = int(val)
-                    elif dtype == 'float': params[key] = float(val)
-                    else: params[key] = val
-                except ValueError: print(f"ERROR: Invalid format for {key}. Expected {dtype}."); valid_input = False; break
-            
-            if valid_input:
-                try: self.ts.add_exercise_to_plan(self.system_data, new_plan.id, type_code, params)
-                except ValueError as e: print(f"ERROR: Could not add exercise. {e}")
-                print(f"Exercise '{type_code}' added to Plan {new_plan.id}.")
+            # Prevod typu dela zkompilovany validator typu cviceni (src/validation.py).
+            raw = {key: input(f"  Enter value for {key} ({dtype}): ").strip()
+                   for key, dtype in ex_type.parameters_metadata.items()}
+            try: self.ts.add_exercise_to_plan(self.system_data, new_plan.id, type_code, raw)
+            except ValueError as e: print(f"ERROR: Could not add exercise. {e}"); continue
+            print(f"Exercise '{type_code}' added to Plan {new_plan.id}.")
                 
         print(f"\nTraining Plan {new_plan.id} finalized for {player.name}.")
 
+    def undo_last_change(self):
+        try:
+            undone = self.dm.undo(self.system_data)
+        except RuntimeError as e:
+            print(f"ERROR: {e}"); return
+        print("Last change undone." if undone else "Nothing to undo.")
+
     def mark_exercise_completed(self):
         print("\n--- MARK EXERCISE COMPLETED ---")
-        found_pending = False
-        for plan in self.system_data.training_plans:
-            if plan.status == STATUS_PENDING:
-                found_pending = True
-                player = self.ts.find_player(self.system_data, plan.player_id)
-                pending_units = [u for u in plan.exercises if u.specific_parameters.get('status') != STATUS_COMPLETED]
-                
-                if pending_units:
+        player_filter = input("Filter by Player ID or name (blank = all players): ").strip()
+        player = self._choose_player(player_filter) if player_filter else None
+        if player_filter and not player: return
+        type_filter = input("Filter by exercise CODE (blank = all types): ").strip().upper() or None
+        query = PlanQuery(player_id=player.id if player else None, status=STATUS_PENDING)
+
+        units_shown, last_plan = 0, None
+        def render(items):
+            nonlocal units_shown, last_plan
+            for plan, unit in items:
+                if plan.id != last_plan:
+                    player = self.ts.find_player(self.system_data, plan.player_id)
                     print(f"\nPLAN ID {plan.id} for {player.name if player else 'Unknown Player'}:")
-                    for unit in pending_units: print(f"  [UNIT ID {unit.id}] {unit.type_code} (Params: {unit.specific_parameters})")
+                    last_plan = plan.id
+                print(f"  [UNIT ID {unit.id}] {unit.type_code} (Params: {unit.parameters_dict()})")
+                units_shown += 1
 
-        if not found_pending: print("No pending training plans found."); return
+        answer = self._page_through(
+            lambda cursor: self.ts.page_units(self.system_data, query, type_filter, STATUS_PENDING, CLI_PAGE_SIZE, cursor),
+            render, "-- Enter = next page, or type the Plan ID --")
+        if not units_shown: print("No pending training units found."); return
 
         try:
-            plan_id = int(input("\nEnter Plan ID: ").strip())
+            plan_id = int(answer or input("\nEnter Plan ID: ").strip())
             unit_id = int(input("Enter Unit ID to mark as Completed: ").strip())
         except ValueError: print("ERROR: ID must be a number."); return
 
@@ -181,6 +250,391 @@ class TrainingPlannerCLI:
             print("ERROR: Plan or Unit ID not found, or unit is already completed.")
 
 
+def _data_manager(args) -> DataManager:
+    """DataManager for args.data_file; --shared/--exclusive override SHARED_DATA_FILE."""
+    if args.shared is None:
+        return DataManager(args.data_file)
+    return DataManager(args.data_file, shared=args.shared)
+
+
+def run_migrate(args) -> int:
+    """Converts a dataset between storage backends (e.g. system_data.json -> SQLite)."""
+    # Prevod dat mezi backendy.
+    from src.storage import create_backend, migrate
+    if os.path.abspath(args.source) == os.path.abspath(args.target):
+        print("ERROR: Source and target must be different files."); return 1
+    if not os.path.exists(args.source):
+        print(f"ERROR: Source file '{args.source}' not found."); return 1
+    source = create_backend(args.source_backend, args.source)
+    target = create_backend(args.target_backend, args.target)
+    try:
+        system_data = migrate(source, target)
+    finally:
+        source.close(); target.close()
+    units = sum(len(p.exercises) for p in system_data.training_plans)
+    print(f"Migrated {len(system_data.players)} players, {len(system_data.training_plans)} plans "
+          f"and {units} units to '{args.target}' ({args.target_backend}).")
+    return 0
+
+
+def run_import(args) -> int:
+    """Bulk-imports players, plans and units from a CSV or JSON-lines file."""
+    # Hromadny import bez interaktivnich dotazu.
+    from src.importer import import_file, DEFAULT_BATCH_SIZE
+    if not os.path.exists(args.file):
+        print(f"ERROR: Input file '{args.file}' not found."); return 1
+    dm = _data_manager(args)
+    ts = TrainingService(dm)
+    try:
+        system_data = dm.load_data()
+        report = import_file(ts, system_data, args.file, args.format, args.batch_size or DEFAULT_BATCH_SIZE)
+    finally:
+        dm.close()
+    print(f"Imported {report.players_added} players, {report.plans_added} plans and {report.units_added} units "
+          f"from {report.rows_read} rows in {report.batches} batch(es).")
+    for rejected in report.rejected:
+        print(f"  REJECTED line {rejected.line}: {rejected.message}")
+    return 0 if report.ok else 2
+
+
+def run_report(args) -> int:
+    """Prints training-load numbers per player (and week) for the selected metrics."""
+    # Report zatizeni (sprint, strelba, skoky).
+    from src.analytics import METRICS, TrainingLoadAnalytics, format_report
+    dm = _data_manager(args)
+    try:
+        system_data = dm.load_data()
+    finally:
+        dm.close()
+    analytics = TrainingLoadAnalytics(system_data, archive=None if args.hot_only else dm.archive)
+    try:
+        for name in args.metrics:
+            metric = METRICS[name]
+            values = analytics.compute(metric, by_week=args.by_week, date_from=args.date_from,
+                                       date_to=args.date_to, completed_only=args.completed_only)
+            print("\n".join(format_report(system_data, metric, values)))
+    except ValueError as e:
+        print(f"ERROR: Invalid date. {e}"); return 1
+    return 0
+
+
+def _plan_query(args, ts: TrainingService, system_data: SystemData) -> PlanQuery:
+    # --player prijima ID i jmeno (musi urcit jedineho hrace).
+    player_id = ts.resolve_player(system_data, args.player).id if args.player else None
+    return PlanQuery(player_id=player_id, status=args.status, assigned_from=args.assigned_from,
+                     assigned_to=args.assigned_to, due_from=args.due_from, due_to=args.due_to,
+                     overdue=args.overdue, order_by=args.order_by)
+
+
+def run_plans(args) -> int:
+    """Prints one page of plans matching the filters and the cursor of the next page."""
+    # Vypis planu podle filtru, po strankach (--cursor).
+    dm = _data_manager(args)
+    try:
+        system_data = dm.load_data()
+    finally:
+        dm.close()
+    ts = TrainingService(dm)
+    try:
+        query = _plan_query(args, ts, system_data)
+        if args.archived:
+            page = ts.page_archived_plans(system_data, query, args.limit, args.cursor)
+        else:
+            page = ts.page_plans(system_data, query, args.limit, args.cursor)
+    except ValueError as e:
+        print(f"ERROR: {e}"); return 1
+    for plan in page.items:
+        summary = ts.get_plan_summary(plan)
+        print(f"PLAN ID {plan.id}  player {plan.player_id}  assigned {plan.date_assigned}  "
+              f"target {plan.target_completion_date or 'N/A'}  {plan.status}  {summary['completed']}/{summary['total']} units")
+    print(f"Next cursor: {page.next_cursor}" if page.next_cursor else "(end of results)")
+    return 0
+
+
+def run_archive(args) -> int:
+    """Moves old completed plans from the data file into compressed monthly segments."""
+    # Archivace dokoncenych planu.
+    dm = _data_manager(args)
+    try:
+        system_data = dm.load_data()
+        archived = dm.archive_completed(system_data, args.before)
+    except ValueError as e:
+        print(f"ERROR: {e}"); return 1
+    finally:
+        dm.close()
+    print(f"Archived {archived} completed plan(s) into '{dm.archive.directory}' "
+          f"({len(dm.archive.segments())} monthly segment(s)).")
+    return 0
+
+
+def run_units(args) -> int:
+    """Prints one page of units (filtered by plan filters, type and status) and the next cursor."""
+    dm = _data_manager(args)
+    try:
+        system_data = dm.load_data()
+    finally:
+        dm.close()
+    ts = TrainingService(dm)
+    try:
+        query = _plan_query(args, ts, system_data)
+        page = ts.page_units(system_data, query, args.type.upper() if args.type else None, args.unit_status,
+                             args.limit, args.cursor)
+    except ValueError as e:
+        print(f"ERROR: {e}"); return 1
+    for plan, unit in page.items:
+        print(f"PLAN ID {plan.id}  UNIT ID {unit.id}  {unit.type_code}  {unit.status or STATUS_PENDING}  "
+              f"{unit.parameters_dict(include_status=False)}")
+    print(f"Next cursor: {page.next_cursor}" if page.next_cursor else "(end of results)")
+    return 0
+
+
+def run_teams(args) -> int:
+    """Prints plan counters and completion rate of every team shard and of the whole club."""
+    # Prehled tymu: soubory se nacitaji paralelne v procesech.
+    from src.shards import ShardedDataManager
+    from src.repository import ProgressStats
+    if args.shared is None:
+        shards = ShardedDataManager(args.dir, workers=args.workers)
+    else:
+        shards = ShardedDataManager(args.dir, shared=args.shared, workers=args.workers)
+    try:
+        teams = shards.teams()
+        if not teams:
+            print(f"No team shards in '{args.dir}'."); return 1
+        progress = shards.progress_by_team(teams)
+    finally:
+        shards.close()
+    for team, stats in progress.items():
+        print(f"TEAM {team}  {stats.plans_total} plans  {stats.plans_pending} pending  "
+              f"{stats.plans_completed} completed  rate {TrainingPlannerCLI._format_rate(stats.completion_rate)}")
+    club = sum(progress.values(), ProgressStats())
+    print(f"CLUB  {club.plans_total} plans  {club.plans_pending} pending  {club.plans_completed} completed  "
+          f"rate {TrainingPlannerCLI._format_rate(club.completion_rate)}")
+    return 0
+
+
+def _parse_unit_spec(spec: str):
+    """'SPRINT distance_m=30 repetitions=5' -> ('SPRINT', {'distance_m': '30', 'repetitions': '5'})."""
+    code, *pairs = spec.split()
+    params = {}
+    for pair in pairs:
+        key, sep, value = pair.partition("=")
+        if not sep or not key:
+            raise ValueError(f"Invalid parameter '{pair}' in unit '{spec}'. Use key=value.")
+        params[key] = value
+    return code, params
+
+
+def run_template(args) -> int:
+    """Stores a plan template from --unit specs, or lists the stored templates."""
+    # Definice sablony planu (hodnoty prevadi validator typu cviceni).
+    dm = _data_manager(args)
+    ts = TrainingService(dm)
+    try:
+        system_data = dm.load_data()
+        if not args.name:
+            for template in system_data.plan_templates:
+                units = ", ".join(f"{u.type_code} {u.parameters_dict()}" for u in template.units)
+                print(f"TEMPLATE {template.name}  {template.description or '-'}  [{units}]")
+            if not system_data.plan_templates:
+                print("No plan templates defined.")
+            return 0
+        if not args.unit:
+            print("ERROR: Give at least one --unit."); return 1
+        try:
+            template = ts.save_plan_template(system_data, args.name, [_parse_unit_spec(u) for u in args.unit],
+                                             args.description)
+        except ValueError as e:
+            print(f"ERROR: {e}"); return 1
+    finally:
+        dm.close()
+    print(f"Template '{template.name}' saved with {len(template.units)} unit(s).")
+    return 0
+
+
+def run_assign(args) -> int:
+    """Creates a plan from a template for the chosen players (IDs, names or a position) with one write."""
+    # Hromadne prirazeni sablony hracum.
+    dm = _data_manager(args)
+    ts = TrainingService(dm)
+    try:
+        system_data = dm.load_data()
+        try:
+            player_ids = [ts.resolve_player(system_data, p).id for p in args.player] if args.player else None
+            plans = ts.assign_plan_template(system_data, args.template, player_ids, args.position, args.target_date)
+        except ValueError as e:
+            print(f"ERROR: {e}"); return 1
+    finally:
+        dm.close()
+    if not plans:
+        print("No players matched; nothing assigned."); return 1
+    print(f"Assigned template '{args.template}' to {len(plans)} player(s): plans {plans[0].id}-{plans[-1].id}.")
+    return 0
+
+
+def run_changes(args) -> int:
+    """Prints change events after a cursor (or a named consumer's stored cursor) as JSON lines."""
+    # Vypis zmen od kurzoru; s --consumer se kurzor po vypisu ulozi.
+    import json
+    from dataclasses import asdict
+    from src.changefeed import ChangeFeed, feed_path_for
+    feed = ChangeFeed(feed_path_for(args.data_file))
+    try:
+        consumer = feed.consumer(args.consumer, args.limit) if args.consumer else None
+    except ValueError as e:
+        print(f"ERROR: {e}"); return 1
+    batch = consumer.poll() if consumer else feed.read(args.since, args.limit)
+    for event in batch.events:
+        print(json.dumps(asdict(event), ensure_ascii=False))
+    if consumer and batch.events:
+        consumer.commit(batch.cursor)
+    print(f"Next cursor: {batch.cursor}" + ("" if batch.has_more else " (up to date)"))
+    return 0
+
+
+def run_serve(args) -> int:
+    """Serves the HTTP/JSON API until interrupted."""
+    # asyncio a server se importuji az zde - zbytek CLI je nepotrebuje (rychlejsi start).
+    import asyncio
+    from src.server import serve
+    try:
+        asyncio.run(serve(args.data_file, args.host, args.port, shared=args.shared))
+    except KeyboardInterrupt:
+        print("Server stopped.")
+    return 0
+
+
+def build_parser() -> argparse.ArgumentParser:
+    parser = argparse.ArgumentParser(description="Training Planner CLI. Without a command the interactive menu starts.")
+    parser.add_argument("--metrics-out", metavar="PATH",
+                        help="Record timing metrics and write them to PATH on exit (.prom = Prometheus text, else JSON).")
+    parser.add_argument("--team", help=f"Run the interactive menu on this team's shard in {TEAMS_DIR}.")
+    # Vice treneru nad jednim souborem: zamek a slouceni zmen (jinak posledni zapis vyhrava).
+    # عدة مدربين على ملف واحد
+    sharing = parser.add_mutually_exclusive_group()
+    sharing.add_argument("--shared", dest="shared", action="store_const", const=True,
+                         help="Other processes (trainers, the server) write the data file too: lock it and merge "
+                              "their changes instead of overwriting them (overrides SHARED_DATA_FILE).")
+    sharing.add_argument("--exclusive", dest="shared", action="store_const", const=False,
+                         help="This process is the only writer of the data file (skips locking and merging).")
+    commands = parser.add_subparsers(dest="command")
+
+    p_migrate = commands.add_parser("migrate", help="Convert a data file to another storage backend.")
+    p_migrate.add_argument("source", help="Existing data file (e.g. data/system_data.json).")
+    p_migrate.add_argument("target", help="Data file to create (e.g. data/system_data.db).")
+    p_migrate.add_argument("--source-backend", default="json", choices=BACKENDS)
+    p_migrate.add_argument("--target-backend", default="sqlite", choices=BACKENDS)
+    p_migrate.set_defaults(handler=run_migrate)
+
+    p_import = commands.add_parser("import", help="Bulk-import players, plans and units (CSV or JSON lines).")
+    p_import.add_argument("file", help="Input file; rows have kind=player|plan|unit.")
+    p_import.add_argument("--format", choices=IMPORT_FORMATS, help="Defaults to the file extension.")
+    p_import.add_argument("--batch-size", type=int, help="Rows per persistence write (default: DEFAULT_BATCH_SIZE in src/importer.py).")
+    p_import.add_argument("--data-file", default=DATA_FILE_PATH, help="Data file to import into.")
+    p_import.set_defaults(handler=run_import)
+
+    p_report = commands.add_parser("report", help="Training-load report per player (and week).")
+    p_report.add_argument("metrics", nargs="+", choices=REPORT_METRICS, help="Metrics to compute.")
+    p_report.add_argument("--from", dest="date_from", help="First date_assigned to include (YYYY-MM-DD).")
+    p_report.add_argument("--to", dest="date_to", help="Last date_assigned to include (YYYY-MM-DD).")
+    p_report.add_argument("--by-week", action="store_true", help="Group per ISO week as well as per player.")
+    p_report.add_argument("--completed-only", action="store_true", help="Count only completed units.")
+    p_report.add_argument("--hot-only", action="store_true", help="Skip archived plans.")
+    p_report.add_argument("--data-file", default=DATA_FILE_PATH, help="Data file to report on.")
+    p_report.set_defaults(handler=run_report)
+
+    filters = argparse.ArgumentParser(add_help=False)
+    filters.add_argument("--player", help="Only plans of this player (ID or a name matching one player).")
+    filters.add_argument("--status", choices=[STATUS_PENDING, STATUS_COMPLETED, STATUS_CANCELLED], help="Plan status.")
+    filters.add_argument("--assigned-from", help="First date_assigned (YYYY-MM-DD).")
+    filters.add_argument("--assigned-to", help="Last date_assigned (YYYY-MM-DD).")
+    filters.add_argument("--due-from", help="First target completion date (YYYY-MM-DD).")
+    filters.add_argument("--due-to", help="Last target completion date (YYYY-MM-DD).")
+    filters.add_argument("--overdue", action="store_true", help="Pending plans past their target date.")
+    filters.add_argument("--order-by", choices=ORDERS)
+    filters.add_argument("--limit", type=int, default=CLI_PAGE_SIZE, help="Results per page.")
+    filters.add_argument("--cursor", help="Cursor printed by the previous page.")
+    filters.add_argument("--data-file", default=DATA_FILE_PATH, help="Data file to query.")
+
+    p_plans = commands.add_parser("plans", parents=[filters], help="List plans by player, status and dates (paged).")
+    p_plans.add_argument("--archived", action="store_true", help="List archived plans (date_assigned order).")
+    p_plans.set_defaults(handler=run_plans)
+
+    p_units = commands.add_parser("units", parents=[filters], help="List units of the matching plans (paged).")
+    p_units.add_argument("--type", help="Exercise type code.")
+    p_units.add_argument("--unit-status", choices=[STATUS_PENDING, STATUS_COMPLETED], help="Unit status.")
+    p_units.set_defaults(handler=run_units)
+
+    p_archive = commands.add_parser("archive", help="Move old completed plans into compressed monthly segments.")
+    p_archive.add_argument("--before", help="Archive plans assigned before this date (default: ARCHIVE_AFTER_DAYS ago).")
+    p_archive.add_argument("--data-file", default=DATA_FILE_PATH, help="Data file to archive from.")
+    p_archive.set_defaults(handler=run_archive)
+
+    p_teams = commands.add_parser("teams", help="Completion rates of every team shard and the whole club.")
+    p_teams.add_argument("--dir", default=TEAMS_DIR, help="Directory with one <team>.json per team.")
+    p_teams.add_argument("--workers", type=int, default=0, help="Processes loading the shards (0 = CPU count).")
+    p_teams.set_defaults(handler=run_teams)
+
+    p_template = commands.add_parser("template", help="Define a plan template (a named list of units) or list them.")
+    p_template.add_argument("name", nargs="?", help="Template name (replaces a template of that name); omit to list.")
+    p_template.add_argument("--unit", action="append", metavar="SPEC",
+                            help="One unit as 'CODE key=value ...', e.g. 'SPRINT distance_m=30 repetitions=5' (repeatable).")
+    p_template.add_argument("--description", default="", help="Template description.")
+    p_template.add_argument("--data-file", default=DATA_FILE_PATH, help="Data file to store the template in.")
+    p_template.set_defaults(handler=run_template)
+
+    p_assign = commands.add_parser("assign", help="Give a template's plan to many players with one write.")
+    p_assign.add_argument("template", help="Template name.")
+    p_assign.add_argument("--player", action="append", help="Player ID or name (repeatable).")
+    p_assign.add_argument("--position", help="Only players of this position (from the whole squad without --player).")
+    p_assign.add_argument("--target-date", help="Target completion date of the plans (YYYY-MM-DD).")
+    p_assign.add_argument("--data-file", default=DATA_FILE_PATH, help="Data file to assign in.")
+    p_assign.set_defaults(handler=run_assign)
+
+    p_changes = commands.add_parser("changes", help="Print change events after a cursor (JSON lines).")
+    p_changes.add_argument("--since", type=int, default=0, help="Cursor: print events with a higher sequence number.")
+    p_changes.add_argument("--consumer", help="Continue from this consumer's stored cursor and store the new one.")
+    p_changes.add_argument("--limit", type=int, default=CLI_PAGE_SIZE, help="Events per call.")
+    p_changes.add_argument("--data-file", default=DATA_FILE_PATH, help="Data file whose changes to print.")
+    p_changes.set_defaults(handler=run_changes)
+
+    p_serve = commands.add_parser("serve", help="Serve the planner as a local HTTP/JSON API.")
+    p_serve.add_argument("--host", default=SERVER_HOST)
+    p_serve.add_argument("--port", type=int, default=SERVER_PORT)
+    p_serve.add_argument("--data-file", default=DATA_FILE_PATH, help="Data file to serve.")
+    # Stejne prepinace i za prikazem; SUPPRESS = neprepsat hodnotu zadanou pred prikazem.
+    sharing = p_serve.add_mutually_exclusive_group()
+    sharing.add_argument("--shared", dest="shared", action="store_const", const=True, default=argparse.SUPPRESS,
+                         help="Other processes write the file too (locking and merging; overrides SHARED_DATA_FILE).")
+    sharing.add_argument("--exclusive", dest="shared", action="store_const", const=False, default=argparse.SUPPRESS,
+                         help="The server is the only writer of the file (skips multi-process locking and merging).")
+    p_serve.set_defaults(handler=run_serve)
+    return parser
+
+
+def main(argv=None) -> int:
+    args = build_parser().parse_args(argv)
+    if args.metrics_out:
+        metrics.enable()
+    try:
+        if args.command is None:
+            if args.team:
+                from src.shards import ShardedDataManager
+                try:
+                    data_file_path = ShardedDataManager().shard_path(args.team)
+                except ValueError as e:
+                    print(f"ERROR: {e}"); return 1
+            else:
+                data_file_path = DATA_FILE_PATH
+            cli = TrainingPlannerCLI(data_file_path, shared=args.shared)
+            cli.run()
+            return 0
+        return args.handler(args)
+    finally:
+        if args.metrics_out:
+            metrics.registry.export(args.metrics_out)
+
+
+
 if __name__ == "__main__":
-    cli = TrainingPlannerCLI()
-    cli.run()
\ No newline at end of file
+    sys.exit(main())
\ No newline at end of file
@@ -0,0 +1,173 @@
+# src/codec.py
+import gc
+import json
+import marshal
+from contextlib import contextmanager
+from dataclasses import fields, is_dataclass, MISSING
+from typing import Any, Callable, Dict, get_args, get_origin, get_type_hints
+
+from src.models import SystemData, TrainingUnit
+
+# Formaty souboru s daty (config.DATA_FORMAT)
+# صيغ ملف البيانات
+FORMAT_JSON = "json"                  # citelny JSON s odsazenim (puvodni format)
+FORMAT_JSON_COMPACT = "json-compact"  # JSON bez odsazeni a mezer
+FORMAT_MARSHAL = "marshal"            # binarni format (marshal)
+
+# Hlavicka binarniho formatu - podle ni se pri nacitani pozna format.
+MARSHAL_MAGIC = b"PFLM1\n"
+
+_encoders: Dict[type, Callable[[Any], Dict[str, Any]]] = {}
+_decoders: Dict[type, Callable[[Dict[str, Any]], Any]] = {}
+
+
+def _is_model(hint) -> bool:
+    return is_dataclass(hint) or hint in _encoders
+
+
+def _nested_dataclass(hint):
+    """Returns (model, is_list) for fields holding models, else (None, False)."""
+    if _is_model(hint):
+        return hint, False
+    if get_origin(hint) in (list, tuple) and get_args(hint) and _is_model(get_args(hint)[0]):
+        return get_args(hint)[0], True
+    return None, False
+
+
+def _encode_unit(u: TrainingUnit) -> Dict[str, Any]:
+    # Na disku zustava puvodni tvar: stav je soucasti specific_parameters.
+    return {'id': u.id, 'type_code': u.type_code, 'specific_parameters': u.parameters_dict()}
+
+
+def _decode_unit(d: Dict[str, Any], _cls=TrainingUnit) -> TrainingUnit:
+    return _cls(d.get('id', 0), d.get('type_code', ""), d.get('specific_parameters'), d.get('status'))
+
+
+# TrainingUnit neni dataclass (sloty + zabalene parametry), ma rucne psany kodek.
+_encoders[TrainingUnit] = _encode_unit
+_decoders[TrainingUnit] = _decode_unit
+
+
+def _build_encoder(cls):
+    """Generates `def encode(o)` that copies attribute references into a dict.
+
+    Unlike dataclasses.asdict nothing is deep-copied; nested dicts such as
+    parameters_metadata are shared with the live object. List fields of a
+    snapshot view go through FrozenList.map_items.
+    """
+    hints = get_type_hints(cls)
+    namespace: Dict[str, Any] = {}
+    items = []
+    for f in fields(cls):
+        if not f.init:
+            continue  # odvozeny stav (napr. citace v TrainingPlan) se neuklada
+        nested, is_list = _nested_dataclass(hints[f.name])
+        if nested is None:
+            items.append(f"{f.name!r}: o.{f.name}")
+        elif is_list:
+            namespace[f"_enc_{f.name}"] = get_encoder(nested)
+            # Snimek (FrozenList z src/versioning.py) se koduje vlastni metodou.
+            items.append(f"{f.name!r}: [_enc_{f.name}(x) for x in o.{f.name}] if o.{f.name}.__class__ is list "
+                         f"else o.{f.name}.map_items(_enc_{f.name})")
+        else:
+            namespace[f"_enc_{f.name}"] = get_encoder(nested)
+            items.append(f"{f.name!r}: _enc_{f.name}(o.{f.name})")
+    source = "def encode(o):\n    return {" + ", ".join(items) + "}\n"
+    exec(source, namespace)
+    return namespace["encode"]
+
+
+def _build_decoder(cls):
+    """Generates `def decode(d)` that calls the constructor with positional arguments (no **kwargs unpacking)."""
+    hints = get_type_hints(cls)
+    namespace: Dict[str, Any] = {"_cls": cls}
+    args = []
+    for f in fields(cls):
+        if not f.init:
+            continue
+        nested, is_list = _nested_dataclass(hints[f.name])
+        if f.default is not MISSING:
+            namespace[f"_default_{f.name}"] = f.default
+            fallback = f"_default_{f.name}"
+        elif f.default_factory is not MISSING:
+            namespace[f"_factory_{f.name}"] = f.default_factory
+            fallback = f"_factory_{f.name}()"
+        else:
+            fallback = None
+        if nested is not None:
+            namespace[f"_dec_{f.name}"] = get_decoder(nested)
+            value = (f"[_dec_{f.name}(x) for x in d[{f.name!r}]]" if is_list
+                     else f"_dec_{f.name}(d[{f.name!r}])")
+        else:
+            value = f"d[{f.name!r}]"
+        if fallback is not None:
+            value = f"({value} if {f.name!r} in d else {fallback})"
+        args.append(value)
+    source = "def decode(d):\n    return _cls(" + ", ".join(args) + ")\n"
+    exec(source, namespace)
+    return namespace["decode"]
+
+
+def get_encoder(cls) -> Callable[[Any], Dict[str, Any]]:
+    """Returns the cached generated encoder for a model class."""
+    encoder = _encoders.get(cls)
+    if encoder is None:
+        encoder = _encoders[cls] = _build_encoder(cls)
+    return encoder
+
+
+def get_decoder(cls) -> Callable[[Dict[str, Any]], Any]:
+    """Returns the cached generated decoder for a model class."""
+    decoder = _decoders.get(cls)
+    if decoder is None:
+        decoder = _decoders[cls] = _build_decoder(cls)
+    return decoder
+
+
+def encode(obj) -> Dict[str, Any]:
+    """Plain dict form of a model instance (shares nested dicts with obj)."""
+    return get_encoder(type(obj))(obj)
+
+
+def decode(cls, data: Dict[str, Any]):
+    """Builds a model instance of cls from its plain dict form."""
+    return get_decoder(cls)(data)
+
+
+@contextmanager
+def _gc_paused():
+    """Pauses the cyclic GC while building large acyclic object trees.
+
+    Allocating hundreds of thousands of dicts and dataclasses otherwise triggers
+    repeated full collections that cost more than the (de)serialization itself.
+    """
+    was_enabled = gc.isenabled()
+    gc.disable()
+    try:
+        yield
+    finally:
+        if was_enabled:
+            gc.enable()
+
+
+def dumps(system_data: SystemData, fmt: str = FORMAT_JSON) -> bytes:
+    """Serializes SystemData in the given on-disk format."""
+    if fmt not in (FORMAT_JSON, FORMAT_JSON_COMPACT, FORMAT_MARSHAL):
+        raise ValueError(f"Unknown data format '{fmt}'.")
+    with _gc_paused():
+        data = encode(system_data)
+        if fmt == FORMAT_JSON:
+            return json.dumps(data, ensure_ascii=False, indent=4).encode('utf-8')
+        if fmt == FORMAT_JSON_COMPACT:
+            return json.dumps(data, ensure_ascii=False, separators=(',', ':')).encode('utf-8')
+        return MARSHAL_MAGIC + marshal.dumps(data)
+
+
+def loads(raw: bytes) -> SystemData:
+    """Deserializes SystemData; the format is detected from the content."""
+    with _gc_paused():
+        if raw.startswith(MARSHAL_MAGIC):
+            data = marshal.loads(raw[len(MARSHAL_MAGIC):])
+        else:
+            data = json.loads(raw.decode('utf-8'))
+        return decode(SystemData, data)
@@ -0,0 +1,204 @@
+# src/importer.py
+import csv
+import json
+import os
+from dataclasses import dataclass, field
+from datetime import date
+from typing import Any, Dict, Iterable, Iterator, List, Optional, TextIO, Tuple
+
+from src.models import SystemData, ExerciseType
+from src.validation import ParameterError, compile_validator
+
+# Druhy radku vstupu
+# أنواع صفوف الإدخال
+KIND_PLAYER = "player"
+KIND_PLAN = "plan"
+KIND_UNIT = "unit"
+
+# Formaty vstupniho souboru
+FORMAT_CSV = "csv"
+FORMAT_JSONL = "jsonl"
+
+# Sloupce CSV, ktere nejsou parametry cviceni
+_RESERVED_COLUMNS = {
+    "kind", "ref", "name", "position", "player_id", "player_ref",
+    "target_date", "plan_id", "plan_ref", "type_code", "params",
+}
+
+DEFAULT_BATCH_SIZE = 500
+
+
+class RowError(ValueError):
+    """A single input row that cannot be imported."""
+
+
+@dataclass
+class RejectedRow:
+    line: int
+    message: str
+
+
+@dataclass
+class ImportReport:
+    """Outcome of a bulk import."""
+    # Vysledek hromadneho importu.
+    rows_read: int = 0
+    players_added: int = 0
+    plans_added: int = 0
+    units_added: int = 0
+    batches: int = 0
+    rejected: List[RejectedRow] = field(default_factory=list)
+
+    @property
+    def ok(self) -> bool:
+        return not self.rejected
+
+
+def coerce_parameters(exercise_type: ExerciseType, raw: Dict[str, Any]) -> Dict[str, Any]:
+    """Validates raw parameter values against parameters_metadata and converts them (compiled validator)."""
+    try:
+        return compile_validator(exercise_type).validate(raw)
+    except ParameterError as e:
+        raise RowError(str(e)) from None
+
+
+def read_jsonl(stream: TextIO) -> Iterator[Tuple[int, Any]]:
+    """Yields (line number, parsed row); unparsable lines yield a RowError instead."""
+    for line_no, line in enumerate(stream, start=1):
+        if not line.strip():
+            continue
+        try:
+            yield line_no, json.loads(line)
+        except json.JSONDecodeError as e:
+            yield line_no, RowError(f"Invalid JSON: {e.msg}.")
+
+
+def read_csv(stream: TextIO) -> Iterator[Tuple[int, Any]]:
+    """Yields (line number, row) from a CSV with a header; extra columns are unit parameters."""
+    reader = csv.DictReader(stream)
+    for row in reader:
+        params = {k: v for k, v in row.items() if k not in _RESERVED_COLUMNS and k is not None and v not in (None, "")}
+        data: Dict[str, Any] = {k: v for k, v in row.items() if k in _RESERVED_COLUMNS and v not in (None, "")}
+        if data.get("kind") == KIND_UNIT:
+            data["params"] = params
+        yield reader.line_num, data
+
+
+class BulkImporter:
+    """Streams player/plan/unit rows into SystemData, one persistence write per batch."""
+    # Hromadny import: validace kazdeho radku, chybne radky se jen nahlasi.
+    # استيراد جماعي مع التحقق من كل صف
+
+    def __init__(self, ts, system_data: SystemData, batch_size: int = DEFAULT_BATCH_SIZE):
+        self.ts = ts
+        self.system_data = system_data
+        self.batch_size = max(1, batch_size)
+        # Reference z importniho souboru (ref) -> nove pridelene ID
+        self.player_refs: Dict[str, int] = {}
+        self.plan_refs: Dict[str, int] = {}
+
+    def run(self, rows: Iterable[Tuple[int, Any]]) -> ImportReport:
+        report = ImportReport()
+        batch: List[Tuple[int, Any]] = []
+        for item in rows:
+            batch.append(item)
+            if len(batch) >= self.batch_size:
+                self._import_batch(batch, report)
+                batch = []
+        if batch:
+            self._import_batch(batch, report)
+        return report
+
+    def _validate_units(self, batch: List[Tuple[int, Any]]) -> Dict[int, Any]:
+        """Checks the params of every unit row of the batch in one call: position -> params or error message."""
+        # Parametry vsech jednotek davky se zkontroluji najednou (validator na typ se sestavi jednou).
+        positions, items = [], []
+        for i, (_, row) in enumerate(batch):
+            if isinstance(row, dict) and row.get("kind") == KIND_UNIT and isinstance(row.get("params") or {}, dict):
+                positions.append(i)
+                items.append((str(row.get("type_code", "")).strip().upper(), row.get("params") or {}))
+        checked = self.ts.validate_units(self.system_data, items)
+        return {i: checked.errors.get(j) or checked.params[j] for j, i in enumerate(positions)}
+
+    def _import_batch(self, batch: List[Tuple[int, Any]], report: ImportReport):
+        validated = self._validate_units(batch)
+        with self.ts.dm.batch(self.system_data):
+            for i, (line_no, row) in enumerate(batch):
+                report.rows_read += 1
+                try:
+                    if isinstance(row, RowError):
+                        raise row
+                    self._import_row(row, report, validated.get(i))
+                except ValueError as e:
+                    report.rejected.append(RejectedRow(line_no, str(e)))
+        report.batches += 1
+
+    def _resolve(self, row: Dict[str, Any], id_key: str, ref_key: str, refs: Dict[str, int]) -> int:
+        if row.get(ref_key) not in (None, ""):
+            ref = str(row[ref_key])
+            if ref not in refs:
+                raise RowError(f"Unknown {ref_key} '{ref}'.")
+            return refs[ref]
+        if row.get(id_key) in (None, ""):
+            raise RowError(f"Either {id_key} or {ref_key} is required.")
+        try:
+            return int(row[id_key])
+        except (TypeError, ValueError):
+            raise RowError(f"{id_key} must be a number.")
+
+    def _import_row(self, row: Any, report: ImportReport, params: Any = None):
+        if not isinstance(row, dict):
+            raise RowError("Row must be an object.")
+        kind = row.get("kind")
+        if kind == KIND_PLAYER:
+            name = str(row.get("name", "")).strip()
+            position = str(row.get("position", "")).strip()
+            if not name or not position:
+                raise RowError("Name and position cannot be empty.")
+            player = self.ts.dm.add_player(self.system_data, name, position)
+            self._remember(row, self.player_refs, player.id)
+            report.players_added += 1
+        elif kind == KIND_PLAN:
+            player_id = self._resolve(row, "player_id", "player_ref", self.player_refs)
+            target_date = row.get("target_date") or None
+            if target_date is not None:
+                try:
+                    date.fromisoformat(target_date)
+                except (TypeError, ValueError):
+                    raise RowError(f"Invalid target_date {target_date!r}. Expected YYYY-MM-DD.")
+            plan = self.ts.create_training_plan(self.system_data, player_id, target_date)
+            if plan is None:
+                raise RowError(f"Player {player_id} not found.")
+            self._remember(row, self.plan_refs, plan.id)
+            report.plans_added += 1
+        elif kind == KIND_UNIT:
+            plan_id = self._resolve(row, "plan_id", "plan_ref", self.plan_refs)
+            if self.ts.find_plan(self.system_data, plan_id) is None:
+                raise RowError(f"Plan {plan_id} not found.")
+            if not isinstance(row.get("params") or {}, dict):
+                raise RowError("params must be an object.")
+            if isinstance(params, str):
+                raise RowError(params)  # chyba z davkove kontroly (_validate_units)
+            type_code = str(row.get("type_code", "")).strip().upper()
+            self.ts.add_exercise_to_plan(self.system_data, plan_id, type_code, params)
+            report.units_added += 1
+        else:
+            raise RowError(f"Unknown row kind {kind!r}. Expected player, plan or unit.")
+
+    @staticmethod
+    def _remember(row: Dict[str, Any], refs: Dict[str, int], new_id: int):
+        if row.get("ref") not in (None, ""):
+            refs[str(row["ref"])] = new_id
+
+
+def detect_format(path: str) -> str:
+    return FORMAT_CSV if os.path.splitext(path)[1].lower() == ".csv" else FORMAT_JSONL
+
+
+def import_file(ts, system_data: SystemData, path: str, fmt: Optional[str] = None,
+                batch_size: int = DEFAULT_BATCH_SIZE) -> ImportReport:
+    """Imports a CSV or JSON-lines file without loading it into memory at once."""
+    fmt = fmt or detect_format(path)
+    with open(path, 'r', encoding='utf-8', newline='') as f:
+        rows = read_csv(f) if fmt == FORMAT_CSV else read_jsonl(f)
+        return BulkImporter(ts, system_data, batch_size).run(rows)
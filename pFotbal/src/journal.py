@@ -0,0 +1,140 @@
+# src/journal.py
+import json
+import os
+from typing import Any, Dict, Iterator, List
+
+from src.models import (
+    SystemData, Player, ExerciseType, TrainingPlan, TrainingUnit, PlanTemplate,
+    SEQ_PLAYER, SEQ_PLAN, SEQ_UNIT
+)
+from src.repository import SystemRepository
+from src.codec import encode, decode
+from src.metrics import registry, BYTES_BUCKETS
+
+# Typy zaznamu v zurnalu (jedna zmena = jeden radek)
+# أنواع سجلات التغييرات
+OP_ADD_PLAYER = "add_player"
+OP_ADD_EXERCISE_TYPE = "add_exercise_type"
+OP_CREATE_PLAN = "create_plan"
+OP_ADD_UNIT = "add_unit"
+OP_COMPLETE_UNIT = "complete_unit"
+OP_ARCHIVE_PLANS = "archive_plans"
+OP_SAVE_TEMPLATE = "save_template"
+
+# Sekvence zurnalovych zaznamu (ulozena v SystemData.id_sequences)
+SEQ_MUTATION = "mutation"
+
+
+def plan_header(plan: TrainingPlan) -> Dict[str, Any]:
+    """Plan fields without its units (units are journaled separately)."""
+    return {
+        "id": plan.id,
+        "player_id": plan.player_id,
+        "date_assigned": plan.date_assigned,
+        "target_completion_date": plan.target_completion_date,
+        "status": plan.status,
+    }
+
+
+def build_record(op: str, **payload) -> Dict[str, Any]:
+    """Turns a mutation into a JSON-ready record (entities become plain dicts)."""
+    record: Dict[str, Any] = {"op": op}
+    for key, value in payload.items():
+        if isinstance(value, TrainingPlan):
+            value = plan_header(value)
+        elif isinstance(value, (Player, ExerciseType, TrainingUnit, PlanTemplate)):
+            value = encode(value)
+        record[key] = value
+    return record
+
+
+def _bump(system_data: SystemData, sequence: str, value: int):
+    if value > system_data.id_sequences.get(sequence, 0):
+        system_data.id_sequences[sequence] = value
+
+
+def apply_record(system_data: SystemData, record: Dict[str, Any]):
+    """Replays one journal record on top of system_data."""
+    # Prehraje jeden zaznam zurnalu.
+    # يعيد تطبيق سجل واحد
+    repo = SystemRepository.of(system_data)
+    op = record["op"]
+    if op == OP_ADD_PLAYER:
+        player = decode(Player, record["player"])
+        repo.add_player(player)
+        _bump(system_data, SEQ_PLAYER, player.id)
+    elif op == OP_ADD_EXERCISE_TYPE:
+        repo.add_exercise_type(decode(ExerciseType, record["exercise_type"]))
+    elif op == OP_CREATE_PLAN:
+        plan = decode(TrainingPlan, record["plan"])
+        repo.add_plan(plan)
+        _bump(system_data, SEQ_PLAN, plan.id)
+    elif op == OP_ADD_UNIT:
+        plan = repo.get_plan(record["plan_id"])
+        unit = decode(TrainingUnit, record["unit"])
+        if plan is not None:
+            repo.add_unit(plan, unit)
+        _bump(system_data, SEQ_UNIT, unit.id)
+    elif op == OP_COMPLETE_UNIT:
+        unit = repo.get_unit(record["plan_id"], record["unit_id"])
+        if unit is not None:
+            repo.complete_unit(repo.get_plan(record["plan_id"]), unit)
+    elif op == OP_ARCHIVE_PLANS:
+        repo.remove_plans(record["plan_ids"])
+    elif op == OP_SAVE_TEMPLATE:
+        repo.add_template(decode(PlanTemplate, record["template"]))
+    else:
+        raise ValueError(f"Unknown journal operation '{op}'.")
+    _bump(system_data, SEQ_MUTATION, record.get("seq", 0))
+
+
+class MutationJournal:
+    """Append-only JSON-lines file of mutations written after the last snapshot."""
+    # Zurnal zmen (JSON lines) od posledniho snapshotu.
+    # سجل تغييرات بإلحاق فقط
+
+    def __init__(self, path: str):
+        self.path = path
+        self.record_count = 0
+        self.size_bytes = 0
+        if os.path.exists(path):
+            self._drop_torn_tail()
+            self.size_bytes = os.path.getsize(path)
+            self.record_count = sum(1 for _ in self.read())
+
+    def _drop_torn_tail(self):
+        """Cuts off a partially written last line so later appends start on a clean line."""
+        with open(self.path, 'rb+') as f:
+            data = f.read()
+            if data and not data.endswith(b"\n"):
+                f.truncate(data.rfind(b"\n") + 1)
+
+    def append(self, records: List[Dict[str, Any]]):
+        """Appends records as compact JSON lines; cost is proportional to the change."""
+        lines = "".join(json.dumps(r, ensure_ascii=False, separators=(',', ':')) + "\n" for r in records)
+        data = lines.encode('utf-8')
+        with open(self.path, 'ab') as f:
+            f.write(data)
+            f.flush()
+            os.fsync(f.fileno())
+        self.record_count += len(records)
+        self.size_bytes += len(data)
+        registry.observe("pfl_journal_append_bytes", len(data), BYTES_BUCKETS)
+
+    def read(self) -> Iterator[Dict[str, Any]]:
+        """Yields records in write order. A torn last line (crash mid-append) is ignored."""
+        if not os.path.exists(self.path):
+            return
+        with open(self.path, 'r', encoding='utf-8') as f:
+            for line in f:
+                if not line.endswith("\n"):
+                    break
+                yield json.loads(line)
+
+    def truncate(self):
+        """Drops all records (called once they are contained in a snapshot)."""
+        with open(self.path, 'wb') as f:
+            f.flush()
+            os.fsync(f.fileno())
+        self.record_count = 0
+        self.size_bytes = 0
@@ -0,0 +1,216 @@
+# src/loadtest.py
+"""Load test for the planner API: concurrent keep-alive clients, reports requests/sec.
+
+Run from the project root:
+    python src/loadtest.py                                  # self-hosted server on synthetic data
+    python src/loadtest.py --url http://127.0.0.1:8080      # an already running `cli.py serve`
+"""
+import sys
+import os
+
+# Oprava chyby importu (ModuleNotFoundError)
+try:
+    project_root = os.path.abspath(os.path.join(os.path.dirname(__file__), '..'))
+    if project_root not in sys.path:
+        sys.path.append(project_root)
+except Exception:
+    pass
+
+import argparse
+import asyncio
+import contextlib
+import io
+import json
+import random
+import tempfile
+import time
+from typing import Any, Dict, List, Optional, Tuple
+from urllib.parse import urlsplit
+
+from src.benchmark import parse_scale
+from src.codec import dumps
+from src.models import STATUS_COMPLETED
+from src.services import DataManager, TrainingService, MODE_JOURNAL, MODE_SNAPSHOT
+from src.async_service import AsyncTrainingService
+from src.server import PlannerServer
+from src.synthetic import generate_system_data
+
+
+class HttpClient:
+    """Minimal keep-alive HTTP/1.1 JSON client on asyncio streams."""
+
+    def __init__(self, host: str, port: int):
+        self.host = host
+        self.port = port
+        self._reader: Optional[asyncio.StreamReader] = None
+        self._writer: Optional[asyncio.StreamWriter] = None
+
+    async def request(self, method: str, path: str, payload: Any = None) -> Tuple[int, Any]:
+        if self._writer is None:
+            self._reader, self._writer = await asyncio.open_connection(self.host, self.port)
+        body = json.dumps(payload).encode("utf-8") if payload is not None else b""
+        self._writer.write((f"{method} {path} HTTP/1.1\r\nHost: {self.host}\r\n"
+                            f"Content-Type: application/json\r\nContent-Length: {len(body)}\r\n\r\n").encode("latin-1") + body)
+        await self._writer.drain()
+        status = int((await self._reader.readline()).split(b" ", 2)[1])
+        length = 0
+        while True:
+            line = await self._reader.readline()
+            if line in (b"\r\n", b""):
+                break
+            name, _, value = line.decode("latin-1").partition(":")
+            if name.strip().lower() == "content-length":
+                length = int(value)
+        data = await self._reader.readexactly(length)
+        return status, json.loads(data) if data else None
+
+    async def close(self):
+        if self._writer is not None:
+            self._writer.close()
+            with contextlib.suppress(ConnectionError):
+                await self._writer.wait_closed()
+            self._writer = None
+
+
+async def discover(client: HttpClient, max_players: int = 50) -> Tuple[List[int], List[int], List[Tuple[int, int]]]:
+    """Collects player ids, plan ids and pending (plan, unit) pairs through the API."""
+    _, players = await client.request("GET", "/players")
+    player_ids = [p["id"] for p in players]
+    plan_ids, pending = [], []
+    for player_id in player_ids[:max_players]:
+        _, plans = await client.request("GET", f"/players/{player_id}/plans")
+        for plan in plans:
+            plan_ids.append(plan["id"])
+            pending.extend((plan["id"], u["id"]) for u in plan["exercises"]
+                           if u["specific_parameters"].get("status") != STATUS_COMPLETED)
+    return player_ids, plan_ids, pending
+
+
+def _percentile(sorted_values: List[float], q: float) -> float:
+    if not sorted_values:
+        return 0.0
+    return sorted_values[min(len(sorted_values) - 1, int(q * len(sorted_values)))]
+
+
+async def run_load(host: str, port: int, connections: int, requests: int, write_ratio: float,
+                   seed: int = 0) -> Dict[str, Any]:
+    """Sends `requests` requests over `connections` concurrent clients and measures throughput."""
+    # Zatezovy test: soubezni klienti, mix cteni a dokonceni jednotek.
+    # اختبار الحمل
+    rnd = random.Random(seed)
+    probe = HttpClient(host, port)
+    player_ids, plan_ids, pending = await discover(probe)
+    await probe.close()
+    if not player_ids or not plan_ids:
+        raise ValueError("The server has no players or plans to query.")
+    rnd.shuffle(pending)
+
+    latencies: Dict[str, List[float]] = {"read": [], "write": []}
+    errors = 0
+    remaining = requests
+
+    async def worker():
+        nonlocal remaining, errors
+        client = HttpClient(host, port)
+        try:
+            while remaining > 0:
+                remaining -= 1
+                if pending and rnd.random() < write_ratio:
+                    kind = "write"
+                    plan_id, unit_id = pending.pop()
+                    method, path = "POST", f"/plans/{plan_id}/units/{unit_id}/complete"
+                else:
+                    kind = "read"
+                    method, path = "GET", rnd.choice((
+                        f"/plans/{rnd.choice(plan_ids)}", f"/players/{rnd.choice(player_ids)}", "/progress"))
+                start = time.perf_counter()
+                status, _ = await client.request(method, path)
+                latencies[kind].append(time.perf_counter() - start)
+                if status >= 400:
+                    errors += 1
+        finally:
+            await client.close()
+
+    start = time.perf_counter()
+    await asyncio.gather(*(worker() for _ in range(max(1, connections))))
+    elapsed = time.perf_counter() - start
+    result: Dict[str, Any] = {
+        "connections": connections,
+        "requests": sum(len(v) for v in latencies.values()),
+        "errors": errors,
+        "seconds": elapsed,
+    }
+    result["requests_per_second"] = result["requests"] / elapsed if elapsed else 0.0
+    for kind, values in latencies.items():
+        values.sort()
+        result[kind] = {"count": len(values), "p50_ms": _percentile(values, 0.50) * 1000,
+                        "p95_ms": _percentile(values, 0.95) * 1000, "p99_ms": _percentile(values, 0.99) * 1000}
+    return result
+
+
+async def run_self_hosted(scale: str, mode: str, **load_args) -> Dict[str, Any]:
+    """Starts a server on synthetic data in a temp dir (same process) and load-tests it."""
+    _, (players, plans, units) = parse_scale(scale)
+    with tempfile.TemporaryDirectory() as tmp_dir:
+        data_file = os.path.join(tmp_dir, "system_data.json")
+        with open(data_file, "wb") as f:
+            f.write(dumps(generate_system_data(players, plans, units, seed=load_args.get("seed", 0))))
+        dm = DataManager(data_file, persistence_mode=mode, shared=False)
+        ts = TrainingService(dm)
+        service = AsyncTrainingService(ts, dm.load_data())
+        server = PlannerServer(service, "127.0.0.1", 0)
+        await server.start()
+        try:
+            result = await run_load("127.0.0.1", server.port, **load_args)
+        finally:
+            await server.close()
+            dm.close()
+        result["scale"] = scale
+        result["persistence_mode"] = mode
+        result["write_batches"] = service.batches_written
+        result["writes_persisted"] = service.writes_applied
+        return result
+
+
+def format_result(result: Dict[str, Any]) -> List[str]:
+    lines = [f"{result['requests']} requests over {result['connections']} connections in {result['seconds']:.2f} s "
+             f"-> {result['requests_per_second']:.0f} req/s ({result['errors']} errors)"]
+    for kind in ("read", "write"):
+        stats = result[kind]
+        lines.append(f"  {kind:<5} {stats['count']:>7}  p50 {stats['p50_ms']:.2f} ms  "
+                     f"p95 {stats['p95_ms']:.2f} ms  p99 {stats['p99_ms']:.2f} ms")
+    if "write_batches" in result:
+        lines.append(f"  {result['writes_persisted']} writes persisted in {result['write_batches']} batches")
+    return lines
+
+
+def build_parser() -> argparse.ArgumentParser:
+    parser = argparse.ArgumentParser(description="Load-tests the planner HTTP API.")
+    parser.add_argument("--url", help="Server to test (default: start one in-process on synthetic data).")
+    parser.add_argument("--scale", default="small", help="Synthetic data size for the self-hosted server.")
+    parser.add_argument("--mode", default=MODE_JOURNAL, choices=[MODE_SNAPSHOT, MODE_JOURNAL],
+                        help="Persistence mode of the self-hosted server.")
+    parser.add_argument("--connections", type=int, default=32, help="Concurrent keep-alive clients.")
+    parser.add_argument("--requests", type=int, default=5000, help="Total requests to send.")
+    parser.add_argument("--write-ratio", type=float, default=0.1, help="Share of requests that complete a unit.")
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--json", action="store_true", help="Print the result as JSON.")
+    return parser
+
+
+def main(argv=None) -> int:
+    args = build_parser().parse_args(argv)
+    load_args = dict(connections=args.connections, requests=args.requests, write_ratio=args.write_ratio, seed=args.seed)
+    # Vypisy ukladani by prekryly vysledek.
+    with contextlib.redirect_stdout(io.StringIO()):
+        if args.url:
+            target = urlsplit(args.url)
+            result = asyncio.run(run_load(target.hostname or "127.0.0.1", target.port or 80, **load_args))
+        else:
+            result = asyncio.run(run_self_hosted(args.scale, args.mode, **load_args))
+    print(json.dumps(result, indent=4) if args.json else "\n".join(format_result(result)))
+    return 0 if result["errors"] == 0 else 1
+
+
+if __name__ == "__main__":
+    sys.exit(main())
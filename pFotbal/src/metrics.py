@@ -0,0 +1,255 @@
+# src/metrics.py
+import atexit
+import functools
+import json
+import os
+import threading
+import time
+from bisect import bisect_left
+from typing import Any, Callable, Dict, Iterable, List, Optional, Tuple
+
+# Formaty exportu metrik (config.METRICS_FORMAT)
+# صيغ تصدير المقاييس
+FORMAT_JSON = "json"
+FORMAT_PROMETHEUS = "prometheus"
+
+# Hranice histogramu: sekundy (10 us .. 10 s) a bajty (1 KiB .. 1 GiB)
+# حدود المدرجات التكرارية
+SECONDS_BUCKETS = (0.00001, 0.00005, 0.0001, 0.0005, 0.001, 0.005, 0.01, 0.05, 0.1, 0.5, 1.0, 5.0, 10.0)
+BYTES_BUCKETS = tuple(1024 * 4 ** i for i in range(11))
+
+Labels = Tuple[Tuple[str, str], ...]
+
+
+class Histogram:
+    """Fixed-bucket histogram (Prometheus style: count per upper bound, plus sum and count)."""
+    __slots__ = ("bounds", "counts", "sum", "count")
+
+    def __init__(self, bounds: Tuple[float, ...]):
+        self.bounds = bounds
+        self.counts = [0] * (len(bounds) + 1)  # posledni = +Inf
+        self.sum = 0.0
+        self.count = 0
+
+    def observe(self, value: float):
+        self.counts[bisect_left(self.bounds, value)] += 1
+        self.sum += value
+        self.count += 1
+
+    def cumulative(self) -> List[Tuple[str, int]]:
+        """(le, cumulative count) pairs including +Inf."""
+        total = 0
+        result = []
+        for bound, n in zip(list(self.bounds) + [float("inf")], self.counts):
+            total += n
+            result.append(("+Inf" if bound == float("inf") else repr(bound), total))
+        return result
+
+
+class MetricsRegistry:
+    """Thread-safe counters, gauges and histograms with JSON / Prometheus-text export.
+
+    Every recording call returns immediately while `enabled` is False; hot paths
+    additionally check `registry.enabled` themselves before measuring anything.
+    """
+    # Registr metrik (citace, merky, histogramy).
+    # سجل المقاييس
+
+    def __init__(self):
+        self.enabled = False
+        self._lock = threading.Lock()
+        self._counters: Dict[Tuple[str, Labels], float] = {}
+        self._gauges: Dict[Tuple[str, Labels], float] = {}
+        self._histograms: Dict[Tuple[str, Labels], Histogram] = {}
+        self._help: Dict[str, str] = {}
+
+    def describe(self, name: str, text: str):
+        self._help[name] = text
+
+    def inc(self, name: str, value: float = 1, **labels):
+        if not self.enabled:
+            return
+        key = (name, tuple(sorted(labels.items())))
+        with self._lock:
+            self._counters[key] = self._counters.get(key, 0) + value
+
+    def set_gauge(self, name: str, value: float, **labels):
+        if not self.enabled:
+            return
+        with self._lock:
+            self._gauges[(name, tuple(sorted(labels.items())))] = value
+
+    def observe(self, name: str, value: float, buckets: Tuple[float, ...] = SECONDS_BUCKETS, **labels):
+        if not self.enabled:
+            return
+        key = (name, tuple(sorted(labels.items())))
+        with self._lock:
+            histogram = self._histograms.get(key)
+            if histogram is None:
+                histogram = self._histograms[key] = Histogram(buckets)
+            histogram.observe(value)
+
+    def reset(self):
+        with self._lock:
+            self._counters.clear()
+            self._gauges.clear()
+            self._histograms.clear()
+
+    def snapshot(self) -> Dict[str, Any]:
+        """JSON-ready copy of every metric."""
+        with self._lock:
+            return {
+                "counters": [{"name": n, "labels": dict(l), "value": v} for (n, l), v in sorted(self._counters.items())],
+                "gauges": [{"name": n, "labels": dict(l), "value": v} for (n, l), v in sorted(self._gauges.items())],
+                "histograms": [{"name": n, "labels": dict(l), "count": h.count, "sum": h.sum,
+                                "buckets": dict(h.cumulative())}
+                               for (n, l), h in sorted(self._histograms.items())],
+            }
+
+    def to_json(self) -> str:
+        return json.dumps(self.snapshot(), indent=4)
+
+    def to_prometheus(self) -> str:
+        """Prometheus text exposition format (version 0.0.4)."""
+        snap = self.snapshot()
+        lines: List[str] = []
+        seen = set()
+
+        def header(name: str, kind: str):
+            if name not in seen:
+                seen.add(name)
+                if name in self._help:
+                    lines.append(f"# HELP {name} {self._help[name]}")
+                lines.append(f"# TYPE {name} {kind}")
+
+        for item in snap["counters"]:
+            header(item["name"], "counter")
+            lines.append(f"{item['name']}{_labels(item['labels'])} {_number(item['value'])}")
+        for item in snap["gauges"]:
+            header(item["name"], "gauge")
+            lines.append(f"{item['name']}{_labels(item['labels'])} {_number(item['value'])}")
+        for item in snap["histograms"]:
+            name = item["name"]
+            header(name, "histogram")
+            for le, n in item["buckets"].items():
+                lines.append(f"{name}_bucket{_labels(dict(item['labels'], le=le))} {n}")
+            lines.append(f"{name}_sum{_labels(item['labels'])} {_number(item['sum'])}")
+            lines.append(f"{name}_count{_labels(item['labels'])} {item['count']}")
+        return "\n".join(lines) + "\n"
+
+    def export(self, path: str, fmt: Optional[str] = None):
+        """Writes the metrics atomically; fmt defaults from the extension (.prom -> Prometheus)."""
+        # Export metrik do souboru (JSON nebo Prometheus text).
+        fmt = fmt or (FORMAT_PROMETHEUS if path.endswith((".prom", ".txt")) else FORMAT_JSON)
+        if fmt not in (FORMAT_JSON, FORMAT_PROMETHEUS):
+            raise ValueError(f"Unknown metrics format '{fmt}'.")
+        text = self.to_prometheus() if fmt == FORMAT_PROMETHEUS else self.to_json()
+        directory = os.path.dirname(path)
+        if directory and not os.path.exists(directory):
+            os.makedirs(directory)
+        tmp_path = path + ".tmp"
+        with open(tmp_path, 'w', encoding='utf-8') as f:
+            f.write(text)
+        os.replace(tmp_path, path)
+
+
+def _labels(labels: Dict[str, str]) -> str:
+    if not labels:
+        return ""
+    escaped = (k + '="' + str(v).replace("\\", "\\\\").replace('"', '\\"').replace("\n", "\\n") + '"'
+               for k, v in labels.items())
+    return "{" + ",".join(escaped) + "}"
+
+
+def _number(value: float) -> str:
+    return str(int(value)) if float(value).is_integer() else repr(float(value))
+
+
+# Globalni registr sdileny celou aplikaci
+# السجل العام
+registry = MetricsRegistry()
+registry.describe("pfl_calls_total", "Service and data-manager method calls.")
+registry.describe("pfl_call_errors_total", "Method calls that raised an exception.")
+registry.describe("pfl_call_seconds", "Method call latency in seconds.")
+registry.describe("pfl_load_seconds", "Time to load the dataset (backend load and journal replay).")
+registry.describe("pfl_save_seconds", "Duration of one background save.")
+registry.describe("pfl_save_bytes", "Bytes written by one snapshot save.")
+registry.describe("pfl_saves_total", "Completed background saves.")
+registry.describe("pfl_save_errors_total", "Background saves that failed.")
+registry.describe("pfl_saves_coalesced_total", "Save requests merged into a later write.")
+registry.describe("pfl_save_queue_depth", "Save requests submitted but not yet written.")
+registry.describe("pfl_journal_append_bytes", "Bytes appended to the mutation journal per write.")
+
+# Tridy, jejichz metody se pri zapnuti metrik obali merenim
+# الفئات التي يتم قياس دوالها
+_instrumented: List[Tuple[type, Tuple[str, ...]]] = []
+_originals: Dict[Tuple[type, str], Callable] = {}
+_export_target: Dict[str, Optional[str]] = {"path": None, "fmt": None}
+_atexit_registered = False
+
+
+def _timed_method(fn: Callable, label: str) -> Callable:
+    @functools.wraps(fn)
+    def wrapper(*args, **kwargs):
+        start = time.perf_counter()
+        try:
+            return fn(*args, **kwargs)
+        except Exception:
+            registry.inc("pfl_call_errors_total", method=label)
+            raise
+        finally:
+            registry.inc("pfl_calls_total", method=label)
+            registry.observe("pfl_call_seconds", time.perf_counter() - start, method=label)
+    return wrapper
+
+
+def _wrap(cls: type, methods: Iterable[str]):
+    for name in methods:
+        if (cls, name) not in _originals:
+            original = cls.__dict__[name]
+            _originals[(cls, name)] = original
+            setattr(cls, name, _timed_method(original, f"{cls.__name__}.{name}"))
+
+
+def instrument(cls: type, methods: Iterable[str]):
+    """Registers methods of cls for latency/call metrics.
+
+    Methods are only wrapped while metrics are enabled, so a disabled build runs
+    the original functions with no extra call layer.
+    """
+    methods = tuple(methods)
+    _instrumented.append((cls, methods))
+    if registry.enabled:
+        _wrap(cls, methods)
+
+
+def enable(export_path: Optional[str] = None, fmt: Optional[str] = None):
+    """Turns metrics on; with export_path they are also written there at exit."""
+    # Zapne mereni (a volitelne export pri ukonceni).
+    global _atexit_registered
+    registry.enabled = True
+    for cls, methods in _instrumented:
+        _wrap(cls, methods)
+    if export_path:
+        _export_target["path"], _export_target["fmt"] = export_path, fmt
+        if not _atexit_registered:
+            atexit.register(export_at_exit)
+            _atexit_registered = True
+
+
+def disable():
+    """Turns metrics off and restores the original methods."""
+    registry.enabled = False
+    for (cls, name), original in list(_originals.items()):
+        setattr(cls, name, original)
+        del _originals[(cls, name)]
+    _export_target["path"] = None
+
+
+def export_at_exit():
+    path = _export_target["path"]
+    if path and registry.enabled:
+        try:
+            registry.export(path, _export_target["fmt"])
+        except OSError as e:
+            print(f"[ERROR: METRICS EXPORT FAILED] {e}")
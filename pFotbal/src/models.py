@@ -1,6 +1,9 @@
 
+import sys
+from array import array
+from collections.abc import MutableMapping
 from dataclasses import dataclass, field
-from typing import List, Dict, Any, Optional
+from typing import List, Dict, Any, Optional, Tuple, Iterator
 
 # Konstanty pro stav treninkoveho planu
 # ثوابت لحالة خطة التدريب
@@ -8,7 +11,18 @@ STATUS_PENDING = "Pending"
 STATUS_COMPLETED = "Completed"
 STATUS_CANCELLED = "Cancelled"
 
-@dataclass
+# Nazvy sekvenci pro generovani ID
+# أسماء تسلسلات المعرفات
+SEQ_PLAYER = "player"
+SEQ_PLAN = "plan"
+SEQ_UNIT = "unit"
+
+# Modely bez __dict__ (sloty) - vyrazne mensi pamet pri statisicich jednotek.
+# Python 3.9 sloty v dataclass nepodporuje, tam zustava bezna dataclass.
+# نماذج بدون __dict__ لتقليل الذاكرة
+_model = dataclass(slots=True) if sys.version_info >= (3, 10) else dataclass
+
+@_model
 class Player:
     """Represents a football player."""
     # Reprezentuje fotbaloveho hrace.
@@ -17,7 +31,7 @@ class Player:
     name: str = ""
     position: str = ""
 
-@dataclass
+@_model
 class ExerciseType:
     """Defines a standardized type of exercise (Sprint, Shooting, etc.)."""
     # Definuje standardizovany typ cviceni.
@@ -26,16 +40,209 @@ class ExerciseType:
     description: str = ""
     parameters_metadata: Dict[str, str] = field(default_factory=dict) 
 
-@dataclass
+# Typy parametru, ktere lze ulozit do kompaktniho pole (array 'd').
+PACKED_TYPES = ("int", "float")
+# Cela cisla do 2**53 jsou v double presna.
+_MAX_EXACT_INT = 2 ** 53
+
+
+def _packable_kind(value: Any, declared: Optional[str] = None) -> Optional[str]:
+    """Returns 'int'/'float' when value can be stored exactly in a double, else None."""
+    if isinstance(value, bool):
+        return None
+    if isinstance(value, int):
+        if abs(value) > _MAX_EXACT_INT:
+            return None
+        return "float" if declared == "float" else "int"
+    if isinstance(value, float):
+        return "float" if declared in (None, "float") else None
+    return None
+
+
+class ParameterSchema:
+    """Shared, interned layout of packed unit parameters: ordered keys and their types."""
+    # Sdileny popis rozlozeni parametru (klice a typy); jedna instance pro stejny tvar.
+    # مخطط مشترك لمعلمات الوحدة
+    __slots__ = ("fields", "keys", "kinds", "index")
+    _interned: Dict[Tuple[Tuple[str, str], ...], "ParameterSchema"] = {}
+
+    def __init__(self, fields: Tuple[Tuple[str, str], ...]):
+        self.fields = fields
+        self.keys = tuple(k for k, _ in fields)
+        self.kinds = tuple(t for _, t in fields)
+        self.index = {k: i for i, k in enumerate(self.keys)}
+
+    @classmethod
+    def get(cls, fields: Tuple[Tuple[str, str], ...]) -> "ParameterSchema":
+        schema = cls._interned.get(fields)
+        if schema is None:
+            schema = cls._interned[fields] = cls(fields)
+        return schema
+
+    def __reduce__(self):
+        return (ParameterSchema.get, (self.fields,))
+
+
+class SpecificParametersView(MutableMapping):
+    """Dict-like view over a unit's packed parameters and its status (backward compatibility)."""
+    # Pohled jako slovnik: unit.specific_parameters['status'] funguje jako drive.
+    __slots__ = ("_unit",)
+
+    def __init__(self, unit: "TrainingUnit"):
+        self._unit = unit
+
+    def __getitem__(self, key):
+        unit = self._unit
+        if key == 'status' and unit.status is not None:
+            return unit.status
+        schema = unit._schema
+        if schema is not None:
+            i = schema.index.get(key)
+            if i is not None:
+                value = unit._values[i]
+                return int(value) if schema.kinds[i] == "int" else value
+        if unit._extra is not None and key in unit._extra:
+            return unit._extra[key]
+        raise KeyError(key)
+
+    def __setitem__(self, key, value):
+        unit = self._unit
+        if key == 'status':
+            unit.status = value
+            return
+        schema = unit._schema
+        if schema is not None and key in schema.index:
+            i = schema.index[key]
+            if _packable_kind(value) == schema.kinds[i]:
+                unit._values[i] = value
+                return
+        params = unit.parameters_dict(include_status=False)
+        params[key] = value
+        unit._pack(params)
+
+    def __delitem__(self, key):
+        unit = self._unit
+        if key == 'status' and unit.status is not None:
+            unit.status = None
+            return
+        params = unit.parameters_dict(include_status=False)
+        del params[key]
+        unit._pack(params)
+
+    def __iter__(self) -> Iterator[str]:
+        unit = self._unit
+        if unit._schema is not None:
+            yield from unit._schema.keys
+        if unit._extra is not None:
+            yield from unit._extra
+        if unit.status is not None:
+            yield 'status'
+
+    def __len__(self) -> int:
+        unit = self._unit
+        return ((len(unit._schema.keys) if unit._schema is not None else 0)
+                + (len(unit._extra) if unit._extra is not None else 0)
+                + (unit.status is not None))
+
+    def __repr__(self):
+        return repr(self._unit.parameters_dict())
+
+
 class TrainingUnit:
-    """A specific exercise instance within a plan."""
+    """A specific exercise instance within a plan.
+
+    Numeric parameters are packed into one array('d') laid out by a shared
+    ParameterSchema (taken from ExerciseType.parameters_metadata when given);
+    other values go to a small overflow dict. `status` is a first-class field;
+    `specific_parameters` is a dict-like view that still exposes it.
+    """
     # Konkretni instance cviceni v ramci planu.
     # مثيل تمرين محدد ضمن الخطة
-    id: int = field(default_factory=lambda: 0)
-    type_code: str = ""
-    specific_parameters: Dict[str, Any] = field(default_factory=dict)
+    __slots__ = ("id", "type_code", "status", "_schema", "_values", "_extra")
 
-@dataclass
+    def __init__(self, id: int = 0, type_code: str = "", specific_parameters: Optional[Dict[str, Any]] = None,
+                 status: Optional[str] = None, parameters_metadata: Optional[Dict[str, str]] = None):
+        self.id = id
+        self.type_code = type_code
+        params = specific_parameters or {}
+        # Starsi data nesou stav ve slovniku parametru.
+        if 'status' in params:
+            params = dict(params)
+            legacy_status = params.pop('status')
+            if status is None:
+                status = legacy_status
+        self.status = status
+        self._pack(params, parameters_metadata)
+
+    def _pack(self, params: Dict[str, Any], parameters_metadata: Optional[Dict[str, str]] = None):
+        declared = parameters_metadata or {}
+        fields = []
+        values = []
+        extra = None
+        for key, value in params.items():
+            if type(value) is float and declared.get(key, "float") == "float":
+                kind = "float"  # nejcastejsi pripad bez volani funkce
+            else:
+                kind = _packable_kind(value, declared.get(key))
+            if kind is None:
+                if extra is None:
+                    extra = {}
+                extra[key] = value
+            else:
+                fields.append((key, kind))
+                values.append(value)
+        self._schema = ParameterSchema.get(tuple(fields)) if fields else None
+        self._values = array('d', values) if fields else None
+        self._extra = extra
+
+    @property
+    def specific_parameters(self) -> SpecificParametersView:
+        return SpecificParametersView(self)
+
+    @specific_parameters.setter
+    def specific_parameters(self, params: Dict[str, Any]):
+        params = dict(params)
+        if 'status' in params:
+            self.status = params.pop('status')
+        self._pack(params)
+
+    def copy(self) -> "TrainingUnit":
+        """Independent copy of the unit (only the interned schema is shared)."""
+        unit = TrainingUnit.__new__(TrainingUnit)
+        unit.id = self.id
+        unit.type_code = self.type_code
+        unit.status = self.status
+        unit._schema = self._schema
+        unit._values = array('d', self._values) if self._values is not None else None
+        unit._extra = dict(self._extra) if self._extra is not None else None
+        return unit
+
+    def parameters_dict(self, include_status: bool = True) -> Dict[str, Any]:
+        """Plain dict of the parameters (with 'status' last, as stored on disk)."""
+        params: Dict[str, Any] = {}
+        schema = self._schema
+        if schema is not None:
+            for key, kind, value in zip(schema.keys, schema.kinds, self._values):
+                params[key] = int(value) if kind == "int" else value
+        if self._extra is not None:
+            params.update(self._extra)
+        if include_status and self.status is not None:
+            params['status'] = self.status
+        return params
+
+    def __eq__(self, other):
+        if other.__class__ is not self.__class__:
+            return NotImplemented
+        return ((self.id, self.type_code, self.status, self.parameters_dict())
+                == (other.id, other.type_code, other.status, other.parameters_dict()))
+
+    __hash__ = None
+
+    def __repr__(self):
+        return (f"TrainingUnit(id={self.id!r}, type_code={self.type_code!r}, "
+                f"specific_parameters={self.parameters_dict()!r})")
+
+@_model
 class TrainingPlan:
     """The entire plan assigned to a player."""
     # Cely plan prirazeny hraci.
@@ -46,13 +253,40 @@ class TrainingPlan:
     target_completion_date: Optional[str] = None
     exercises: List[TrainingUnit] = field(default_factory=list)
     status: str = STATUS_PENDING
+    # Odvozene citace (neukladaji se): pocet dokoncenych jednotek a delka seznamu,
+    # pro kterou byl citac naposledy spocten. Udrzuje je SystemRepository.
+    _completed_units: int = field(default=0, init=False, repr=False, compare=False)
+    _counted_units: int = field(default=0, init=False, repr=False, compare=False)
+    # Cislo nejnovejsiho pohledu (snimku), ktery uz ma ulozeny stav tohoto planu (viz src/versioning.py).
+    _imaged: int = field(default=0, init=False, repr=False, compare=False)
     
+@_model
+class PlanTemplate:
+    """A named, reusable list of unit specs (units with id 0 and no status) assigned to many players at once."""
+    # Sablona planu: pojmenovany seznam jednotek pro hromadne prirazeni.
+    # قالب خطة قابل لإعادة الاستخدام
+    name: str = ""
+    description: str = ""
+    units: List[TrainingUnit] = field(default_factory=list)
+
 @dataclass
 class SystemData:
     """Main container for storing all data."""
     # Hlavni kontejner pro ulozeni vsech dat.
     # الحاوية الرئيسية لتخزين كافة البيانات
+    # Jedina instance - zustava s __dict__, nese i pripojeny repozitar (SystemRepository).
     players: List[Player] = field(default_factory=list)
     exercise_types: List[ExerciseType] = field(default_factory=list)
 
     training_plans: List[TrainingPlan] = field(default_factory=list)
+    # Posledni pridelene ID pro kazdou sekvenci (player, plan, unit).
+    id_sequences: Dict[str, int] = field(default_factory=dict)
+    # Sablony planu (nemenne objekty; nova verze sablony nahradi starou).
+    plan_templates: List[PlanTemplate] = field(default_factory=list)
+
+    def __getstate__(self):
+        # Pripojeny repozitar (indexy) se nepickluje, po nacteni se postavi znovu.
+        # لا يتم حفظ الفهارس
+        state = dict(self.__dict__)
+        state.pop("_repository", None)
+        return state
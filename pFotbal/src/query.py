@@ -0,0 +1,254 @@
+# src/query.py
+from dataclasses import dataclass, field
+from datetime import date
+from typing import Any, Callable, Container, Generic, Iterable, Iterator, List, Optional, Tuple, TypeVar
+
+from src.models import Player, TrainingPlan, TrainingUnit, STATUS_PENDING, STATUS_COMPLETED
+from src.repository import SystemRepository
+
+# Razeni vysledku dotazu na plany
+# ترتيب نتائج الاستعلام
+ORDER_ID = "id"
+ORDER_ASSIGNED = "date_assigned"
+ORDER_DUE = "target_completion_date"
+ORDERS = (ORDER_ID, ORDER_ASSIGNED, ORDER_DUE)
+
+# Vychozi velikost stranky
+DEFAULT_PAGE_SIZE = 20
+
+_INF = float("inf")
+
+T = TypeVar("T")
+
+
+def _check_date(value: Optional[str], name: str) -> Optional[str]:
+    if value:
+        try:
+            date.fromisoformat(value)
+        except ValueError:
+            raise ValueError(f"{name} must be a YYYY-MM-DD date, got '{value}'.")
+    return value or None
+
+
+@dataclass
+class PlanQuery:
+    """Filters for TrainingService.query_plans; every field left as None matches all plans.
+
+    Date bounds are inclusive ISO dates. `overdue` selects pending plans whose
+    target date lies before `today` (default: the current date). When
+    `order_by` is None, plans come in date_assigned order if that range is
+    given, in target date order for due-date filters, else in id order.
+    Ordering by target date lists only plans that have one.
+    """
+    # Filtr planu: hrac, stav, rozsah datumu prirazeni a terminu, po terminu.
+    # مرشح الخطط
+    player_id: Optional[int] = None
+    status: Optional[str] = None
+    assigned_from: Optional[str] = None
+    assigned_to: Optional[str] = None
+    due_from: Optional[str] = None
+    due_to: Optional[str] = None
+    overdue: bool = False
+    today: Optional[str] = None
+    order_by: Optional[str] = None
+
+    def __post_init__(self):
+        for name in ("assigned_from", "assigned_to", "due_from", "due_to", "today"):
+            setattr(self, name, _check_date(getattr(self, name), name))
+        if self.order_by is not None and self.order_by not in ORDERS:
+            raise ValueError(f"order_by must be one of {', '.join(ORDERS)}.")
+
+    @property
+    def order(self) -> str:
+        if self.order_by is not None:
+            return self.order_by
+        if self.assigned_from or self.assigned_to:
+            return ORDER_ASSIGNED
+        if self.due_from or self.due_to or self.overdue:
+            return ORDER_DUE
+        return ORDER_ID
+
+    def _bounds(self, field_name: str) -> Tuple[Optional[tuple], Optional[tuple]]:
+        """Index bounds (low inclusive, high exclusive) for one date field."""
+        if field_name == ORDER_ASSIGNED:
+            low, high = self.assigned_from, self.assigned_to
+            return (low,) if low else None, (high, _INF) if high else None
+        low, high = self.due_from, self.due_to
+        high_key = (high, _INF) if high else None
+        if self.overdue:
+            today = (self.today or date.today().isoformat(),)
+            high_key = today if high_key is None else min(high_key, today)
+        return (low,) if low else None, high_key
+
+    def matches(self, plan: TrainingPlan) -> bool:
+        """Full check of every filter against one plan."""
+        if self.player_id is not None and plan.player_id != self.player_id:
+            return False
+        if self.status is not None and plan.status != self.status:
+            return False
+        if self.overdue and plan.status != STATUS_PENDING:
+            return False
+        for field_name in (ORDER_ASSIGNED, ORDER_DUE):
+            low, high = self._bounds(field_name)
+            if low is None and high is None:
+                continue
+            value = getattr(plan, field_name)
+            if not value or (low is not None and (value,) < low) or (high is not None and (value, plan.id) >= high):
+                return False
+        return True
+
+    def sort_key(self, plan: TrainingPlan) -> Tuple[str, int]:
+        if self.order == ORDER_ID:
+            return "", plan.id
+        return getattr(plan, self.order) or "", plan.id
+
+
+@dataclass
+class Page(Generic[T]):
+    """One page of results; pass next_cursor back to get the following page (None = last page)."""
+    items: List[T] = field(default_factory=list)
+    next_cursor: Optional[str] = None
+
+
+def encode_cursor(*parts: Any) -> str:
+    return "|".join(str(p) for p in parts)
+
+
+def decode_cursor(cursor: str, size: int) -> List[str]:
+    parts = cursor.split("|")
+    if len(parts) != size or not all(p.lstrip("-").isdigit() for p in parts[1:]):
+        raise ValueError(f"Invalid cursor '{cursor}'.")
+    return parts
+
+
+def paginate(items: Iterable[T], limit: int, cursor_of: Callable[[T], str]) -> Page[T]:
+    """Takes up to `limit` items from a lazy iterable; reads one more to know if a next page exists."""
+    # Strankovani kurzorem: kurzor je klic razeni posledni vracene polozky.
+    limit = max(1, limit)
+    page: Page[T] = Page()
+    for item in items:
+        if len(page.items) == limit:
+            page.next_cursor = cursor_of(page.items[-1])
+            break
+        page.items.append(item)
+    return page
+
+
+def iter_plans(repo: SystemRepository, query: Optional[PlanQuery] = None,
+               after: Optional[Tuple[str, int]] = None) -> Iterator[TrainingPlan]:
+    """Lazily yields the plans matching query in its order, starting after the sort key `after`."""
+    # Zdroj kandidatu: index datumu (bisect), plany hrace, nebo vsechny plany.
+    # مصدر المرشحين: فهرس التاريخ أو خطط اللاعب أو كل الخطط
+    query = query or PlanQuery()
+    order = query.order
+    if order != ORDER_ID and query.player_id is not None:
+        # Plany jednoho hrace je levnejsi seradit nez prochazet index celeho tymu.
+        plans = sorted((p for p in repo.plans_for_player(query.player_id)
+                        if getattr(p, order) and query.matches(p)), key=query.sort_key)
+        for plan in plans:
+            if after is None or query.sort_key(plan) > after:
+                yield plan
+        return
+    if order != ORDER_ID:
+        low, high = query._bounds(order)
+        if after is not None:
+            low = (after[0], after[1] + 1) if low is None else max(low, (after[0], after[1] + 1))
+        for _, plan_id in repo.date_index(order).scan(low, high):
+            plan = repo.get_plan(plan_id)
+            if plan is not None and query.matches(plan):
+                yield plan
+        return
+
+    after_id = after[1] if after is not None else None
+    if query.player_id is not None:
+        candidates: Iterable[TrainingPlan] = repo.plans_for_player(query.player_id)
+    elif any(query._bounds(f) != (None, None) for f in (ORDER_ASSIGNED, ORDER_DUE)):
+        # Razeni podle ID s filtrem datumu: kandidati z indexu, serazeni podle ID.
+        index_field = ORDER_ASSIGNED if query._bounds(ORDER_ASSIGNED) != (None, None) else ORDER_DUE
+        ids = sorted(plan_id for _, plan_id in repo.date_index(index_field).scan(*query._bounds(index_field)))
+        candidates = (repo.get_plan(plan_id) for plan_id in ids)
+    else:
+        candidates = repo.data.training_plans
+    for plan in candidates:
+        if plan is not None and (after_id is None or plan.id > after_id) and query.matches(plan):
+            yield plan
+
+
+def iter_units(repo: SystemRepository, query: Optional[PlanQuery] = None, type_code: Optional[str] = None,
+               status: Optional[str] = None,
+               after: Optional[Tuple[str, int, int]] = None) -> Iterator[Tuple[TrainingPlan, TrainingUnit]]:
+    """Lazily yields (plan, unit) pairs of the matching plans whose units match type_code and status.
+
+    Unit status is STATUS_COMPLETED or STATUS_PENDING (any unit not completed).
+    `after` is (plan sort key..., unit id) of the last unit already returned.
+    """
+    query = query or PlanQuery()
+
+    def unit_matches(unit: TrainingUnit) -> bool:
+        if type_code is not None and unit.type_code != type_code:
+            return False
+        if status is not None and (unit.status == STATUS_COMPLETED) != (status == STATUS_COMPLETED):
+            return False
+        return True
+
+    if after is not None:
+        # Dokonceni rozpracovaneho planu z kurzoru, pak dalsi plany.
+        plan = repo.get_plan(after[1])
+        if plan is not None and query.matches(plan):
+            ids = [u.id for u in plan.exercises]
+            start = ids.index(after[2]) + 1 if after[2] in ids else len(ids)
+            for unit in plan.exercises[start:]:
+                if unit_matches(unit):
+                    yield plan, unit
+    for plan in iter_plans(repo, query, after[:2] if after is not None else None):
+        for unit in plan.exercises:
+            if unit_matches(unit):
+                yield plan, unit
+
+
+def iter_archived(archive, query: Optional[PlanQuery] = None, after: Optional[Tuple[str, int]] = None,
+                  exclude: Container[int] = ()) -> Iterator[TrainingPlan]:
+    """Lazily yields archived plans (PlanArchive) matching query in (date_assigned, id) order.
+
+    Only the monthly segments overlapping the assigned range (and the cursor) are
+    read. Plan ids in `exclude` (still in the hot data) are skipped.
+    """
+    query = query or PlanQuery()
+    date_from = query.assigned_from
+    if after is not None and (date_from is None or after[0] > date_from):
+        date_from = after[0]
+    for plan in archive.iter_plans(date_from, query.assigned_to):
+        if after is not None and (plan.date_assigned, plan.id) <= after:
+            continue
+        if plan.id not in exclude and query.matches(plan):
+            yield plan
+
+
+def iter_players(repo: SystemRepository, after: Optional[int] = None) -> Iterator[Player]:
+    """Lazily yields players in list order, starting after the player id `after`."""
+    for player in repo.data.players:
+        if after is None or player.id > after:
+            yield player
+
+
+def plan_cursor(query: PlanQuery, plan: TrainingPlan) -> str:
+    return encode_cursor(*query.sort_key(plan))
+
+
+def unit_cursor(query: PlanQuery, item: Tuple[TrainingPlan, TrainingUnit]) -> str:
+    plan, unit = item
+    return encode_cursor(*query.sort_key(plan), unit.id)
+
+
+def parse_plan_cursor(cursor: Optional[str]) -> Optional[Tuple[str, int]]:
+    if not cursor:
+        return None
+    key, plan_id = decode_cursor(cursor, 2)
+    return key, int(plan_id)
+
+
+def parse_unit_cursor(cursor: Optional[str]) -> Optional[Tuple[str, int, int]]:
+    if not cursor:
+        return None
+    key, plan_id, unit_id = decode_cursor(cursor, 3)
+    return key, int(plan_id), int(unit_id)
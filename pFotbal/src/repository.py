@@ -0,0 +1,471 @@
+# src/repository.py
+import itertools
+import weakref
+from bisect import bisect_left, bisect_right, insort
+from collections import deque
+from dataclasses import dataclass
+from typing import Deque, Dict, Iterator, List, Optional, Tuple
+
+from config import UNDO_DEPTH
+from src.models import (
+    SystemData, Player, ExerciseType, TrainingPlan, TrainingUnit, PlanTemplate,
+    STATUS_PENDING, STATUS_COMPLETED
+)
+from src.versioning import FrozenList, PlanState
+from src.validation import ParameterValidator
+from src.search import PlayerSearchIndex
+
+
+@dataclass
+class ProgressStats:
+    """Rolled-up plan and unit counters for one player or the whole squad."""
+    # Souhrnne citace planu a jednotek.
+    # عدادات مجمعة للخطط والوحدات
+    plans_pending: int = 0
+    plans_completed: int = 0
+    plans_total: int = 0
+    units_completed: int = 0
+    units_total: int = 0
+
+    @property
+    def completion_rate(self) -> Optional[float]:
+        """Share of completed plans (None when there are no plans)."""
+        return self.plans_completed / self.plans_total if self.plans_total else None
+
+    def __add__(self, other: "ProgressStats") -> "ProgressStats":
+        """Counters of two disjoint sets of plans (e.g. two teams) combined."""
+        return ProgressStats(self.plans_pending + other.plans_pending, self.plans_completed + other.plans_completed,
+                             self.plans_total + other.plans_total, self.units_completed + other.units_completed,
+                             self.units_total + other.units_total)
+
+    def _add_plan(self, plan: TrainingPlan, sign: int = 1):
+        self.plans_total += sign
+        if plan.status == STATUS_PENDING:
+            self.plans_pending += sign
+        elif plan.status == STATUS_COMPLETED:
+            self.plans_completed += sign
+
+
+def plan_progress(plan: TrainingPlan) -> Tuple[int, int]:
+    """Returns (completed, total) units of a plan from its maintained counter.
+
+    The counter is recounted only if units were appended behind the repository's back.
+    """
+    total = len(plan.exercises)
+    if plan._counted_units != total:
+        plan._completed_units = sum(1 for u in plan.exercises if u.status == STATUS_COMPLETED)
+        plan._counted_units = total
+    return plan._completed_units, total
+
+
+# Razene klice indexu datumu: (ISO datum, ID planu)
+DateKey = Tuple[str, int]
+
+
+class DateIndex:
+    """Plans sorted by one ISO date field as (date, plan id) keys; range scans by bisect.
+
+    Plans without a value in the field are not in the index.
+    """
+    # Razeny index planu podle datumu (bisect).
+    # فهرس مرتب للخطط حسب التاريخ
+
+    def __init__(self, field: str, plans: List[TrainingPlan]):
+        self.field = field
+        self.keys: List[DateKey] = sorted(
+            (value, plan.id) for plan in plans if (value := getattr(plan, field)))
+
+    def add(self, plan: TrainingPlan):
+        value = getattr(plan, self.field)
+        if value:
+            insort(self.keys, (value, plan.id))
+
+    def remove(self, plan: TrainingPlan):
+        value = getattr(plan, self.field)
+        if value:
+            i = bisect_left(self.keys, (value, plan.id))
+            if i < len(self.keys) and self.keys[i] == (value, plan.id):
+                del self.keys[i]
+
+    def scan(self, low: Optional[tuple] = None, high: Optional[tuple] = None) -> Iterator[DateKey]:
+        """Lazily yields keys with low <= key < high in order.
+
+        Bounds are tuples compared against the keys: ("2026-01-01",) sorts before
+        every key of that day, ("2026-01-01", inf) after them. Keys inserted
+        while the generator is suspended do not cause repeats or skips.
+        """
+        keys = self.keys
+        i = bisect_left(keys, low) if low is not None else 0
+        size = len(keys)
+        while i < len(keys):
+            key = keys[i]
+            if high is not None and key >= high:
+                return
+            yield key
+            if len(keys) != size:
+                size = len(keys)
+                i = bisect_right(keys, key)
+            else:
+                i += 1
+
+
+class SystemRepository:
+    """Hash-indexed access layer over a SystemData instance."""
+    # Indexovana vrstva nad SystemData (id -> entita).
+    # طبقة مفهرسة فوق بيانات النظام
+
+    # Cisla pohledu (snimku) rostou napric vsemi repozitari.
+    _serials = itertools.count(1)
+
+    def __init__(self, system_data: SystemData, history_depth: int = UNDO_DEPTH):
+        self.data = system_data
+        # Pocitadlo zmen, zive pohledy (slabe odkazy) a body pro undo.
+        self.version = 0
+        self._serial = 0
+        self._views: List[weakref.ref] = []
+        self._latest: Optional[weakref.ref] = None
+        self._latest_key: Optional[tuple] = None
+        self.history: Deque[SystemData] = deque(maxlen=history_depth + 1 if history_depth > 0 else 0)
+        self.reindex()
+
+    @classmethod
+    def of(cls, system_data: SystemData) -> "SystemRepository":
+        """Returns the repository attached to system_data, creating it on first use."""
+        # Repozitar je ulozen primo na objektu SystemData, aby ho sdilely vsechny sluzby.
+        repo = getattr(system_data, "_repository", None)
+        if repo is None or repo.data is not system_data:
+            repo = cls(system_data)
+            system_data._repository = repo
+        return repo
+
+    def reindex(self):
+        """Rebuilds every index from the underlying lists."""
+        # Znovu sestavi vsechny indexy.
+        data = self.data
+        self.players_by_id: Dict[int, Player] = {p.id: p for p in data.players}
+        self.exercise_types_by_code: Dict[str, ExerciseType] = {e.code: e for e in data.exercise_types}
+        # Zkompilovane validatory parametru podle kodu typu (plni se pri prvnim pouziti).
+        self.validators: Dict[str, ParameterValidator] = {}
+        self.templates_by_name: Dict[str, PlanTemplate] = {t.name: t for t in data.plan_templates}
+        self.plans_by_id: Dict[int, TrainingPlan] = {}
+        self.plans_by_player: Dict[int, List[TrainingPlan]] = {}
+        self.units_by_plan: Dict[int, Dict[int, TrainingUnit]] = {}
+        self.player_stats: Dict[int, ProgressStats] = {}
+        self.squad_stats = ProgressStats()
+        # Indexy datumu a vyhledavani hracu se stavi az pri prvnim dotazu.
+        self.date_indexes: Dict[str, DateIndex] = {}
+        self.player_search: Optional[PlayerSearchIndex] = None
+        for plan in data.training_plans:
+            self._index_plan(plan)
+
+    def _index_plan(self, plan: TrainingPlan):
+        self.plans_by_id[plan.id] = plan
+        self.plans_by_player.setdefault(plan.player_id, []).append(plan)
+        self.units_by_plan[plan.id] = {u.id: u for u in plan.exercises}
+        # Citace se pri nacteni spocitaji znovu, takze po reloadu vzdy sedi.
+        plan._counted_units = -1
+        plan._imaged = 0
+        completed, total = plan_progress(plan)
+        for stats in (self._stats_for(plan.player_id), self.squad_stats):
+            stats._add_plan(plan)
+            stats.units_total += total
+            stats.units_completed += completed
+
+    def _stats_for(self, player_id: int) -> ProgressStats:
+        stats = self.player_stats.get(player_id)
+        if stats is None:
+            stats = self.player_stats[player_id] = ProgressStats()
+        return stats
+
+    def _sync(self):
+        """Cheap O(1) guard against lists that were mutated behind the repository's back."""
+        # Pokud nekdo upravil seznamy primo, indexy se prestavi.
+        data = self.data
+        if (len(data.players) != len(self.players_by_id)
+                or len(data.exercise_types) != len(self.exercise_types_by_code)
+                or len(data.plan_templates) != len(self.templates_by_name)
+                or len(data.training_plans) != len(self.plans_by_id)):
+            self.reindex()
+
+    # --- Lookups ---
+
+    def get_player(self, player_id: int) -> Optional[Player]:
+        self._sync()
+        return self.players_by_id.get(player_id)
+
+    def get_exercise_type(self, code: str) -> Optional[ExerciseType]:
+        self._sync()
+        return self.exercise_types_by_code.get(code)
+
+    def validator(self, code: str) -> Optional[ParameterValidator]:
+        """Compiled parameter validator of an exercise type (None for an unknown code), cached until the type is redefined."""
+        validator = self.validators.get(code)
+        if validator is None:
+            exercise_type = self.get_exercise_type(code)
+            if exercise_type is None:
+                return None
+            validator = self.validators[code] = ParameterValidator.for_type(exercise_type)
+        return validator
+
+    def get_template(self, name: str) -> Optional[PlanTemplate]:
+        self._sync()
+        return self.templates_by_name.get(name)
+
+    def get_plan(self, plan_id: int) -> Optional[TrainingPlan]:
+        self._sync()
+        return self.plans_by_id.get(plan_id)
+
+    def get_unit(self, plan_id: int, unit_id: int) -> Optional[TrainingUnit]:
+        plan = self.get_plan(plan_id)
+        if plan is None:
+            return None
+        units = self.units_by_plan.get(plan_id)
+        if units is None or len(units) != len(plan.exercises):
+            units = self.units_by_plan[plan_id] = {u.id: u for u in plan.exercises}
+        return units.get(unit_id)
+
+    def date_index(self, field: str) -> DateIndex:
+        """Sorted index over `date_assigned` or `target_completion_date`, built on first use."""
+        self._sync()
+        index = self.date_indexes.get(field)
+        if index is None:
+            index = self.date_indexes[field] = DateIndex(field, self.data.training_plans)
+        return index
+
+    def player_index(self) -> PlayerSearchIndex:
+        """Name/position search index over the players, built on first use and kept up to date by add_player."""
+        self._sync()
+        if self.player_search is None:
+            self.player_search = PlayerSearchIndex(self.data.players)
+        return self.player_search
+
+    def plans_for_player(self, player_id: int) -> List[TrainingPlan]:
+        self._sync()
+        return self.plans_by_player.get(player_id, [])
+
+    def player_progress(self, player_id: int) -> ProgressStats:
+        """O(1) rolled-up counters of one player."""
+        self._sync()
+        return self.player_stats.get(player_id) or ProgressStats()
+
+    def squad_progress(self) -> ProgressStats:
+        """O(1) rolled-up counters of the whole squad."""
+        self._sync()
+        return self.squad_stats
+
+    # --- Mutations (keep lists and indexes in step) ---
+
+    def add_player(self, player: Player) -> Player:
+        self._sync()
+        self._mutating()
+        self.data.players.append(player)
+        self.players_by_id[player.id] = player
+        if self.player_search is not None:
+            self.player_search.add(player)
+        return player
+
+    def add_exercise_type(self, exercise_type: ExerciseType) -> ExerciseType:
+        """Stores a type; one with the same code is replaced (in a new list, so views keep the old one)."""
+        self._sync()
+        self._mutating()
+        if exercise_type.code in self.exercise_types_by_code:
+            self.data.exercise_types = [e for e in self.data.exercise_types if e.code != exercise_type.code]
+        self.data.exercise_types.append(exercise_type)
+        self.exercise_types_by_code[exercise_type.code] = exercise_type
+        self.validators.pop(exercise_type.code, None)  # novy typ = nove schema
+        return exercise_type
+
+    def add_plan(self, plan: TrainingPlan) -> TrainingPlan:
+        self._sync()
+        self._mutating()
+        self.data.training_plans.append(plan)
+        self._index_plan(plan)
+        plan._imaged = self._serial  # starsi pohledy plan neobsahuji
+        for index in self.date_indexes.values():
+            index.add(plan)
+        return plan
+
+    def add_plans(self, plans: List[TrainingPlan]) -> List[TrainingPlan]:
+        """Adds many plans (units already attached) as one change: one sync and one undo baseline for the whole block."""
+        # Hromadne pridani planu (sablony) - indexy a citace se aktualizuji jednim pruchodem.
+        if not plans:
+            return plans
+        self._sync()
+        self._mutating()
+        self.data.training_plans.extend(plans)
+        for plan in plans:
+            self._index_plan(plan)
+            plan._imaged = self._serial
+            for index in self.date_indexes.values():
+                index.add(plan)
+        return plans
+
+    def add_template(self, template: PlanTemplate) -> PlanTemplate:
+        """Stores a template; one with the same name is replaced (in a new list, so views keep the old one)."""
+        self._sync()
+        self._mutating()
+        if template.name in self.templates_by_name:
+            self.data.plan_templates = [t for t in self.data.plan_templates if t.name != template.name]
+        self.data.plan_templates.append(template)
+        self.templates_by_name[template.name] = template
+        return template
+
+    def remove_plans(self, plan_ids) -> List[TrainingPlan]:
+        """Removes plans (with their units) from the data, indexes and counters; returns the removed ones."""
+        # Odebrani planu (archivace) - jeden pruchod seznamem, citace se odectou.
+        self._sync()
+        wanted = set(plan_ids)
+        removed = [p for p in self.data.training_plans if p.id in wanted]
+        if not removed:
+            return removed
+        self._mutating()
+        # Novy seznam (ne zmena na miste) - pohledy si ponechaji puvodni.
+        self.data.training_plans = [p for p in self.data.training_plans if p.id not in wanted]
+        for plan in removed:
+            del self.plans_by_id[plan.id]
+            self.units_by_plan.pop(plan.id, None)
+            player_plans = self.plans_by_player.get(plan.player_id)
+            if player_plans is not None:
+                player_plans[:] = [p for p in player_plans if p.id not in wanted]
+            completed, total = plan_progress(plan)
+            for stats in self._plan_stats(plan):
+                stats._add_plan(plan, -1)
+                stats.units_total -= total
+                stats.units_completed -= completed
+            for index in self.date_indexes.values():
+                index.remove(plan)
+        return removed
+
+    def add_unit(self, plan: TrainingPlan, unit: TrainingUnit) -> TrainingUnit:
+        self._mutating()
+        self._before_write(plan)
+        completed, _ = plan_progress(plan)
+        plan.exercises.append(unit)
+        done = unit.status == STATUS_COMPLETED
+        plan._completed_units = completed + done
+        plan._counted_units = len(plan.exercises)
+        self.units_by_plan.setdefault(plan.id, {})[unit.id] = unit
+        for stats in self._plan_stats(plan):
+            stats.units_total += 1
+            stats.units_completed += done
+        return unit
+
+    def complete_unit(self, plan: TrainingPlan, unit: TrainingUnit) -> bool:
+        """Marks a unit completed, updating all counters; completes the plan when it was the last one.
+
+        Returns False when the unit was already completed (nothing changes).
+        """
+        # Oznaci jednotku jako dokoncenou a aktualizuje citace (bez prochazeni planu).
+        if unit.status == STATUS_COMPLETED:
+            return False
+        self._mutating()
+        self._before_write(plan)
+        completed, total = plan_progress(plan)
+        unit.status = STATUS_COMPLETED
+        plan._completed_units = completed + 1
+        stats_list = self._plan_stats(plan)
+        for stats in stats_list:
+            stats.units_completed += 1
+        if plan._completed_units == total and plan.status != STATUS_COMPLETED:
+            for stats in stats_list:
+                stats._add_plan(plan, -1)
+            plan.status = STATUS_COMPLETED
+            for stats in stats_list:
+                stats._add_plan(plan)
+        return True
+
+    def _plan_stats(self, plan: TrainingPlan) -> Tuple[ProgressStats, ProgressStats]:
+        return self._stats_for(plan.player_id), self.squad_stats
+
+    # --- Versions (copy-on-write snapshots, undo) ---
+
+    def snapshot(self) -> SystemData:
+        """O(1) read-only view of the current state, safe to serialize while the live data keeps changing.
+
+        The view shares every list and entity with the live data. The live side
+        only appends to shared lists, and saves a plan's state (PlanState, a
+        pointer copy) into the views that still share it right before changing
+        it in place (see FrozenList).
+        """
+        # Snimek bez kopirovani; stav planu se ulozi az pri jeho zmene.
+        # لقطة بدون نسخ البيانات
+        self._sync()
+        data = self.data
+        key = (self.version, id(data.players), len(data.players), id(data.exercise_types), len(data.exercise_types),
+               id(data.training_plans), len(data.training_plans), id(data.plan_templates), len(data.plan_templates))
+        latest = self._latest() if self._latest is not None else None
+        if latest is not None and key == self._latest_key:
+            return latest  # od posledniho snimku se nic nezmenilo
+        self._serial = next(self._serials)
+        plans = FrozenList(data.training_plans, PlanState, self._serial)
+        view = SystemData(players=FrozenList(data.players), exercise_types=FrozenList(data.exercise_types),
+                          training_plans=plans, id_sequences=dict(data.id_sequences),
+                          plan_templates=FrozenList(data.plan_templates))
+        self._views = [ref for ref in self._views if ref() is not None]
+        self._views.append(weakref.ref(plans))
+        self._latest, self._latest_key = weakref.ref(view), key
+        return view
+
+    def _before_write(self, plan: TrainingPlan):
+        """Saves the plan's current state in every live view that still shares it, before it changes in place."""
+        if plan._imaged >= self._serial:
+            return
+        state = None
+        for ref in reversed(self._views):
+            view = ref()
+            if view is None:
+                continue
+            if view.serial <= plan._imaged:
+                break  # starsi pohledy stav uz maji
+            if state is None:
+                state = PlanState(plan)
+            view.saved.setdefault(id(plan), state)
+        plan._imaged = self._serial
+
+    def _mutating(self):
+        # Pred prvni zmenou se ulozi vychozi stav pro undo.
+        if not self.history and self.history.maxlen:
+            self.history.append(self.snapshot())
+        self.version += 1
+
+    def checkpoint(self):
+        """Records the current state as an undo point (one per persisted change or batch)."""
+        if self.history.maxlen:
+            self.history.append(self.snapshot())
+
+    def clear_history(self):
+        """Forgets every undo point (after the data was reloaded or merged)."""
+        self.history.clear()
+
+    def view(self, steps_back: int = 0) -> Optional[SystemData]:
+        """Point-in-time view `steps_back` undo points ago (0 = the latest one); None if it is not kept."""
+        if not 0 <= steps_back < len(self.history):
+            return None
+        return self.history[-1 - steps_back]
+
+    def undo(self, steps: int = 1) -> int:
+        """Restores the state of `steps` undo points ago in place; returns how many steps were undone.
+
+        Entities keep their identity; lists are replaced and indexes rebuilt.
+        Id sequences are not rolled back, so ids are never handed out twice.
+        """
+        # Vraceni zmen: obnova ulozenych stavu planu, seznamy z pohledu, prestaveni indexu.
+        # التراجع عن آخر التغييرات
+        steps = min(steps, len(self.history) - 1)
+        if steps <= 0:
+            return 0
+        for _ in range(steps):
+            self.history.pop()
+        target = self.history[-1]
+        self.version += 1
+        for state in list(target.training_plans.saved.values()):
+            if state.changed():
+                self._before_write(state.plan)
+                state.restore()
+        data = self.data
+        data.players = target.players.originals()
+        data.exercise_types = target.exercise_types.originals()
+        data.training_plans = target.training_plans.originals()
+        data.plan_templates = target.plan_templates.originals()
+        self.reindex()
+        return steps
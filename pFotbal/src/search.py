@@ -0,0 +1,175 @@
+# src/search.py
+import heapq
+import re
+import unicodedata
+from bisect import bisect_left, insort
+from collections import Counter
+from typing import Dict, Iterable, List, Optional, Tuple
+
+from src.models import Player
+
+# Vychozi pocet vracenych kandidatu
+# العدد الافتراضي للنتائج
+DEFAULT_SEARCH_LIMIT = 10
+
+# Znaky, ktere NFKD nerozlozi na zaklad + diakritiku
+_FOLD = str.maketrans({"ø": "o", "ł": "l", "đ": "d", "ð": "d", "þ": "th", "æ": "ae", "œ": "oe", "ı": "i"})
+_WORD = re.compile(r"[^\W_]+")
+
+# Ceny shody jednoho slova dotazu (nizsi = lepsi)
+_EXACT, _PREFIX, _FUZZY = 0, 1, 3
+
+
+def normalize(text: str) -> str:
+    """Lower-case text without diacritics: 'Novák' -> 'novak', 'Dvořák' -> 'dvorak'."""
+    decomposed = unicodedata.normalize("NFKD", text)
+    return "".join(c for c in decomposed if not unicodedata.combining(c)).casefold().translate(_FOLD)
+
+
+def tokenize(text: str) -> List[str]:
+    """Normalized words of text (hyphenated names give one word per part)."""
+    return _WORD.findall(normalize(text))
+
+
+def max_typos(term: str) -> int:
+    """Typos tolerated in one query word: none below 3 letters, 1 up to 6, then 2."""
+    return 0 if len(term) < 3 else 1 if len(term) <= 6 else 2
+
+
+def prefix_distance(term: str, word: str, bound: int) -> int:
+    """Edit distance (with transpositions) between term and the closest prefix of word; bound + 1 once it exceeds bound."""
+    # Omezena Damerau-Levenshteinova vzdalenost; radek nad mez = konec.
+    m, n = len(term), min(len(word), len(term) + bound)
+    before: List[int] = []
+    previous = list(range(n + 1))
+    for i in range(1, m + 1):
+        char = term[i - 1]
+        current = [i] + [0] * n
+        lowest = i
+        for j in range(1, n + 1):
+            value = min(previous[j] + 1, current[j - 1] + 1, previous[j - 1] + (char != word[j - 1]))
+            if i > 1 and j > 1 and char == word[j - 2] and term[i - 2] == word[j - 1]:
+                value = min(value, before[j - 2] + 1)
+            current[j] = value
+            if value < lowest:
+                lowest = value
+        if lowest > bound:
+            return bound + 1
+        before, previous = previous, current
+    return min(previous)
+
+
+def _bigrams(word: str) -> List[str]:
+    return [word[i:i + 2] for i in range(len(word) - 1)]
+
+
+class PlayerSearchIndex:
+    """Incremental search over player names and positions.
+
+    Every normalized word is kept as a sorted (word, player id) key, so a
+    query word is matched as a prefix by bisect. Words that match nothing
+    as a prefix are looked up fuzzily: candidates share enough letter pairs
+    with the query word (q-gram filter) and are then checked by a bounded
+    edit distance. Every query word must match some word of the player;
+    results are ranked by exact, then prefix, then fuzzy matches.
+    """
+    # Vyhledavani hracu podle jmena a pozice (prefix, bez diakritiky, preklepy).
+    # البحث عن اللاعبين بالاسم والمركز
+
+    def __init__(self, players: Iterable[Player] = ()):
+        self.keys: List[Tuple[str, int]] = []
+        self.players: Dict[int, Player] = {}
+        self.names: Dict[int, str] = {}
+        # Slovo -> hraci, dvojice pismen -> slova (pro preklepy)
+        self.word_players: Dict[str, List[int]] = {}
+        self.grams: Dict[str, List[str]] = {}
+        for player in players:
+            self._add(player, sort=False)
+        self.keys.sort()
+
+    def __len__(self) -> int:
+        return len(self.players)
+
+    def add(self, player: Player):
+        """Indexes one player in O(words * log n)."""
+        self._add(player, sort=True)
+
+    def _add(self, player: Player, sort: bool):
+        if player.id in self.players:
+            return
+        self.players[player.id] = player
+        self.names[player.id] = " ".join(tokenize(player.name))
+        for word in set(tokenize(player.name) + tokenize(player.position)):
+            if sort:
+                insort(self.keys, (word, player.id))
+            else:
+                self.keys.append((word, player.id))
+            owners = self.word_players.get(word)
+            if owners is None:
+                owners = self.word_players[word] = []
+                for gram in set(_bigrams(word)):
+                    self.grams.setdefault(gram, []).append(word)
+            owners.append(player.id)
+
+    def _prefix_matches(self, term: str) -> Dict[int, int]:
+        """player id -> cost of the best word starting with term."""
+        found: Dict[int, int] = {}
+        keys = self.keys
+        i = bisect_left(keys, (term,))
+        while i < len(keys):
+            word, player_id = keys[i]
+            if not word.startswith(term):
+                break
+            cost = _EXACT if len(word) == len(term) else _PREFIX
+            if cost < found.get(player_id, _FUZZY + 3):
+                found[player_id] = cost
+            i += 1
+        return found
+
+    def _fuzzy_matches(self, term: str) -> Dict[int, int]:
+        """player id -> cost of the closest word within max_typos(term) edits."""
+        bound = max_typos(term)
+        if bound == 0:
+            return {}
+        grams = _bigrams(term)
+        # Jedna uprava zmeni nejvyse 3 dvojice (prehozeni), takze slovo v mezi `bound`
+        # sdili s dotazem alespon len(grams) - 3 * bound dvojic.
+        needed = max(1, len(grams) - 3 * bound)
+        shared = Counter()
+        for gram in set(grams):
+            shared.update(self.grams.get(gram, ()))
+        found: Dict[int, int] = {}
+        for word, count in shared.items():
+            if count < needed or len(word) < len(term) - bound:
+                continue
+            distance = prefix_distance(term, word, bound)
+            if distance <= bound:
+                # Preklep v celem slove je lepsi nez preklep jen v jeho zacatku.
+                cost = _FUZZY + distance + (abs(len(word) - len(term)) > distance)
+                for player_id in self.word_players[word]:
+                    if cost < found.get(player_id, _FUZZY + bound + 2):
+                        found[player_id] = cost
+        return found
+
+    def search(self, query: str, limit: int = DEFAULT_SEARCH_LIMIT) -> List[Player]:
+        """Players matching every word of query, best first (at most `limit`)."""
+        terms = tokenize(query)
+        if not terms:
+            return []
+        # Nejdrive presne a prefixove shody; preklepy jen pro slova, ktera jinak nic nenajdou.
+        total: Optional[Dict[int, int]] = None
+        for term in sorted(set(terms), key=len, reverse=True):
+            matches = self._prefix_matches(term)
+            if not matches:
+                matches = self._fuzzy_matches(term)
+            if total is None:
+                total = matches
+            else:
+                total = {pid: cost + matches[pid] for pid, cost in total.items() if pid in matches}
+            if not total:
+                return []
+        phrase = " ".join(terms)
+        names = self.names
+        ranked = heapq.nsmallest(max(1, limit), total.items(), key=lambda item: (
+            item[1], not names[item[0]].startswith(phrase), names[item[0]], item[0]))
+        return [self.players[player_id] for player_id, _ in ranked]
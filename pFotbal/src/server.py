@@ -0,0 +1,338 @@
+# src/server.py
+import asyncio
+import json
+import re
+from dataclasses import asdict
+from typing import Any, Awaitable, Callable, Dict, List, Optional, Pattern, Tuple
+from urllib.parse import parse_qsl, urlsplit
+
+from src.async_service import AsyncTrainingService
+from src.services import DataManager, TrainingService
+from src.codec import encode
+from src.changefeed import DEFAULT_FEED_BATCH
+from src.search import DEFAULT_SEARCH_LIMIT
+from src.models import ExerciseType, TrainingPlan
+from src.repository import ProgressStats
+
+# Limity pozadavku
+# حدود الطلب
+MAX_HEADER_LINES = 100
+MAX_BODY_BYTES = 1024 * 1024
+
+_REASONS = {200: "OK", 201: "Created", 400: "Bad Request", 404: "Not Found", 405: "Method Not Allowed",
+            409: "Conflict", 413: "Payload Too Large", 500: "Internal Server Error"}
+
+
+class HttpError(Exception):
+    """An error answered with the given HTTP status and a JSON {"error": message} body."""
+
+    def __init__(self, status: int, message: str):
+        super().__init__(message)
+        self.status = status
+
+
+Response = Tuple[int, Any]
+Handler = Callable[..., Awaitable[Response]]
+
+
+def _progress(stats: ProgressStats) -> Dict[str, Any]:
+    return dict(asdict(stats), completion_rate=stats.completion_rate)
+
+
+def _require(body: Dict[str, Any], *keys: str):
+    missing = [k for k in keys if body.get(k) in (None, "")]
+    if missing:
+        raise HttpError(400, f"Missing fields: {', '.join(missing)}.")
+
+
+class PlannerServer:
+    """Small stdlib HTTP/1.1 JSON API (keep-alive) over an AsyncTrainingService.
+
+    Routes:
+        GET  /players                      GET  /players/{id}        GET /players/{id}/plans
+        GET  /plans/{id}                   GET  /progress            GET /exercise-types
+        GET  /players?q={name}&limit={n}   GET  /changes?since={seq}&limit={n}
+        POST /players {name, position}     POST /exercise-types {code, description, parameters_metadata}
+        POST /plans {player_id, target_date}
+        POST /plans/{id}/units {type_code, params}
+        POST /plans/{id}/units/{unit_id}/complete
+        GET  /templates                    POST /templates {name, description, units: [{type_code, params}]}
+        POST /templates/assign {name, player_ids, position, target_date}
+    """
+    # Lokalni HTTP/JSON server planovace.
+    # خادم HTTP/JSON محلي
+
+    def __init__(self, service: AsyncTrainingService, host: str = "127.0.0.1", port: int = 8080):
+        self.service = service
+        self.host = host
+        self.port = port
+        self.requests_served = 0
+        self._server: Optional[asyncio.AbstractServer] = None
+        self._routes: List[Tuple[str, Pattern, Handler]] = [
+            ("GET", re.compile(r"/players"), self._list_players),
+            ("GET", re.compile(r"/players/(\d+)"), self._get_player),
+            ("GET", re.compile(r"/players/(\d+)/plans"), self._player_plans),
+            ("GET", re.compile(r"/plans/(\d+)"), self._get_plan),
+            ("GET", re.compile(r"/progress"), self._squad_progress),
+            ("GET", re.compile(r"/exercise-types"), self._list_exercise_types),
+            ("GET", re.compile(r"/changes"), self._list_changes),
+            ("GET", re.compile(r"/templates"), self._list_templates),
+            ("POST", re.compile(r"/players"), self._add_player),
+            ("POST", re.compile(r"/exercise-types"), self._add_exercise_type),
+            ("POST", re.compile(r"/plans"), self._create_plan),
+            ("POST", re.compile(r"/plans/(\d+)/units"), self._add_unit),
+            ("POST", re.compile(r"/plans/(\d+)/units/(\d+)/complete"), self._complete_unit),
+            ("POST", re.compile(r"/templates"), self._save_template),
+            ("POST", re.compile(r"/templates/assign"), self._assign_template),
+        ]
+
+    async def start(self):
+        """Starts listening; with port 0 the chosen port is stored in self.port."""
+        await self.service.start()
+        self._server = await asyncio.start_server(self._handle_connection, self.host, self.port)
+        self.port = self._server.sockets[0].getsockname()[1]
+
+    async def serve_forever(self):
+        if self._server is None:
+            await self.start()
+        async with self._server:
+            await self._server.serve_forever()
+
+    async def close(self):
+        """Stops accepting connections and persists every queued write."""
+        if self._server is not None:
+            self._server.close()
+            await self._server.wait_closed()
+            self._server = None
+        await self.service.close()
+
+    # --- HTTP ---
+
+    async def _handle_connection(self, reader: asyncio.StreamReader, writer: asyncio.StreamWriter):
+        try:
+            while True:
+                request = await self._read_request(reader)
+                if request is None:
+                    break
+                method, target, headers, body = request
+                status, payload = await self.dispatch(method, target, body)
+                keep_alive = headers.get("connection", "").lower() != "close"
+                self._write_response(writer, status, payload, keep_alive)
+                await writer.drain()
+                self.requests_served += 1
+                if not keep_alive:
+                    break
+        except HttpError as e:
+            self._write_response(writer, e.status, {"error": str(e)}, False)
+        except (ConnectionError, asyncio.IncompleteReadError):
+            pass
+        finally:
+            try:
+                writer.close()
+                await writer.wait_closed()
+            except ConnectionError:
+                pass
+
+    async def _read_request(self, reader: asyncio.StreamReader):
+        line = await reader.readline()
+        if not line:
+            return None
+        try:
+            method, target, _ = line.decode("latin-1").split(" ", 2)
+        except ValueError:
+            raise HttpError(400, "Malformed request line.")
+        headers: Dict[str, str] = {}
+        for _ in range(MAX_HEADER_LINES):
+            line = await reader.readline()
+            if line in (b"\r\n", b"\n", b""):
+                break
+            name, _, value = line.decode("latin-1").partition(":")
+            headers[name.strip().lower()] = value.strip()
+        else:
+            raise HttpError(400, "Too many headers.")
+        try:
+            length = int(headers.get("content-length") or 0)
+        except ValueError:
+            raise HttpError(400, "Invalid Content-Length.")
+        if length > MAX_BODY_BYTES:
+            raise HttpError(413, "Request body too large.")
+        body = await reader.readexactly(length) if length else b""
+        return method.upper(), target, headers, body
+
+    @staticmethod
+    def _write_response(writer: asyncio.StreamWriter, status: int, payload: Any, keep_alive: bool):
+        body = json.dumps(payload, ensure_ascii=False).encode("utf-8")
+        head = (f"HTTP/1.1 {status} {_REASONS.get(status, 'OK')}\r\n"
+                f"Content-Type: application/json; charset=utf-8\r\n"
+                f"Content-Length: {len(body)}\r\n"
+                f"Connection: {'keep-alive' if keep_alive else 'close'}\r\n\r\n")
+        writer.write(head.encode("latin-1") + body)
+
+    async def dispatch(self, method: str, target: str, body: bytes = b"") -> Response:
+        """Routes one request; returns (status, JSON-ready payload)."""
+        url = urlsplit(target)
+        path = url.path.rstrip("/") or "/"
+        allowed = False
+        try:
+            for route_method, pattern, handler in self._routes:
+                match = pattern.fullmatch(path)
+                if match is None:
+                    continue
+                if route_method != method:
+                    allowed = True
+                    continue
+                data = self._parse_body(body) if method == "POST" else dict(parse_qsl(url.query))
+                return await handler(data, *(int(g) for g in match.groups()))
+            if allowed:
+                raise HttpError(405, f"Method {method} not allowed for {path}.")
+            raise HttpError(404, f"No route for {path}.")
+        except HttpError as e:
+            return e.status, {"error": str(e)}
+        except ValueError as e:
+            return 400, {"error": str(e)}
+        except Exception as e:
+            return 500, {"error": f"Unexpected error: {e}"}
+
+    @staticmethod
+    def _parse_body(body: bytes) -> Dict[str, Any]:
+        if not body:
+            return {}
+        try:
+            data = json.loads(body.decode("utf-8"))
+        except (UnicodeDecodeError, json.JSONDecodeError):
+            raise HttpError(400, "Body must be JSON.")
+        if not isinstance(data, dict):
+            raise HttpError(400, "Body must be a JSON object.")
+        return data
+
+    # --- Handlers ---
+
+    async def _plan_payload(self, plan: TrainingPlan) -> Dict[str, Any]:
+        return dict(encode(plan), summary=await self.service.get_plan_summary(plan))
+
+    async def _list_players(self, data) -> Response:
+        if "q" not in data:
+            return 200, [encode(p) for p in self.service.system_data.players]
+        # ?q= hledani podle jmena/pozice (serazene, nejlepsi shoda prvni)
+        try:
+            limit = int(data.get("limit", DEFAULT_SEARCH_LIMIT))
+        except ValueError:
+            raise HttpError(400, "limit must be an integer.")
+        return 200, [encode(p) for p in await self.service.search_players(data["q"], limit)]
+
+    async def _get_player(self, data, player_id: int) -> Response:
+        player = await self.service.find_player(player_id)
+        if player is None:
+            raise HttpError(404, f"Player {player_id} not found.")
+        return 200, dict(encode(player), progress=_progress(await self.service.get_player_progress(player_id)))
+
+    async def _player_plans(self, data, player_id: int) -> Response:
+        if await self.service.find_player(player_id) is None:
+            raise HttpError(404, f"Player {player_id} not found.")
+        return 200, [await self._plan_payload(p) for p in await self.service.find_player_plans(player_id)]
+
+    async def _get_plan(self, data, plan_id: int) -> Response:
+        plan = await self.service.find_plan(plan_id)
+        if plan is None:
+            raise HttpError(404, f"Plan {plan_id} not found.")
+        return 200, await self._plan_payload(plan)
+
+    async def _squad_progress(self, data) -> Response:
+        return 200, _progress(await self.service.get_squad_progress())
+
+    async def _list_exercise_types(self, data) -> Response:
+        return 200, [encode(e) for e in self.service.system_data.exercise_types]
+
+    async def _list_changes(self, data) -> Response:
+        feed = self.service.dm.changes
+        if feed is None:
+            raise HttpError(404, "The change feed is disabled.")
+        try:
+            since, limit = int(data.get("since", 0)), int(data.get("limit", DEFAULT_FEED_BATCH))
+        except ValueError:
+            raise HttpError(400, "since and limit must be integers.")
+        batch = await asyncio.to_thread(feed.read, since, min(limit, DEFAULT_FEED_BATCH))
+        return 200, {"events": [asdict(e) for e in batch.events], "cursor": batch.cursor, "has_more": batch.has_more}
+
+    async def _add_player(self, data) -> Response:
+        _require(data, "name", "position")
+        player = await self.service.add_player(str(data["name"]).strip(), str(data["position"]).strip())
+        return 201, encode(player)
+
+    async def _add_exercise_type(self, data) -> Response:
+        _require(data, "code", "parameters_metadata")
+        code = str(data["code"]).strip().upper()
+        if await self.service.find_exercise_type(code) is not None:
+            raise HttpError(409, f"Exercise type {code} already exists.")
+        metadata = data["parameters_metadata"]
+        if not isinstance(metadata, dict):
+            raise HttpError(400, "parameters_metadata must be an object.")
+        exercise_type = await self.service.add_exercise_type(
+            ExerciseType(code=code, description=str(data.get("description", "")), parameters_metadata=metadata))
+        return 201, encode(exercise_type)
+
+    async def _create_plan(self, data) -> Response:
+        _require(data, "player_id")
+        plan = await self.service.create_training_plan(int(data["player_id"]), data.get("target_date") or None)
+        if plan is None:
+            raise HttpError(404, f"Player {data['player_id']} not found.")
+        return 201, await self._plan_payload(plan)
+
+    async def _add_unit(self, data, plan_id: int) -> Response:
+        _require(data, "type_code")
+        params = data.get("params") or {}
+        if not isinstance(params, dict):
+            raise HttpError(400, "params must be an object.")
+        unit = await self.service.add_exercise_to_plan(plan_id, str(data["type_code"]).strip().upper(), params)
+        if unit is None:
+            raise HttpError(404, f"Plan {plan_id} or exercise type {data['type_code']} not found.")
+        return 201, encode(unit)
+
+    async def _complete_unit(self, data, plan_id: int, unit_id: int) -> Response:
+        plan = await self.service.find_plan(plan_id)
+        if plan is None:
+            raise HttpError(404, f"Plan {plan_id} not found.")
+        completed = await self.service.mark_exercise_completed(plan_id, unit_id)
+        if not completed and self.service.ts.repo(self.service.system_data).get_unit(plan_id, unit_id) is None:
+            raise HttpError(404, f"Unit {unit_id} not found in plan {plan_id}.")
+        return 200, {"completed": completed, "plan_status": plan.status}
+
+    async def _list_templates(self, data) -> Response:
+        return 200, [encode(t) for t in self.service.system_data.plan_templates]
+
+    async def _save_template(self, data) -> Response:
+        _require(data, "name", "units")
+        units = data["units"]
+        if not isinstance(units, list) or not all(isinstance(u, dict) and isinstance(u.get("params") or {}, dict)
+                                                  for u in units):
+            raise HttpError(400, "units must be a list of {type_code, params} objects.")
+        template = await self.service.save_plan_template(
+            str(data["name"]), [(str(u.get("type_code", "")), u.get("params") or {}) for u in units],
+            str(data.get("description", "")))
+        return 201, encode(template)
+
+    async def _assign_template(self, data) -> Response:
+        _require(data, "name")
+        player_ids = data.get("player_ids")
+        if player_ids is not None and (not isinstance(player_ids, list) or not all(isinstance(i, int) for i in player_ids)):
+            raise HttpError(400, "player_ids must be a list of integers.")
+        if self.service.ts.find_plan_template(self.service.system_data, str(data["name"])) is None:
+            raise HttpError(404, f"Plan template {data['name']} not found.")
+        plans = await self.service.assign_plan_template(str(data["name"]), player_ids, data.get("position") or None,
+                                                        data.get("target_date") or None)
+        return 201, {"plan_ids": [p.id for p in plans]}
+
+
+async def serve(data_file: str, host: str, port: int, shared: Optional[bool] = None):
+    """Loads the data file and serves the API until cancelled."""
+    # Spusti server nad datovym souborem.
+    dm = DataManager(data_file) if shared is None else DataManager(data_file, shared=shared)
+    system_data = dm.load_data()
+    server = PlannerServer(AsyncTrainingService(TrainingService(dm), system_data), host, port)
+    await server.start()
+    print(f"Planner API listening on http://{server.host}:{server.port} (Ctrl+C to stop)")
+    try:
+        await server.serve_forever()
+    finally:
+        await server.close()
+        dm.close()
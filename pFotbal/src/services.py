@@ -1,110 +1,646 @@
 # src/services.py
-import json
 import os
-from datetime import date
-from typing import List, Optional, Dict, Any
-from dataclasses import asdict, is_dataclass
+from datetime import date, timedelta
+from typing import TYPE_CHECKING, List, Optional, Dict, Any, Iterable, Iterator, Tuple
 # IMPORTY PRO PARALELISMUS
 import threading
-from functools import wraps 
+import atexit
+import time
+from contextlib import contextmanager, nullcontext
 
-from config import DATA_FILE_PATH
+from config import (
+    DATA_FILE_PATH, PERSISTENCE_MODE, JOURNAL_MAX_RECORDS, JOURNAL_MAX_BYTES, STORAGE_BACKEND, DATA_FORMAT,
+    METRICS_ENABLED, METRICS_EXPORT_PATH, METRICS_FORMAT, SHARED_DATA_FILE, STARTUP_CACHE,
+    ARCHIVE_COMPRESSION, ARCHIVE_AFTER_DAYS, CHANGE_FEED
+)
 from src.models import (
-    SystemData, Player, ExerciseType, TrainingPlan, TrainingUnit,
-    STATUS_PENDING, STATUS_COMPLETED
+    SystemData, Player, ExerciseType, TrainingPlan, TrainingUnit, PlanTemplate,
+    STATUS_PENDING, STATUS_COMPLETED, SEQ_PLAYER, SEQ_PLAN, SEQ_UNIT
+)
+from src.repository import SystemRepository, ProgressStats, plan_progress
+from src.writer import BackgroundWriter
+from src import metrics
+from src.metrics import registry, BYTES_BUCKETS
+from src.sharing import SEQ_VERSION, FileLock, file_signature, merge_changes, adopt
+from src.archive import PlanArchive, archive_dir_for
+from src.query import (
+    PlanQuery, Page, DEFAULT_PAGE_SIZE, iter_plans, iter_units, iter_players, iter_archived, paginate,
+    plan_cursor, unit_cursor, parse_plan_cursor, parse_unit_cursor, encode_cursor
 )
+from src.validation import BatchValidation, validate_batch
+from src.search import DEFAULT_SEARCH_LIMIT, normalize
+from src.journal import (
+    MutationJournal, build_record, apply_record, SEQ_MUTATION,
+    OP_ADD_PLAYER, OP_ADD_EXERCISE_TYPE, OP_CREATE_PLAN, OP_ADD_UNIT, OP_COMPLETE_UNIT, OP_ARCHIVE_PLANS,
+    OP_SAVE_TEMPLATE
+)
+
+# Uloziste (sqlite3), cache (pickle, hashlib), kanal zmen a import (csv) se nacitaji az pri pouziti:
+# `import src.cli` je pak nepotrebuje.
+# تحميل الوحدات عند الحاجة فقط
+if TYPE_CHECKING:
+    from src.storage import StorageBackend
+    from src.startup_cache import StartupCache
+    from src.changefeed import ChangeFeed
+    from src.importer import ImportReport
+
+# Rezimy ukladani
+# أوضاع الحفظ
+MODE_SNAPSHOT = "snapshot"
+MODE_JOURNAL = "journal"
+
+def default_exercise_types() -> List[ExerciseType]:
+    """Exercise types every new data file starts with."""
+    # Vychozi typy cviceni
+    return [
+        ExerciseType(code="SPRINT", description="Short distance running training.", parameters_metadata={"distance_m": "float", "repetitions": "int"}),
+        ExerciseType(code="SHOOT", description="Goal shooting practice.", parameters_metadata={"shots_taken": "int", "goals_scored": "int"}),
+        ExerciseType(code="JUMP", description="Vertical or horizontal jumping drills.", parameters_metadata={"jumps_count": "int", "height_cm": "float"}),
+    ]
 
-def run_in_thread(func):
-    @wraps(func)
-    def wrapper(*args, **kwargs):
-        # We start saving in a new background thread.
-        # نبدأ الحفظ في خيط خلفي جديد
-        thread = threading.Thread(target=func, args=args, kwargs=kwargs)
-        thread.start()
-        return thread
-    return wrapper
-
-# Helper class for JSON serialization
-class JSONEncoder(json.JSONEncoder):
-    def default(self, o):
-        if is_dataclass(o):
-            return asdict(o)
-        return super().default(o)
 
 class DataManager:
     """Handles saving and loading the SystemData object."""
     # يتعامل مع حفظ وتحميل كائن بيانات النظام
+
+    # Zamek pro pridelovani ID (sdileny vsemi vlakny).
+    _id_lock = threading.Lock()
+
+    # Vychozi hodnoty na urovni tridy (pro podtridy, ktere nevolaji __init__).
+    data_file_path = DATA_FILE_PATH
+    _writer: Optional[BackgroundWriter] = None
+    _writer_lock = threading.Lock()
+    persistence_mode = MODE_SNAPSHOT
+    journal: Optional[MutationJournal] = None
+    backend: Optional["StorageBackend"] = None
+    _batch_local: Optional[threading.local] = None
+    shared = False
+    cache: Optional["StartupCache"] = None
+    archive: Optional[PlanArchive] = None
+    changes: Optional["ChangeFeed"] = None
+    _loaded: Optional[SystemData] = None
+    _cache_current = False
+    _held_lock: Optional[FileLock] = None
+    _feed_lock = threading.Lock()
+
+    def __init__(self, data_file_path: str = DATA_FILE_PATH, persistence_mode: str = PERSISTENCE_MODE,
+                 journal_max_records: int = JOURNAL_MAX_RECORDS, journal_max_bytes: int = JOURNAL_MAX_BYTES,
+                 backend: Optional["StorageBackend"] = None, shared: bool = SHARED_DATA_FILE,
+                 startup_cache: bool = STARTUP_CACHE, change_feed: bool = CHANGE_FEED):
+        if persistence_mode not in (MODE_SNAPSHOT, MODE_JOURNAL):
+            raise ValueError(f"Unknown persistence mode '{persistence_mode}'.")
+        self.data_file_path = data_file_path
+        if backend is None:
+            from src.storage import create_backend
+            backend = create_backend(STORAGE_BACKEND, data_file_path, DATA_FORMAT)
+        self.backend = backend
+        self.persistence_mode = persistence_mode
+        self.journal_max_records = journal_max_records
+        self.journal_max_bytes = journal_max_bytes
+        self._writer = None
+        self._journal_lock = threading.Lock()
+        self._batch_local = threading.local()
+        # Inkrementalni backend (SQLite) zurnal nepotrebuje.
+        if persistence_mode == MODE_JOURNAL and not self.backend.incremental:
+            self.journal = MutationJournal(data_file_path + ".journal")
+        # Sdileny soubor (vice procesu): zamek, verze a slouceni zmen.
+        # Plati pro snapshot do jednoho souboru; zurnal a SQLite maji vlastni zapis.
+        self.shared = shared and persistence_mode == MODE_SNAPSHOT and not self.backend.incremental
+        self.lock_path = data_file_path + ".lock"
+        self._signature = None
+        self._unsynced: List[Dict[str, Any]] = []
+        self._shared_lock = threading.Lock()
+        self.conflicts: List[str] = []
+        # Zaznamy cekajici na zapis zapisovacim vlaknem; do kanalu zmen jdou az po nem.
+        self._feed_lock = threading.Lock()
+        self._feed_pending: List[Dict[str, Any]] = []
+        self._feed_queued = 0
+        self._feed_written = 0
+        # Cache rozparsovanych dat (jen pro backend s jednim souborem, ktery se cely parsuje).
+        self.cache = None
+        if startup_cache and not self.backend.incremental:
+            from src.startup_cache import StartupCache
+            self.cache = StartupCache(data_file_path)
+        self._loaded: Optional[SystemData] = None
+        self._cache_current = False
+        self.archive = PlanArchive(archive_dir_for(data_file_path), ARCHIVE_COMPRESSION)
+        # Kanal zmen pro odberatele; v rezimu zurnalu stejne trvanlivy jako zurnal (fsync).
+        self.changes = None
+        if change_feed:
+            from src.changefeed import ChangeFeed, feed_path_for
+            self.changes = ChangeFeed(feed_path_for(data_file_path), shared=shared,
+                                      durable=persistence_mode == MODE_JOURNAL)
     
     def _create_empty_data_if_needed(self):
         """Creates initial data file and structure."""
         # ينشئ ملف وهيكل بيانات أولي
-        if not os.path.exists(os.path.dirname(DATA_FILE_PATH)):
-            os.makedirs(os.path.dirname(DATA_FILE_PATH))
+        data_dir = os.path.dirname(self.data_file_path)
+        if data_dir and not os.path.exists(data_dir):
+            os.makedirs(data_dir)
             
-        if not os.path.exists(DATA_FILE_PATH):
-            initial_data = SystemData(
-                exercise_types=[
-                    # Vychozi typy cviceni
-                    ExerciseType(code="SPRINT", description="Short distance running training.", parameters_metadata={"distance_m": "float", "repetitions": "int"}),
-                    ExerciseType(code="SHOOT", description="Goal shooting practice.", parameters_metadata={"shots_taken": "int", "goals_scored": "int"}),
-                    ExerciseType(code="JUMP", description="Vertical or horizontal jumping drills.", parameters_metadata={"jumps_count": "int", "height_cm": "float"}),
-                ]
-            )
+        if self.shared:
+            with FileLock(self.lock_path):
+                if not self.backend.exists():
+                    self._write_versioned(SystemData(exercise_types=default_exercise_types()))
+            return True
+        if not self.backend.exists():
+            initial_data = SystemData(exercise_types=default_exercise_types())
             self.save_data(initial_data)
+            self.flush()
             return True
         return True
 
-    def load_data(self) -> SystemData:
-        """Loads data from file and performs deserialization."""
+    def load_data(self, snapshot: Optional[Tuple[SystemData, Any, bool]] = None) -> SystemData:
+        """Loads data from file and performs deserialization.
+
+        `snapshot` is a read_snapshot() result produced elsewhere (e.g. in a worker
+        process); only the journal replay and sequence checks then run here.
+        """
         # يحمل البيانات من الملف
         self._create_empty_data_if_needed()
-        with open(DATA_FILE_PATH, 'r', encoding='utf-8') as f:
-            data = json.load(f)
-            
-        # Manual deserialization
-        players = [Player(**p) for p in data.pop('players', [])]
-        exercise_types = [ExerciseType(**e) for e in data.pop('exercise_types', [])]
-        
-        training_plans = []
-        for p_data in data.pop('training_plans', []):
-            exercises = [TrainingUnit(**e) for e in p_data.pop('exercises', [])]
-            plan = TrainingPlan(**p_data)
-            plan.exercises = exercises
-            training_plans.append(plan)
-
-        return SystemData(
-            players=players,
-            exercise_types=exercise_types,
-            training_plans=training_plans
-        )
+        start = time.perf_counter() if registry.enabled else 0.0
+        if snapshot is None:
+            snapshot = self.read_snapshot()
+        system_data, self._signature, self._cache_current = snapshot
+        if registry.enabled and self.cache is not None:
+            registry.inc("pfl_startup_cache_hits_total" if self._cache_current else "pfl_startup_cache_misses_total")
+        if self.journal is not None:
+            self._replay_journal(system_data)
+        self._reconcile_sequences(system_data)
+        repo = getattr(system_data, "_repository", None)
+        if repo is not None:
+            repo.clear_history()  # prehrani zurnalu neni zmena, kterou by slo vratit
+        if registry.enabled:
+            registry.observe("pfl_load_seconds", time.perf_counter() - start)
+        self._loaded = system_data
+        return system_data
+
+    def read_snapshot(self) -> Tuple[SystemData, Any, bool]:
+        """Reads the data file: (data, file signature, True if it came from the startup cache).
+
+        Touches no state of this manager, so it can run in another process.
+        """
+        if self.shared:
+            with FileLock(self.lock_path, exclusive=False):
+                return self._load_snapshot()
+        return self._load_snapshot()
+
+    def _load_snapshot(self) -> Tuple[SystemData, Any, bool]:
+        # Nejdriv cache (pickle), jinak parsovani souboru.
+        system_data = self.cache.load() if self.cache is not None else None
+        from_cache = system_data is not None
+        if system_data is None:
+            system_data = self.backend.load()
+        return system_data, file_signature(self.data_file_path), from_cache
+
+    def _store_cache(self):
+        """Caches the loaded data on close when it is exactly what the data file holds."""
+        # Jen kdyz soubor od naseho posledniho cteni/zapisu nikdo nezmenil a vse je ulozeno.
+        # Zurnal muze obsahovat zaznamy navic - jejich prehrani je idempotentni (sekvence).
+        if self.cache is None or self._loaded is None or self._cache_current:
+            return
+        if self._writer is not None and self._writer.last_error is not None:
+            return
+        lock = FileLock(self.lock_path, exclusive=False) if self.shared else nullcontext()
+        with lock:
+            if file_signature(self.data_file_path) == self._signature:
+                self._cache_current = self.cache.store(self._loaded)
+
+    def _replay_journal(self, system_data: SystemData):
+        """Applies journal records newer than the snapshot on top of it."""
+        # Prehraje zaznamy zurnalu, ktere jeste nejsou ve snapshotu.
+        applied = system_data.id_sequences.get(SEQ_MUTATION, 0)
+        for record in self.journal.read():
+            if record.get("seq", 0) > applied:
+                apply_record(system_data, record)
+                self._cache_current = False
+
+    def _get_writer(self) -> BackgroundWriter:
+        """Starts the dedicated writer thread on first use."""
+        if self._writer is None:
+            with self._writer_lock:
+                if self._writer is None:
+                    self._writer = BackgroundWriter(self._write_snapshot)
+                    atexit.register(self.close)
+        return self._writer
 
-    @run_in_thread
     def save_data(self, system_data: SystemData):
-        """Saves the current state of SystemData object to JSON file in a separate thread (PARALLELISM)."""
+        """Schedules a save of SystemData on the background writer thread (PARALLELISM).
+
+        The writer gets a copy-on-write snapshot, so it serializes a consistent
+        state while the caller keeps mutating. Saves requested while a write is
+        running are coalesced into one follow-up write.
+        """
         # يحفظ البيانات في ملف JSON في خيط منفصل (توازي)
+        # Writer dostane O(1) snimek (copy-on-write), ne zivy objekt, ktery se dal meni.
+        # Snimek obsahuje zmeny vsech zaznamu zarazenych do fronty kanalu pred nim.
+        writer = self._get_writer()
+        with self._feed_lock:
+            writer.submit((SystemRepository.of(system_data).snapshot(), self._feed_queued))
+
+    def _write_snapshot(self, payload: Tuple[SystemData, int]):
+        """Writer-thread target: writes a snapshot, then publishes the change events of the records it contains."""
+        system_data, covered = payload
+        self._write_file(system_data)
+        # Az po uspesnem zapisu; pri chybe zaznamy cekaji na dalsi zapis (ten je obsahuje take).
+        with self._feed_lock:
+            count = max(0, covered - self._feed_written)
+            records, self._feed_pending = self._feed_pending[:count], self._feed_pending[count:]
+            self._feed_written = max(covered, self._feed_written)
+        self._publish(records)
+
+    def _save_and_publish(self, system_data: SystemData, records: List[Dict[str, Any]]):
+        """Schedules a background save; the records' change events follow once a save containing them is on disk."""
+        if self.changes is not None:
+            with self._feed_lock:
+                self._feed_pending.extend(records)
+                self._feed_queued += len(records)
+        self.save_data(system_data)
+
+    def _publish(self, records: List[Dict[str, Any]]):
+        """Publishes change events for records that are already on disk."""
+        if self.changes is not None and records:
+            self.changes.publish(records)
+
+    def _write_file(self, system_data: SystemData):
+        """Writes the complete SystemData through the storage backend (counted by the pfl_save* metrics)."""
+        # Bez vypisu na stdout - zapis bezi i pod interaktivnim menu a v serveru.
+        start = time.perf_counter() if registry.enabled else 0.0
+        written = self.backend.save(system_data)
+        self._signature = file_signature(self.data_file_path)
+        self._cache_current = False
+        if registry.enabled:
+            registry.observe("pfl_save_seconds", time.perf_counter() - start)
+            registry.inc("pfl_saves_total")
+            if written is not None:
+                registry.observe("pfl_save_bytes", written, BYTES_BUCKETS)
+
+    def flush(self, timeout: Optional[float] = None) -> bool:
+        """Waits until every requested save is on disk."""
+        # Pocka na dokonceni vsech ukladani.
+        if self._writer is None:
+            return True
+        return self._writer.flush(timeout)
+
+    def close(self):
+        """Flushes pending saves, stops the writer thread, refreshes the startup cache and releases the backend and feed."""
+        writer = self._writer
+        if writer is not None:
+            writer.close()
+        self._store_cache()
+        self._writer = None
+        if self.changes is not None:
+            self.changes.close()
+        if self.backend is not None:
+            self.backend.close()
+
+    def commit(self, system_data: SystemData, op: str, **payload):
+        """Persists one mutation that has already been applied to system_data.
+
+        Incremental backends (SQLite) write only the affected rows. Otherwise snapshot
+        mode schedules a full save, and journal mode appends a compact record of the
+        change and compacts the journal when it grows past its limits.
+        """
+        # Ulozi jednu zmenu (snapshot nebo zaznam v zurnalu).
+        # يحفظ تغييرًا واحدًا
+        batch = getattr(self._batch_local, "records", None) if self._batch_local is not None else None
+        if batch is not None:
+            # Uvnitr batch() se zmeny jen sbiraji a ulozi se najednou.
+            batch.append(build_record(op, **payload))
+            return
+        self._commit_records(system_data, [build_record(op, **payload)])
+
+    @contextmanager
+    def batch(self, system_data: SystemData):
+        """Groups every commit made by this thread inside the block into one persistence write.
+
+        Mutations are applied to system_data immediately; only persisting them is deferred.
+        Records collected before an exception are still written, because the in-memory
+        state already contains them. Nested batches join the outer one.
+        """
+        # Hromadne ulozeni: vsechny zmeny v bloku = jeden zapis.
+        # حفظ جماعي بكتابة واحدة
+        if self._batch_local is None:
+            self._batch_local = threading.local()
+        if getattr(self._batch_local, "records", None) is not None:
+            yield
+            return
+        self._batch_local.records = []
         try:
-            with open(DATA_FILE_PATH, 'w', encoding='utf-8') as f:
-                # TISK pro demonstraci vlakna
-                print("[INFO: ASYNC SAVE START] Saving data in background thread...")
-                json.dump(asdict(system_data), f, ensure_ascii=False, indent=4, cls=JSONEncoder)
-                print("[INFO: ASYNC SAVE END] Data saved successfully.")
-        except Exception as e:
-            print(f"[ERROR: ASYNC SAVE FAILED] Could not save data: {e}")
-
-    def _get_next_id(self, entity_list: List):
-        """Helper method to generate a unique ID."""
-        # Pomocna metoda pro generovani unikatniho ID.
-        return max([e.id for e in entity_list], default=0) + 1
+            yield
+        finally:
+            records, self._batch_local.records = self._batch_local.records, None
+            if records:
+                self._commit_records(system_data, records)
+
+    @contextmanager
+    def collect(self):
+        """Captures the records committed by this thread inside the block without persisting them.
+
+        The yielded list is later handed to persist(), possibly from another thread.
+        """
+        # Zmeny se jen posbiraji; ulozeni provede volajici pres persist().
+        if self._batch_local is None:
+            self._batch_local = threading.local()
+        if getattr(self._batch_local, "records", None) is not None:
+            raise RuntimeError("collect() cannot be used inside batch().")
+        records: List[Dict[str, Any]] = []
+        self._batch_local.records = records
+        try:
+            yield records
+        finally:
+            self._batch_local.records = None
+
+    def persist(self, system_data: SystemData, records: List[Dict[str, Any]]):
+        """Writes records gathered by collect() in one write and waits until they are on disk.
+
+        Raises the error of a failed background save (the records are then not on disk).
+        """
+        if records:
+            self._commit_records(system_data, records)
+        self.flush()
+        if self._writer is not None and self._writer.last_error is not None:
+            raise self._writer.last_error
+
+    def discard(self, records: List[Dict[str, Any]]):
+        """Forgets records whose write failed and whose changes the caller has rolled back.
+
+        They are then neither published on the change feed by a later save nor
+        merged into the shared file by a later shared write.
+        """
+        # Zaznamy neuspesneho zapisu, jejichz zmeny volajici vratil.
+        dropped = {id(record) for record in records}
+        with self._feed_lock:
+            kept = [r for r in self._feed_pending if id(r) not in dropped]
+            self._feed_queued -= len(self._feed_pending) - len(kept)
+            self._feed_pending = kept
+        with self._shared_lock:
+            self._unsynced = [r for r in self._unsynced if id(r) not in dropped]
+
+    def _commit_records(self, system_data: SystemData, records: List[Dict[str, Any]]):
+        """Persists mutation records with a single write; they reach the change feed once they are on disk."""
+        # Kazdy zapis (zmena nebo cely batch) je jeden krok pro undo.
+        SystemRepository.of(system_data).checkpoint()
+        self._persist_records(system_data, records)
+
+    def _persist_records(self, system_data: SystemData, records: List[Dict[str, Any]]):
+        """Writes mutation records for the configured mode and publishes them after the write.
+
+        In snapshot mode the write happens on the writer thread, which publishes
+        the events once the snapshot is saved; a failed save publishes nothing.
+        """
+        if self.shared:
+            self._commit_shared(system_data, records)
+        elif self.backend is not None and self.backend.incremental:
+            # Zapis jen dotcenych radku, bez prepisu celeho datasetu.
+            self.flush()
+            self.backend.apply(system_data, records)
+        elif self.journal is None:
+            self._save_and_publish(system_data, records)
+            return
+        else:
+            with self._journal_lock:
+                for record in records:
+                    record["seq"] = self.next_id(system_data, SEQ_MUTATION)
+                self.journal.append(records)
+                self._cache_current = False
+                if (self.journal.record_count >= self.journal_max_records
+                        or self.journal.size_bytes >= self.journal_max_bytes):
+                    self._compact_locked(system_data)
+        self._publish(records)
+
+    # --- Shared data file (several processes) ---
+
+    def _write_versioned(self, system_data: SystemData):
+        """Bumps the file version and writes synchronously; caller holds the file lock."""
+        system_data.id_sequences[SEQ_VERSION] = system_data.id_sequences.get(SEQ_VERSION, 0) + 1
+        self._write_file(system_data)
+        self._signature = file_signature(self.data_file_path)
+
+    def is_stale(self) -> bool:
+        """True when another process has written the data file since we last read or wrote it (one stat call)."""
+        return self.shared and file_signature(self.data_file_path) != self._signature
+
+    def _read_disk(self) -> SystemData:
+        """Loads the newer file written by another process (blocking file read)."""
+        disk = self.backend.load()
+        self._reconcile_sequences(disk)
+        return disk
+
+    def _merge_from_disk(self, system_data: SystemData, disk: Optional[SystemData] = None):
+        """Re-applies our unsaved changes on the newer file content (loaded here unless given) and adopts it in place."""
+        if disk is None:
+            disk = self._read_disk()
+        if disk.id_sequences.get(SEQ_VERSION, 0) == system_data.id_sequences.get(SEQ_VERSION, 0) and not self._unsynced:
+            return  # jen zmena metadat souboru, obsah je stejny
+        conflicts = merge_changes(system_data, disk, self._unsynced)
+        adopt(system_data, disk)
+        SystemRepository.of(system_data).clear_history()  # undo nesmi prepsat zmeny jinych procesu
+        self._cache_current = False
+        for conflict in conflicts:
+            print(f"[WARN: MERGE CONFLICT] {conflict}")
+        self.conflicts.extend(conflicts)
+
+    def _commit_shared(self, system_data: SystemData, records: List[Dict[str, Any]]):
+        """Optimistic write: if the file changed since our last read, merge first, then save under the lock."""
+        # Zapis pod zamkem; pokud soubor mezitim zmenil jiny proces, zmeny se slouci.
+        # كتابة تحت القفل مع دمج التغييرات
+        disk = self.begin_shared_write(records)
+        try:
+            view = self.merge_shared_write(system_data, disk)
+        except BaseException:
+            self.release_shared_write()
+            raise
+        self.end_shared_write(view)
+
+    # Sdileny zapis po krocich: asyncio volajici dela zamky a I/O ve vlakne, slouceni na smycce.
+    # الكتابة المشتركة على مراحل
+
+    def begin_shared_write(self, records: List[Dict[str, Any]]) -> Optional[SystemData]:
+        """Takes the locks for writing records; returns the newer file content to merge, or None when nobody wrote.
+
+        Blocking (lock wait, file read). Must be followed by end_shared_write() or release_shared_write().
+        """
+        self._shared_lock.acquire()
+        file_lock = FileLock(self.lock_path)
+        try:
+            self._unsynced.extend(records)
+            file_lock.__enter__()
+        except BaseException:
+            self._shared_lock.release()
+            raise
+        self._held_lock = file_lock
+        try:
+            return self._read_disk() if self.is_stale() else None
+        except BaseException:
+            self.release_shared_write()
+            raise
+
+    def merge_shared_write(self, system_data: SystemData, disk: Optional[SystemData]) -> SystemData:
+        """Merges disk (from begin_shared_write) into system_data in place; returns the versioned snapshot to write."""
+        if disk is not None:
+            self._merge_from_disk(system_data, disk)
+        system_data.id_sequences[SEQ_VERSION] = system_data.id_sequences.get(SEQ_VERSION, 0) + 1
+        view = SystemRepository.of(system_data).snapshot()
+        # Snimek muze byt ten z checkpointu (bez nove verze) - sekvence se prevezmou aktualni.
+        view.id_sequences = dict(system_data.id_sequences)
+        return view
+
+    def end_shared_write(self, view: SystemData):
+        """Writes the snapshot from merge_shared_write and releases the locks (blocking)."""
+        try:
+            self._write_file(view)
+            self._signature = file_signature(self.data_file_path)
+            self._unsynced = []
+        finally:
+            self.release_shared_write()
+
+    def release_shared_write(self):
+        """Releases the locks taken by begin_shared_write (from any thread)."""
+        file_lock, self._held_lock = self._held_lock, None
+        if file_lock is not None:
+            try:
+                file_lock.__exit__(None, None, None)
+            finally:
+                self._shared_lock.release()
+
+    def refresh(self, system_data: SystemData) -> bool:
+        """Reloads system_data in place when another process changed the file. Returns True if it did."""
+        # Levna kontrola (stat); nacita se jen pri zmene.
+        if not self.is_stale():
+            return False
+        with self._shared_lock:
+            with FileLock(self.lock_path, exclusive=False):
+                if not self.is_stale():
+                    return False
+                self._merge_from_disk(system_data)
+                self._signature = file_signature(self.data_file_path)
+        return True
+
+    def compact(self, system_data: SystemData):
+        """Writes a full snapshot and empties the journal."""
+        if self.journal is None:
+            self.save_data(system_data)
+            return
+        with self._journal_lock:
+            self._compact_locked(system_data)
+
+    def _compact_locked(self, system_data: SystemData):
+        # Snapshot obsahuje posledni sekvenci zurnalu, takze pad mezi zapisem
+        # snapshotu a zkracenim zurnalu nevede k dvojimu prehrani.
+        self.flush()
+        self._write_file(system_data)
+        self.journal.truncate()
+
+    def archive_completed(self, system_data: SystemData, before: Optional[str] = None) -> int:
+        """Moves completed plans assigned before `before` into the compressed archive.
+
+        The default cutoff is ARCHIVE_AFTER_DAYS ago. Plans are written to their
+        monthly segments first and only then removed from the hot data, so a
+        crash in between leaves a duplicate (ignored by readers), never a loss.
+        Returns the number of archived plans.
+        """
+        # Archivace: zapis do segmentu, odebrani z horkych dat, jeden zapis.
+        # أرشفة الخطط المكتملة القديمة
+        if before:
+            date.fromisoformat(before)  # ValueError pro neplatne datum
+        cutoff = before or (date.today() - timedelta(days=ARCHIVE_AFTER_DAYS)).isoformat()
+        plans = [p for p in system_data.training_plans
+                 if p.status == STATUS_COMPLETED and p.date_assigned and p.date_assigned < cutoff]
+        if not plans:
+            return 0
+        self.archive.append(plans)
+        SystemRepository.of(system_data).remove_plans([p.id for p in plans])
+        self.commit(system_data, OP_ARCHIVE_PLANS, plan_ids=[p.id for p in plans])
+        if self.journal is not None:
+            # Snapshot se zmensi hned, ne az pri pristi kompakci.
+            self.compact(system_data)
+        return len(plans)
+
+    def undo(self, system_data: SystemData, steps: int = 1) -> int:
+        """Reverts the last `steps` persisted changes (at most UNDO_DEPTH) and saves the result.
+
+        A batch() counts as one change. Ids handed out meanwhile are not reused.
+        In shared mode only changes made since the last merge can be undone.
+        Publishes an "undo" change event. Returns the number of steps undone.
+        """
+        # Vraceni poslednich zmen a ulozeni celeho stavu.
+        # التراجع عن آخر التغييرات وحفظ الحالة
+        repo = SystemRepository.of(system_data)
+        if self.shared:
+            with self._shared_lock:
+                with FileLock(self.lock_path):
+                    if self.is_stale():
+                        raise RuntimeError("The data file was changed by another process; reload it before undoing.")
+                    undone = repo.undo(steps)
+                    if undone:
+                        self._write_versioned(system_data)
+        else:
+            undone = repo.undo(steps)
+            if undone:
+                if self.backend is not None and self.backend.incremental:
+                    self.flush()
+                    self.backend.save(system_data)
+                elif self.journal is None:
+                    # Snapshot: cely soubor na zapisovacim vlakne, udalost az po zapisu.
+                    self._save_and_publish(system_data, [self._undo_record(undone)])
+                    return undone
+                else:
+                    # Zurnal: snapshot a zkraceni zurnalu.
+                    self.compact(system_data)
+        if undone:
+            self._publish([self._undo_record(undone)])
+        return undone
+
+    @staticmethod
+    def _undo_record(steps: int) -> Dict[str, Any]:
+        # Odberatel nezna predchozi stav - udalost mu rika, ze si ma data nacist znovu.
+        from src.changefeed import OP_UNDO
+        return {"op": OP_UNDO, "steps": steps}
+
+    def _max_existing_id(self, system_data: SystemData, sequence: str) -> int:
+        """Highest id currently used by the entities of a sequence (O(n), seeding only)."""
+        if sequence == SEQ_PLAYER:
+            return max((p.id for p in system_data.players), default=0)
+        if sequence == SEQ_PLAN:
+            return max((p.id for p in system_data.training_plans), default=0)
+        if sequence == SEQ_UNIT:
+            return max((u.id for p in system_data.training_plans for u in p.exercises), default=0)
+        # Sekvence bez entit (napr. zaznamy zurnalu) zacinaji od nuly.
+        return 0
+
+    def _reconcile_sequences(self, system_data: SystemData):
+        """Makes sure no stored sequence is behind the ids already present in the data."""
+        # Zajisti, ze sekvence nejsou pozadu za existujicimi ID (napr. po rucni uprave souboru).
+        with self._id_lock:
+            for sequence in (SEQ_PLAYER, SEQ_PLAN, SEQ_UNIT):
+                stored = system_data.id_sequences.get(sequence, 0)
+                system_data.id_sequences[sequence] = max(stored, self._max_existing_id(system_data, sequence))
+
+    def next_id(self, system_data: SystemData, sequence: str) -> int:
+        """Hands out the next id of a persistent per-entity sequence in O(1)."""
+        # Vrati dalsi ID ze sekvence ulozene v datech.
+        return self.next_ids(system_data, sequence, 1)[0]
+
+    def next_ids(self, system_data: SystemData, sequence: str, count: int) -> range:
+        """Reserves a block of `count` consecutive ids of a sequence under one lock acquisition."""
+        # Blok ID najednou (sablony planu pro cely tym).
+        with self._id_lock:
+            current = system_data.id_sequences.get(sequence)
+            if current is None:
+                current = self._max_existing_id(system_data, sequence)
+            system_data.id_sequences[sequence] = current + count
+            return range(current + 1, current + count + 1)
 
     def add_player(self, system_data: SystemData, name: str, position: str) -> Player:
         """Adds a new player to the system."""
         new_player = Player(
-            id=self._get_next_id(system_data.players),
+            id=self.next_id(system_data, SEQ_PLAYER),
             name=name,
             position=position
         )
-        system_data.players.append(new_player)
-        self.save_data(system_data) # Asynchronni ukladani
+        SystemRepository.of(system_data).add_player(new_player)
+        self.commit(system_data, OP_ADD_PLAYER, player=new_player) # Asynchronni ukladani
         return new_player
 
 class TrainingService:
@@ -115,70 +651,258 @@ class TrainingService:
 
     # (Ostatní metody TrainingService
     
+    def repo(self, system_data: SystemData) -> SystemRepository:
+        """Returns the hash-indexed repository for system_data."""
+        return SystemRepository.of(system_data)
+
     def find_player(self, system_data: SystemData, player_id: int) -> Optional[Player]:
-        return next((p for p in system_data.players if p.id == player_id), None)
+        return self.repo(system_data).get_player(player_id)
         
     def find_exercise_type(self, system_data: SystemData, code: str) -> Optional[ExerciseType]:
-        return next((e for e in system_data.exercise_types if e.code == code), None)
+        return self.repo(system_data).get_exercise_type(code)
 
     def find_plan(self, system_data: SystemData, plan_id: int) -> Optional[TrainingPlan]:
-        return next((p for p in system_data.training_plans if p.id == plan_id), None)
+        return self.repo(system_data).get_plan(plan_id)
+
+    def find_player_plans(self, system_data: SystemData, player_id: int) -> List[TrainingPlan]:
+        return self.repo(system_data).plans_for_player(player_id)
+
+    def search_players(self, system_data: SystemData, query: str, limit: int = DEFAULT_SEARCH_LIMIT) -> List[Player]:
+        """Players ranked for an ID or a name/position query (prefix, diacritic-insensitive, small typos allowed)."""
+        # Cislo = ID hrace (pokud existuje), jinak hledani podle jmena a pozice.
+        query = query.strip()
+        if query.isdigit():
+            player = self.find_player(system_data, int(query))
+            if player is not None:
+                return [player]
+        return self.repo(system_data).player_index().search(query, limit)
+
+    def resolve_player(self, system_data: SystemData, query: str) -> Player:
+        """The one player meant by an ID or a name; ValueError if nobody or several players match."""
+        # Jednoznacna shoda: ID, jediny kandidat, nebo jediny hrac s presne timto jmenem.
+        candidates = self.search_players(system_data, query)
+        if len(candidates) > 1:
+            wanted = " ".join(normalize(query).split())
+            exact = [p for p in candidates if " ".join(normalize(p.name).split()) == wanted]
+            candidates = exact if len(exact) == 1 else candidates
+        if not candidates:
+            raise ValueError(f"No player matches '{query}'.")
+        if len(candidates) > 1:
+            listed = ", ".join(f"{p.name} (ID {p.id})" for p in candidates)
+            raise ValueError(f"'{query}' matches several players: {listed}. Use the player ID.")
+        return candidates[0]
+
+    # --- Queries (lazy generators, cursor pagination) ---
+
+    def query_plans(self, system_data: SystemData, query: Optional[PlanQuery] = None,
+                    cursor: Optional[str] = None) -> Iterator[TrainingPlan]:
+        """Lazily yields plans matching query (player, status, date ranges, overdue) after cursor."""
+        # Dotaz na plany; rozsahy datumu jdou pres razene indexy (bisect).
+        # استعلام الخطط عبر فهارس مرتبة
+        return iter_plans(self.repo(system_data), query, parse_plan_cursor(cursor))
+
+    def query_units(self, system_data: SystemData, query: Optional[PlanQuery] = None,
+                    type_code: Optional[str] = None, status: Optional[str] = None,
+                    cursor: Optional[str] = None) -> Iterator[Tuple[TrainingPlan, TrainingUnit]]:
+        """Lazily yields (plan, unit) pairs for the plans matching query, filtered by unit type and status."""
+        return iter_units(self.repo(system_data), query, type_code, status, parse_unit_cursor(cursor))
+
+    def page_plans(self, system_data: SystemData, query: Optional[PlanQuery] = None,
+                   limit: int = DEFAULT_PAGE_SIZE, cursor: Optional[str] = None) -> Page[TrainingPlan]:
+        """One page of query_plans; page.next_cursor continues where it stopped."""
+        query = query or PlanQuery()
+        return paginate(self.query_plans(system_data, query, cursor), limit, lambda p: plan_cursor(query, p))
+
+    def page_units(self, system_data: SystemData, query: Optional[PlanQuery] = None,
+                   type_code: Optional[str] = None, status: Optional[str] = None,
+                   limit: int = DEFAULT_PAGE_SIZE, cursor: Optional[str] = None) -> Page[Tuple[TrainingPlan, TrainingUnit]]:
+        """One page of query_units; page.next_cursor continues where it stopped."""
+        query = query or PlanQuery()
+        return paginate(self.query_units(system_data, query, type_code, status, cursor), limit,
+                        lambda item: unit_cursor(query, item))
+
+    def page_players(self, system_data: SystemData, limit: int = DEFAULT_PAGE_SIZE,
+                     cursor: Optional[str] = None) -> Page[Player]:
+        """One page of players in id order."""
+        if cursor and not cursor.isdigit():
+            raise ValueError(f"Invalid cursor '{cursor}'.")
+        after = int(cursor) if cursor else None
+        return paginate(iter_players(self.repo(system_data), after), limit, lambda p: str(p.id))
+
+    def query_archived_plans(self, system_data: SystemData, query: Optional[PlanQuery] = None,
+                             cursor: Optional[str] = None) -> Iterator[TrainingPlan]:
+        """Lazily yields archived plans matching query in (date_assigned, id) order; reads only the needed months."""
+        if self.dm.archive is None:
+            return iter(())
+        return iter_archived(self.dm.archive, query, parse_plan_cursor(cursor), self.repo(system_data).plans_by_id)
+
+    def page_archived_plans(self, system_data: SystemData, query: Optional[PlanQuery] = None,
+                            limit: int = DEFAULT_PAGE_SIZE, cursor: Optional[str] = None) -> Page[TrainingPlan]:
+        """One page of query_archived_plans."""
+        return paginate(self.query_archived_plans(system_data, query, cursor), limit,
+                        lambda p: encode_cursor(p.date_assigned, p.id))
+
+    def add_exercise_type(self, system_data: SystemData, exercise_type: ExerciseType) -> ExerciseType:
+        """Registers a new exercise type and persists it."""
+        self.repo(system_data).add_exercise_type(exercise_type)
+        self.dm.commit(system_data, OP_ADD_EXERCISE_TYPE, exercise_type=exercise_type)
+        return exercise_type
         
     def create_training_plan(
         self, system_data: SystemData, player_id: int, target_date: Optional[str]
     ) -> Optional[TrainingPlan]:
         if not self.find_player(system_data, player_id): return None
         new_plan = TrainingPlan(
-            id=self.dm._get_next_id(system_data.training_plans),
+            id=self.dm.next_id(system_data, SEQ_PLAN),
             player_id=player_id,
             date_assigned=date.today().isoformat(),
             target_completion_date=target_date,
             status=STATUS_PENDING
         )
-        system_data.training_plans.append(new_plan)
-        self.dm.save_data(system_data)
+        self.repo(system_data).add_plan(new_plan)
+        self.dm.commit(system_data, OP_CREATE_PLAN, plan=new_plan)
         return new_plan
 
     def add_exercise_to_plan(
         self, system_data: SystemData, plan_id: int, type_code: str, params: Dict[str, Any]
     ) -> Optional[TrainingUnit]:
+        """Adds a unit to a plan; params are checked and converted by the type's compiled validator (ValueError if invalid)."""
         plan = self.find_plan(system_data, plan_id)
         exercise_type = self.find_exercise_type(system_data, type_code)
         if not plan or not exercise_type: return None
-        if not all(key in params for key in exercise_type.parameters_metadata.keys()):
-            raise ValueError("Missing parameters for the selected exercise type.")
-            
-        all_units = [u for p in system_data.training_plans for u in p.exercises]
-        unit_id = self.dm._get_next_id(all_units)
+        params = self.repo(system_data).validator(type_code).validate(params)
+
+        unit_id = self.dm.next_id(system_data, SEQ_UNIT)
 
         new_unit = TrainingUnit(
             id=unit_id,
             type_code=type_code,
-            specific_parameters=params
+            specific_parameters=params,
+            parameters_metadata=exercise_type.parameters_metadata
         )
-        plan.exercises.append(new_unit)
-        self.dm.save_data(system_data)
+        self.repo(system_data).add_unit(plan, new_unit)
+        self.dm.commit(system_data, OP_ADD_UNIT, plan_id=plan.id, unit=new_unit)
         return new_unit
         
     def mark_exercise_completed(self, system_data: SystemData, plan_id: int, unit_id: int) -> bool:
         plan = self.find_plan(system_data, plan_id)
         if not plan: return False
             
-        unit_to_update = next((u for u in plan.exercises if u.id == unit_id), None)
+        unit_to_update = self.repo(system_data).get_unit(plan_id, unit_id)
         if not unit_to_update: return False
 
-        unit_to_update.specific_parameters['status'] = STATUS_COMPLETED
-        
-        is_plan_fully_completed = all(u.specific_parameters.get('status') == STATUS_COMPLETED for u in plan.exercises)
-        if is_plan_fully_completed:
-            plan.status = STATUS_COMPLETED
+        # Citace planu/hrace se aktualizuji primo, plan se uzavre po posledni jednotce.
+        if not self.repo(system_data).complete_unit(plan, unit_to_update):
+            return False # jiz dokonceno
             
-        self.dm.save_data(system_data)
+        self.dm.commit(system_data, OP_COMPLETE_UNIT, plan_id=plan_id, unit_id=unit_id, plan_status=plan.status)
         return True
         
+    def validate_parameters(self, system_data: SystemData, type_code: str, params: Dict[str, Any]) -> Dict[str, Any]:
+        """Checks and converts one unit's params (e.g. strings typed in the CLI); ValueError if invalid."""
+        validator = self.repo(system_data).validator(type_code)
+        if validator is None:
+            raise ValueError(f"Unknown exercise type '{type_code}'.")
+        return validator.validate(params)
+
+    def validate_units(self, system_data: SystemData, items: Iterable[Tuple[str, Dict[str, Any]]]) -> BatchValidation:
+        """Validates many (type_code, params) pairs in one call; each type's rows go through its validator at once."""
+        return validate_batch(self.repo(system_data).validator, items)
+
+    # --- Plan templates ---
+
+    def find_plan_template(self, system_data: SystemData, name: str) -> Optional[PlanTemplate]:
+        return self.repo(system_data).get_template(name)
+
+    def save_plan_template(self, system_data: SystemData, name: str, units: Iterable[Tuple[str, Dict[str, Any]]],
+                           description: str = "") -> PlanTemplate:
+        """Stores (or replaces) a named list of (type_code, params) unit specs; ValueError if any unit is invalid."""
+        # Vsechny jednotky se zkontroluji jednim davkovym volanim, ulozi se az cela sablona.
+        name = name.strip()
+        if not name:
+            raise ValueError("Template name cannot be empty.")
+        items = [(code.strip().upper(), params) for code, params in units]
+        if not items:
+            raise ValueError("A template needs at least one unit.")
+        checked = self.validate_units(system_data, items)
+        if not checked.ok:
+            i = min(checked.errors)
+            raise ValueError(f"Unit {i + 1} ({items[i][0]}): {checked.errors[i]}")
+        repo = self.repo(system_data)
+        template = PlanTemplate(name=name, description=description, units=[
+            TrainingUnit(0, code, params, parameters_metadata=repo.get_exercise_type(code).parameters_metadata)
+            for (code, _), params in zip(items, checked.params)])
+        repo.add_template(template)
+        self.dm.commit(system_data, OP_SAVE_TEMPLATE, template=template)
+        return template
+
+    def template_players(self, system_data: SystemData, player_ids: Optional[Iterable[int]] = None,
+                         position: Optional[str] = None) -> List[Player]:
+        """Players a template goes to: the given ids (ValueError for unknown ones), narrowed to a position when given.
+
+        Without ids the position filter (diacritic- and case-insensitive) picks from the
+        whole squad; with neither, the whole squad is returned.
+        """
+        repo = self.repo(system_data)
+        if player_ids is None:
+            players = list(system_data.players)
+        else:
+            players, missing = [], []
+            for player_id in dict.fromkeys(player_ids):  # bez duplicit, poradi zachovano
+                player = repo.get_player(player_id)
+                if player is None:
+                    missing.append(player_id)
+                else:
+                    players.append(player)
+            if missing:
+                raise ValueError(f"Players not found: {', '.join(map(str, missing))}.")
+        if position:
+            wanted = normalize(position.strip())
+            players = [p for p in players if normalize(p.position.strip()) == wanted]
+        return players
+
+    def assign_plan_template(self, system_data: SystemData, name: str, player_ids: Optional[Iterable[int]] = None,
+                             position: Optional[str] = None, target_date: Optional[str] = None) -> List[TrainingPlan]:
+        """Creates one plan from the template for every selected player (see template_players) in one transaction.
+
+        Plan and unit ids are reserved in two blocks, the plans enter the indexes in
+        one pass and everything is persisted with a single write (one undo step).
+        Raises ValueError for an unknown template, unknown players or a bad target date.
+        """
+        # Hromadne prirazeni sablony: bloky ID, jeden zapis.
+        # إسناد قالب لعدة لاعبين بكتابة واحدة
+        template = self.find_plan_template(system_data, name)
+        if template is None:
+            raise ValueError(f"Plan template '{name}' not found.")
+        if target_date is not None:
+            date.fromisoformat(target_date)  # ValueError pro neplatne datum
+        players = self.template_players(system_data, player_ids, position)
+        if not players:
+            return []
+        per_plan = len(template.units)
+        plan_ids = self.dm.next_ids(system_data, SEQ_PLAN, len(players))
+        unit_ids = iter(self.dm.next_ids(system_data, SEQ_UNIT, len(players) * per_plan))
+        assigned = date.today().isoformat()
+        plans = []
+        for plan_id, player in zip(plan_ids, players):
+            units = []
+            for spec in template.units:
+                unit = spec.copy()  # kopie pole parametru, schema zustava sdilene
+                unit.id = next(unit_ids)
+                units.append(unit)
+            plans.append(TrainingPlan(id=plan_id, player_id=player.id, date_assigned=assigned,
+                                      target_completion_date=target_date, exercises=units, status=STATUS_PENDING))
+        self.repo(system_data).add_plans(plans)
+        # Stejne zaznamy jako create_training_plan/add_exercise_to_plan - zurnal, SQLite i slucovani je znaji.
+        with self.dm.batch(system_data):
+            for plan in plans:
+                self.dm.commit(system_data, OP_CREATE_PLAN, plan=plan)
+                for unit in plan.exercises:
+                    self.dm.commit(system_data, OP_ADD_UNIT, plan_id=plan.id, unit=unit)
+        return plans
+
     def get_plan_summary(self, plan: TrainingPlan) -> Dict[str, Any]:
-        total_units = len(plan.exercises)
-        completed_units = sum(1 for u in plan.exercises if u.specific_parameters.get('status') == STATUS_COMPLETED)
+        completed_units, total_units = plan_progress(plan)
         
         return {
             "total": total_units,
@@ -187,3 +911,28 @@ class TrainingService:
             "completion_percentage": f"{completed_units / total_units * 100:.1f}%" if total_units > 0 else "N/A"
 
         }
+
+    def bulk_import(self, system_data: SystemData, rows, batch_size: Optional[int] = None) -> "ImportReport":
+        """Imports (line, row) pairs of players/plans/units with one persistence write per batch (DEFAULT_BATCH_SIZE rows by default)."""
+        from src.importer import BulkImporter, DEFAULT_BATCH_SIZE
+        return BulkImporter(self, system_data, batch_size or DEFAULT_BATCH_SIZE).run(rows)
+
+    def get_player_progress(self, system_data: SystemData, player_id: int) -> ProgressStats:
+        """Plans pending/completed and completion rate of one player, read in O(1)."""
+        return self.repo(system_data).player_progress(player_id)
+
+    def get_squad_progress(self, system_data: SystemData) -> ProgressStats:
+        """Squad-wide plans pending/completed and completion rate, read in O(1)."""
+        return self.repo(system_data).squad_progress()
+
+
+# Merene metody (obaleni jen pri zapnutych metrikach)
+# الدوال المقاسة
+metrics.instrument(DataManager, ("save_data", "flush", "commit", "compact", "add_player", "undo"))
+metrics.instrument(TrainingService, (
+    "find_player", "find_exercise_type", "find_plan", "find_player_plans", "search_players", "resolve_player", "add_exercise_type",
+    "create_training_plan", "add_exercise_to_plan", "mark_exercise_completed", "get_plan_summary",
+    "bulk_import", "get_player_progress", "get_squad_progress", "save_plan_template", "assign_plan_template",
+))
+if METRICS_ENABLED:
+    metrics.enable(METRICS_EXPORT_PATH, METRICS_FORMAT)
@@ -0,0 +1,161 @@
+# src/shards.py
+import os
+import re
+from concurrent.futures import ProcessPoolExecutor
+from typing import Any, Callable, Dict, Iterable, List, Optional, Tuple
+
+from config import (
+    TEAMS_DIR, SHARD_LOAD_WORKERS, PERSISTENCE_MODE, SHARED_DATA_FILE, STARTUP_CACHE, STORAGE_BACKEND
+)
+from src.models import SystemData
+from src.repository import SystemRepository, ProgressStats
+from src.services import DataManager, TrainingService
+from src.storage import BACKEND_SQLITE
+
+# Povolene nazvy tymu (nazev souboru bez pripony)
+# أسماء الفرق المسموح بها
+_TEAM_NAME = re.compile(r"[\w\-]+")
+
+# Argumenty DataManageru jednoho tymu: (cesta, rezim ukladani, sdileny soubor, cache)
+ShardOptions = Tuple[str, str, bool, bool]
+
+
+def _read_shard(options: ShardOptions) -> Tuple[SystemData, Any, bool]:
+    """Worker process: parses one team file (DataManager.read_snapshot)."""
+    dm = DataManager(options[0], options[1], shared=options[2], startup_cache=options[3])
+    try:
+        return dm.read_snapshot()
+    finally:
+        dm.close()
+
+
+def _run_on_shard(options: ShardOptions, fn: Callable[[SystemData], Any]) -> Any:
+    """Worker process: loads one team and returns fn(data); the data itself stays in the worker."""
+    dm = DataManager(options[0], options[1], shared=options[2], startup_cache=options[3])
+    try:
+        return fn(dm.load_data())
+    finally:
+        dm.close()
+
+
+def team_progress(system_data: SystemData) -> ProgressStats:
+    """Plan counters of one team (picklable fan-out function)."""
+    return SystemRepository.of(system_data).squad_progress()
+
+
+class ShardedDataManager:
+    """A directory of per-team shards (`<team>.json`), each a SystemData with its own DataManager.
+
+    Every team has its own file, journal, lock and startup cache, so a team's
+    mutations (through service(team)) write only that team's shard. Shards
+    are parsed in parallel by a process pool; cross-team queries fan out over
+    the shards and merge the results. Ids are unique within a team only.
+    """
+    # Data klubu rozdelena po tymech, kazdy tym ve vlastnim souboru.
+    # بيانات النادي مقسمة حسب الفرق
+
+    def __init__(self, directory: str = TEAMS_DIR, persistence_mode: str = PERSISTENCE_MODE,
+                 shared: bool = SHARED_DATA_FILE, startup_cache: bool = STARTUP_CACHE,
+                 workers: int = SHARD_LOAD_WORKERS):
+        self.directory = directory
+        self.persistence_mode = persistence_mode
+        self.shared = shared
+        self.startup_cache = startup_cache
+        self.workers = workers or os.cpu_count() or 1
+        self.suffix = ".db" if STORAGE_BACKEND == BACKEND_SQLITE else ".json"
+        self.managers: Dict[str, DataManager] = {}
+        self.loaded: Dict[str, SystemData] = {}
+
+    def shard_path(self, team: str) -> str:
+        if not _TEAM_NAME.fullmatch(team):
+            raise ValueError(f"Invalid team name '{team}' (letters, digits, '_' and '-' only).")
+        return os.path.join(self.directory, team + self.suffix)
+
+    def teams(self) -> List[str]:
+        """Sorted names of the teams with a shard on disk."""
+        if not os.path.isdir(self.directory):
+            return []
+        return sorted(name[:-len(self.suffix)] for name in os.listdir(self.directory)
+                      if name.endswith(self.suffix) and _TEAM_NAME.fullmatch(name[:-len(self.suffix)]))
+
+    def _options(self, team: str) -> ShardOptions:
+        return self.shard_path(team), self.persistence_mode, self.shared, self.startup_cache
+
+    def manager(self, team: str) -> DataManager:
+        """The DataManager of one team's shard (created on first use)."""
+        if team not in self.managers:
+            self.managers[team] = DataManager(self.shard_path(team), self.persistence_mode, shared=self.shared,
+                                              startup_cache=self.startup_cache)
+        return self.managers[team]
+
+    def service(self, team: str) -> TrainingService:
+        """A TrainingService whose writes go to this team's shard only."""
+        return TrainingService(self.manager(team))
+
+    def load(self, team: str) -> SystemData:
+        """Loads one team (a new team starts with an empty shard); later calls return the same object."""
+        if team not in self.loaded:
+            self.loaded[team] = self.manager(team).load_data()
+        return self.loaded[team]
+
+    def load_all(self, teams: Optional[Iterable[str]] = None) -> Dict[str, SystemData]:
+        """Loads the given teams (default: all on disk), parsing the shards in parallel worker processes.
+
+        Only parsing runs in the workers; journal replay and sequence checks then
+        run here on the returned snapshots.
+        """
+        # Paralelni nacteni: kazdy proces parsuje jeden soubor.
+        # تحميل متوازٍ للفرق
+        teams = list(self.teams() if teams is None else teams)
+        pending = [team for team in teams if team not in self.loaded]
+        for team in pending:
+            self.manager(team)._create_empty_data_if_needed()
+        if len(pending) > 1 and self.workers > 1:
+            with ProcessPoolExecutor(max_workers=min(self.workers, len(pending))) as pool:
+                snapshots = list(pool.map(_read_shard, [self._options(team) for team in pending]))
+            for team, snapshot in zip(pending, snapshots):
+                self.loaded[team] = self.manager(team).load_data(snapshot)
+        else:
+            for team in pending:
+                self.load(team)
+        return {team: self.loaded[team] for team in teams}
+
+    def fan_out(self, fn: Callable[[SystemData], Any], teams: Optional[Iterable[str]] = None) -> Dict[str, Any]:
+        """Runs fn on every team's data and returns {team: result} in team order.
+
+        Loaded teams are evaluated here; the others are loaded and evaluated in
+        worker processes without keeping their data (fn must then be picklable,
+        i.e. a module-level function).
+        """
+        # Dotaz pres vsechny tymy: nactene tymy zde, ostatni v procesech.
+        teams = list(self.teams() if teams is None else teams)
+        results = {team: fn(self.loaded[team]) for team in teams if team in self.loaded}
+        pending = [team for team in teams if team not in self.loaded]
+        if len(pending) > 1 and self.workers > 1:
+            with ProcessPoolExecutor(max_workers=min(self.workers, len(pending))) as pool:
+                futures = {team: pool.submit(_run_on_shard, self._options(team), fn) for team in pending}
+                results.update((team, future.result()) for team, future in futures.items())
+        else:
+            results.update((team, _run_on_shard(self._options(team), fn)) for team in pending)
+        return {team: results[team] for team in teams}
+
+    def progress_by_team(self, teams: Optional[Iterable[str]] = None) -> Dict[str, ProgressStats]:
+        """Plans pending/completed and completion rate of every team."""
+        return self.fan_out(team_progress, teams)
+
+    def completion_rates(self, teams: Optional[Iterable[str]] = None) -> Dict[str, Optional[float]]:
+        """Share of completed plans per team (None for a team without plans)."""
+        return {team: stats.completion_rate for team, stats in self.progress_by_team(teams).items()}
+
+    def club_progress(self, teams: Optional[Iterable[str]] = None) -> ProgressStats:
+        """Counters of all teams merged."""
+        return sum(self.progress_by_team(teams).values(), ProgressStats())
+
+    def flush(self):
+        for dm in self.managers.values():
+            dm.flush()
+
+    def close(self):
+        """Closes every team's DataManager (pending saves are written)."""
+        for dm in self.managers.values():
+            dm.close()
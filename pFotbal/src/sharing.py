@@ -0,0 +1,187 @@
+# src/sharing.py
+import os
+from typing import Any, Dict, List, Optional, Tuple
+
+from src.models import SystemData, SEQ_PLAYER, SEQ_PLAN, SEQ_UNIT
+from src.repository import SystemRepository
+from src.journal import (
+    OP_ADD_PLAYER, OP_ADD_EXERCISE_TYPE, OP_CREATE_PLAN, OP_ADD_UNIT, OP_COMPLETE_UNIT, OP_ARCHIVE_PLANS,
+    OP_SAVE_TEMPLATE
+)
+
+# Zamykani souboru: fcntl (Linux/macOS), msvcrt (Windows)
+# قفل الملف
+try:
+    import fcntl
+except ImportError:  # pragma: no cover - Windows
+    fcntl = None
+try:
+    import msvcrt
+except ImportError:
+    msvcrt = None
+
+# Citac verzi souboru (ulozen v SystemData.id_sequences); kazdy zapis ho zvysi.
+# عداد إصدار الملف
+SEQ_VERSION = "version"
+
+# Podpis souboru pro levnou detekci zmeny: (inode, mtime_ns, velikost)
+Signature = Optional[Tuple[int, int, int]]
+
+
+def file_signature(path: str) -> Signature:
+    """(inode, mtime_ns, size) of path, or None when it does not exist.
+
+    Saves replace the file atomically, so every write also produces a new inode.
+    """
+    try:
+        st = os.stat(path)
+    except FileNotFoundError:
+        return None
+    return st.st_ino, st.st_mtime_ns, st.st_size
+
+
+class FileLock:
+    """Advisory inter-process lock on a side file (`<data file>.lock`).
+
+    Uses fcntl.flock where available (shared or exclusive), msvcrt.locking on
+    Windows (always exclusive). Not reentrant.
+    """
+    # Zamek mezi procesy nad pomocnym souborem.
+    # قفل بين العمليات
+
+    def __init__(self, path: str, exclusive: bool = True):
+        self.path = path
+        self.exclusive = exclusive
+        self._fd: Optional[int] = None
+
+    def __enter__(self) -> "FileLock":
+        self._fd = os.open(self.path, os.O_RDWR | os.O_CREAT, 0o644)
+        if fcntl is not None:
+            fcntl.flock(self._fd, fcntl.LOCK_EX if self.exclusive else fcntl.LOCK_SH)
+        elif msvcrt is not None:  # pragma: no cover - Windows
+            msvcrt.locking(self._fd, msvcrt.LK_LOCK, 1)
+        return self
+
+    def __exit__(self, *exc):
+        try:
+            if fcntl is not None:
+                fcntl.flock(self._fd, fcntl.LOCK_UN)
+            elif msvcrt is not None:  # pragma: no cover - Windows
+                os.lseek(self._fd, 0, os.SEEK_SET)
+                msvcrt.locking(self._fd, msvcrt.LK_UNLCK, 1)
+        finally:
+            os.close(self._fd)
+            self._fd = None
+
+
+def _claim(system_data: SystemData, sequence: str, wanted: int) -> int:
+    """Keeps wanted when the target has not handed it out yet, else takes the next free id."""
+    current = system_data.id_sequences.get(sequence, 0)
+    new_id = wanted if wanted > current else current + 1
+    system_data.id_sequences[sequence] = new_id
+    return new_id
+
+
+def merge_changes(local: SystemData, disk: SystemData, records: List[Dict[str, Any]]) -> List[str]:
+    """Re-applies this process's unsaved mutations on top of a newer on-disk state.
+
+    The local entity objects are moved into `disk`; ids that another process
+    has meanwhile used are renumbered (and references to them follow, also in
+    the records themselves, so the change feed publishes the final ids).
+    Changes that cannot be applied are skipped and described in the returned list.
+    """
+    # Slouceni: nase neulozene zmeny se prehraji nad novejsim stavem z disku.
+    # دمج التغييرات المحلية مع الحالة الأحدث على القرص
+    local_repo = SystemRepository.of(local)
+    disk_repo = SystemRepository.of(disk)
+    # Nejdrive dohledat lokalni objekty (podle puvodnich ID), teprve pak precislovat.
+    resolved = []
+    own_units = set()
+    for record in records:
+        op = record["op"]
+        if op == OP_ADD_PLAYER:
+            resolved.append((record, local_repo.get_player(record["player"]["id"])))
+        elif op == OP_ADD_EXERCISE_TYPE:
+            resolved.append((record, local_repo.get_exercise_type(record["exercise_type"]["code"])))
+        elif op == OP_CREATE_PLAN:
+            resolved.append((record, local_repo.get_plan(record["plan"]["id"])))
+        elif op == OP_SAVE_TEMPLATE:
+            resolved.append((record, local_repo.get_template(record["template"]["name"])))
+        elif op == OP_ADD_UNIT:
+            own_units.add((record["plan_id"], record["unit"]["id"]))
+            resolved.append((record, local_repo.get_unit(record["plan_id"], record["unit"]["id"])))
+        else:
+            resolved.append((record, None))
+
+    conflicts: List[str] = []
+    player_ids: Dict[int, int] = {}
+    own_plans: Dict[int, Any] = {}
+    # (puvodni ID planu, puvodni ID jednotky) -> (nove ID planu, nove ID jednotky)
+    unit_keys: Dict[Tuple[int, int], Tuple[int, int]] = {}
+    for record, obj in resolved:
+        op = record["op"]
+        if op == OP_ADD_PLAYER and obj is not None:
+            old_id = obj.id
+            obj.id = player_ids[old_id] = _claim(disk, SEQ_PLAYER, old_id)
+            record["player"]["id"] = obj.id
+            disk_repo.add_player(obj)
+        elif op == OP_ADD_EXERCISE_TYPE and obj is not None:
+            existing = disk_repo.get_exercise_type(obj.code)
+            if existing is None:
+                disk_repo.add_exercise_type(obj)
+            elif existing.parameters_metadata != obj.parameters_metadata:
+                conflicts.append(f"Exercise type {obj.code} was defined differently by another process; kept theirs.")
+        elif op == OP_CREATE_PLAN and obj is not None:
+            old_id = obj.id
+            obj.player_id = player_ids.get(obj.player_id, obj.player_id)
+            if disk_repo.get_player(obj.player_id) is None:
+                conflicts.append(f"Plan {old_id} dropped: player {obj.player_id} no longer exists.")
+                continue
+            obj.id = _claim(disk, SEQ_PLAN, old_id)
+            record["plan"]["id"], record["plan"]["player_id"] = obj.id, obj.player_id
+            # Jednotky planu se pridaji vlastnimi zaznamy add_unit.
+            obj.exercises = []
+            disk_repo.add_plan(obj)
+            own_plans[old_id] = obj
+        elif op == OP_ADD_UNIT and obj is not None:
+            old_plan_id = record["plan_id"]
+            plan = own_plans.get(old_plan_id) or disk_repo.get_plan(old_plan_id)
+            if plan is None:
+                conflicts.append(f"Unit {obj.id} dropped: plan {old_plan_id} no longer exists.")
+                continue
+            old_id = obj.id
+            obj.id = _claim(disk, SEQ_UNIT, old_id)
+            disk_repo.add_unit(plan, obj)
+            unit_keys[(old_plan_id, old_id)] = (plan.id, obj.id)
+            record["plan_id"], record["unit"]["id"] = plan.id, obj.id
+        elif op == OP_COMPLETE_UNIT:
+            key = (record["plan_id"], record["unit_id"])
+            if key in own_units:
+                # Stav nese uz samotny objekt jednotky; jen zaznam dostane nova ID.
+                record["plan_id"], record["unit_id"] = unit_keys.get(key, key)
+                continue
+            plan = disk_repo.get_plan(record["plan_id"])
+            unit = disk_repo.get_unit(record["plan_id"], record["unit_id"])
+            if unit is None:
+                conflicts.append(f"Completion of unit {record['unit_id']} in plan {record['plan_id']} dropped: unit not found.")
+                continue
+            disk_repo.complete_unit(plan, unit)
+        elif op == OP_ARCHIVE_PLANS:
+            # Plany uz jsou v archivu; jen je odebrat i z novejsiho stavu.
+            disk_repo.remove_plans(record["plan_ids"])
+        elif op == OP_SAVE_TEMPLATE and obj is not None:
+            # Posledni ulozena verze sablony vyhrava.
+            disk_repo.add_template(obj)
+    return conflicts
+
+
+def adopt(target: SystemData, source: SystemData):
+    """Makes target hold source's content in place (callers keep their SystemData reference)."""
+    repo = SystemRepository.of(source)
+    target.players = source.players
+    target.exercise_types = source.exercise_types
+    target.training_plans = source.training_plans
+    target.id_sequences = source.id_sequences
+    target.plan_templates = source.plan_templates
+    repo.data = target
+    target._repository = repo
@@ -0,0 +1,125 @@
+# src/startup_cache.py
+import gc
+import hashlib
+import json
+import os
+import pickle
+import sys
+from contextlib import contextmanager
+from typing import Any, Dict, Optional, Tuple
+
+from src.models import SystemData
+
+# Verze formatu cache; zvysit pri kazde zmene modelu, ktera meni pickle.
+# إصدار صيغة ذاكرة التخزين المؤقت
+CACHE_VERSION = 1
+CACHE_MAGIC = b"PFLC1\n"
+
+
+def _fingerprint(path: str) -> Tuple[Dict[str, Any], bytes]:
+    """Returns ({size, mtime_ns, blake2b}, content) of the data file, read through one descriptor."""
+    with open(path, "rb") as f:
+        st = os.fstat(f.fileno())
+        content = f.read()
+    key = {
+        "size": st.st_size,
+        "mtime_ns": st.st_mtime_ns,
+        "blake2b": hashlib.blake2b(content, digest_size=20).hexdigest(),
+    }
+    return key, content
+
+
+def _header(key: Dict[str, Any]) -> Dict[str, Any]:
+    return dict(key, version=CACHE_VERSION, python=list(sys.version_info[:2]))
+
+
+@contextmanager
+def _gc_paused():
+    # Milion malych objektu pri unpickle zbytecne spousti generacni GC.
+    enabled = gc.isenabled()
+    gc.disable()
+    try:
+        yield
+    finally:
+        if enabled:
+            gc.enable()
+
+
+class StartupCache:
+    """Parsed SystemData of a JSON data file, pickled next to it (`<data file>.cache`).
+
+    The cache is valid only for the exact file it was built from: size and
+    mtime are compared first (one stat), then a blake2b hash of the content.
+    Anything unexpected - missing, stale, truncated or from another Python or
+    model version - is treated as a miss and the caller parses the file.
+    """
+    # Cache rozparsovanych dat pro rychly start CLI.
+    # ذاكرة مؤقتة للبيانات المحللة لتسريع بدء التشغيل
+
+    def __init__(self, data_path: str):
+        self.data_path = data_path
+        self.path = data_path + ".cache"
+        self.hits = 0
+        self.misses = 0
+
+    def _read_header(self, f) -> Optional[Dict[str, Any]]:
+        if f.read(len(CACHE_MAGIC)) != CACHE_MAGIC:
+            return None
+        return json.loads(f.readline())
+
+    def load(self) -> Optional[SystemData]:
+        """Returns the cached SystemData when it matches the data file, else None."""
+        try:
+            with open(self.path, "rb") as f:
+                header = self._read_header(f)
+                if header is None or header.get("version") != CACHE_VERSION \
+                        or header.get("python") != list(sys.version_info[:2]):
+                    raise ValueError("incompatible cache")
+                st = os.stat(self.data_path)
+                if (header["size"], header["mtime_ns"]) != (st.st_size, st.st_mtime_ns):
+                    self.misses += 1
+                    return None
+                key, _ = _fingerprint(self.data_path)
+                if header["blake2b"] != key["blake2b"]:
+                    self.misses += 1
+                    return None
+                with _gc_paused():
+                    system_data = pickle.load(f)
+            if not isinstance(system_data, SystemData):
+                raise ValueError("unexpected cache content")
+        except FileNotFoundError:
+            self.misses += 1
+            return None
+        except Exception:
+            # Poskozena nebo nekompatibilni cache - smazat a nacist soubor.
+            self.misses += 1
+            self.invalidate()
+            return None
+        self.hits += 1
+        return system_data
+
+    def store(self, system_data: SystemData) -> bool:
+        """Pickles system_data keyed to the current data file. Returns False when it could not."""
+        # Zapis pres docasny soubor a os.replace - cache neni nikdy rozepsana.
+        tmp_path = self.path + ".tmp"
+        try:
+            key, _ = _fingerprint(self.data_path)
+            with open(tmp_path, "wb") as f:
+                f.write(CACHE_MAGIC)
+                f.write(json.dumps(_header(key)).encode("ascii") + b"\n")
+                pickle.dump(system_data, f, protocol=pickle.HIGHEST_PROTOCOL)
+            os.replace(tmp_path, self.path)
+        except (OSError, pickle.PicklingError):
+            try:
+                os.remove(tmp_path)
+            except OSError:
+                pass
+            return False
+        return True
+
+    def invalidate(self):
+        """Removes the cache file."""
+        try:
+            os.remove(self.path)
+        except OSError:
+            pass
@@ -0,0 +1,258 @@
+# src/storage.py
+import json
+import os
+import threading
+from typing import TYPE_CHECKING, Any, Dict, List, Optional
+
+from src.models import SystemData, Player, ExerciseType, TrainingPlan, TrainingUnit, PlanTemplate
+from src.journal import (
+    OP_ADD_PLAYER, OP_ADD_EXERCISE_TYPE, OP_CREATE_PLAN, OP_ADD_UNIT, OP_COMPLETE_UNIT, OP_ARCHIVE_PLANS,
+    OP_SAVE_TEMPLATE
+)
+from src.repository import SystemRepository
+from src.codec import FORMAT_JSON, dumps, loads, encode, decode
+
+# sqlite3 se importuje az pri otevreni databaze (JSON backend ho nepotrebuje).
+if TYPE_CHECKING:
+    import sqlite3
+
+# Nazvy backendu (config.STORAGE_BACKEND)
+# أسماء محركات التخزين
+BACKEND_JSON = "json"
+BACKEND_SQLITE = "sqlite"
+
+
+class StorageBackend:
+    """Interface between DataManager and the place where the data lives."""
+    # Rozhrani uloziste dat.
+    # واجهة محرك التخزين
+
+    # True, pokud backend umi ulozit jednu zmenu bez prepsani vsech dat.
+    incremental = False
+
+    def exists(self) -> bool:
+        raise NotImplementedError
+
+    def load(self) -> SystemData:
+        raise NotImplementedError
+
+    def save(self, system_data: SystemData) -> Optional[int]:
+        """Writes the complete state; returns the number of bytes written when known."""
+        raise NotImplementedError
+
+    def apply(self, system_data: SystemData, records: List[Dict[str, Any]]):
+        """Persists already-applied mutation records in one write (incremental backends only)."""
+        raise NotImplementedError
+
+    def close(self):
+        pass
+
+
+class JsonFileBackend(StorageBackend):
+    """Default backend: the whole dataset in one file (JSON, compact JSON or marshal)."""
+
+    def __init__(self, path: str, fmt: str = FORMAT_JSON):
+        self.path = path
+        self.fmt = fmt
+
+    def exists(self) -> bool:
+        return os.path.exists(self.path)
+
+    def load(self) -> SystemData:
+        # Format se pozna podle obsahu, takze zmena DATA_FORMAT nerozbije stary soubor.
+        with open(self.path, 'rb') as f:
+            return loads(f.read())
+
+    def save(self, system_data: SystemData) -> int:
+        """Writes to a temp file and atomically replaces the data file."""
+        # Zapis do docasneho souboru a atomicka vymena (os.replace).
+        tmp_path = self.path + ".tmp"
+        raw = dumps(system_data, self.fmt)
+        with open(tmp_path, 'wb') as f:
+            f.write(raw)
+            f.flush()
+            os.fsync(f.fileno())
+        os.replace(tmp_path, self.path)
+        return len(raw)
+
+
+_SQLITE_SCHEMA = """
+CREATE TABLE IF NOT EXISTS players (
+    id INTEGER PRIMARY KEY,
+    name TEXT NOT NULL,
+    position TEXT NOT NULL
+);
+CREATE TABLE IF NOT EXISTS exercise_types (
+    code TEXT PRIMARY KEY,
+    description TEXT NOT NULL,
+    parameters_metadata TEXT NOT NULL
+);
+CREATE TABLE IF NOT EXISTS training_plans (
+    id INTEGER PRIMARY KEY,
+    player_id INTEGER NOT NULL,
+    date_assigned TEXT NOT NULL,
+    target_completion_date TEXT,
+    status TEXT NOT NULL
+);
+CREATE INDEX IF NOT EXISTS idx_plans_player ON training_plans(player_id);
+CREATE INDEX IF NOT EXISTS idx_plans_status ON training_plans(status);
+CREATE INDEX IF NOT EXISTS idx_plans_date ON training_plans(date_assigned);
+CREATE TABLE IF NOT EXISTS training_units (
+    id INTEGER PRIMARY KEY,
+    plan_id INTEGER NOT NULL,
+    type_code TEXT NOT NULL,
+    specific_parameters TEXT NOT NULL
+);
+CREATE INDEX IF NOT EXISTS idx_units_plan ON training_units(plan_id);
+CREATE INDEX IF NOT EXISTS idx_units_type ON training_units(type_code);
+CREATE TABLE IF NOT EXISTS plan_templates (
+    name TEXT PRIMARY KEY,
+    description TEXT NOT NULL,
+    units TEXT NOT NULL
+);
+CREATE TABLE IF NOT EXISTS id_sequences (
+    name TEXT PRIMARY KEY,
+    value INTEGER NOT NULL
+);
+"""
+
+
+def _dumps(value: Any) -> str:
+    return json.dumps(value, ensure_ascii=False, separators=(',', ':'))
+
+
+class SqliteBackend(StorageBackend):
+    """Stdlib sqlite3 backend with indexed tables; each mutation is a single-row write."""
+    # SQLite backend - kazda zmena je zapis jednoho radku.
+    # محرك SQLite - كل تغيير يكتب صفًا واحدًا
+
+    incremental = True
+
+    def __init__(self, path: str):
+        self.path = path
+        self._lock = threading.Lock()
+        self._conn: Optional["sqlite3.Connection"] = None
+
+    def _connection(self) -> "sqlite3.Connection":
+        if self._conn is None:
+            import sqlite3
+            self._conn = sqlite3.connect(self.path, check_same_thread=False)
+            self._conn.executescript(_SQLITE_SCHEMA)
+        return self._conn
+
+    def exists(self) -> bool:
+        if not os.path.exists(self.path):
+            return False
+        with self._lock:
+            row = self._connection().execute("SELECT COUNT(*) FROM exercise_types").fetchone()
+        return row[0] > 0
+
+    def load(self) -> SystemData:
+        with self._lock:
+            conn = self._connection()
+            players = [Player(id=r[0], name=r[1], position=r[2])
+                       for r in conn.execute("SELECT id, name, position FROM players ORDER BY id")]
+            exercise_types = [ExerciseType(code=r[0], description=r[1], parameters_metadata=json.loads(r[2]))
+                              for r in conn.execute("SELECT code, description, parameters_metadata FROM exercise_types ORDER BY rowid")]
+            plans: Dict[int, TrainingPlan] = {}
+            for r in conn.execute("SELECT id, player_id, date_assigned, target_completion_date, status FROM training_plans ORDER BY id"):
+                plans[r[0]] = TrainingPlan(id=r[0], player_id=r[1], date_assigned=r[2], target_completion_date=r[3], status=r[4])
+            for r in conn.execute("SELECT id, plan_id, type_code, specific_parameters FROM training_units ORDER BY id"):
+                plan = plans.get(r[1])
+                if plan is not None:
+                    plan.exercises.append(TrainingUnit(id=r[0], type_code=r[2], specific_parameters=json.loads(r[3])))
+            id_sequences = dict(conn.execute("SELECT name, value FROM id_sequences"))
+            templates = [decode(PlanTemplate, {"name": r[0], "description": r[1], "units": json.loads(r[2])})
+                         for r in conn.execute("SELECT name, description, units FROM plan_templates ORDER BY rowid")]
+        return SystemData(players=players, exercise_types=exercise_types,
+                          training_plans=list(plans.values()), id_sequences=id_sequences, plan_templates=templates)
+
+    def save(self, system_data: SystemData):
+        """Replaces every table in one transaction (initial data and migration)."""
+        with self._lock:
+            conn = self._connection()
+            with conn:
+                for table in ("players", "exercise_types", "training_plans", "training_units", "id_sequences",
+                              "plan_templates"):
+                    conn.execute(f"DELETE FROM {table}")
+                conn.executemany("INSERT INTO players VALUES (?, ?, ?)",
+                                 [(p.id, p.name, p.position) for p in system_data.players])
+                conn.executemany("INSERT INTO exercise_types VALUES (?, ?, ?)",
+                                 [(e.code, e.description, _dumps(e.parameters_metadata)) for e in system_data.exercise_types])
+                conn.executemany("INSERT INTO training_plans VALUES (?, ?, ?, ?, ?)",
+                                 [(p.id, p.player_id, p.date_assigned, p.target_completion_date, p.status)
+                                  for p in system_data.training_plans])
+                conn.executemany("INSERT INTO training_units VALUES (?, ?, ?, ?)",
+                                 [(u.id, p.id, u.type_code, _dumps(u.parameters_dict()))
+                                  for p in system_data.training_plans for u in p.exercises])
+                conn.executemany("INSERT INTO id_sequences VALUES (?, ?)", list(system_data.id_sequences.items()))
+                conn.executemany("INSERT INTO plan_templates VALUES (?, ?, ?)",
+                                 [(t.name, t.description, _dumps([encode(u) for u in t.units])) for t in system_data.plan_templates])
+
+    def apply(self, system_data: SystemData, records: List[Dict[str, Any]]):
+        """Writes the rows touched by the mutation records in one transaction."""
+        with self._lock:
+            conn = self._connection()
+            with conn:
+                for record in records:
+                    self._apply_record(conn, system_data, record)
+                conn.executemany("INSERT OR REPLACE INTO id_sequences VALUES (?, ?)",
+                                 list(system_data.id_sequences.items()))
+
+    def _apply_record(self, conn: "sqlite3.Connection", system_data: SystemData, record: Dict[str, Any]):
+        op = record["op"]
+        if op == OP_ADD_PLAYER:
+            p = record["player"]
+            conn.execute("INSERT INTO players VALUES (?, ?, ?)", (p["id"], p["name"], p["position"]))
+        elif op == OP_ADD_EXERCISE_TYPE:
+            e = record["exercise_type"]
+            conn.execute("INSERT OR REPLACE INTO exercise_types VALUES (?, ?, ?)",
+                         (e["code"], e["description"], _dumps(e["parameters_metadata"])))
+        elif op == OP_CREATE_PLAN:
+            p = record["plan"]
+            conn.execute("INSERT INTO training_plans VALUES (?, ?, ?, ?, ?)",
+                         (p["id"], p["player_id"], p["date_assigned"], p["target_completion_date"], p["status"]))
+        elif op == OP_ADD_UNIT:
+            u = record["unit"]
+            conn.execute("INSERT INTO training_units VALUES (?, ?, ?, ?)",
+                         (u["id"], record["plan_id"], u["type_code"], _dumps(u["specific_parameters"])))
+        elif op == OP_COMPLETE_UNIT:
+            unit = SystemRepository.of(system_data).get_unit(record["plan_id"], record["unit_id"])
+            conn.execute("UPDATE training_units SET specific_parameters = ? WHERE id = ?",
+                         (_dumps(unit.parameters_dict()), record["unit_id"]))
+            conn.execute("UPDATE training_plans SET status = ? WHERE id = ?",
+                         (record["plan_status"], record["plan_id"]))
+        elif op == OP_ARCHIVE_PLANS:
+            rows = [(plan_id,) for plan_id in record["plan_ids"]]
+            conn.executemany("DELETE FROM training_units WHERE plan_id = ?", rows)
+            conn.executemany("DELETE FROM training_plans WHERE id = ?", rows)
+        elif op == OP_SAVE_TEMPLATE:
+            t = record["template"]
+            conn.execute("INSERT OR REPLACE INTO plan_templates VALUES (?, ?, ?)",
+                         (t["name"], t["description"], _dumps(t["units"])))
+        else:
+            raise ValueError(f"Unknown mutation '{op}'.")
+
+    def close(self):
+        with self._lock:
+            if self._conn is not None:
+                self._conn.close()
+                self._conn = None
+
+
+def create_backend(kind: str, path: str, fmt: str = FORMAT_JSON) -> StorageBackend:
+    """Creates a storage backend by its config name."""
+    if kind == BACKEND_JSON:
+        return JsonFileBackend(path, fmt)
+    if kind == BACKEND_SQLITE:
+        return SqliteBackend(path)
+    raise ValueError(f"Unknown storage backend '{kind}'.")
+
+
+def migrate(source: StorageBackend, target: StorageBackend) -> SystemData:
+    """Copies the complete dataset from one backend into another."""
+    # Prevede data mezi backendy (napr. system_data.json -> SQLite).
+    # ينقل البيانات بين محركات التخزين
+    system_data = source.load()
+    target.save(system_data)
+    return system_data
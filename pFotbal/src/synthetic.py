@@ -0,0 +1,65 @@
+# src/synthetic.py
+import random
+from datetime import date, timedelta
+from typing import Dict, Callable, Any
+
+from src.models import (
+    SystemData, Player, TrainingPlan, TrainingUnit,
+    STATUS_PENDING, STATUS_COMPLETED, SEQ_PLAYER, SEQ_PLAN, SEQ_UNIT
+)
+from src.services import default_exercise_types
+
+# Jmena a pozice pro generovana data
+# أسماء ومراكز للبيانات المولدة
+_FIRST_NAMES = ("Jan", "Petr", "Tomáš", "Jiří", "Lukáš", "Ondřej", "Mohamed", "Ahmed", "Karim", "David", "Matěj", "Adam")
+_LAST_NAMES = ("Novák", "Svoboda", "Dvořák", "Černý", "Procházka", "Kučera", "Hassan", "Saleh", "Mansour", "Horák")
+_POSITIONS = ("Goalkeeper", "Defender", "Midfielder", "Forward")
+
+
+def _shoot_parameters(rnd: random.Random) -> Dict[str, Any]:
+    shots = rnd.randint(5, 30)
+    return {"shots_taken": shots, "goals_scored": rnd.randint(0, shots)}
+
+
+# Generatory parametru pro vychozi typy cviceni
+_PARAMETERS: Dict[str, Callable[[random.Random], Dict[str, Any]]] = {
+    "SPRINT": lambda rnd: {"distance_m": float(rnd.choice((20, 30, 40, 50, 60, 100))), "repetitions": rnd.randint(3, 12)},
+    "SHOOT": _shoot_parameters,
+    "JUMP": lambda rnd: {"jumps_count": rnd.randint(5, 40), "height_cm": round(rnd.uniform(20.0, 70.0), 1)},
+}
+
+
+def generate_system_data(players: int = 100, plans_per_player: int = 10, units_per_plan: int = 5,
+                         completed_ratio: float = 0.5, seed: int = 0,
+                         start_date: date = date(2025, 1, 6)) -> SystemData:
+    """Builds a reproducible SystemData with SPRINT/SHOOT/JUMP units.
+
+    The same arguments (including seed) always give the same data; plan dates
+    are spread over the year after start_date and a plan is Completed when all
+    of its units are.
+    """
+    # Deterministicka synteticka data pro benchmarky a testy.
+    # بيانات اصطناعية حتمية
+    rnd = random.Random(seed)
+    exercise_types = default_exercise_types()
+    metadata = {e.code: e.parameters_metadata for e in exercise_types}
+    codes = [e.code for e in exercise_types]
+    dates = [(start_date + timedelta(days=d)).isoformat() for d in range(365)]
+
+    squad = [Player(id=i, name=f"{rnd.choice(_FIRST_NAMES)} {rnd.choice(_LAST_NAMES)}", position=rnd.choice(_POSITIONS))
+             for i in range(1, players + 1)]
+    plans = []
+    unit_id = 0
+    for player in squad:
+        for _ in range(plans_per_player):
+            units = []
+            for _ in range(units_per_plan):
+                unit_id += 1
+                code = rnd.choice(codes)
+                status = STATUS_COMPLETED if rnd.random() < completed_ratio else None
+                units.append(TrainingUnit(unit_id, code, _PARAMETERS[code](rnd), status, metadata[code]))
+            all_done = bool(units) and all(u.status == STATUS_COMPLETED for u in units)
+            plans.append(TrainingPlan(id=len(plans) + 1, player_id=player.id, date_assigned=rnd.choice(dates),
+                                      exercises=units, status=STATUS_COMPLETED if all_done else STATUS_PENDING))
+    return SystemData(players=squad, exercise_types=exercise_types, training_plans=plans,
+                      id_sequences={SEQ_PLAYER: players, SEQ_PLAN: len(plans), SEQ_UNIT: unit_id})
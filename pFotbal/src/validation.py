@@ -0,0 +1,170 @@
+# src/validation.py
+import math
+from collections.abc import Mapping
+from dataclasses import dataclass, field
+from typing import Any, Callable, Dict, Iterable, List, Optional, Tuple
+
+from src.models import ExerciseType
+
+# Typy parametru, ktere se kontroluji a prevadi (ostatni se ulozi beze zmeny)
+# أنواع المعلمات التي يتم التحقق منها
+TYPE_INT = "int"
+TYPE_FLOAT = "float"
+
+_INF = math.inf
+
+
+class ParameterError(ValueError):
+    """Unit parameters that do not match their exercise type's parameters_metadata."""
+
+
+def _to_int(key: str, value: Any) -> int:
+    # Pomala cesta: retezce (CSV, CLI) a cela cisla zapsana jako float.
+    if isinstance(value, bool) or (isinstance(value, float) and not value.is_integer()):
+        raise ParameterError(f"Invalid value {value!r} for {key}. Expected int.")
+    try:
+        return int(value)
+    except (TypeError, ValueError, OverflowError):
+        raise ParameterError(f"Invalid value {value!r} for {key}. Expected int.") from None
+
+
+def _to_float(key: str, value: Any) -> float:
+    if isinstance(value, bool):
+        raise ParameterError(f"Invalid value {value!r} for {key}. Expected float.")
+    try:
+        result = float(value)
+    except (TypeError, ValueError):
+        raise ParameterError(f"Invalid value {value!r} for {key}. Expected float.") from None
+    if not math.isfinite(result):
+        raise ParameterError(f"Invalid value {value!r} for {key}. Expected a finite float.")
+    return result
+
+
+class ParameterValidator:
+    """Checks and converts the parameters of one exercise type with generated code.
+
+    The schema is read once, when the validator is built: the generated
+    function looks each key up directly, passes values that already have the
+    declared type through (one class check) and only falls back to parsing for
+    strings and other numbers. Unknown keys, missing values and values of the
+    wrong type raise ParameterError. Validators are interned per (code, schema).
+    """
+    # Predkompilovana kontrola parametru jednoho typu cviceni.
+    # مدقق معلمات مُجمَّع لنوع تمرين واحد
+    __slots__ = ("code", "fields", "keys", "validate", "validate_many")
+    _interned: Dict[Tuple[str, Tuple[Tuple[str, str], ...]], "ParameterValidator"] = {}
+
+    def __init__(self, code: str, fields: Tuple[Tuple[str, str], ...]):
+        self.code = code
+        self.fields = fields
+        self.keys = frozenset(k for k, _ in fields)
+        self.validate, self.validate_many = self._compile()
+
+    @classmethod
+    def for_type(cls, exercise_type: ExerciseType) -> "ParameterValidator":
+        fields = tuple(exercise_type.parameters_metadata.items())
+        key = (exercise_type.code, fields)
+        validator = cls._interned.get(key)
+        if validator is None:
+            validator = cls._interned[key] = cls(exercise_type.code, fields)
+        return validator
+
+    def __call__(self, raw: Any) -> Dict[str, Any]:
+        return self.validate(raw)
+
+    def _unknown(self, raw: Mapping):
+        unknown = sorted(str(k) for k in raw if k not in self.keys)
+        raise ParameterError(f"Unknown parameters for {self.code}: {', '.join(unknown)}.")
+
+    def _missing(self, raw: Mapping):
+        missing = [k for k, _ in self.fields if raw.get(k) in (None, "")]
+        raise ParameterError(f"Missing parameters for {self.code}: {', '.join(missing)}.")
+
+    def _not_mapping(self, raw: Any):
+        raise ParameterError(f"Parameters for {self.code} must be an object, got {type(raw).__name__}.")
+
+    def _compile(self) -> Tuple[Callable[[Any], Dict[str, Any]], Callable]:
+        """Generates `validate(raw)` and `validate_many(rows)` for this schema."""
+        namespace: Dict[str, Any] = {
+            "_keys": self.keys, "_unknown": self._unknown, "_missing": self._missing,
+            "_not_mapping": self._not_mapping, "_Mapping": Mapping, "_to_int": _to_int, "_to_float": _to_float,
+            "_INF": _INF, "ParameterError": ParameterError,
+        }
+        body = [
+            "if raw.__class__ is not dict and not isinstance(raw, _Mapping): _not_mapping(raw)",
+            "if not raw.keys() <= _keys: _unknown(raw)",
+        ]
+        items = []
+        for i, (key, dtype) in enumerate(self.fields):
+            body.append(f"v = raw.get({key!r})")
+            body.append("if v is None or v == '': _missing(raw)")
+            if dtype == TYPE_INT:
+                body.append(f"p{i} = v if v.__class__ is int else _to_int({key!r}, v)")
+            elif dtype == TYPE_FLOAT:
+                body.append(f"p{i} = v if v.__class__ is float and -_INF < v < _INF else _to_float({key!r}, v)")
+            else:
+                body.append(f"p{i} = v")
+            items.append(f"{key!r}: p{i}")
+        result = "{" + ", ".join(items) + "}"
+        one = "\n    ".join(body)
+        many = "\n            ".join(body)
+        source = (
+            f"def validate(raw):\n    {one}\n    return {result}\n\n"
+            "def validate_many(rows):\n"
+            "    valid = []\n    errors = []\n"
+            "    for i, raw in enumerate(rows):\n"
+            "        try:\n"
+            f"            {many}\n"
+            f"            valid.append({result})\n"
+            "        except ParameterError as e:\n"
+            "            valid.append(None)\n"
+            "            errors.append((i, str(e)))\n"
+            "    return valid, errors\n"
+        )
+        exec(source, namespace)
+        return namespace["validate"], namespace["validate_many"]
+
+
+def compile_validator(exercise_type: ExerciseType) -> ParameterValidator:
+    """The (cached) validator of an exercise type."""
+    return ParameterValidator.for_type(exercise_type)
+
+
+@dataclass
+class BatchValidation:
+    """Outcome of validating many unit payloads: converted params (None where invalid) and errors by position."""
+    params: List[Optional[Dict[str, Any]]] = field(default_factory=list)
+    errors: Dict[int, str] = field(default_factory=dict)
+
+    @property
+    def ok(self) -> bool:
+        return not self.errors
+
+
+def validate_batch(lookup: Callable[[str], Optional[ParameterValidator]],
+                   items: Iterable[Tuple[str, Any]]) -> BatchValidation:
+    """Validates (type_code, raw params) pairs; rows of one type go through its validator in one call."""
+    # Davkova kontrola: radky se seskupi podle typu a kazda skupina projde jednim volanim.
+    # التحقق الجماعي حسب نوع التمرين
+    groups: Dict[str, Tuple[List[int], List[Any]]] = {}
+    count = 0
+    for i, (code, raw) in enumerate(items):
+        group = groups.get(code)
+        if group is None:
+            group = groups[code] = ([], [])
+        group[0].append(i)
+        group[1].append(raw)
+        count = i + 1
+    result = BatchValidation([None] * count)
+    for code, (positions, rows) in groups.items():
+        validator = lookup(code)
+        if validator is None:
+            for i in positions:
+                result.errors[i] = f"Unknown exercise type '{code}'."
+            continue
+        valid, errors = validator.validate_many(rows)
+        for i, params in zip(positions, valid):
+            result.params[i] = params
+        for j, message in errors:
+            result.errors[positions[j]] = message
+    return result
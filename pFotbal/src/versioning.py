@@ -0,0 +1,136 @@
+# src/versioning.py
+from collections.abc import Sequence
+from itertools import islice
+from typing import Any, Callable, Dict, Iterator, List, Optional
+
+from src.models import TrainingPlan
+
+
+class PlanState:
+    """The state of a plan at one point: its fields, its unit list and the unit statuses.
+
+    Saving it copies pointers only (units are shared; the repository changes
+    nothing but their status). The plan object is built on first read.
+    """
+    # Ulozeny stav planu (pro pohledy a undo).
+    # الحالة المحفوظة للخطة
+    __slots__ = ("plan", "fields", "units", "statuses", "_image")
+
+    def __init__(self, plan: TrainingPlan):
+        self.plan = plan
+        self.fields = (plan.player_id, plan.date_assigned, plan.target_completion_date, plan.status)
+        self.units = tuple(plan.exercises)
+        self.statuses = tuple([unit.status for unit in self.units])
+        self._image: Optional[TrainingPlan] = None
+
+    def image(self) -> TrainingPlan:
+        """Independent copy of the plan as it was when the state was saved."""
+        if self._image is None:
+            units = []
+            for unit, status in zip(self.units, self.statuses):
+                copy = unit.copy()
+                copy.status = status
+                units.append(copy)
+            player_id, date_assigned, target_completion_date, status = self.fields
+            self._image = TrainingPlan(self.plan.id, player_id, date_assigned, target_completion_date, units, status)
+        return self._image
+
+    def changed(self) -> bool:
+        """True when the live plan no longer matches the saved state."""
+        plan = self.plan
+        return ((plan.player_id, plan.date_assigned, plan.target_completion_date, plan.status) != self.fields
+                or len(plan.exercises) != len(self.units)
+                or any(a is not b for a, b in zip(plan.exercises, self.units))
+                or any(unit.status != status for unit, status in zip(self.units, self.statuses)))
+
+    def restore(self):
+        """Puts the saved state back into the live plan (same plan and unit objects)."""
+        plan = self.plan
+        plan.player_id, plan.date_assigned, plan.target_completion_date, plan.status = self.fields
+        plan.exercises = list(self.units)
+        for unit, status in zip(self.units, self.statuses):
+            unit.status = status
+
+
+class FrozenList(Sequence):
+    """Read-only view of the first `length` items of a live list, as they were when the view was taken.
+
+    Taking the view is O(1): it shares the list and its items. The live side
+    only appends to the list (removals replace it with a new list), and
+    before changing a shared item in place it saves the item's old state
+    here (`saved`, keyed by id of the live item). Items read from the view
+    are copies built from a saved state, so they never change afterwards.
+    """
+    # Pohled na seznam v case snimku; sdili seznam i polozky, uklada se jen stav menenych.
+    # عرض للقائمة لحظة اللقطة دون نسخها
+    __slots__ = ("_base", "_length", "_state_fn", "saved", "serial", "__weakref__")
+
+    def __init__(self, base: List[Any], state_fn: Optional[Callable[[Any], Any]] = None, serial: int = 0):
+        self._base = base
+        self._length = len(base)
+        # Bez state_fn jsou polozky nemenne (hraci, typy cviceni) a vraci se primo.
+        self._state_fn = state_fn
+        self.saved: Dict[int, Any] = {}
+        self.serial = serial
+
+    def __len__(self) -> int:
+        return self._length
+
+    def _resolve(self, obj: Any) -> Any:
+        if self._state_fn is None:
+            return obj
+        state = self.saved.get(id(obj))
+        if state is None:
+            # setdefault: pokud zivy objekt mezitim zacal menit, plati jeho drive ulozeny stav.
+            state = self.saved.setdefault(id(obj), self._state_fn(obj))
+        return state.image()
+
+    def __getitem__(self, index):
+        if isinstance(index, slice):
+            return [self[i] for i in range(*index.indices(self._length))]
+        if index < 0:
+            index += self._length
+        if not 0 <= index < self._length:
+            raise IndexError("FrozenList index out of range")
+        return self._resolve(self._base[index])
+
+    def __iter__(self) -> Iterator[Any]:
+        for obj in islice(self._base, self._length):
+            yield self._resolve(obj)
+
+    def originals(self) -> List[Any]:
+        """The shared item objects of the view (their saved states are in `saved`)."""
+        return list(islice(self._base, self._length))
+
+    def map_items(self, fn: Callable[[Any], Any]) -> List[Any]:
+        """[fn(item) for item in self] without copying unchanged items (used by the codec on the writer thread).
+
+        fn runs on the shared item; if a state was saved meanwhile, the live side
+        started changing the item and fn runs again on the saved state.
+        """
+        # Optimisticke cteni: stav se uklada pred zmenou, takze chybejici stav po fn() = konzistentni vysledek.
+        saved = self.saved
+        result = []
+        for obj in islice(self._base, self._length):
+            state = saved.get(id(obj))
+            if state is None:
+                value = fn(obj)
+                state = saved.get(id(obj))
+                if state is None:
+                    result.append(value)
+                    continue
+            result.append(fn(state.image()))
+        return result
+
+    def __eq__(self, other):
+        if isinstance(other, (list, FrozenList)):
+            return list(self) == list(other)
+        return NotImplemented
+
+    __hash__ = None
+
+    def __repr__(self):
+        return f"FrozenList({list(self)!r})"
+
+    def __reduce__(self):
+        return list, (list(self),)
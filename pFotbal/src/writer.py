@@ -0,0 +1,88 @@
+# src/writer.py
+import sys
+import threading
+from typing import Any, Callable, Optional
+
+from src.metrics import registry
+
+# Znacka "nic neceka na zapis"
+# علامة عدم وجود كتابة معلقة
+_NOTHING = object()
+
+
+class BackgroundWriter:
+    """One dedicated writer thread that coalesces pending saves.
+
+    Only the most recently submitted payload is kept; a burst of submits while a
+    write is running collapses into a single follow-up write.
+    """
+    # Jedno vlakno pro zapis; vice pozadavku se slouci do jednoho zapisu.
+    # خيط كتابة واحد يدمج طلبات الحفظ المعلقة
+
+    def __init__(self, write_fn: Callable[[Any], None], name: str = "data-writer"):
+        self._write_fn = write_fn
+        self._cond = threading.Condition()
+        self._pending: Any = _NOTHING
+        self._submitted = 0
+        self._completed = 0
+        self._closed = False
+        self.last_error: Optional[Exception] = None
+        self._thread = threading.Thread(target=self._run, name=name, daemon=True)
+        self._thread.start()
+
+    @property
+    def pending(self) -> bool:
+        """True while a submitted payload has not been written yet."""
+        with self._cond:
+            return self._completed < self._submitted
+
+    def submit(self, payload: Any):
+        """Schedules payload for writing, replacing any payload still waiting."""
+        with self._cond:
+            if self._closed:
+                raise RuntimeError("Writer is closed.")
+            if registry.enabled and self._pending is not _NOTHING:
+                registry.inc("pfl_saves_coalesced_total")
+            self._pending = payload
+            self._submitted += 1
+            if registry.enabled:
+                registry.set_gauge("pfl_save_queue_depth", self._submitted - self._completed)
+            self._cond.notify_all()
+
+    def flush(self, timeout: Optional[float] = None) -> bool:
+        """Blocks until everything submitted so far is on disk. Returns False on timeout."""
+        # Pocka, az bude vse odeslane zapsano.
+        with self._cond:
+            target = self._submitted
+            return self._cond.wait_for(lambda: self._completed >= target, timeout)
+
+    def close(self, timeout: Optional[float] = None):
+        """Writes what is still pending and stops the thread."""
+        with self._cond:
+            self._closed = True
+            self._cond.notify_all()
+        if self._thread is not threading.current_thread():
+            self._thread.join(timeout)
+
+    def _run(self):
+        while True:
+            with self._cond:
+                self._cond.wait_for(lambda: self._pending is not _NOTHING or self._closed)
+                if self._pending is _NOTHING:
+                    return
+                payload, self._pending = self._pending, _NOTHING
+                target = self._submitted
+            try:
+                self._write_fn(payload)
+                self.last_error = None
+            except Exception as e:
+                self.last_error = e
+                registry.inc("pfl_save_errors_total")
+                # Na stderr, aby se nemichalo s vystupem menu.
+                print(f"[ERROR: ASYNC SAVE FAILED] Could not save data: {e}", file=sys.stderr)
+            finally:
+                with self._cond:
+                    self._completed = target
+                    if registry.enabled:
+                        registry.set_gauge("pfl_save_queue_depth", self._submitted - self._completed)
+                    self._cond.notify_all()
@@ -0,0 +1,13 @@
+# test/support.py
+from src.models import SystemData
+from src.services import DataManager
+
+
+class CountingDataManager(DataManager):
+    """DataManager that counts persistence writes instead of touching disk."""
+    # Pocita zapisy, na disk nesaha (sdileno testy).
+    def __init__(self):
+        self.saves = 0
+
+    def save_data(self, system_data: SystemData):
+        self.saves += 1
@@ -0,0 +1,126 @@
+import contextlib
+import io
+import math
+import os
+import tempfile
+import unittest
+from datetime import date
+from src.models import SystemData, ExerciseType, Player, TrainingPlan, TrainingUnit, STATUS_COMPLETED
+from src.analytics import METRICS, TrainingLoadAnalytics, build_columns, week_label, numpy_available
+from src.codec import dumps
+from src.repository import SystemRepository
+from src.cli import main as cli_main
+
+
+def _sample_data() -> SystemData:
+    sprint = ExerciseType(code="SPRINT", parameters_metadata={"distance_m": "float", "repetitions": "int"})
+    shoot = ExerciseType(code="SHOOT", parameters_metadata={"shots_taken": "int", "goals_scored": "int"})
+    plans = [
+        # 2026-01-05 a 2026-01-07 jsou ve stejnem tydnu, 2026-01-12 v dalsim.
+        TrainingPlan(id=1, player_id=1, date_assigned="2026-01-05", exercises=[
+            TrainingUnit(1, "SPRINT", {"distance_m": 30.0, "repetitions": 5}, STATUS_COMPLETED),
+            TrainingUnit(2, "SHOOT", {"shots_taken": 10, "goals_scored": 4}, STATUS_COMPLETED),
+        ]),
+        TrainingPlan(id=2, player_id=1, date_assigned="2026-01-07", exercises=[
+            TrainingUnit(3, "SPRINT", {"distance_m": 50.0, "repetitions": 2}),
+            TrainingUnit(4, "SHOOT", {"shots_taken": 10, "goals_scored": 6}),
+        ]),
+        TrainingPlan(id=3, player_id=1, date_assigned="2026-01-12", exercises=[
+            TrainingUnit(5, "SPRINT", {"distance_m": 40.0, "repetitions": 1}, STATUS_COMPLETED),
+        ]),
+        TrainingPlan(id=4, player_id=2, date_assigned="2026-01-06", exercises=[
+            TrainingUnit(6, "SPRINT", {"distance_m": 20.0, "repetitions": 3}),
+            TrainingUnit(7, "SPRINT", {"distance_m": 25.0}),  # chybi repetitions -> preskoceno
+        ]),
+    ]
+    return SystemData(players=[Player(1, "Jan", "DF"), Player(2, "Petr", "MF")],
+                      exercise_types=[sprint, shoot], training_plans=plans)
+
+
+MONDAY_1 = date(2026, 1, 5).toordinal()
+MONDAY_2 = date(2026, 1, 12).toordinal()
+
+
+class TestTrainingLoadAnalytics(unittest.TestCase):
+    """Tests the grouped training-load aggregations (pure-Python path)."""
+    # Testy analytiky zatizeni.
+    # اختبارات تحليلات الحمل
+
+    use_numpy = False
+
+    def setUp(self):
+        self.system_data = _sample_data()
+        self.analytics = TrainingLoadAnalytics(self.system_data, use_numpy=self.use_numpy)
+
+    def test_sprint_distance_per_player(self):
+        values = self.analytics.compute(METRICS["sprint"])
+        self.assertEqual(values, {(1, None): 150.0 + 100.0 + 40.0, (2, None): 60.0})
+
+    def test_sprint_distance_per_week(self):
+        values = self.analytics.compute(METRICS["sprint"], by_week=True)
+        self.assertEqual(values, {(1, MONDAY_1): 250.0, (1, MONDAY_2): 40.0, (2, MONDAY_1): 60.0})
+        self.assertEqual(week_label(MONDAY_2), "2026-W03")
+
+    def test_shot_conversion_is_ratio_of_sums(self):
+        values = self.analytics.compute(METRICS["shoot"])
+        self.assertAlmostEqual(values[(1, None)], 10 / 20)
+
+    def test_date_range_and_completed_only(self):
+        values = self.analytics.compute(METRICS["sprint"], date_from="2026-01-06", date_to="2026-01-12")
+        self.assertEqual(values, {(1, None): 140.0, (2, None): 60.0})
+        values = self.analytics.compute(METRICS["sprint"], completed_only=True)
+        self.assertEqual(values, {(1, None): 190.0})
+
+    def test_unknown_type_gives_empty_result(self):
+        self.assertEqual(self.analytics.compute(METRICS["jump"]), {})
+
+    def test_columns_rebuilt_after_completion(self):
+        """Tests that cached columns are refreshed once a unit changes status."""
+        self.assertEqual(len(self.analytics.columns("SPRINT")), 5)
+        self.analytics.compute(METRICS["sprint"], completed_only=True)
+        plan = self.system_data.training_plans[3]
+        SystemRepository.of(self.system_data).complete_unit(plan, plan.exercises[0])
+        values = self.analytics.compute(METRICS["sprint"], completed_only=True)
+        self.assertEqual(values[(2, None)], 60.0)
+
+
+@unittest.skipIf(not numpy_available(), "numpy is not installed")
+class TestTrainingLoadAnalyticsNumpy(TestTrainingLoadAnalytics):
+    """Runs the same checks on the NumPy path."""
+    use_numpy = True
+
+    def test_matches_pure_python(self):
+        reference = TrainingLoadAnalytics(self.system_data, use_numpy=False)
+        for metric in METRICS.values():
+            for by_week in (False, True):
+                expected = reference.compute(metric, by_week=by_week)
+                actual = self.analytics.compute(metric, by_week=by_week)
+                self.assertEqual(expected.keys(), actual.keys())
+                for key, value in expected.items():
+                    self.assertTrue(math.isclose(value, actual[key]), (metric.name, key))
+
+    def test_columns_are_numpy_arrays(self):
+        cols = build_columns(self.system_data, "SPRINT", use_numpy=True)
+        self.assertEqual(cols.params["repetitions"].dtype.name, "float64")
+        self.assertTrue(math.isnan(cols.params["repetitions"][4]))
+
+
+class TestReportCommand(unittest.TestCase):
+
+    def test_report_command(self):
+        with tempfile.TemporaryDirectory() as tmp_dir:
+            data_file = os.path.join(tmp_dir, "system_data.json")
+            with open(data_file, "wb") as f:
+                f.write(dumps(_sample_data()))
+            out = io.StringIO()
+            with contextlib.redirect_stdout(out):
+                code = cli_main(["report", "sprint", "shoot", "--by-week", "--data-file", data_file])
+            self.assertEqual(code, 0)
+            text = out.getvalue()
+            self.assertIn("2026-W02", text)
+            self.assertIn("250.0", text)
+            self.assertIn("50.0%", text)
+
+
+if __name__ == '__main__':
+    unittest.main()
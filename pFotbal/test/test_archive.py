@@ -0,0 +1,154 @@
+import contextlib
+import gzip
+import io
+import math
+import os
+import tempfile
+import unittest
+from src.analytics import METRICS, TrainingLoadAnalytics
+from src.archive import PlanArchive, COMPRESSION_LZMA
+from src.codec import dumps
+from src.models import STATUS_COMPLETED
+from src.query import PlanQuery
+from src.services import DataManager, TrainingService, MODE_JOURNAL
+from src.storage import create_backend, BACKEND_SQLITE
+from src.synthetic import generate_system_data
+from src.cli import main as cli_main
+
+CUTOFF = "2025-07-01"
+
+
+class TestPlanArchive(unittest.TestCase):
+    """Tests moving completed plans into monthly segments and reading them back."""
+    # Testy archivace dokoncenych planu.
+    # اختبارات أرشفة الخطط المكتملة
+
+    def setUp(self):
+        self.tmp_dir = tempfile.TemporaryDirectory()
+        self.data_file = os.path.join(self.tmp_dir.name, "system_data.json")
+        self.source = generate_system_data(players=6, plans_per_player=12, units_per_plan=2, completed_ratio=0.8, seed=5)
+        with open(self.data_file, "wb") as f:
+            f.write(dumps(self.source))
+        self.old_completed = sorted(p.id for p in self.source.training_plans
+                                    if p.status == STATUS_COMPLETED and p.date_assigned < CUTOFF)
+        self._quiet = contextlib.redirect_stdout(io.StringIO())
+        self._quiet.__enter__()
+
+    def tearDown(self):
+        self._quiet.__exit__(None, None, None)
+        self.tmp_dir.cleanup()
+
+    def _open(self, **kwargs):
+        dm = DataManager(self.data_file, shared=False, **kwargs)
+        return dm, TrainingService(dm), dm.load_data()
+
+    def _archive(self, **kwargs):
+        dm, _, system_data = self._open(**kwargs)
+        archived = dm.archive_completed(system_data, CUTOFF)
+        dm.close()
+        return archived
+
+    def test_hot_file_keeps_only_active_plans(self):
+        size_before = os.path.getsize(self.data_file)
+        self.assertEqual(self._archive(), len(self.old_completed))
+        self.assertLess(os.path.getsize(self.data_file), size_before)
+
+        dm, ts, system_data = self._open()
+        self.assertFalse(set(self.old_completed) & {p.id for p in system_data.training_plans})
+        archived = list(ts.query_archived_plans(system_data))
+        self.assertEqual(sorted(p.id for p in archived), self.old_completed)
+        self.assertEqual(archived, sorted(archived, key=lambda p: (p.date_assigned, p.id)))
+        self.assertEqual({m[:4] for m in dm.archive.months()}, {"2025"})
+        original = {p.id: p for p in self.source.training_plans}
+        self.assertTrue(all(p == original[p.id] for p in archived))
+        # Archivovana ID se znovu nepridelují.
+        plan = ts.create_training_plan(system_data, 1, None)
+        self.assertGreater(plan.id, max(original))
+        dm.close()
+
+    def test_archived_queries_and_pagination(self):
+        self._archive()
+        dm, ts, system_data = self._open()
+        query = PlanQuery(player_id=2, assigned_from="2025-02-01", assigned_to="2025-05-31")
+        expected = sorted((p for p in self.source.training_plans if p.id in self.old_completed
+                           and p.player_id == 2 and "2025-02-01" <= p.date_assigned <= "2025-05-31"),
+                          key=lambda p: (p.date_assigned, p.id))
+        seen, cursor = [], None
+        while True:
+            page = ts.page_archived_plans(system_data, query, 1, cursor)
+            seen.extend(page.items)
+            if page.next_cursor is None:
+                break
+            cursor = page.next_cursor
+        self.assertEqual(seen, expected)
+        dm.close()
+
+    def test_journal_mode_and_sqlite_backend(self):
+        self.assertEqual(self._archive(persistence_mode=MODE_JOURNAL), len(self.old_completed))
+        _, _, system_data = self._open(persistence_mode=MODE_JOURNAL)
+        self.assertFalse(set(self.old_completed) & {p.id for p in system_data.training_plans})
+
+        db_file = os.path.join(self.tmp_dir.name, "system_data.db")
+        backend = create_backend(BACKEND_SQLITE, db_file)
+        backend.save(self.source)
+        dm = DataManager(db_file, backend=backend, shared=False)
+        dm.archive_completed(dm.load_data(), CUTOFF)
+        dm.close()
+        reloaded = create_backend(BACKEND_SQLITE, db_file).load()
+        self.assertEqual(len(reloaded.training_plans), len(self.source.training_plans) - len(self.old_completed))
+
+    def test_analytics_loads_archive_on_demand(self):
+        metric = METRICS["sprint"]
+        before = TrainingLoadAnalytics(self.source, use_numpy=False).compute(metric)
+        self._archive()
+        dm, _, system_data = self._open()
+        analytics = TrainingLoadAnalytics(system_data, use_numpy=False, archive=dm.archive)
+        after = analytics.compute(metric)
+        self.assertEqual(before.keys(), after.keys())
+        self.assertTrue(all(math.isclose(before[k], after[k]) for k in before))
+        self.assertNotEqual(analytics.compute(metric, include_archive=False), after)
+        # Jen mesice v rozsahu dotazu.
+        analytics.compute(metric, date_from="2025-03-01", date_to="2025-03-31")
+        self.assertEqual(set(analytics._archived), set(dm.archive.months()))
+        fresh = TrainingLoadAnalytics(system_data, use_numpy=False, archive=dm.archive)
+        fresh.compute(metric, date_from="2025-03-01", date_to="2025-03-31")
+        self.assertEqual(list(fresh._archived), ["2025-03"])
+        dm.close()
+
+    def test_crash_duplicate_is_counted_once(self):
+        dm, ts, system_data = self._open()
+        plan = next(p for p in system_data.training_plans if p.id in self.old_completed)
+        dm.archive.append([plan])  # zapsano do archivu, ale z horkych dat neodebrano
+        self.assertEqual(list(ts.query_archived_plans(system_data)), [])
+        metric = METRICS["jump"]
+        self.assertEqual(TrainingLoadAnalytics(system_data, use_numpy=False, archive=dm.archive).compute(metric),
+                         TrainingLoadAnalytics(system_data, use_numpy=False).compute(metric))
+        dm.close()
+
+    def test_lzma_appends_and_torn_tail(self):
+        archive = PlanArchive(os.path.join(self.tmp_dir.name, "archive"), COMPRESSION_LZMA)
+        plans = [p for p in self.source.training_plans if p.date_assigned.startswith("2025-03")]
+        archive.append(plans[:2])
+        archive.append(plans[2:])
+        self.assertTrue(archive.segments()["2025-03"].endswith(".jsonl.xz"))
+        self.assertEqual(len(archive.read_month("2025-03")), len(plans))
+
+        gz = PlanArchive(os.path.join(self.tmp_dir.name, "archive_gz"))
+        gz.append(plans[:2])
+        with open(gz.segments()["2025-03"], "ab") as f:
+            f.write(gzip.compress(b'{"id": 999, "player_id"')[:15])
+        self.assertEqual([p.id for p in gz.read_month("2025-03")], sorted(p.id for p in plans[:2]))
+
+    def test_cli_archive_and_list(self):
+        out = io.StringIO()
+        with contextlib.redirect_stdout(out):
+            self.assertEqual(cli_main(["archive", "--before", CUTOFF, "--data-file", self.data_file]), 0)
+            self.assertEqual(cli_main(["plans", "--archived", "--limit", "3", "--data-file", self.data_file]), 0)
+            self.assertEqual(cli_main(["archive", "--before", "yesterday", "--data-file", self.data_file]), 1)
+        text = out.getvalue()
+        self.assertIn(f"Archived {len(self.old_completed)} completed plan(s)", text)
+        self.assertEqual(text.count("PLAN ID"), 3)
+
+
+if __name__ == '__main__':
+    unittest.main()
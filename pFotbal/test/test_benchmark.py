@@ -0,0 +1,73 @@
+import contextlib
+import io
+import json
+import os
+import tempfile
+import unittest
+from src.models import STATUS_COMPLETED, SEQ_UNIT
+from src.codec import dumps
+from src.synthetic import generate_system_data
+from src.benchmark import run_benchmarks, find_regressions, parse_scale, main as bench_main
+
+
+class TestSyntheticData(unittest.TestCase):
+    """Tests the seeded synthetic data generator."""
+    # Testy generatoru syntetickych dat.
+    # اختبارات مولد البيانات الاصطناعية
+
+    def test_sizes_and_sequences(self):
+        data = generate_system_data(players=7, plans_per_player=3, units_per_plan=4, seed=1)
+        self.assertEqual(len(data.players), 7)
+        self.assertEqual(len(data.training_plans), 21)
+        self.assertEqual(sum(len(p.exercises) for p in data.training_plans), 84)
+        self.assertEqual(data.id_sequences[SEQ_UNIT], 84)
+        self.assertEqual({e.code for e in data.exercise_types}, {"SPRINT", "SHOOT", "JUMP"})
+
+    def test_same_seed_same_data(self):
+        self.assertEqual(dumps(generate_system_data(5, 2, 3, seed=42)), dumps(generate_system_data(5, 2, 3, seed=42)))
+        self.assertNotEqual(dumps(generate_system_data(5, 2, 3, seed=1)), dumps(generate_system_data(5, 2, 3, seed=2)))
+
+    def test_plan_status_follows_units(self):
+        data = generate_system_data(10, 5, 2, completed_ratio=0.7, seed=3)
+        for plan in data.training_plans:
+            done = all(u.status == STATUS_COMPLETED for u in plan.exercises)
+            self.assertEqual(plan.status == STATUS_COMPLETED, done)
+
+
+class TestBenchmark(unittest.TestCase):
+
+    def test_run_reports_every_operation(self):
+        results = run_benchmarks(["4x3x2"], repeat=1, ops=10)
+        operations = results["scales"]["4x3x2"]["operations"]
+        for op in ("load_data", "save_data", "find_player", "find_plan", "find_player_plans",
+                   "add_exercise_to_plan", "mark_exercise_completed", "get_plan_summary", "validate_units"):
+            self.assertGreater(operations[op]["per_op_us"], 0, op)
+        json.dumps(results)
+
+    def test_regression_threshold(self):
+        def doc(us):
+            return {"scales": {"small": {"operations": {"find_plan": {"per_op_us": us}}}}}
+        self.assertEqual(find_regressions(doc(1.4), doc(1.0), threshold=1.5), [])
+        self.assertEqual(len(find_regressions(doc(1.6), doc(1.0), threshold=1.5)), 1)
+        self.assertEqual(find_regressions(doc(9.0), {"scales": {}}, threshold=1.5), [])
+
+    def test_invalid_scale(self):
+        with self.assertRaises(ValueError):
+            parse_scale("huge")
+
+    def test_command_writes_results_and_fails_on_regression(self):
+        with tempfile.TemporaryDirectory() as tmp_dir:
+            output = os.path.join(tmp_dir, "bench.json")
+            baseline = os.path.join(tmp_dir, "baseline.json")
+            with open(baseline, "w", encoding="utf-8") as f:
+                json.dump({"scales": {"3x2x2": {"operations": {"find_plan": {"per_op_us": 1e-9}}}}}, f)
+            with contextlib.redirect_stdout(io.StringIO()):
+                code = bench_main(["--scales", "3x2x2", "--repeat", "1", "--ops", "5",
+                                   "--output", output, "--baseline", baseline])
+            self.assertEqual(code, 1)
+            with open(output, encoding="utf-8") as f:
+                self.assertIn("3x2x2", json.load(f)["scales"])
+
+
+if __name__ == '__main__':
+    unittest.main()
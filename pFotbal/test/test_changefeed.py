@@ -0,0 +1,214 @@
+import asyncio
+import contextlib
+import io
+import os
+import tempfile
+import threading
+import unittest
+from src.changefeed import ChangeFeed, feed_path_for, OP_UNDO
+from src.codec import dumps
+from src.journal import OP_ADD_PLAYER, OP_CREATE_PLAN, OP_ADD_UNIT, OP_COMPLETE_UNIT
+from src.services import DataManager, TrainingService, MODE_JOURNAL
+from src.synthetic import generate_system_data
+from src.async_service import AsyncTrainingService
+from src.server import PlannerServer
+from src.cli import main as cli_main
+
+
+class TestChangeFeed(unittest.TestCase):
+    """Tests change events of mutations, cursor reads, subscribers and stored consumer cursors."""
+    # Testy kanalu zmen.
+    # اختبارات سجل التغييرات
+
+    def setUp(self):
+        self.tmp_dir = tempfile.TemporaryDirectory()
+        self.data_file = os.path.join(self.tmp_dir.name, "system_data.json")
+        with open(self.data_file, "wb") as f:
+            f.write(dumps(generate_system_data(players=3, plans_per_player=2, units_per_plan=2, completed_ratio=0, seed=4)))
+        self._quiet = contextlib.redirect_stdout(io.StringIO())
+        self._quiet.__enter__()
+
+    def tearDown(self):
+        self._quiet.__exit__(None, None, None)
+        self.tmp_dir.cleanup()
+
+    def _open(self, **kwargs):
+        kwargs.setdefault("shared", False)
+        dm = DataManager(self.data_file, **kwargs)
+        return dm, TrainingService(dm), dm.load_data()
+
+    def _mutate(self, dm, ts, system_data):
+        player = dm.add_player(system_data, "Nový Hráč", "GK")
+        plan = ts.create_training_plan(system_data, player.id, None)
+        unit = ts.add_exercise_to_plan(system_data, plan.id, "JUMP", {"jumps_count": 5, "height_cm": 30.0})
+        ts.mark_exercise_completed(system_data, plan.id, unit.id)
+        return player, plan, unit
+
+    def test_shared_mode_events_carry_merged_ids(self):
+        """Tests that ids renumbered while merging with another process's write are the ones published."""
+        # Dva procesy nad jednim souborem - udalosti musi nest ID po slouceni.
+        dm_a, ts_a, data_a = self._open(shared=True)
+        dm_b, ts_b, data_b = self._open(shared=True)
+        first = self._mutate(dm_a, ts_a, data_a)
+        with dm_b.batch(data_b):  # vse se slouci najednou: hrac, plan i jednotka se precisluji
+            player, plan, unit = self._mutate(dm_b, ts_b, data_b)
+        self.assertEqual([e.id for e in first], [4, 7, 13])
+        self.assertEqual((player.id, plan.id, unit.id), (5, 8, 14))
+
+        events = dm_a.changes.read().events[4:]
+        dm_a.close()
+        dm_b.close()
+        self.assertEqual(events[0].data["player"]["id"], 5)
+        self.assertEqual((events[1].data["plan"]["id"], events[1].data["plan"]["player_id"]), (8, 5))
+        self.assertEqual((events[2].data["plan_id"], events[2].data["unit"]["id"]), (8, 14))
+        self.assertEqual((events[3].data["plan_id"], events[3].data["unit_id"]), (8, 14))
+
+    def test_every_mutation_is_an_event_and_survives_restart(self):
+        dm, ts, system_data = self._open(persistence_mode=MODE_JOURNAL)
+        player, plan, unit = self._mutate(dm, ts, system_data)
+        self.assertFalse(ts.mark_exercise_completed(system_data, plan.id, unit.id))  # bez zmeny = bez udalosti
+        dm.close()
+
+        dm, ts, system_data = self._open(persistence_mode=MODE_JOURNAL)
+        events = dm.changes.read().events
+        self.assertEqual([e.seq for e in events], [1, 2, 3, 4])
+        self.assertEqual([e.op for e in events], [OP_ADD_PLAYER, OP_CREATE_PLAN, OP_ADD_UNIT, OP_COMPLETE_UNIT])
+        self.assertEqual(events[0].data["player"], {"id": player.id, "name": "Nový Hráč", "position": "GK"})
+        self.assertEqual(events[2].data["plan_id"], plan.id)
+        self.assertEqual(events[3].data, {"plan_id": plan.id, "unit_id": unit.id, "plan_status": plan.status})
+        self.assertNotIn("seq", events[1].data)  # sekvence zurnalu neni soucasti udalosti
+        # Cislovani pokracuje po restartu; batch = jeden zapis, udalost pro kazdou zmenu.
+        with dm.batch(system_data):
+            dm.add_player(system_data, "A", "DF")
+            dm.add_player(system_data, "B", "DF")
+        self.assertEqual(dm.changes.last_seq, 6)
+        self.assertEqual(dm.undo(system_data), 1)
+        last = dm.changes.read(6).events
+        self.assertEqual([(e.seq, e.op, e.data) for e in last], [(7, OP_UNDO, {"steps": 1})])
+        dm.close()
+
+    def test_events_wait_for_a_successful_save(self):
+        """Tests that snapshot-mode events appear only after the background save, never after a failed one."""
+        dm, _, system_data = self._open()
+        received = []
+        dm.changes.subscribe(received.append)
+        save = dm.backend.save
+
+        def failing(data):
+            raise OSError("disk full")
+        dm.backend.save = failing
+        dm.add_player(system_data, "Ztraceny", "GK")
+        dm.flush()
+        self.assertEqual((received, dm.changes.read().events), ([], []))
+
+        release = threading.Event()
+
+        def slow(data):
+            release.wait(5)
+            return save(data)
+        dm.backend.save = slow
+        dm.add_player(system_data, "Dalsi", "GK")
+        self.assertEqual(received, [])  # zapis jeste bezi
+        release.set()
+        dm.flush()
+        # Uspesny snapshot obsahuje i zmenu z neuspesneho zapisu - teprve ted jsou udalosti pravdive.
+        self.assertEqual([e.data["player"]["name"] for e in received], ["Ztraceny", "Dalsi"])
+        dm.close()
+
+    def test_cursor_reads_in_batches(self):
+        dm, _, system_data = self._open()
+        for i in range(57):
+            dm.add_player(system_data, f"P{i}", "MF")
+        dm.close()
+        feed = ChangeFeed(feed_path_for(self.data_file))
+        seen, cursor = [], 0
+        while True:
+            batch = feed.read(cursor, 10)
+            seen.extend(e.seq for e in batch.events)
+            cursor = batch.cursor
+            if not batch.has_more:
+                break
+        self.assertEqual(seen, list(range(1, 58)))
+        self.assertEqual(feed.read(cursor).events, [])
+        self.assertEqual(feed.read(cursor).cursor, cursor)
+        for start in (1, 9, 31, 56):
+            self.assertEqual(feed.read(start, 2).events[0].seq, start + 1)
+        # Utrzeny posledni radek (pad pri zapisu) se nepocita a pri otevreni zahodi.
+        with open(feed.path, "ab") as f:
+            f.write(b'{"seq":58,"ts":"2')
+        self.assertEqual(feed.read(55).cursor, 57)
+        self.assertEqual(ChangeFeed(feed.path).last_seq, 57)
+        self.assertEqual(len(list(ChangeFeed(feed.path).iter_from())), 57)
+
+    def test_subscribers_get_only_new_deltas(self):
+        dm, ts, system_data = self._open()
+        dm.add_player(system_data, "Pred", "GK")
+        dm.flush()  # udalost se zverejni az po zapisu snapshotu
+        received = []
+
+        def broken(event):
+            raise RuntimeError("dashboard down")
+        unsubscribe = dm.changes.subscribe(received.append)
+        dm.changes.subscribe(broken)
+        self._mutate(dm, ts, system_data)
+        dm.flush()
+        unsubscribe()
+        dm.add_player(system_data, "Po", "GK")
+        self.assertEqual([e.seq for e in received], [2, 3, 4, 5])
+        self.assertEqual(len(system_data.players), 6)
+        self.assertIn("[WARN: CHANGE FEED]", self._quiet._new_target.getvalue())
+        dm.close()
+
+    def test_consumer_cursor_is_resumable(self):
+        dm, ts, system_data = self._open()
+        self._mutate(dm, ts, system_data)
+        dm.flush()
+        consumer = dm.changes.consumer("medical", batch_size=3)
+        batches = [[e.seq for e in batch.events] for batch in consumer]
+        self.assertEqual(batches, [[1, 2, 3], [4]])
+        dm.add_player(system_data, "Novy", "DF")
+        dm.close()
+        consumer = ChangeFeed(feed_path_for(self.data_file)).consumer("medical")
+        self.assertEqual(consumer.cursor, 4)
+        batch = consumer.poll()
+        self.assertEqual([e.seq for e in batch.events], [5])
+        self.assertEqual(consumer.poll().cursor, 5)  # bez commit() se kurzor neposune
+        with self.assertRaises(ValueError):
+            dm.changes.consumer("../x")
+
+    def test_shared_processes_continue_numbering(self):
+        first, _, first_data = self._open(shared=True)
+        second, _, second_data = self._open(shared=True)
+        first.add_player(first_data, "A", "GK")
+        second.add_player(second_data, "B", "GK")
+        first.add_player(first_data, "C", "GK")
+        events = first.changes.read().events
+        self.assertEqual([e.seq for e in events], [1, 2, 3])
+        self.assertEqual([e.data["player"]["name"] for e in events], ["A", "B", "C"])
+        first.close()
+        second.close()
+
+    def test_cli_and_http_read_the_feed(self):
+        dm, ts, system_data = self._open()
+        self._mutate(dm, ts, system_data)
+        dm.close()
+        out = io.StringIO()
+        with contextlib.redirect_stdout(out):
+            self.assertEqual(cli_main(["changes", "--consumer", "board", "--limit", "3", "--data-file", self.data_file]), 0)
+            self.assertEqual(cli_main(["changes", "--consumer", "board", "--data-file", self.data_file]), 0)
+        lines = out.getvalue().splitlines()
+        self.assertEqual(sum(1 for l in lines if l.startswith("{")), 4)
+        self.assertEqual(lines[-1], "Next cursor: 4 (up to date)")
+
+        dm, ts, system_data = self._open()
+        server = PlannerServer(AsyncTrainingService(ts, system_data))
+        status, payload = asyncio.run(server.dispatch("GET", "/changes?since=2&limit=1"))
+        self.assertEqual(status, 200)
+        self.assertEqual([e["seq"] for e in payload["events"]], [3])
+        self.assertEqual((payload["cursor"], payload["has_more"]), (3, True))
+        self.assertEqual(asyncio.run(server.dispatch("GET", "/changes?since=x"))[0], 400)
+        dm.close()
+
+
+if __name__ == '__main__':
+    unittest.main()
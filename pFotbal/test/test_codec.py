@@ -0,0 +1,67 @@
+import json
+import unittest
+from src.models import SystemData, Player, ExerciseType, TrainingPlan, TrainingUnit, STATUS_PENDING
+from src.codec import (
+    encode, decode, dumps, loads, FORMAT_JSON, FORMAT_JSON_COMPACT, FORMAT_MARSHAL, MARSHAL_MAGIC
+)
+
+
+class TestCodec(unittest.TestCase):
+    """Tests the generated encoders/decoders and on-disk formats."""
+    # Testy serializace.
+    # اختبارات التسلسل
+
+    def setUp(self):
+        self.system_data = SystemData(
+            players=[Player(id=1, name="Jan Novák", position="Defender")],
+            exercise_types=[ExerciseType(code="SPRINT", description="Run", parameters_metadata={"distance_m": "float"})],
+            training_plans=[TrainingPlan(id=1, player_id=1, date_assigned="2025-12-02", exercises=[
+                TrainingUnit(id=1, type_code="SPRINT", specific_parameters={"distance_m": 50.0, "status": "Completed"})
+            ])],
+            id_sequences={"player": 1, "plan": 1, "unit": 1},
+        )
+
+    def test_round_trip_all_formats(self):
+        """Tests that every format restores an equal SystemData."""
+        for fmt in (FORMAT_JSON, FORMAT_JSON_COMPACT, FORMAT_MARSHAL):
+            with self.subTest(fmt=fmt):
+                self.assertEqual(loads(dumps(self.system_data, fmt)), self.system_data)
+        self.assertTrue(dumps(self.system_data, FORMAT_MARSHAL).startswith(MARSHAL_MAGIC))
+        self.assertNotIn(b"\n", dumps(self.system_data, FORMAT_JSON_COMPACT))
+
+    def test_pretty_json_matches_legacy_output(self):
+        """Tests that the default format is byte-identical to the old asdict + indent=4 output."""
+        legacy_dict = {
+            "players": [{"id": 1, "name": "Jan Novák", "position": "Defender"}],
+            "exercise_types": [{"code": "SPRINT", "description": "Run", "parameters_metadata": {"distance_m": "float"}}],
+            "training_plans": [{
+                "id": 1, "player_id": 1, "date_assigned": "2025-12-02", "target_completion_date": None,
+                "exercises": [{"id": 1, "type_code": "SPRINT",
+                               "specific_parameters": {"distance_m": 50.0, "status": "Completed"}}],
+                "status": "Pending",
+            }],
+            "id_sequences": {"player": 1, "plan": 1, "unit": 1},
+            "plan_templates": [],
+        }
+        legacy = json.dumps(legacy_dict, ensure_ascii=False, indent=4).encode('utf-8')
+        self.assertEqual(dumps(self.system_data, FORMAT_JSON), legacy)
+
+    def test_encoder_does_not_deep_copy(self):
+        """Tests that nested metadata dicts are shared, not copied."""
+        exercise_type = self.system_data.exercise_types[0]
+        self.assertIs(encode(exercise_type)["parameters_metadata"], exercise_type.parameters_metadata)
+
+    def test_decoder_fills_defaults_for_missing_keys(self):
+        """Tests that older files without newer fields still load."""
+        plan = decode(TrainingPlan, {"id": 3, "player_id": 1, "date_assigned": "2025-01-01"})
+        self.assertEqual(plan.status, STATUS_PENDING)
+        self.assertEqual(plan.exercises, [])
+        self.assertEqual(decode(SystemData, {"players": []}).id_sequences, {})
+
+    def test_unknown_format(self):
+        with self.assertRaises(ValueError):
+            dumps(self.system_data, "yaml")
+
+
+if __name__ == '__main__':
+    unittest.main()
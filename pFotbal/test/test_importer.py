@@ -0,0 +1,79 @@
+import io
+import os
+import tempfile
+import unittest
+from src.models import SystemData, ExerciseType, Player
+from src.services import DataManager, TrainingService
+from src.importer import read_jsonl, read_csv
+from src.cli import main as cli_main
+from support import CountingDataManager
+
+
+JSONL = """{"kind": "player", "ref": "p1", "name": "Jan Novák", "position": "Defender"}
+{"kind": "plan", "ref": "w1", "player_ref": "p1", "target_date": "2026-01-10"}
+{"kind": "unit", "plan_ref": "w1", "type_code": "sprint", "params": {"distance_m": "30", "repetitions": 5}}
+{"kind": "unit", "plan_ref": "w1", "type_code": "SPRINT", "params": {"distance_m": 30}}
+{"kind": "unit", "plan_ref": "w1", "type_code": "SPRINT", "params": {"distance_m": 30, "repetitions": "x"}}
+{"kind": "plan", "player_id": 999}
+not json
+{"kind": "unit", "plan_ref": "w1", "type_code": "SPRINT", "params": {"distance_m": 40.5, "repetitions": 2, "speed": 1}}
+"""
+
+
+class TestBulkImport(unittest.TestCase):
+    """Tests the streaming bulk import."""
+    # Testy hromadneho importu.
+    # اختبارات الاستيراد الجماعي
+
+    def setUp(self):
+        self.system_data = SystemData(exercise_types=[
+            ExerciseType(code="SPRINT", parameters_metadata={"distance_m": "float", "repetitions": "int"})
+        ])
+        self.dm = CountingDataManager()
+        self.ts = TrainingService(self.dm)
+
+    def test_valid_rows_imported_and_bad_rows_reported(self):
+        report = self.ts.bulk_import(self.system_data, read_jsonl(io.StringIO(JSONL)))
+        self.assertEqual((report.players_added, report.plans_added, report.units_added), (1, 1, 1))
+        self.assertEqual([r.line for r in report.rejected], [4, 5, 6, 7, 8])
+        self.assertIn("Missing parameters", report.rejected[0].message)
+        self.assertIn("Unknown parameters", report.rejected[4].message)
+
+        unit = self.system_data.training_plans[0].exercises[0]
+        self.assertEqual(unit.parameters_dict(), {"distance_m": 30.0, "repetitions": 5})
+        self.assertEqual(self.system_data.training_plans[0].target_completion_date, "2026-01-10")
+
+    def test_one_write_per_batch(self):
+        """Tests that each batch is persisted with a single write."""
+        # Kazda davka = jeden zapis.
+        rows = [(i, {"kind": "player", "name": f"P{i}", "position": "MF"}) for i in range(1, 251)]
+        report = self.ts.bulk_import(self.system_data, iter(rows), batch_size=100)
+        self.assertEqual(report.players_added, 250)
+        self.assertEqual(report.batches, 3)
+        self.assertEqual(self.dm.saves, 3)
+
+    def test_csv_parameters_from_extra_columns(self):
+        self.system_data.players.append(Player(id=7, name="A", position="GK"))
+        csv_text = ("kind,ref,player_id,plan_ref,type_code,distance_m,repetitions\n"
+                    "plan,w,7,,,,\n"
+                    "unit,,,w,SPRINT,25.5,4\n")
+        report = self.ts.bulk_import(self.system_data, read_csv(io.StringIO(csv_text)))
+        self.assertTrue(report.ok, report.rejected)
+        self.assertEqual(self.system_data.training_plans[0].exercises[0].specific_parameters["repetitions"], 4)
+
+    def test_import_command(self):
+        """Tests the non-interactive import command against a temporary data file."""
+        with tempfile.TemporaryDirectory() as tmp_dir:
+            source = os.path.join(tmp_dir, "rows.jsonl")
+            with open(source, "w", encoding="utf-8") as f:
+                f.write(JSONL)
+            data_file = os.path.join(tmp_dir, "system_data.json")
+            self.assertEqual(cli_main(["import", source, "--data-file", data_file]), 2)
+
+            reloaded = DataManager(data_file).load_data()
+            self.assertEqual(reloaded.players[0].name, "Jan Novák")
+            self.assertEqual(len(reloaded.training_plans[0].exercises), 1)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,94 @@
+import os
+import tempfile
+import unittest
+from src.models import STATUS_COMPLETED
+from src.services import DataManager, TrainingService, MODE_JOURNAL
+
+
+class TestJournaledPersistence(unittest.TestCase):
+    """Tests the append-only journal mode of DataManager."""
+    # Testy zurnalovaciho rezimu.
+    # اختبارات وضع السجل
+
+    def setUp(self):
+        self.tmp_dir = tempfile.TemporaryDirectory()
+        self.path = os.path.join(self.tmp_dir.name, "system_data.json")
+        self.dm = self._open()
+
+    def tearDown(self):
+        self.dm.close()
+        self.tmp_dir.cleanup()
+
+    def _open(self, **kwargs) -> DataManager:
+        return DataManager(self.path, persistence_mode=MODE_JOURNAL, **kwargs)
+
+    def _build_plan(self, dm: DataManager):
+        ts = TrainingService(dm)
+        system_data = dm.load_data()
+        player = dm.add_player(system_data, "Jan Novák", "Defender")
+        plan = ts.create_training_plan(system_data, player.id, None)
+        unit = ts.add_exercise_to_plan(system_data, plan.id, "SPRINT", {"distance_m": 30.0, "repetitions": 5})
+        ts.mark_exercise_completed(system_data, plan.id, unit.id)
+        return system_data
+
+    def test_mutations_append_records_and_replay(self):
+        """Tests that mutations only touch the journal and are replayed on load."""
+        snapshot_before = os.path.getsize(self.path) if os.path.exists(self.path) else None
+        self._build_plan(self.dm)
+        self.assertEqual(os.path.getsize(self.path), snapshot_before or os.path.getsize(self.path))
+        self.assertEqual(self.dm.journal.record_count, 4)
+
+        reloaded = self._open().load_data()
+        self.assertEqual(reloaded.players[0].name, "Jan Novák")
+        plan = reloaded.training_plans[0]
+        self.assertEqual(plan.status, STATUS_COMPLETED)
+        self.assertEqual(plan.exercises[0].specific_parameters["status"], STATUS_COMPLETED)
+        self.assertEqual(reloaded.id_sequences["unit"], 1)
+
+    def test_plan_template_records_replay(self):
+        """Tests that a template and its assignment are one journal append and replay on load."""
+        ts = TrainingService(self.dm)
+        system_data = self.dm.load_data()
+        self.dm.add_player(system_data, "A", "Forward")
+        self.dm.add_player(system_data, "B", "Forward")
+        ts.save_plan_template(system_data, "Speed", [("SPRINT", {"distance_m": 30.0, "repetitions": 5})] * 2)
+        size = self.dm.journal.size_bytes
+        ts.assign_plan_template(system_data, "Speed", position="forward")
+        self.assertEqual(self.dm.journal.record_count, 3 + 2 + 4)
+        self.assertGreater(self.dm.journal.size_bytes, size)
+
+        reloaded = self._open().load_data()
+        self.assertEqual(len(reloaded.plan_templates[0].units), 2)
+        self.assertEqual([len(p.exercises) for p in reloaded.training_plans], [2, 2])
+
+    def test_compaction_on_record_threshold(self):
+        """Tests that passing the record limit writes a snapshot and empties the journal."""
+        # Po prekroceni limitu se zurnal zkompaktuje do snapshotu.
+        self.dm.close()
+        self.dm = self._open(journal_max_records=3)
+        self._build_plan(self.dm)
+        self.assertEqual(self.dm.journal.record_count, 1)
+
+        # Snapshot + zbytek zurnalu dava stejny stav a nic se neprehraje dvakrat.
+        reloaded = self._open().load_data()
+        self.assertEqual(len(reloaded.players), 1)
+        self.assertEqual(len(reloaded.training_plans[0].exercises), 1)
+        self.assertEqual(reloaded.training_plans[0].status, STATUS_COMPLETED)
+
+    def test_torn_last_record_is_dropped(self):
+        """Tests that a partially written record from a crash is ignored."""
+        system_data = self.dm.load_data()
+        self.dm.add_player(system_data, "A", "GK")
+        with open(self.dm.journal.path, 'a', encoding='utf-8') as f:
+            f.write('{"op":"add_player","player":{"id":2')
+
+        dm = self._open()
+        self.assertEqual(dm.journal.record_count, 1)
+        reloaded = dm.load_data()
+        self.assertEqual([p.id for p in reloaded.players], [1])
+        self.assertEqual(dm.add_player(reloaded, "B", "GK").id, 2)
+        self.assertEqual(len(self._open().load_data().players), 2)
+
+
+if __name__ == '__main__':
+    unittest.main()
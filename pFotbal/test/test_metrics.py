@@ -0,0 +1,106 @@
+import contextlib
+import io
+import json
+import os
+import tempfile
+import unittest
+from src import metrics
+from src.metrics import registry, MetricsRegistry
+from src.services import DataManager, TrainingService
+from src.cli import main as cli_main
+
+
+def _find(items, name, **labels):
+    return next((i for i in items if i["name"] == name and all(i["labels"].get(k) == v for k, v in labels.items())), None)
+
+
+class TestMetricsRegistry(unittest.TestCase):
+    """Tests counters, histograms and the export formats."""
+    # Testy registru metrik.
+    # اختبارات سجل المقاييس
+
+    def setUp(self):
+        self.registry = MetricsRegistry()
+        self.registry.enabled = True
+
+    def test_disabled_registry_records_nothing(self):
+        self.registry.enabled = False
+        self.registry.inc("c")
+        self.registry.observe("h", 0.1)
+        self.assertEqual(self.registry.snapshot(), {"counters": [], "gauges": [], "histograms": []})
+
+    def test_histogram_buckets_are_cumulative(self):
+        for value in (0.00001, 0.002, 0.002, 20.0):
+            self.registry.observe("latency", value, method="x")
+        histogram = self.registry.snapshot()["histograms"][0]
+        self.assertEqual(histogram["count"], 4)
+        self.assertEqual(histogram["buckets"]["1e-05"], 1)
+        self.assertEqual(histogram["buckets"]["0.005"], 3)
+        self.assertEqual(histogram["buckets"]["+Inf"], 4)
+
+    def test_prometheus_text(self):
+        self.registry.describe("pfl_calls_total", "Calls.")
+        self.registry.inc("pfl_calls_total", method='A."b"')
+        self.registry.set_gauge("pfl_save_queue_depth", 2)
+        text = self.registry.to_prometheus()
+        self.assertIn("# TYPE pfl_calls_total counter", text)
+        self.assertIn('pfl_calls_total{method="A.\\"b\\""} 1', text)
+        self.assertIn("pfl_save_queue_depth 2", text)
+
+    def test_export_format_from_extension(self):
+        self.registry.inc("c")
+        with tempfile.TemporaryDirectory() as tmp_dir:
+            self.registry.export(os.path.join(tmp_dir, "m.json"))
+            self.registry.export(os.path.join(tmp_dir, "m.prom"))
+            with open(os.path.join(tmp_dir, "m.json"), encoding="utf-8") as f:
+                self.assertEqual(json.load(f)["counters"][0]["value"], 1)
+            with open(os.path.join(tmp_dir, "m.prom"), encoding="utf-8") as f:
+                self.assertIn("c 1", f.read())
+
+
+class TestInstrumentation(unittest.TestCase):
+    """Tests the service and persistence instrumentation."""
+
+    def tearDown(self):
+        metrics.disable()
+        registry.reset()
+
+    def test_methods_are_wrapped_only_while_enabled(self):
+        original = TrainingService.__dict__["find_plan"]
+        metrics.enable()
+        self.assertIsNot(TrainingService.__dict__["find_plan"], original)
+        metrics.disable()
+        self.assertIs(TrainingService.__dict__["find_plan"], original)
+
+    def test_calls_saves_and_load_are_measured(self):
+        metrics.enable()
+        with tempfile.TemporaryDirectory() as tmp_dir:
+            data_file = os.path.join(tmp_dir, "system_data.json")
+            dm = DataManager(data_file, shared=False)  # background writer path
+            ts = TrainingService(dm)
+            with contextlib.redirect_stdout(io.StringIO()):
+                system_data = dm.load_data()
+                ts.dm.add_player(system_data, "Jan", "DF")
+                ts.find_player(system_data, 1)
+                ts.find_player(system_data, 2)
+                dm.close()
+        snap = registry.snapshot()
+        self.assertEqual(_find(snap["counters"], "pfl_calls_total", method="TrainingService.find_player")["value"], 2)
+        self.assertEqual(_find(snap["histograms"], "pfl_call_seconds", method="DataManager.add_player")["count"], 1)
+        self.assertGreaterEqual(_find(snap["counters"], "pfl_saves_total")["value"], 1)
+        self.assertGreater(_find(snap["histograms"], "pfl_save_bytes")["sum"], 0)
+        self.assertEqual(_find(snap["histograms"], "pfl_load_seconds")["count"], 1)
+        self.assertEqual(_find(snap["gauges"], "pfl_save_queue_depth")["value"], 0)
+
+    def test_cli_metrics_out(self):
+        with tempfile.TemporaryDirectory() as tmp_dir:
+            data_file = os.path.join(tmp_dir, "system_data.json")
+            out_file = os.path.join(tmp_dir, "metrics.prom")
+            with contextlib.redirect_stdout(io.StringIO()):
+                cli_main(["--metrics-out", out_file, "report", "sprint", "--data-file", data_file])
+            with open(out_file, encoding="utf-8") as f:
+                self.assertIn("pfl_load_seconds_count 1", f.read())
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,73 @@
+import pickle
+import unittest
+from src.models import (
+    Player, TrainingPlan, TrainingUnit, ParameterSchema, STATUS_COMPLETED
+)
+
+
+class TestCompactModels(unittest.TestCase):
+    """Tests slot-based models and the packed TrainingUnit parameters."""
+    # Testy kompaktnich modelu.
+    # اختبارات النماذج المضغوطة
+
+    def test_models_have_no_instance_dict(self):
+        for obj in (Player(id=1), TrainingPlan(id=1), TrainingUnit(id=1)):
+            with self.subTest(model=type(obj).__name__):
+                self.assertFalse(hasattr(obj, "__dict__"))
+
+    def test_numeric_parameters_are_packed_exactly(self):
+        """Tests that ints and floats round-trip with their original types."""
+        unit = TrainingUnit(id=1, type_code="SPRINT", specific_parameters={"distance_m": 50.5, "repetitions": 10, "note": "wet pitch"})
+        self.assertEqual(unit.parameters_dict(), {"distance_m": 50.5, "repetitions": 10, "note": "wet pitch"})
+        self.assertIsInstance(unit.specific_parameters["repetitions"], int)
+        self.assertEqual(unit._schema.keys, ("distance_m", "repetitions"))
+        self.assertEqual(unit._extra, {"note": "wet pitch"})
+
+    def test_schema_is_shared_between_units_of_same_shape(self):
+        a = TrainingUnit(id=1, specific_parameters={"shots_taken": 20, "goals_scored": 12})
+        b = TrainingUnit(id=2, specific_parameters={"shots_taken": 5, "goals_scored": 1})
+        self.assertIs(a._schema, b._schema)
+
+    def test_declared_metadata_coerces_types(self):
+        """Tests that parameters_metadata decides the packed type."""
+        unit = TrainingUnit(id=1, specific_parameters={"distance_m": 50, "repetitions": 3},
+                            parameters_metadata={"distance_m": "float", "repetitions": "int"})
+        self.assertIsInstance(unit.specific_parameters["distance_m"], float)
+        self.assertEqual(unit._schema.kinds, ("float", "int"))
+
+    def test_status_is_first_class_and_visible_in_view(self):
+        """Tests the backward-compatible dict view of status."""
+        # Stav ze starych dat se presune do pole status.
+        unit = TrainingUnit(id=1, specific_parameters={"repetitions": 3, "status": STATUS_COMPLETED})
+        self.assertEqual(unit.status, STATUS_COMPLETED)
+        self.assertEqual(unit.specific_parameters.get("status"), STATUS_COMPLETED)
+
+        fresh = TrainingUnit(id=2, specific_parameters={"repetitions": 3})
+        self.assertIsNone(fresh.specific_parameters.get("status"))
+        fresh.specific_parameters["status"] = STATUS_COMPLETED
+        self.assertEqual(fresh.status, STATUS_COMPLETED)
+        self.assertEqual(list(fresh.specific_parameters), ["repetitions", "status"])
+
+    def test_view_mutations(self):
+        unit = TrainingUnit(id=1, specific_parameters={"repetitions": 3})
+        view = unit.specific_parameters
+        view["repetitions"] = 4
+        view["height_cm"] = 30.5
+        view["repetitions"] = "many"
+        self.assertEqual(dict(view), {"height_cm": 30.5, "repetitions": "many"})
+        del view["repetitions"]
+        self.assertEqual(view, {"height_cm": 30.5})
+        with self.assertRaises(KeyError):
+            view["repetitions"]
+
+    def test_equality_and_pickle(self):
+        unit = TrainingUnit(id=1, type_code="JUMP", specific_parameters={"jumps_count": 10, "height_cm": 40.0}, status=STATUS_COMPLETED)
+        clone = pickle.loads(pickle.dumps(unit))
+        self.assertEqual(clone, unit)
+        self.assertIs(clone._schema, unit._schema)
+        self.assertNotEqual(clone, TrainingUnit(id=1, type_code="JUMP", specific_parameters={"jumps_count": 10, "height_cm": 40.0}))
+        self.assertIsInstance(ParameterSchema.get((("a", "int"),)), ParameterSchema)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,127 @@
+import contextlib
+import io
+import os
+import random
+import tempfile
+import unittest
+from src.models import SystemData, Player, TrainingPlan, TrainingUnit, STATUS_PENDING, STATUS_COMPLETED
+from src.codec import dumps
+from src.query import PlanQuery, ORDER_ID, ORDER_ASSIGNED
+from src.repository import SystemRepository
+from src.services import TrainingService
+from src.cli import main as cli_main
+
+
+def _dataset(plans: int = 60, seed: int = 4) -> SystemData:
+    rnd = random.Random(seed)
+    system_data = SystemData(players=[Player(id=i, name=f"P{i}", position="MF") for i in range(1, 6)])
+    unit_id = 0
+    for plan_id in range(1, plans + 1):
+        units = []
+        for _ in range(3):
+            unit_id += 1
+            units.append(TrainingUnit(id=unit_id, type_code=rnd.choice(("SPRINT", "JUMP")),
+                                      status=STATUS_COMPLETED if rnd.random() < 0.4 else None))
+        system_data.training_plans.append(TrainingPlan(
+            id=plan_id, player_id=rnd.randint(1, 5), date_assigned=f"2026-0{rnd.randint(1, 6)}-{rnd.randint(10, 28)}",
+            target_completion_date=f"2026-0{rnd.randint(2, 9)}-15" if rnd.random() < 0.7 else None,
+            exercises=units, status=rnd.choice((STATUS_PENDING, STATUS_COMPLETED))))
+    return system_data
+
+
+class TestPlanQueries(unittest.TestCase):
+    """Tests plan/unit filters, bisect date indexes and cursor pagination."""
+    # Testy dotazu na plany a jednotky a strankovani.
+    # اختبارات الاستعلامات والترقيم
+
+    def setUp(self):
+        self.system_data = _dataset()
+        self.ts = TrainingService(None)
+        self.plans = self.system_data.training_plans
+
+    def _all_pages(self, query, limit=7):
+        items, cursor = [], None
+        while True:
+            page = self.ts.page_plans(self.system_data, query, limit, cursor)
+            items.extend(page.items)
+            if page.next_cursor is None:
+                return items
+            cursor = page.next_cursor
+
+    def test_date_range_uses_sorted_order(self):
+        query = PlanQuery(assigned_from="2026-02-01", assigned_to="2026-04-28")
+        expected = sorted((p for p in self.plans if "2026-02-01" <= p.date_assigned <= "2026-04-28"),
+                          key=lambda p: (p.date_assigned, p.id))
+        self.assertEqual(list(self.ts.query_plans(self.system_data, query)), expected)
+        self.assertEqual(self._all_pages(query), expected)
+
+    def test_combined_filters_in_id_order(self):
+        query = PlanQuery(player_id=2, status=STATUS_PENDING, due_to="2026-06-30", order_by=ORDER_ID)
+        expected = [p for p in self.plans if p.player_id == 2 and p.status == STATUS_PENDING
+                    and p.target_completion_date and p.target_completion_date <= "2026-06-30"]
+        self.assertEqual(self._all_pages(query, limit=2), expected)
+        query.player_id = None
+        expected = [p for p in self.plans if p.status == STATUS_PENDING
+                    and p.target_completion_date and p.target_completion_date <= "2026-06-30"]
+        self.assertEqual(self._all_pages(query, limit=3), expected)
+
+    def test_overdue(self):
+        query = PlanQuery(overdue=True, today="2026-05-15")
+        expected = sorted((p for p in self.plans if p.status == STATUS_PENDING and p.target_completion_date
+                           and p.target_completion_date < "2026-05-15"),
+                          key=lambda p: (p.target_completion_date, p.id))
+        self.assertTrue(expected)
+        self.assertEqual(self._all_pages(query, limit=4), expected)
+
+    def test_player_plans_in_date_order(self):
+        query = PlanQuery(player_id=3, order_by=ORDER_ASSIGNED)
+        expected = sorted((p for p in self.plans if p.player_id == 3), key=lambda p: (p.date_assigned, p.id))
+        self.assertEqual(self._all_pages(query, limit=2), expected)
+
+    def test_queries_are_lazy_and_see_new_plans(self):
+        repo = SystemRepository.of(self.system_data)
+        query = PlanQuery(assigned_from="2026-01-01")
+        results = self.ts.query_plans(self.system_data, query)
+        first = next(results)
+        repo.add_plan(TrainingPlan(id=500, player_id=1, date_assigned="2026-12-31"))
+        rest = list(results)
+        self.assertEqual(rest[-1].id, 500)
+        self.assertEqual(len({p.id for p in [first] + rest}), len(rest) + 1)
+
+    def test_units_by_type_and_status_with_cursor(self):
+        query = PlanQuery(status=STATUS_PENDING)
+        expected = [(p.id, u.id) for p in self.plans if p.status == STATUS_PENDING
+                    for u in p.exercises if u.type_code == "JUMP" and u.status != STATUS_COMPLETED]
+        seen, cursor = [], None
+        while True:
+            page = self.ts.page_units(self.system_data, query, "JUMP", STATUS_PENDING, 5, cursor)
+            seen.extend((p.id, u.id) for p, u in page.items)
+            if page.next_cursor is None:
+                break
+            cursor = page.next_cursor
+        self.assertEqual(seen, expected)
+
+    def test_invalid_input(self):
+        with self.assertRaises(ValueError):
+            PlanQuery(assigned_from="01/02/2026")
+        with self.assertRaises(ValueError):
+            list(self.ts.query_plans(self.system_data, PlanQuery(), cursor="garbage"))
+        with self.assertRaises(ValueError):
+            self.ts.page_players(self.system_data, cursor="x")
+
+    def test_cli_plans_command(self):
+        with tempfile.TemporaryDirectory() as tmp_dir:
+            data_file = os.path.join(tmp_dir, "system_data.json")
+            with open(data_file, "wb") as f:
+                f.write(dumps(self.system_data))
+            out = io.StringIO()
+            with contextlib.redirect_stdout(out):
+                code = cli_main(["plans", "--player", "1", "--limit", "2", "--data-file", data_file])
+            self.assertEqual(code, 0)
+            lines = out.getvalue().splitlines()
+            self.assertEqual(len([l for l in lines if l.startswith("PLAN ID")]), 2)
+            self.assertTrue(lines[-1].startswith("Next cursor: "))
+
+
+if __name__ == '__main__':
+    unittest.main()
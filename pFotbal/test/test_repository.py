@@ -0,0 +1,51 @@
+import unittest
+from src.models import SystemData, Player, ExerciseType, TrainingPlan, TrainingUnit
+from src.repository import SystemRepository
+
+
+class TestSystemRepository(unittest.TestCase):
+
+    def setUp(self):
+        """Setup a small dataset with two players and one plan."""
+        # Nastaveni testovacich dat pred kazdym testem.
+        self.system_data = SystemData(
+            players=[Player(id=1, name="Jan Novak", position="Defender"), Player(id=2, name="Petr Dvorak", position="Forward")],
+            exercise_types=[ExerciseType(code="SPRINT", parameters_metadata={"distance_m": "float"})],
+            training_plans=[TrainingPlan(id=10, player_id=1, exercises=[TrainingUnit(id=5, type_code="SPRINT")])],
+        )
+        self.repo = SystemRepository.of(self.system_data)
+
+    def test_repository_is_cached_per_system_data(self):
+        """The same repository instance is returned for the same SystemData."""
+        self.assertIs(SystemRepository.of(self.system_data), self.repo)
+        self.assertIsNot(SystemRepository.of(SystemData()), self.repo)
+
+    def test_lookups(self):
+        """Tests id, code and player_id lookups."""
+        # Testuje vyhledavani pres indexy.
+        self.assertEqual(self.repo.get_player(2).name, "Petr Dvorak")
+        self.assertIsNone(self.repo.get_player(99))
+        self.assertEqual(self.repo.get_exercise_type("SPRINT").code, "SPRINT")
+        self.assertEqual([p.id for p in self.repo.plans_for_player(1)], [10])
+        self.assertEqual(self.repo.plans_for_player(2), [])
+        self.assertEqual(self.repo.get_unit(10, 5).type_code, "SPRINT")
+        self.assertIsNone(self.repo.get_unit(10, 6))
+
+    def test_mutations_keep_indexes_current(self):
+        """Entities added through the repository are immediately indexed."""
+        plan = self.repo.add_plan(TrainingPlan(id=11, player_id=2))
+        self.repo.add_unit(plan, TrainingUnit(id=6, type_code="SPRINT"))
+        self.assertIs(self.repo.get_plan(11), plan)
+        self.assertEqual([p.id for p in self.repo.plans_for_player(2)], [11])
+        self.assertEqual(self.repo.get_unit(11, 6).id, 6)
+        self.assertEqual(len(self.system_data.training_plans), 2)
+
+    def test_direct_list_mutation_triggers_reindex(self):
+        """Lists changed behind the repository's back are picked up on the next lookup."""
+        # Primo pridany hrac musi byt nalezen.
+        self.system_data.players.append(Player(id=3, name="Direct", position="GK"))
+        self.assertEqual(self.repo.get_player(3).name, "Direct")
+
+
+if __name__ == '__main__':
+    unittest.main()
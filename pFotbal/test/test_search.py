@@ -0,0 +1,115 @@
+import asyncio
+import contextlib
+import io
+import os
+import tempfile
+import time
+import unittest
+from src.models import SystemData, Player
+from src.codec import dumps
+from src.search import PlayerSearchIndex, normalize, prefix_distance
+from src.services import TrainingService
+from src.synthetic import generate_system_data
+from src.async_service import AsyncTrainingService
+from src.server import PlannerServer
+from src.cli import main as cli_main
+from support import CountingDataManager
+
+
+class TestPlayerSearch(unittest.TestCase):
+    """Tests prefix, diacritic-insensitive and fuzzy player search and name resolution in the CLI."""
+    # Testy vyhledavani hracu.
+    # اختبارات البحث عن اللاعبين
+
+    def setUp(self):
+        self.system_data = SystemData(players=[
+            Player(id=1, name="Tomáš Novák", position="Forward"),
+            Player(id=2, name="Jan Novotný", position="Defender"),
+            Player(id=3, name="Jan Nováková", position="Midfielder"),
+            Player(id=4, name="Antonín Dvořák", position="Goalkeeper"),
+            Player(id=5, name="Ahmed Saleh", position="Forward"),
+            Player(id=6, name="Jan Novák", position="Defender"),
+        ])
+        self.ts = TrainingService(CountingDataManager())
+
+    def _names(self, query, limit=10):
+        return [p.name for p in self.ts.search_players(self.system_data, query, limit)]
+
+    def test_prefix_and_diacritics(self):
+        self.assertEqual(normalize("Dvořák ŁÓDŹ"), "dvorak lodz")
+        self.assertEqual(self._names("dvor"), ["Antonín Dvořák"])
+        self.assertEqual(self._names("DVOŘÁK"), ["Antonín Dvořák"])
+        # Presna shoda slova pred prefixem, pak jmeno zacinajici dotazem.
+        self.assertEqual(self._names("novak"), ["Jan Novák", "Tomáš Novák", "Jan Nováková"])
+        self.assertEqual(self._names("nov", 2), ["Jan Novák", "Jan Nováková"])
+        self.assertEqual(self._names("jan nov"), ["Jan Novák", "Jan Nováková", "Jan Novotný"])
+        self.assertEqual(self._names("novak jan"), ["Jan Novák", "Jan Nováková"])
+        self.assertEqual(self._names("forw"), ["Ahmed Saleh", "Tomáš Novák"])
+        self.assertEqual(self._names("  "), [])
+        self.assertEqual(self._names("4"), ["Antonín Dvořák"])  # cislo = ID
+
+    def test_typos(self):
+        self.assertEqual(prefix_distance("novka", "novak", 1), 1)  # prehozena pismena
+        self.assertEqual(prefix_distance("salhe", "saleh", 2), 1)
+        self.assertEqual(prefix_distance("xyz", "saleh", 1), 2)
+        self.assertEqual(self._names("novka")[:2], ["Jan Novák", "Tomáš Novák"])
+        self.assertEqual(self._names("dvorka"), ["Antonín Dvořák"])
+        self.assertEqual(self._names("ahmde saleh"), ["Ahmed Saleh"])
+        self.assertEqual(self._names("dovrak antonin"), ["Antonín Dvořák"])
+        self.assertEqual(self._names("sx"), [])  # kratka slova bez preklepu
+        self.assertEqual(self._names("qwerty"), [])
+
+    def test_index_follows_new_players(self):
+        repo = self.ts.repo(self.system_data)
+        index = repo.player_index()
+        self.assertIs(repo.player_index(), index)
+        self.assertEqual(self._names("ševč"), [])
+        self.ts.dm.add_player = None  # pridani jde primo pres repozitar
+        repo.add_player(Player(id=7, name="Karel Ševčík", position="Defender"))
+        self.assertIs(repo.player_index(), index)
+        self.assertEqual(len(index), 7)
+        self.assertEqual(self._names("sevc"), ["Karel Ševčík"])
+        self.assertEqual(self.ts.resolve_player(self.system_data, "Jan Novák").id, 6)  # presne jmeno
+        self.assertEqual(self.ts.resolve_player(self.system_data, "sevcik").id, 7)
+        for ambiguous in ("jan", "nobody", "99"):
+            with self.assertRaises(ValueError):
+                self.ts.resolve_player(self.system_data, ambiguous)
+
+    def test_keystrokes_on_large_squad(self):
+        system_data = generate_system_data(players=2000, plans_per_player=0, units_per_plan=0, seed=7)
+        index = PlayerSearchIndex(system_data.players)
+        target = system_data.players[1234]
+        queries = [target.name[:i] for i in range(1, len(target.name) + 1)]
+        start = time.perf_counter()
+        for query in queries:
+            results = index.search(query)
+        elapsed = (time.perf_counter() - start) / len(queries)
+        self.assertEqual(results[0].name, target.name)
+        self.assertLess(elapsed, 0.01)  # cil je pod 1 ms; rezerva pro pomale stroje
+
+    def test_cli_and_http_accept_names(self):
+        from src.models import TrainingPlan
+        self.system_data.training_plans = [TrainingPlan(id=i, player_id=4 if i % 2 else 5, date_assigned="2026-01-01")
+                                           for i in range(1, 5)]
+        with tempfile.TemporaryDirectory() as tmp_dir:
+            data_file = os.path.join(tmp_dir, "system_data.json")
+            with open(data_file, "wb") as f:
+                f.write(dumps(self.system_data))
+            out = io.StringIO()
+            with contextlib.redirect_stdout(out):
+                self.assertEqual(cli_main(["plans", "--player", "dvorak", "--data-file", data_file]), 0)
+                self.assertEqual(cli_main(["plans", "--player", "jan", "--data-file", data_file]), 1)
+            lines = out.getvalue().splitlines()
+            self.assertEqual([l.split()[2] for l in lines if l.startswith("PLAN ID")], ["1", "3"])
+            self.assertTrue(lines[-1].startswith("ERROR: 'jan' matches several players"))
+
+        server = PlannerServer(AsyncTrainingService(self.ts, self.system_data))
+        status, payload = asyncio.run(server.dispatch("GET", "/players?q=novak&limit=2"))
+        self.assertEqual(status, 200)
+        self.assertEqual([p["id"] for p in payload], [6, 1])
+        self.assertEqual(len(asyncio.run(server.dispatch("GET", "/players"))[1]), 6)
+        self.assertEqual(asyncio.run(server.dispatch("GET", "/players?q=a&limit=x"))[0], 400)
+
+
+if __name__ == '__main__':
+    unittest.main()
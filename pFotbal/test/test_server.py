@@ -0,0 +1,211 @@
+import asyncio
+import contextlib
+import io
+import os
+import tempfile
+import unittest
+from collections import deque
+from src.models import STATUS_COMPLETED
+from src.codec import dumps
+from src.services import DataManager, TrainingService, MODE_JOURNAL, MODE_SNAPSHOT
+from src.synthetic import generate_system_data
+from src.async_service import AsyncTrainingService
+from src.server import PlannerServer
+from src.loadtest import HttpClient, run_self_hosted
+
+
+class TestAsyncService(unittest.TestCase):
+    """Tests the asyncio service and the HTTP API on a temporary data file."""
+    # Testy asynchronni sluzby a HTTP API.
+    # اختبارات الخدمة غير المتزامنة وواجهة HTTP
+
+    def setUp(self):
+        self.tmp_dir = tempfile.TemporaryDirectory()
+        self.data_file = os.path.join(self.tmp_dir.name, "system_data.json")
+        with open(self.data_file, "wb") as f:
+            f.write(dumps(generate_system_data(players=5, plans_per_player=2, units_per_plan=4, completed_ratio=0, seed=1)))
+        self.dm = DataManager(self.data_file, persistence_mode=MODE_JOURNAL, shared=False)
+        self.service = AsyncTrainingService(TrainingService(self.dm), self.dm.load_data())
+        self._quiet = contextlib.redirect_stdout(io.StringIO())
+        self._quiet.__enter__()
+
+    def tearDown(self):
+        self.dm.close()
+        self._quiet.__exit__(None, None, None)
+        self.tmp_dir.cleanup()
+
+    def _reload(self):
+        return DataManager(self.data_file, persistence_mode=MODE_JOURNAL, shared=False).load_data()
+
+    def test_concurrent_writes_are_batched_and_persisted(self):
+        plan = self.service.system_data.training_plans[0]
+        unit_ids = [u.id for u in plan.exercises]
+
+        async def scenario():
+            async with self.service:
+                return await asyncio.gather(*(self.service.mark_exercise_completed(plan.id, u) for u in unit_ids))
+
+        self.assertEqual(asyncio.run(scenario()), [True] * len(unit_ids))
+        self.assertEqual(self.service.batches_written, 1)
+        reloaded = self._reload()
+        self.assertEqual(reloaded.training_plans[0].status, STATUS_COMPLETED)
+
+    def test_write_errors_reach_the_caller(self):
+        async def scenario():
+            async with self.service:
+                with self.assertRaises(ValueError):
+                    await self.service.add_exercise_to_plan(1, "SPRINT", {"distance_m": 10.0})
+                return await self.service.add_player("Nový", "GK")
+
+        player = asyncio.run(scenario())
+        self.assertEqual(player.id, 6)
+        self.assertEqual(self._reload().players[-1].name, "Nový")
+
+    def test_failed_save_rolls_the_batch_back(self):
+        """Tests that a write whose save failed is undone and not written by the next save."""
+        dm = DataManager(self.data_file, persistence_mode=MODE_SNAPSHOT, shared=False)
+        service = AsyncTrainingService(TrainingService(dm), dm.load_data())
+        save = dm.backend.save
+
+        def failing(data):
+            raise OSError("disk full")
+        dm.backend.save = failing
+
+        async def scenario():
+            async with service:
+                with self.assertRaises(OSError):
+                    await service.add_player("Ztracený", "GK")
+                dm.backend.save = save
+                return await service.add_player("Uložený", "DF")
+
+        player = asyncio.run(scenario())
+        dm.close()
+        self.assertIsNone(service.failed)
+        self.assertEqual(player.id, 7)  # undo sekvence ID nevraci
+        names = [p.name for p in self._reload().players]
+        self.assertNotIn("Ztracený", names)
+        self.assertEqual(names[-1], "Uložený")
+
+    def test_failed_save_without_undo_point_stops_writes(self):
+        """Tests that without undo history a failed save disables further writes."""
+        dm = DataManager(self.data_file, persistence_mode=MODE_SNAPSHOT, shared=False)
+        service = AsyncTrainingService(TrainingService(dm), dm.load_data())
+        service.ts.repo(service.system_data).history = deque(maxlen=0)  # UNDO_DEPTH = 0
+
+        def failing(data):
+            raise OSError("disk full")
+        dm.backend.save = failing
+
+        async def scenario():
+            async with service:
+                with self.assertRaises(OSError):
+                    await service.add_player("Ztracený", "GK")
+                with self.assertRaises(RuntimeError):
+                    await service.add_player("Další", "DF")
+
+        asyncio.run(scenario())
+        dm.close()
+        self.assertIsInstance(service.failed, OSError)
+
+    def test_shared_file_io_runs_off_the_loop(self):
+        """Tests that a shared-file write merges another process's change and does no file I/O on the loop thread."""
+        import threading
+        dm = DataManager(self.data_file, shared=True)
+        service = AsyncTrainingService(TrainingService(dm), dm.load_data())
+        other = DataManager(self.data_file, shared=True)
+        other.add_player(other.load_data(), "Cizí", "DF")
+        io_threads = []
+        for name in ("begin_shared_write", "end_shared_write"):
+            original = getattr(dm, name)
+            def spy(*args, _original=original):
+                io_threads.append(threading.current_thread())
+                return _original(*args)
+            setattr(dm, name, spy)
+
+        async def scenario():
+            async with service:
+                return await service.add_player("Vlastní", "GK"), threading.current_thread()
+
+        (player, loop_thread) = asyncio.run(scenario())
+        other.close()
+        dm.close()
+        self.assertEqual(len(io_threads), 2)
+        self.assertNotIn(loop_thread, io_threads)
+        self.assertEqual(player.id, 7)  # ID 6 uz ma hrac druheho procesu
+        self.assertEqual([p.name for p in self._reload().players[-2:]], ["Cizí", "Vlastní"])
+
+    def test_dispatch_routes(self):
+        server = PlannerServer(self.service)
+
+        async def scenario():
+            async with self.service:
+                results = {
+                    "plan": await server.dispatch("GET", "/plans/1"),
+                    "missing": await server.dispatch("GET", "/plans/999"),
+                    "method": await server.dispatch("DELETE", "/plans/1"),
+                    "unknown": await server.dispatch("GET", "/nothing"),
+                    "bad_json": await server.dispatch("POST", "/players", b"{"),
+                    "created": await server.dispatch("POST", "/players", b'{"name": "A", "position": "DF"}'),
+                    "complete": await server.dispatch("POST", "/plans/1/units/1/complete"),
+                    "progress": await server.dispatch("GET", "/progress"),
+                }
+            return results
+
+        r = asyncio.run(scenario())
+        self.assertEqual(r["plan"][0], 200)
+        self.assertEqual(r["plan"][1]["summary"]["total"], 4)
+        self.assertEqual([r[k][0] for k in ("missing", "method", "unknown", "bad_json")], [404, 405, 404, 400])
+        self.assertEqual(r["created"], (201, {"id": 6, "name": "A", "position": "DF"}))
+        self.assertEqual(r["complete"], (200, {"completed": True, "plan_status": "Pending"}))
+        self.assertEqual(r["progress"][1]["units_completed"], 1)
+
+    def test_template_routes(self):
+        server = PlannerServer(self.service)
+        template = b'{"name": "Week", "units": [{"type_code": "JUMP", "params": {"jumps_count": 5, "height_cm": 20}}]}'
+
+        async def scenario():
+            async with self.service:
+                return {
+                    "saved": await server.dispatch("POST", "/templates", template),
+                    "listed": await server.dispatch("GET", "/templates"),
+                    "assigned": await server.dispatch("POST", "/templates/assign", b'{"name": "Week", "player_ids": [1, 2]}'),
+                    "missing": await server.dispatch("POST", "/templates/assign", b'{"name": "Nope"}'),
+                    "bad_player": await server.dispatch("POST", "/templates/assign", b'{"name": "Week", "player_ids": [99]}'),
+                }
+
+        r = asyncio.run(scenario())
+        self.assertEqual(r["saved"][0], 201)
+        self.assertEqual(r["listed"][1][0]["units"][0]["specific_parameters"], {"jumps_count": 5, "height_cm": 20.0})
+        self.assertEqual(r["assigned"], (201, {"plan_ids": [11, 12]}))
+        self.assertEqual([r[k][0] for k in ("missing", "bad_player")], [404, 400])
+        self.assertEqual(len(self._reload().training_plans), 12)
+
+    def test_http_round_trip(self):
+        server = PlannerServer(self.service, "127.0.0.1", 0)
+
+        async def scenario():
+            await server.start()
+            client = HttpClient("127.0.0.1", server.port)
+            try:
+                first = await client.request("GET", "/players/1")
+                second = await client.request("POST", "/plans", {"player_id": 1, "target_date": "2026-05-01"})
+            finally:
+                await client.close()
+                await server.close()
+            return first, second
+
+        first, second = asyncio.run(scenario())
+        self.assertEqual(first[0], 200)
+        self.assertEqual(first[1]["progress"]["plans_total"], 2)
+        self.assertEqual(second[0], 201)
+        self.assertEqual(second[1]["target_completion_date"], "2026-05-01")
+
+    def test_load_test_smoke(self):
+        result = asyncio.run(run_self_hosted("3x2x2", MODE_JOURNAL, connections=4, requests=40, write_ratio=0.2))
+        self.assertEqual(result["requests"], 40)
+        self.assertEqual(result["errors"], 0)
+        self.assertGreater(result["requests_per_second"], 0)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -1,8 +1,9 @@
+import os
+import tempfile
 import unittest
-from typing import List
 from src.models import (
     SystemData, Player, ExerciseType, TrainingPlan, TrainingUnit,
-    STATUS_PENDING, STATUS_COMPLETED
+    STATUS_PENDING, STATUS_COMPLETED, SEQ_PLAYER, SEQ_PLAN, SEQ_UNIT
 )
 from src.services import DataManager, TrainingService
 
@@ -20,14 +21,6 @@ class MockDataManager(DataManager):
         # Simuluje ukladani dat bez zapisu do souboru.
         # يحاكي حفظ البيانات دون الكتابة في ملف
         self._system_data = system_data
-        
-    def _get_next_id(self, entity_list: List):
-        """Generates a unique ID based on the current list maximum."""
-        # Generuje unikatni ID na zaklade maxima v aktualnim seznamu.
-        # ينشئ معرفًا فريدًا بناءً على الحد الأقصى للقائمة الحالية
-        if not entity_list:
-            return 1
-        return max([e.id for e in entity_list if hasattr(e, 'id')], default=0) + 1
 
 # --- Test Suite ---
 
@@ -140,7 +133,171 @@ class TestTrainingService(unittest.TestCase):
         self.assertEqual(summary_final["completed"], 1)
         self.assertEqual(summary_final["pending"], 1)
         self.assertEqual(summary_final["completion_percentage"], "50.0%")
-        
-        
+    def test_player_and_squad_progress(self):
+        """Tests that rolled-up counters follow completions without rescanning."""
+        # Testuje souhrnne citace hrace a tymu.
+        # اختبار العدادات المجمعة
+        plan2 = self.ts.create_training_plan(self.system_data, 102, None)
+        self.ts.add_exercise_to_plan(self.system_data, plan2.id, "SHOOT", {"shots_taken": 5, "goals_scored": 1})
+
+        squad = self.ts.get_squad_progress(self.system_data)
+        self.assertEqual((squad.plans_pending, squad.plans_completed, squad.units_total), (2, 0, 3))
+        self.assertEqual(squad.completion_rate, 0.0)
+
+        self.ts.mark_exercise_completed(self.system_data, 1, 1)
+        self.ts.mark_exercise_completed(self.system_data, 1, 2)
+        self.assertFalse(self.ts.mark_exercise_completed(self.system_data, 1, 2)) # already completed
+
+        player = self.ts.get_player_progress(self.system_data, 101)
+        self.assertEqual((player.plans_pending, player.plans_completed, player.units_completed), (0, 1, 2))
+        self.assertEqual(player.completion_rate, 1.0)
+        self.assertEqual(squad.completion_rate, 0.5)
+        self.assertIsNone(self.ts.get_player_progress(self.system_data, 999).completion_rate)
+
+    def test_next_id_sequences(self):
+        """Tests that sequences are seeded once from existing ids and then advance in O(1)."""
+        # Testuje, ze sekvence navazuji na existujici ID a jsou ulozeny v SystemData.
+        # اختبار تسلسلات المعرفات
+        self.assertEqual(self.dm_mock.next_id(self.system_data, SEQ_UNIT), 3)
+        self.assertEqual(self.dm_mock.next_id(self.system_data, SEQ_PLAN), 2)
+        self.assertEqual(self.system_data.id_sequences, {SEQ_UNIT: 3, SEQ_PLAN: 2})
+
+        # Smazani entity nesmi vest k opetovnemu pouziti jejiho ID.
+        self.plan1.exercises.clear()
+        self.assertEqual(self.dm_mock.next_id(self.system_data, SEQ_UNIT), 4)
+
+    def test_next_id_unique_across_threads(self):
+        """Tests that concurrent writers never receive the same id."""
+        import threading
+        ids = []
+        def worker():
+            for _ in range(200):
+                ids.append(self.dm_mock.next_id(self.system_data, SEQ_PLAYER))
+        threads = [threading.Thread(target=worker) for _ in range(4)]
+        for t in threads: t.start()
+        for t in threads: t.join()
+        self.assertEqual(len(set(ids)), 800)
+        self.assertEqual(max(ids), 102 + 800)
+
+    def test_assign_plan_template_by_position(self):
+        """Tests that a template becomes one plan per matching player, with block ids and a single save."""
+        # Sablona pro vsechny utocniky - jeden zapis, ID v souvislych blocich.
+        # اختبار إسناد قالب حسب المركز
+        self.system_data.players.append(Player(id=103, name="Petr Dvořák", position="forward"))
+        self.ts.save_plan_template(self.system_data, "Weekly", [
+            ("sprint", {"distance_m": "30", "repetitions": "5"}),
+            ("SHOOT", {"shots_taken": 10, "goals_scored": 0}),
+        ], "Standard week")
+        saves = []
+        self.dm_mock.save_data = saves.append
+
+        plans = self.ts.assign_plan_template(self.system_data, "Weekly", position="Forward", target_date="2026-01-31")
+        self.assertEqual([p.player_id for p in plans], [102, 103])
+        self.assertEqual([p.id for p in plans], [2, 3])
+        self.assertEqual([u.id for p in plans for u in p.exercises], [3, 4, 5, 6])
+        self.assertEqual(plans[0].exercises[0].specific_parameters["distance_m"], 30.0)
+        self.assertEqual(plans[1].target_completion_date, "2026-01-31")
+        self.assertEqual(len(saves), 1)
+        self.assertIs(self.ts.find_plan(self.system_data, 3), plans[1])
+        self.assertEqual(self.ts.get_player_progress(self.system_data, 103).plans_pending, 1)
+        self.assertEqual(self.ts.get_squad_progress(self.system_data).units_total, 6)
+
+        # Jednotky planu jsou nezavisle kopie specifikace sablony.
+        self.ts.mark_exercise_completed(self.system_data, 2, 3)
+        self.assertIsNone(self.ts.find_plan_template(self.system_data, "Weekly").units[0].status)
+        self.assertIsNone(plans[1].exercises[0].status)
+
+    def test_plan_template_errors(self):
+        """Tests invalid template units, unknown templates, players and dates."""
+        with self.assertRaises(ValueError):
+            self.ts.save_plan_template(self.system_data, "Bad", [("SPRINT", {"distance_m": "fast", "repetitions": 1})])
+        self.assertIsNone(self.ts.find_plan_template(self.system_data, "Bad"))
+        with self.assertRaises(ValueError):
+            self.ts.assign_plan_template(self.system_data, "Missing", [101])
+        self.ts.save_plan_template(self.system_data, "Jump", [("SHOOT", {"shots_taken": 1, "goals_scored": 1})])
+        with self.assertRaises(ValueError):
+            self.ts.assign_plan_template(self.system_data, "Jump", [101, 999])
+        with self.assertRaises(ValueError):
+            self.ts.assign_plan_template(self.system_data, "Jump", [101], target_date="31.1.2026")
+        self.assertEqual(len(self.system_data.training_plans), 1)
+        self.assertEqual(self.ts.assign_plan_template(self.system_data, "Jump", [101], position="Goalkeeper"), [])
+
+class TestDataManagerPersistence(unittest.TestCase):
+    """Tests DataManager against a real file in a temporary directory."""
+    # Testy ukladani do skutecneho souboru v docasnem adresari.
+    # اختبارات الحفظ في ملف حقيقي
+
+    def setUp(self):
+        self.tmp_dir = tempfile.TemporaryDirectory()
+        self.path = os.path.join(self.tmp_dir.name, "data", "system_data.json")
+        self.dm = DataManager(self.path)
+
+    def tearDown(self):
+        self.dm.close()
+        self.tmp_dir.cleanup()
+
+    def test_save_flush_and_reload(self):
+        """Tests that a burst of saves ends up on disk and no temp file is left behind."""
+        system_data = self.dm.load_data()
+        self.assertEqual(len(system_data.exercise_types), 3)
+        for i in range(50):
+            self.dm.add_player(system_data, f"Player {i}", "Forward")
+        self.assertTrue(self.dm.flush(timeout=5))
+
+        self.assertFalse(os.path.exists(self.path + ".tmp"))
+        reloaded = DataManager(self.path).load_data()
+        self.assertEqual(len(reloaded.players), 50)
+
+    def test_progress_consistent_after_reload(self):
+        """Tests that counters rebuilt from disk match the ones maintained in memory."""
+        ts = TrainingService(self.dm)
+        system_data = self.dm.load_data()
+        player = self.dm.add_player(system_data, "A", "GK")
+        plan = ts.create_training_plan(system_data, player.id, None)
+        unit = ts.add_exercise_to_plan(system_data, plan.id, "JUMP", {"jumps_count": 5, "height_cm": 30.0})
+        ts.add_exercise_to_plan(system_data, plan.id, "JUMP", {"jumps_count": 5, "height_cm": 30.0})
+        ts.mark_exercise_completed(system_data, plan.id, unit.id)
+        self.dm.flush()
+
+        reloaded = DataManager(self.path).load_data()
+        self.assertEqual(ts.get_squad_progress(reloaded), ts.get_squad_progress(system_data))
+        self.assertEqual(ts.get_plan_summary(reloaded.training_plans[0])["completed"], 1)
+
+    def test_plan_template_survives_reload_and_undo(self):
+        """Tests that templates and assigned plans are saved, and one assignment is one undo step."""
+        ts = TrainingService(self.dm)
+        system_data = self.dm.load_data()
+        for name in ("A", "B", "C"):
+            self.dm.add_player(system_data, name, "Defender")
+        ts.save_plan_template(system_data, "Recovery", [("JUMP", {"jumps_count": 5, "height_cm": 20.0})])
+        plans = ts.assign_plan_template(system_data, "Recovery")
+        self.assertEqual(len(plans), 3)
+        self.dm.flush()
+
+        reloaded = DataManager(self.path).load_data()
+        self.assertEqual(ts.find_plan_template(reloaded, "Recovery").units[0].type_code, "JUMP")
+        self.assertEqual(len(reloaded.training_plans), 3)
+        self.assertEqual(reloaded.id_sequences[SEQ_UNIT], 3)
+
+        self.assertEqual(self.dm.undo(system_data), 1)
+        self.assertEqual(system_data.training_plans, [])
+        self.assertIsNotNone(ts.find_plan_template(system_data, "Recovery"))
+
+    def test_sequences_survive_restart(self):
+        """Tests that ids keep increasing after a reload even when the newest entity is gone."""
+        # ID se po restartu nesmi opakovat.
+        system_data = self.dm.load_data()
+        self.dm.add_player(system_data, "A", "GK")
+        self.dm.add_player(system_data, "B", "GK")
+        system_data.players.pop()
+        self.dm.save_data(system_data)
+        self.dm.close()
+
+        restarted = DataManager(self.path)
+        reloaded = restarted.load_data()
+        self.assertEqual(restarted.add_player(reloaded, "C", "GK").id, 3)
+        restarted.close()
+
+
 if __name__ == '__main__':
-    unittest.main()
\ No newline at end of file
+    unittest.main()
\ No newline at end of file
@@ -0,0 +1,115 @@
+import contextlib
+import io
+import os
+import tempfile
+import unittest
+from src.codec import dumps
+from src.models import STATUS_COMPLETED
+from src.repository import ProgressStats
+from src.services import MODE_JOURNAL
+from src.shards import ShardedDataManager, team_progress
+from src.synthetic import generate_system_data
+from src.cli import main as cli_main
+
+TEAMS = {"u17": 3, "u19": 5, "a-tym": 7}
+
+
+class TestShardedDataManager(unittest.TestCase):
+    """Tests per-team shards: parallel loading, isolated writes and cross-team aggregates."""
+    # Testy dat rozdelenych po tymech.
+    # اختبارات بيانات الفرق المقسمة
+
+    def setUp(self):
+        self.tmp_dir = tempfile.TemporaryDirectory()
+        self.dir = self.tmp_dir.name
+        self.sources = {}
+        for seed, (team, players) in enumerate(sorted(TEAMS.items())):
+            self.sources[team] = generate_system_data(players=players, plans_per_player=3, units_per_plan=2,
+                                                      completed_ratio=0.6, seed=seed)
+            with open(os.path.join(self.dir, team + ".json"), "wb") as f:
+                f.write(dumps(self.sources[team]))
+        self._quiet = contextlib.redirect_stdout(io.StringIO())
+        self._quiet.__enter__()
+
+    def tearDown(self):
+        self._quiet.__exit__(None, None, None)
+        self.tmp_dir.cleanup()
+
+    def _shards(self, **kwargs):
+        kwargs.setdefault("shared", False)
+        return ShardedDataManager(self.dir, **kwargs)
+
+    def test_parallel_load_matches_sequential(self):
+        shards = self._shards(workers=2)
+        self.assertEqual(shards.teams(), sorted(TEAMS))
+        parallel = shards.load_all()
+        sequential = self._shards(workers=1).load_all()
+        self.assertEqual(parallel, sequential)
+        for team, data in parallel.items():
+            self.assertEqual(data, self.sources[team])
+            self.assertEqual(data.id_sequences, sequential[team].id_sequences)
+            self.assertEqual(team_progress(data), team_progress(self.sources[team]))
+        self.assertIs(shards.load("u17"), parallel["u17"])
+        shards.close()
+
+    def test_mutations_write_only_their_shard(self):
+        shards = self._shards(workers=2)
+        data = shards.load_all()
+        before = {team: os.stat(os.path.join(self.dir, team + ".json")).st_mtime_ns for team in TEAMS}
+        player = shards.service("u19").dm.add_player(data["u19"], "Nový Hráč", "GK")
+        shards.service("u19").create_training_plan(data["u19"], player.id, None)
+        shards.close()
+        after = {team: os.stat(os.path.join(self.dir, team + ".json")).st_mtime_ns for team in TEAMS}
+        self.assertEqual([t for t in TEAMS if before[t] != after[t]], ["u19"])
+
+        reloaded = self._shards(workers=2).load_all()
+        self.assertEqual(reloaded["u19"].players[-1].name, "Nový Hráč")
+        self.assertEqual(reloaded["u17"], self.sources["u17"])
+
+    def test_journal_is_replayed_after_parallel_parse(self):
+        shards = self._shards(persistence_mode=MODE_JOURNAL)
+        data = shards.load("a-tym")
+        shards.service("a-tym").dm.add_player(data, "Zurnal", "MF")
+        shards.close()
+        self.assertTrue(os.path.getsize(os.path.join(self.dir, "a-tym.json.journal")) > 0)
+        loaded = self._shards(persistence_mode=MODE_JOURNAL, workers=3).load_all()
+        self.assertEqual(loaded["a-tym"].players[-1].name, "Zurnal")
+
+    def test_cross_team_completion_rates(self):
+        expected = {}
+        for team, source in self.sources.items():
+            done = sum(1 for p in source.training_plans if p.status == STATUS_COMPLETED)
+            expected[team] = done / len(source.training_plans)
+        # Nenactene tymy se pocitaji v procesech, nactene zde.
+        shards = self._shards(workers=2)
+        self.assertEqual(shards.completion_rates(), expected)
+        self.assertEqual(shards.loaded, {})
+        shards.load("u19")
+        self.assertEqual(shards.completion_rates(), expected)
+        club = shards.club_progress()
+        self.assertEqual(club.plans_total, sum(len(s.training_plans) for s in self.sources.values()))
+        self.assertEqual(club, sum((team_progress(s) for s in self.sources.values()), ProgressStats()))
+        self.assertEqual(self._shards(workers=1).progress_by_team(["u17"]), {"u17": team_progress(self.sources["u17"])})
+        shards.close()
+
+    def test_new_team_and_invalid_name(self):
+        shards = self._shards()
+        data = shards.load("zeny")
+        self.assertEqual(data.players, [])
+        self.assertIn("zeny", shards.teams())
+        with self.assertRaises(ValueError):
+            shards.load("../system_data")
+        shards.close()
+
+    def test_cli_teams_command(self):
+        out = io.StringIO()
+        with contextlib.redirect_stdout(out):
+            self.assertEqual(cli_main(["teams", "--dir", self.dir, "--workers", "2"]), 0)
+            self.assertEqual(cli_main(["teams", "--dir", os.path.join(self.dir, "missing")]), 1)
+        lines = out.getvalue().splitlines()
+        self.assertEqual([l.split()[1] for l in lines if l.startswith("TEAM ")], sorted(TEAMS))
+        self.assertTrue(any(l.startswith("CLUB ") for l in lines))
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,133 @@
+import contextlib
+import io
+import multiprocessing
+import os
+import tempfile
+import unittest
+from src.models import ExerciseType, STATUS_COMPLETED
+from src.services import DataManager, TrainingService
+from src.sharing import SEQ_VERSION, FileLock, fcntl
+
+
+def _add_players(data_file: str, prefix: str, count: int):
+    with contextlib.redirect_stdout(io.StringIO()):
+        dm = DataManager(data_file, shared=True)
+        system_data = dm.load_data()
+        for i in range(count):
+            dm.add_player(system_data, f"{prefix}{i}", "MF")
+        dm.close()
+
+
+class TestSharedDataFile(unittest.TestCase):
+    """Tests locking, version counter and merging of concurrent writers."""
+    # Testy sdileneho souboru (vice procesu).
+    # اختبارات الملف المشترك
+
+    def setUp(self):
+        self.tmp_dir = tempfile.TemporaryDirectory()
+        self.data_file = os.path.join(self.tmp_dir.name, "system_data.json")
+        self._quiet = contextlib.redirect_stdout(io.StringIO())
+        self._quiet.__enter__()
+
+    def tearDown(self):
+        self._quiet.__exit__(None, None, None)
+        self.tmp_dir.cleanup()
+
+    def _open(self):
+        dm = DataManager(self.data_file, shared=True)
+        return dm, TrainingService(dm), dm.load_data()
+
+    def _reload(self):
+        return DataManager(self.data_file, shared=False).load_data()
+
+    def test_concurrent_players_are_merged_not_clobbered(self):
+        dm_a, _, data_a = self._open()
+        dm_b, _, data_b = self._open()
+        dm_a.add_player(data_a, "Alpha", "DF")
+        player_b = dm_b.add_player(data_b, "Beta", "GK")
+
+        self.assertEqual(player_b.id, 2)  # precislovano, ID 1 uz ma Alpha
+        on_disk = self._reload()
+        self.assertEqual([(p.id, p.name) for p in on_disk.players], [(1, "Alpha"), (2, "Beta")])
+        self.assertEqual(on_disk.id_sequences[SEQ_VERSION], 3)  # vytvoreni + 2 zapisy
+
+    def test_cli_shared_option_keeps_every_trainers_players(self):
+        """Tests that two interactive CLIs started with --shared both keep their players."""
+        from src.cli import TrainingPlannerCLI, build_parser
+        shared = build_parser().parse_args(["--shared"]).shared
+        trainer_a = TrainingPlannerCLI(self.data_file, shared=shared)
+        trainer_b = TrainingPlannerCLI(self.data_file, shared=shared)
+        self.assertTrue(trainer_a.dm.shared and trainer_b.dm.shared)
+        trainer_a.dm.add_player(trainer_a.system_data, "Alpha", "DF")
+        trainer_b.dm.add_player(trainer_b.system_data, "Beta", "GK")
+        trainer_a.dm.close()
+        trainer_b.dm.close()
+        self.assertEqual(sorted(p.name for p in self._reload().players), ["Alpha", "Beta"])
+
+    def test_refresh_only_when_file_changed(self):
+        dm_a, ts_a, data_a = self._open()
+        dm_b, _, data_b = self._open()
+        self.assertFalse(dm_a.refresh(data_a))
+        dm_b.add_player(data_b, "Beta", "GK")
+        self.assertTrue(dm_a.is_stale())
+        self.assertTrue(dm_a.refresh(data_a))
+        self.assertEqual(ts_a.find_player(data_a, 1).name, "Beta")
+        self.assertFalse(dm_a.refresh(data_a))
+
+    def test_plans_units_and_completions_merge(self):
+        dm, ts, data = self._open()
+        dm.add_player(data, "Alpha", "DF")
+        plan = ts.create_training_plan(data, 1, None)
+        u1 = ts.add_exercise_to_plan(data, plan.id, "JUMP", {"jumps_count": 10, "height_cm": 40.0})
+        u2 = ts.add_exercise_to_plan(data, plan.id, "JUMP", {"jumps_count": 12, "height_cm": 45.0})
+
+        dm_a, ts_a, data_a = self._open()
+        dm_b, ts_b, data_b = self._open()
+        ts_a.mark_exercise_completed(data_a, plan.id, u1.id)
+        ts_b.mark_exercise_completed(data_b, plan.id, u2.id)
+        plan_a = ts_a.create_training_plan(data_a, 1, "2026-02-01")
+        plan_b = ts_b.create_training_plan(data_b, 1, "2026-03-01")
+        unit_b = ts_b.add_exercise_to_plan(data_b, plan_b.id, "SPRINT", {"distance_m": 30.0, "repetitions": 4})
+
+        self.assertNotEqual(plan_a.id, plan_b.id)
+        on_disk = self._reload()
+        merged = {p.id: p for p in on_disk.training_plans}
+        self.assertEqual(merged[plan.id].status, STATUS_COMPLETED)
+        self.assertEqual([u.id for u in merged[plan_b.id].exercises], [unit_b.id])
+        self.assertEqual(len({u.id for p in on_disk.training_plans for u in p.exercises}), 3)
+        self.assertEqual(ts_b.get_squad_progress(data_b).plans_completed, 1)
+
+    def test_conflicting_exercise_type_keeps_first_writer(self):
+        dm_a, ts_a, data_a = self._open()
+        dm_b, ts_b, data_b = self._open()
+        ts_a.add_exercise_type(data_a, ExerciseType("PASS", "", {"passes": "int"}))
+        ts_b.add_exercise_type(data_b, ExerciseType("PASS", "", {"passes": "int", "accuracy": "float"}))
+        self.assertEqual(len(dm_b.conflicts), 1)
+        self.assertEqual(ts_b.find_exercise_type(data_b, "PASS").parameters_metadata, {"passes": "int"})
+
+    def test_processes_writing_at_once(self):
+        """Tests that several real processes appending players lose nothing."""
+        self._open()
+        workers = [multiprocessing.Process(target=_add_players, args=(self.data_file, name, 10)) for name in "abc"]
+        for w in workers:
+            w.start()
+        for w in workers:
+            w.join(60)
+        players = self._reload().players
+        self.assertEqual(len(players), 30)
+        self.assertEqual(sorted(p.id for p in players), list(range(1, 31)))
+
+    @unittest.skipIf(fcntl is None, "fcntl is not available")
+    def test_exclusive_lock_blocks_other_holders(self):
+        lock_path = self.data_file + ".lock"
+        with FileLock(lock_path):
+            fd = os.open(lock_path, os.O_RDWR)
+            try:
+                with self.assertRaises(BlockingIOError):
+                    fcntl.flock(fd, fcntl.LOCK_SH | fcntl.LOCK_NB)
+            finally:
+                os.close(fd)
+
+
+if __name__ == '__main__':
+    unittest.main()
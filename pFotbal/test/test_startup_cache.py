@@ -0,0 +1,139 @@
+import contextlib
+import io
+import os
+import pickle
+import subprocess
+import sys
+import tempfile
+import unittest
+from src.codec import dumps
+from src.services import DataManager, MODE_JOURNAL
+from src.startup_cache import StartupCache
+from src.synthetic import generate_system_data
+from src.repository import SystemRepository
+
+
+class TestStartupCache(unittest.TestCase):
+    """Tests the pickled startup cache: hits, staleness, corruption and journal replay."""
+    # Testy cache pro rychly start.
+    # اختبارات ذاكرة بدء التشغيل المؤقتة
+
+    def setUp(self):
+        self.tmp_dir = tempfile.TemporaryDirectory()
+        self.data_file = os.path.join(self.tmp_dir.name, "system_data.json")
+        with open(self.data_file, "wb") as f:
+            f.write(dumps(generate_system_data(players=4, plans_per_player=2, units_per_plan=3, seed=2)))
+        self.cache_file = self.data_file + ".cache"
+        self._quiet = contextlib.redirect_stdout(io.StringIO())
+        self._quiet.__enter__()
+
+    def tearDown(self):
+        self._quiet.__exit__(None, None, None)
+        self.tmp_dir.cleanup()
+
+    def _session(self, mode="snapshot", startup_cache=True, action=None):
+        """Opens the file, optionally mutates it, closes; returns (data, cache hits)."""
+        dm = DataManager(self.data_file, persistence_mode=mode, shared=False, startup_cache=startup_cache)
+        system_data = dm.load_data()
+        if action is not None:
+            action(dm, system_data)
+        dm.close()
+        return system_data, dm.cache.hits if dm.cache is not None else 0
+
+    def test_warm_load_matches_cold_load(self):
+        cold, hits = self._session()
+        self.assertEqual(hits, 0)
+        self.assertTrue(os.path.exists(self.cache_file))
+        warm, hits = self._session()
+        self.assertEqual(hits, 1)
+        self.assertEqual(warm, cold)
+        self.assertEqual(warm.id_sequences, cold.id_sequences)
+        self.assertEqual(SystemRepository.of(warm).squad_progress(), SystemRepository.of(cold).squad_progress())
+
+    def test_write_invalidates_and_close_refreshes(self):
+        self._session()
+        self._session(action=lambda dm, sd: dm.add_player(sd, "Nový", "GK"))
+        data, hits = self._session()
+        self.assertEqual(hits, 1)
+        self.assertEqual(data.players[-1].name, "Nový")
+
+    def test_external_change_is_detected(self):
+        self._session()
+        self._session(startup_cache=False, action=lambda dm, sd: dm.add_player(sd, "Cizí", "DF"))
+        data, hits = self._session()
+        self.assertEqual(hits, 0)
+        self.assertEqual(data.players[-1].name, "Cizí")
+
+    def test_same_size_and_mtime_still_checks_hash(self):
+        cold, _ = self._session()
+        name = cold.players[0].name.encode("utf-8")
+        renamed = b"X" * len(name)
+        st = os.stat(self.data_file)
+        with open(self.data_file, "rb") as f:
+            content = f.read()
+        with open(self.data_file, "wb") as f:
+            f.write(content.replace(b'"%s"' % name, b'"%s"' % renamed, 1))
+        os.utime(self.data_file, ns=(st.st_atime_ns, st.st_mtime_ns))
+        data, hits = self._session()
+        self.assertEqual(hits, 0)
+        self.assertEqual(data.players[0].name, renamed.decode())
+
+    def test_corrupt_cache_falls_back(self):
+        cold, _ = self._session()
+        with open(self.cache_file, "r+b") as f:
+            f.seek(-20, os.SEEK_END)
+            f.write(b"\0" * 20)
+        cache = StartupCache(self.data_file)
+        self.assertIsNone(cache.load())
+        self.assertFalse(os.path.exists(self.cache_file))
+        with open(self.cache_file, "wb") as f:
+            f.write(b"garbage")
+        data, hits = self._session()
+        self.assertEqual((data, hits), (cold, 0))
+
+    def test_journal_records_are_not_replayed_twice(self):
+        add = lambda dm, sd: dm.add_player(sd, "Zurnal", "MF")
+        self._session(MODE_JOURNAL)
+        self._session(MODE_JOURNAL, action=add)
+        data, hits = self._session(MODE_JOURNAL)
+        self.assertEqual(hits, 1)
+        self.assertEqual([p.name for p in data.players].count("Zurnal"), 1)
+        self.assertEqual(len(data.players), 5)
+
+    def test_no_store_when_file_changed_before_close(self):
+        dm = DataManager(self.data_file, shared=False)
+        dm.load_data()
+        self._session(startup_cache=False, action=lambda dm, sd: dm.add_player(sd, "Cizí", "DF"))
+        dm.close()
+        self.assertFalse(os.path.exists(self.cache_file))
+
+    def test_pickle_drops_repository(self):
+        data, _ = self._session()
+        SystemRepository.of(data)
+        self.assertNotIn("_repository", pickle.loads(pickle.dumps(data)).__dict__)
+
+
+class TestCliImport(unittest.TestCase):
+    """Tests that importing the CLI leaves optional subsystems unloaded."""
+    # Import CLI nesmi nacist moduly, ktere potrebuji jen nektere prikazy.
+
+    def test_import_skips_optional_modules(self):
+        heavy = ["sqlite3", "csv", "gzip", "lzma", "pickle", "hashlib", "asyncio",
+                 "src.storage", "src.startup_cache", "src.importer", "src.analytics", "src.changefeed", "src.server"]
+        code = "import sys, src.cli; print(' '.join(m for m in %r if m in sys.modules))" % heavy
+        root = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+        result = subprocess.run([sys.executable, "-c", code], cwd=root, capture_output=True, text=True, check=True)
+        self.assertEqual(result.stdout.strip(), "")
+
+    def test_literal_choices_match_modules(self):
+        from src import cli
+        from src.analytics import METRICS
+        from src.importer import FORMAT_CSV, FORMAT_JSONL
+        from src.storage import BACKEND_JSON, BACKEND_SQLITE
+        self.assertEqual(cli.REPORT_METRICS, tuple(sorted(METRICS)))
+        self.assertEqual(cli.IMPORT_FORMATS, (FORMAT_CSV, FORMAT_JSONL))
+        self.assertEqual(cli.BACKENDS, (BACKEND_JSON, BACKEND_SQLITE))
+
+
+if __name__ == '__main__':
+    unittest.main()
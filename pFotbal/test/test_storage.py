@@ -0,0 +1,100 @@
+import json
+import os
+import shutil
+import sqlite3
+import tempfile
+import unittest
+from src.models import STATUS_COMPLETED
+from src.services import DataManager, TrainingService
+from src.storage import JsonFileBackend, SqliteBackend, migrate
+from src.cli import main as cli_main
+
+FIXTURE = os.path.join(os.path.dirname(__file__), "..", "data", "team_data.json")
+
+
+class TestSqliteBackend(unittest.TestCase):
+    """Tests the SQLite storage backend and JSON -> SQLite migration."""
+    # Testy SQLite backendu.
+    # اختبارات محرك SQLite
+
+    def setUp(self):
+        self.tmp_dir = tempfile.TemporaryDirectory()
+        self.db_path = os.path.join(self.tmp_dir.name, "system_data.db")
+
+    def tearDown(self):
+        self.tmp_dir.cleanup()
+
+    def _rows(self, sql, *args):
+        """Reads rows straight from the database file (a separate connection)."""
+        conn = sqlite3.connect(self.db_path)
+        try:
+            return conn.execute(sql, args).fetchall()
+        finally:
+            conn.close()
+
+    def test_mutations_are_row_writes_and_reload(self):
+        """Tests that service mutations land in SQLite rows and survive a reload."""
+        dm = DataManager(self.db_path, backend=SqliteBackend(self.db_path))
+        ts = TrainingService(dm)
+        system_data = dm.load_data()
+        player = dm.add_player(system_data, "Jan Novák", "Defender")
+        plan = ts.create_training_plan(system_data, player.id, "2026-01-01")
+        unit = ts.add_exercise_to_plan(system_data, plan.id, "JUMP", {"jumps_count": 10, "height_cm": 40.0})
+        ts.mark_exercise_completed(system_data, plan.id, unit.id)
+
+        # Zmeny jsou v radcich tabulek hned po zapisu
+        self.assertEqual(self._rows("SELECT name FROM players WHERE id = ?", player.id), [("Jan Novák",)])
+        self.assertEqual(self._rows("SELECT id FROM training_plans WHERE player_id = ? AND status = ?",
+                                    player.id, STATUS_COMPLETED), [(plan.id,)])
+        (params,), = self._rows("SELECT specific_parameters FROM training_units WHERE id = ?", unit.id)
+        self.assertEqual(json.loads(params)["status"], STATUS_COMPLETED)
+        dm.close()
+
+        reloaded_dm = DataManager(self.db_path, backend=SqliteBackend(self.db_path))
+        reloaded = reloaded_dm.load_data()
+        self.assertEqual(len(reloaded.exercise_types), 3)
+        self.assertEqual(reloaded.training_plans[0].status, STATUS_COMPLETED)
+        self.assertEqual(reloaded_dm.add_player(reloaded, "B", "GK").id, 2)
+        reloaded_dm.close()
+
+    def test_plan_template_rows(self):
+        """Tests that templates and template-assigned plans are stored in SQLite and reload."""
+        dm = DataManager(self.db_path, backend=SqliteBackend(self.db_path))
+        ts = TrainingService(dm)
+        system_data = dm.load_data()
+        player = dm.add_player(system_data, "Jan Novák", "Defender")
+        ts.save_plan_template(system_data, "Week", [("SHOOT", {"shots_taken": 10, "goals_scored": 4})])
+        ts.save_plan_template(system_data, "Week", [("JUMP", {"jumps_count": 8, "height_cm": 35.5})])
+        plan = ts.assign_plan_template(system_data, "Week", [player.id])[0]
+        self.assertEqual(self._rows("SELECT type_code FROM training_units WHERE plan_id = ?", plan.id), [("JUMP",)])
+        dm.close()
+
+        reloaded_dm = DataManager(self.db_path, backend=SqliteBackend(self.db_path))
+        reloaded = reloaded_dm.load_data()
+        self.assertEqual(len(reloaded.plan_templates), 1)
+        self.assertEqual(reloaded.plan_templates[0].units[0].parameters_dict(), {"jumps_count": 8, "height_cm": 35.5})
+        reloaded_dm.close()
+
+    def test_migrate_json_file(self):
+        """Tests that migration preserves every entity of an existing JSON file."""
+        json_path = os.path.join(self.tmp_dir.name, "team_data.json")
+        shutil.copy(FIXTURE, json_path)
+        original = JsonFileBackend(json_path).load()
+
+        target = SqliteBackend(self.db_path)
+        migrate(JsonFileBackend(json_path), target)
+        migrated = target.load()
+        target.close()
+        self.assertEqual(migrated.players, original.players)
+        self.assertEqual(migrated.exercise_types, original.exercise_types)
+        self.assertEqual(migrated.training_plans, original.training_plans)
+
+    def test_migrate_command(self):
+        """Tests the non-interactive migrate command of the CLI."""
+        self.assertEqual(cli_main(["migrate", FIXTURE, self.db_path]), 0)
+        self.assertEqual(self._rows("SELECT name FROM players WHERE id = 1"), [("Jan Novák",)])
+        self.assertEqual(cli_main(["migrate", os.path.join(self.tmp_dir.name, "missing.json"), self.db_path]), 1)
+
+
+if __name__ == '__main__':
+    unittest.main()
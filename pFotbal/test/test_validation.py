@@ -0,0 +1,110 @@
+import unittest
+from src.models import SystemData, ExerciseType, Player, SEQ_UNIT
+from src.services import TrainingService
+from src.importer import coerce_parameters, RowError
+from src.validation import compile_validator
+from support import CountingDataManager
+
+
+class TestParameterValidators(unittest.TestCase):
+    """Tests compiled parameter validators, their cache and batch validation."""
+    # Testy predkompilovanych validatoru parametru.
+    # اختبارات مدققي المعلمات
+
+    def setUp(self):
+        self.system_data = SystemData(
+            players=[Player(id=1, name="A", position="GK")],
+            exercise_types=[
+                ExerciseType(code="SPRINT", parameters_metadata={"distance_m": "float", "repetitions": "int"}),
+                ExerciseType(code="NOTE", parameters_metadata={"text": "str"}),
+            ])
+        self.ts = TrainingService(CountingDataManager())
+        self.plan = self.ts.create_training_plan(self.system_data, 1, None)
+
+    def test_types_are_enforced_and_unknown_keys_rejected(self):
+        unit = self.ts.add_exercise_to_plan(self.system_data, self.plan.id, "SPRINT", {"distance_m": "30.5", "repetitions": 4.0})
+        self.assertEqual(unit.parameters_dict(include_status=False), {"distance_m": 30.5, "repetitions": 4})
+        self.assertIsInstance(unit.specific_parameters["repetitions"], int)
+        before = self.system_data.id_sequences[SEQ_UNIT]
+        for params in ({"distance_m": 30.0, "repetitions": 4, "speed": 2},
+                       {"distance_m": 30.0, "repetitions": 4.5},
+                       {"distance_m": 30.0, "repetitions": True},
+                       {"distance_m": "fast", "repetitions": 4},
+                       {"distance_m": float("inf"), "repetitions": 4},
+                       {"distance_m": 30.0},
+                       ["distance_m"]):
+            with self.assertRaises(ValueError, msg=params):
+                self.ts.add_exercise_to_plan(self.system_data, self.plan.id, "SPRINT", params)
+        self.assertEqual(len(self.plan.exercises), 1)
+        self.assertEqual(self.system_data.id_sequences[SEQ_UNIT], before)  # neplatne jednotky ID nespotrebuji
+        self.assertEqual(self.ts.validate_parameters(self.system_data, "NOTE", {"text": "volno"}), {"text": "volno"})
+
+    def test_validator_is_cached_until_type_is_redefined(self):
+        repo = self.ts.repo(self.system_data)
+        validator = repo.validator("SPRINT")
+        self.assertIs(repo.validator("SPRINT"), validator)
+        self.assertIs(compile_validator(repo.get_exercise_type("SPRINT")), validator)
+        self.assertIsNone(repo.validator("TACKLE"))
+
+        self.ts.add_exercise_type(self.system_data, ExerciseType(code="TACKLE", parameters_metadata={"count": "int"}))
+        self.assertEqual(repo.validator("TACKLE")({"count": "3"}), {"count": 3})
+        # Novy typ se stejnym kodem (predefinovani) = novy validator.
+        types_before = len(self.system_data.exercise_types)
+        repo.add_exercise_type(ExerciseType(code="SPRINT", parameters_metadata={"distance_m": "float"}))
+        self.assertIsNot(repo.validator("SPRINT"), validator)
+        # Predefinovani nahradi puvodni typ - seznam i index zustanou stejne velke, bez prestaveni indexu.
+        self.assertEqual(len(self.system_data.exercise_types), types_before)
+        self.assertEqual(len(repo.exercise_types_by_code), types_before)
+        reindexes = []
+        repo.reindex = lambda: reindexes.append(1)
+        for _ in range(5):
+            self.ts.find_player(self.system_data, 1)
+        self.assertIs(repo.validator("SPRINT"), repo.validators["SPRINT"])
+        self.assertEqual(reindexes, [])
+        del repo.reindex
+        self.assertEqual(self.ts.validate_parameters(self.system_data, "SPRINT", {"distance_m": 5}), {"distance_m": 5.0})
+        with self.assertRaises(ValueError):
+            self.ts.validate_parameters(self.system_data, "SPRINT", {"distance_m": 5, "repetitions": 1})
+
+    def test_batch_validation(self):
+        items = []
+        for i in range(3000):
+            items.append(("SPRINT", {"distance_m": str(i), "repetitions": i % 7 + 1}))
+        items[10] = ("SPRINT", {"distance_m": 1.0, "repetitions": "x"})
+        items[20] = ("TACKLE", {"count": 1})
+        items[30] = ("NOTE", {"text": "ok"})
+        result = self.ts.validate_units(self.system_data, items)
+        self.assertFalse(result.ok)
+        self.assertEqual(sorted(result.errors), [10, 20])
+        self.assertEqual(result.errors[10], "Invalid value 'x' for repetitions. Expected int.")
+        self.assertEqual(result.errors[20], "Unknown exercise type 'TACKLE'.")
+        self.assertIsNone(result.params[10])
+        self.assertEqual(result.params[30], {"text": "ok"})
+        self.assertEqual(result.params[2999], {"distance_m": 2999.0, "repetitions": 4})
+        self.assertEqual(len(result.params), 3000)
+        self.assertTrue(self.ts.validate_units(self.system_data, []).ok)
+
+    def test_import_validates_each_batch_in_one_call(self):
+        calls = []
+        validate_units = self.ts.validate_units
+
+        def counting(system_data, items):
+            items = list(items)
+            calls.append(len(items))
+            return validate_units(system_data, items)
+        self.ts.validate_units = counting
+        rows = [(1, {"kind": "plan", "ref": "w", "player_id": 1})]
+        rows += [(i, {"kind": "unit", "plan_ref": "w", "type_code": "sprint",
+                      "params": {"distance_m": "10", "repetitions": "2"}}) for i in range(2, 1202)]
+        rows.append((1202, {"kind": "unit", "plan_ref": "w", "type_code": "SPRINT", "params": {"distance_m": 1}}))
+        report = self.ts.bulk_import(self.system_data, iter(rows), batch_size=500)
+        self.assertEqual(calls, [499, 500, 202])
+        self.assertEqual(report.units_added, 1200)
+        self.assertEqual([(r.line, r.message) for r in report.rejected],
+                         [(1202, "Missing parameters for SPRINT: repetitions.")])
+        with self.assertRaises(RowError):
+            coerce_parameters(self.system_data.exercise_types[0], {"distance_m": 1, "repetitions": 1, "x": 0})
+
+
+if __name__ == '__main__':
+    unittest.main()
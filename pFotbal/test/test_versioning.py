@@ -0,0 +1,181 @@
+import contextlib
+import copy
+import io
+import os
+import tempfile
+import threading
+import unittest
+from config import UNDO_DEPTH
+from src.codec import dumps, encode, get_encoder
+from src.models import TrainingPlan, STATUS_COMPLETED
+from src.repository import SystemRepository
+from src.services import DataManager, TrainingService, MODE_JOURNAL
+from src.synthetic import generate_system_data
+from src.versioning import FrozenList
+
+
+class TestCopyOnWriteSnapshots(unittest.TestCase):
+    """Tests O(1) snapshots, their isolation from later changes, and undo."""
+    # Testy snimku copy-on-write a vraceni zmen.
+    # اختبارات اللقطات والتراجع
+
+    def setUp(self):
+        self.tmp_dir = tempfile.TemporaryDirectory()
+        self.data_file = os.path.join(self.tmp_dir.name, "system_data.json")
+        with open(self.data_file, "wb") as f:
+            f.write(dumps(generate_system_data(players=5, plans_per_player=4, units_per_plan=3,
+                                               completed_ratio=0.3, seed=8)))
+        self._quiet = contextlib.redirect_stdout(io.StringIO())
+        self._quiet.__enter__()
+
+    def tearDown(self):
+        self._quiet.__exit__(None, None, None)
+        self.tmp_dir.cleanup()
+
+    def _open(self, **kwargs):
+        kwargs.setdefault("shared", False)
+        dm = DataManager(self.data_file, **kwargs)
+        return dm, TrainingService(dm), dm.load_data()
+
+    def assertSameContent(self, data, other):
+        # Undo nevraci sekvence ID, porovnavaji se jen seznamy.
+        self.assertEqual((data.players, data.exercise_types, data.training_plans),
+                         (other.players, other.exercise_types, other.training_plans))
+
+    def _mutate(self, dm, ts, system_data):
+        player = dm.add_player(system_data, "Novy", "GK")
+        plan = ts.create_training_plan(system_data, player.id, None)
+        ts.add_exercise_to_plan(system_data, plan.id, "JUMP", {"jumps_count": 10, "height_cm": 40.0})
+        old = next(p for p in system_data.training_plans if any(u.status != STATUS_COMPLETED for u in p.exercises))
+        unit = next(u for u in old.exercises if u.status != STATUS_COMPLETED)
+        ts.mark_exercise_completed(system_data, old.id, unit.id)
+        ts.add_exercise_to_plan(system_data, old.id, "SPRINT", {"distance_m": 20.0, "repetitions": 3})
+        SystemRepository.of(system_data).remove_plans([system_data.training_plans[1].id])
+
+    def test_snapshot_shares_data_and_is_isolated(self):
+        dm, ts, system_data = self._open()
+        repo = SystemRepository.of(system_data)
+        before = dumps(system_data)
+        view = repo.snapshot()
+        self.assertIsInstance(view.training_plans, FrozenList)
+        self.assertIs(view.training_plans.originals()[0], system_data.training_plans[0])
+        self.assertEqual(view.training_plans.saved, {})
+        self.assertIs(repo.snapshot(), view)  # bez zmeny stejny snimek
+
+        self._mutate(dm, ts, system_data)
+        self.assertEqual(dumps(view), before)
+        self.assertNotEqual(dumps(system_data), before)
+        self.assertEqual(len(view.training_plans.saved), 1)  # jen zmeneny existujici plan
+        # Pohled lze indexovat a dotazovat jako bezna data.
+        self.assertEqual(SystemRepository.of(view).squad_progress().plans_total, 20)
+        dm.close()
+
+    def test_encoding_while_item_changes(self):
+        dm, ts, system_data = self._open()
+        repo = SystemRepository.of(system_data)
+        plan = next(p for p in system_data.training_plans if p.status != STATUS_COMPLETED)
+        expected = encode(plan)
+        view = repo.snapshot()
+        encode_plan = get_encoder(TrainingPlan)
+
+        def encode_and_interfere(p):
+            # Zmena ziveho planu uprostred kodovani (jako prepnuti vlakna).
+            result = encode_plan(p)
+            if p is plan:
+                for unit in list(plan.exercises):
+                    repo.complete_unit(plan, unit)
+            return result
+        encoded = view.training_plans.map_items(encode_and_interfere)
+        self.assertEqual(encoded[system_data.training_plans.index(plan)], expected)
+        self.assertEqual(plan.status, STATUS_COMPLETED)
+        dm.close()
+
+    def test_background_saves_see_consistent_state(self):
+        dm, ts, system_data = self._open()
+        pending = [(p.id, u.id) for p in system_data.training_plans for u in p.exercises
+                   if u.status != STATUS_COMPLETED]
+        stop = threading.Event()
+
+        def save_loop():
+            while not stop.is_set():
+                dm.save_data(system_data)
+                dm.flush()
+        saver = threading.Thread(target=save_loop)
+        saver.start()
+        try:
+            for plan_id, unit_id in pending:
+                plan = ts.find_plan(system_data, plan_id)
+                ts.add_exercise_to_plan(system_data, plan_id, "SHOOT", {"shots_taken": 5, "goals_scored": 1})
+                ts.mark_exercise_completed(system_data, plan_id, unit_id)
+                self.assertTrue(plan.exercises)
+        finally:
+            stop.set()
+            saver.join()
+        dm.close()
+        self.assertIsNone(dm._writer)
+        _, _, reloaded = self._open()
+        self.assertEqual(reloaded, system_data)
+
+    def test_undo_restores_and_persists(self):
+        dm, ts, system_data = self._open()
+        original = copy.deepcopy(system_data)
+        player = dm.add_player(system_data, "Chyba", "GK")
+        after_player = dumps(system_data)
+        plan = ts.create_training_plan(system_data, player.id, None)
+        with dm.batch(system_data):
+            ts.add_exercise_to_plan(system_data, plan.id, "JUMP", {"jumps_count": 1, "height_cm": 1.0})
+            ts.add_exercise_to_plan(system_data, plan.id, "JUMP", {"jumps_count": 2, "height_cm": 2.0})
+        past = SystemRepository.of(system_data).view(2)
+        self.assertEqual(dumps(past), after_player)
+
+        self.assertEqual(dm.undo(system_data), 1)  # cely batch je jeden krok
+        self.assertEqual(plan.exercises, [])
+        self.assertIs(ts.find_plan(system_data, plan.id), plan)
+        self.assertEqual(dm.undo(system_data, 5), 2)
+        self.assertEqual(dm.undo(system_data), 0)
+        self.assertSameContent(system_data, original)
+        self.assertEqual(dm.add_player(system_data, "Dalsi", "DF").id, player.id + 1)  # ID se neopakuji
+        dm.close()
+        _, _, reloaded = self._open()
+        self.assertEqual([p.name for p in reloaded.players][-1], "Dalsi")
+        self.assertNotIn("Chyba", [p.name for p in reloaded.players])
+
+    def test_undo_in_journal_mode_and_after_archive(self):
+        dm, ts, system_data = self._open(persistence_mode=MODE_JOURNAL)
+        before = copy.deepcopy(system_data)
+        self._mutate(dm, ts, system_data)
+        progress = ts.get_squad_progress(system_data)
+        # Pet ulozenych zmen; odebrani planu primo v repozitari patri k posledni z nich.
+        self.assertEqual(dm.undo(system_data, 6), 5)
+        self.assertSameContent(system_data, before)
+        self.assertNotEqual(ts.get_squad_progress(system_data), progress)
+        self.assertEqual(ts.get_squad_progress(system_data),
+                         SystemRepository(generate_system_data(players=5, plans_per_player=4, units_per_plan=3,
+                                                               completed_ratio=0.3, seed=8)).squad_progress())
+        dm.close()
+        _, _, reloaded = self._open(persistence_mode=MODE_JOURNAL)
+        self.assertSameContent(reloaded, before)
+
+    def test_history_depth_and_shared_conflict(self):
+        dm, ts, system_data = self._open()
+        repo = SystemRepository.of(system_data)
+        for i in range(repo.history.maxlen + 5):
+            dm.add_player(system_data, f"P{i}", "MF")
+        self.assertEqual(dm.undo(system_data, 100), UNDO_DEPTH)
+        self.assertEqual(len(system_data.players), 5 + repo.history.maxlen + 5 - UNDO_DEPTH)
+        dm.close()
+
+        shared_dm, _, shared_data = self._open(shared=True)
+        shared_dm.add_player(shared_data, "A", "GK")
+        other_dm, _, other_data = self._open(shared=True)
+        other_dm.add_player(other_data, "B", "GK")
+        with self.assertRaises(RuntimeError):
+            shared_dm.undo(shared_data)
+        shared_dm.refresh(shared_data)
+        self.assertEqual(shared_dm.undo(shared_data), 0)
+        shared_dm.close()
+        other_dm.close()
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,61 @@
+import threading
+import unittest
+from src.writer import BackgroundWriter
+
+
+class TestBackgroundWriter(unittest.TestCase):
+
+    def test_burst_is_coalesced(self):
+        """Saves submitted while a write is running collapse into one follow-up write."""
+        # Vice pozadavku behem zapisu se slouci do jednoho.
+        release = threading.Event()
+        written = []
+
+        def write(payload):
+            release.wait(5)
+            written.append(payload)
+
+        writer = BackgroundWriter(write)
+        writer.submit(0)
+        for i in range(1, 20):
+            writer.submit(i)
+        release.set()
+        self.assertTrue(writer.flush(timeout=5))
+        writer.close()
+
+        self.assertLessEqual(len(written), 2)
+        self.assertEqual(written[-1], 19)
+
+    def test_close_writes_pending_and_rejects_new_work(self):
+        """Close drains the queue and the writer refuses further submits."""
+        written = []
+        writer = BackgroundWriter(written.append)
+        writer.submit("last")
+        writer.close()
+        self.assertEqual(written, ["last"])
+        self.assertFalse(writer.pending)
+        with self.assertRaises(RuntimeError):
+            writer.submit("late")
+
+    def test_failed_write_is_reported(self):
+        """A failing write does not kill the thread and is exposed as last_error."""
+        calls = []
+
+        def write(payload):
+            calls.append(payload)
+            if payload == "bad":
+                raise OSError("disk full")
+
+        writer = BackgroundWriter(write)
+        writer.submit("bad")
+        writer.flush(timeout=5)
+        self.assertIsInstance(writer.last_error, OSError)
+        writer.submit("good")
+        writer.flush(timeout=5)
+        writer.close()
+        self.assertIsNone(writer.last_error)
+        self.assertEqual(calls, ["bad", "good"])
+
+
+if __name__ == '__main__':
+    unittest.main()